@@ -0,0 +1,90 @@
+# Copyright 2002-2025, OpenNebula Project, OpenNebula Systems
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Latency of multi-ID get_vm_status: sequential vs. parallel fan-out.
+
+Every `onevm show` is simulated with a fixed latency (default 50 ms, roughly a
+warm CLI round trip) so the benchmark runs offline and isolates the effect of
+the fan-out strategy.
+
+Usage:
+    python -m benchmarks.bench_get_vm_status [--latency 0.05] [--repeat 5]
+"""
+
+import argparse
+import asyncio
+import xml.etree.ElementTree as ET
+
+from benchmarks.common import Timer, collect_tools, patched, print_table, summarize
+from src.tools.vm import vm
+
+ID_COUNTS = (1, 10, 100)
+
+
+def _fake_execute(latency: float):
+    async def execute_one_command(command_parts):
+        await asyncio.sleep(latency)
+        return f"<VM><ID>{command_parts[2]}</ID><STATE>3</STATE></VM>"
+
+    return execute_one_command
+
+
+async def _sequential_get_vm_status(vm_ids):
+    """Pre-fan-out behaviour: one `onevm show` after the other."""
+    root = ET.Element("VMS")
+    for vmid in vm_ids:
+        vm_xml = await vm.execute_one_command(["onevm", "show", vmid, "--xml"])
+        root.append(ET.fromstring(vm_xml))
+    return ET.tostring(root, encoding="unicode")
+
+
+async def _run(latency: float, repeat: int) -> None:
+    tools = collect_tools(vm, allow_write=False)
+    get_vm_status = tools["get_vm_status"]
+
+    rows = []
+    with patched(vm, "execute_one_command", _fake_execute(latency)):
+        for count in ID_COUNTS:
+            vm_ids = [str(i) for i in range(count)]
+            sequential, parallel = [], []
+            for _ in range(repeat):
+                with Timer() as t:
+                    await _sequential_get_vm_status(vm_ids)
+                sequential.append(t.elapsed)
+                with Timer() as t:
+                    await get_vm_status(",".join(vm_ids))
+                parallel.append(t.elapsed)
+
+            seq_ms = summarize(sequential)["p50"]
+            par_ms = summarize(parallel)["p50"]
+            rows.append([count, f"{seq_ms:.1f}", f"{par_ms:.1f}", f"{seq_ms / par_ms:.1f}x"])
+
+    print(
+        f"get_vm_status latency (p50 of {repeat} runs, {latency * 1000:.0f} ms per onevm show, "
+        f"fan-out limit {vm.MAX_PARALLEL_VM_FETCH})"
+    )
+    print_table(["ids", "sequential_ms", "parallel_ms", "speedup"], rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated seconds per onevm show")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per ID count")
+    args = parser.parse_args()
+    asyncio.run(_run(args.latency, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# Copyright 2002-2025, OpenNebula Project, OpenNebula Systems
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Latency of the detail fetch after a multi-instance instantiate_vm.
+
+Compares three ways of fetching the new VMs: one `onevm show` after the other
+(the previous behaviour), bounded parallel `onevm show` calls, and the single
+pool query over the new IDs that instantiate_vm now runs. Every command is
+simulated with a fixed latency (default 50 ms, roughly a warm CLI round trip);
+the pool query also pays a small per-VM cost for the larger response.
+
+Usage:
+    python -m benchmarks.bench_instantiate_vm [--latency 0.05] [--repeat 5]
+"""
+
+import argparse
+import asyncio
+import xml.etree.ElementTree as ET
+
+from benchmarks.common import Timer, collect_tools, patched, print_table, summarize
+from src.tools.vm import vm
+
+INSTANCE_COUNTS = (1, 10, 100)
+
+# Simulated extra seconds per VM of a pool listing
+POOL_COST_PER_VM = 0.0002
+
+
+def _vm_xml(vm_id) -> str:
+    return (
+        f"<VM><ID>{vm_id}</ID><NAME>bench-{vm_id}</NAME><STATE>1</STATE><LCM_STATE>0</LCM_STATE>"
+        f"<TEMPLATE><NIC><IP>10.0.{int(vm_id) // 256}.{int(vm_id) % 256}</IP></NIC></TEMPLATE></VM>"
+    )
+
+
+def _fake_execute(latency: float, count: int):
+    async def execute_one_command(command_parts):
+        await asyncio.sleep(latency)
+        if command_parts[1] == "instantiate":
+            return "\n".join(f"VM ID: {i}" for i in range(count))
+        return _vm_xml(command_parts[2])
+
+    return execute_one_command
+
+
+def _fake_stream(latency: float, count: int):
+    async def stream_one_command(command_parts, **kwargs):
+        await asyncio.sleep(latency + POOL_COST_PER_VM * count)
+        yield f"<VM_POOL>{''.join(_vm_xml(i) for i in range(count))}</VM_POOL>".encode()
+
+    return stream_one_command
+
+
+async def _sequential_fetch(vm_ids):
+    """Previous behaviour: one `onevm show` after the other."""
+    root = ET.Element("VMS")
+    for vm_id in vm_ids:
+        root.append(ET.fromstring(await vm.execute_one_command(["onevm", "show", vm_id, "--xml"])))
+    return ET.tostring(root, encoding="unicode")
+
+
+async def _parallel_fetch(vm_ids):
+    """Bounded parallel `onevm show`, as get_vm_status does."""
+    root = ET.Element("VMS")
+    root.extend(ET.fromstring(vm_xml) for vm_xml in await vm._fetch_vms_xml(vm_ids))
+    return ET.tostring(root, encoding="unicode")
+
+
+async def _run(latency: float, repeat: int) -> None:
+    tools = collect_tools(vm, allow_write=True)
+    instantiate_vm = tools["instantiate_vm"]
+
+    rows = []
+    for count in INSTANCE_COUNTS:
+        vm_ids = [str(i) for i in range(count)]
+        timings = {"sequential": [], "parallel": [], "tool": []}
+        with patched(vm, "execute_one_command", _fake_execute(latency, count)), patched(
+            vm, "stream_one_command", _fake_stream(latency, count)
+        ):
+            for _ in range(repeat):
+                with Timer() as t:
+                    await _sequential_fetch(vm_ids)
+                timings["sequential"].append(t.elapsed)
+                with Timer() as t:
+                    await _parallel_fetch(vm_ids)
+                timings["parallel"].append(t.elapsed)
+                # The tool also pays for the instantiate itself
+                with Timer() as t:
+                    await instantiate_vm(template_id="0", num_instances=str(count))
+                timings["tool"].append(t.elapsed - latency)
+
+        seq_ms, par_ms, tool_ms = (summarize(timings[k])["p50"] for k in ("sequential", "parallel", "tool"))
+        rows.append([count, f"{seq_ms:.1f}", f"{par_ms:.1f}", f"{tool_ms:.1f}", f"{seq_ms / tool_ms:.1f}x"])
+
+    print(
+        f"instantiate_vm detail fetch (p50 of {repeat} runs, {latency * 1000:.0f} ms per command, "
+        f"fan-out limit {vm.MAX_PARALLEL_VM_FETCH})"
+    )
+    print_table(["instances", "sequential_ms", "parallel_ms", "pool_query_ms", "speedup"], rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated seconds per command")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per instance count")
+    args = parser.parse_args()
+    asyncio.run(_run(args.latency, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# Copyright 2002-2025, OpenNebula Project, OpenNebula Systems
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+
+"""Peak memory of filtered list_vms: whole-document parse vs. streaming.
+
+For every pool size the fake CLI (``benchmarks.fake_cli``) serves a synthetic
+`onevm list --xml` document. Each mode runs in a fresh interpreter so the
+reported peak RSS (ru_maxrss) is not polluted by previous runs:
+
+* ``buffered``  – read the whole output, ``ET.fromstring`` it and filter
+                  (the behaviour before streaming was introduced).
+* ``streaming`` – the ``list_vms`` tool, which filters while parsing the
+                  command's stdout incrementally.
+
+Usage:
+    python -m benchmarks.bench_list_vms_memory [--sizes 1000,10000,50000] [--state 3]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import xml.etree.ElementTree as ET
+
+from benchmarks.common import Timer, print_table
+from benchmarks.fake_cli import fake_cli
+
+DEFAULT_SIZES = (1000, 10000, 50000)
+MODES = ("buffered", "streaming")
+
+
+def _peak_rss_mib() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def _buffered(state: str) -> int:
+    from src.tools.utils.base import execute_one_command
+
+    output = await execute_one_command(["onevm", "list", "--xml"])
+    root = ET.fromstring(output)
+    matching = [vm for vm in root.findall("VM") if vm.findtext("STATE") == state]
+    new_root = ET.Element("VM_POOL")
+    new_root.extend(matching)
+    return len(ET.tostring(new_root, encoding="unicode"))
+
+
+async def _streaming(state: str) -> int:
+    from benchmarks.common import collect_tools
+    from src.tools.vm import vm
+
+    list_vms = collect_tools(vm, allow_write=False)["list_vms"]
+    return len(await list_vms(state=state))
+
+
+def _worker(mode: str, state: str) -> None:
+    """Run one mode and print its measurements as JSON."""
+    runner = _buffered if mode == "buffered" else _streaming
+    # Import everything up front so the baseline covers the interpreter
+    import src.tools.vm.vm  # noqa: F401
+
+    baseline = _peak_rss_mib()
+    with Timer() as timer:
+        output_size = asyncio.run(runner(state))
+    print(
+        json.dumps(
+            {
+                "peak_mib": _peak_rss_mib(),
+                "delta_mib": _peak_rss_mib() - baseline,
+                "seconds": timer.elapsed,
+                "output_bytes": output_size,
+            }
+        )
+    )
+
+
+def _measure(mode: str, state: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_list_vms_memory", "--worker", mode, "--state", state],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        type=lambda v: [int(s) for s in v.split(",")],
+        default=list(DEFAULT_SIZES),
+        help="Comma separated pool sizes (default: 1000,10000,50000)",
+    )
+    parser.add_argument("--state", default="3", help="VM state filter (default: 3, ACTIVE)")
+    parser.add_argument("--worker", metavar="MODE", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(args.worker, args.state)
+        return
+
+    rows = []
+    for size in args.sizes:
+        with fake_cli({"vm": size}) as data_dir:
+            pool_mib = os.path.getsize(os.path.join(data_dir, "vm.xml")) / (1024 * 1024)
+
+            for mode in MODES:
+                m = _measure(mode, args.state)
+                rows.append(
+                    [
+                        size,
+                        f"{pool_mib:.1f}",
+                        mode,
+                        f"{m['peak_mib']:.1f}",
+                        f"{m['delta_mib']:.1f}",
+                        f"{m['seconds'] * 1000:.0f}",
+                        m["output_bytes"],
+                    ]
+                )
+
+    print_table(
+        ["VMs", "pool MiB", "mode", "peak RSS MiB", "RSS delta MiB", "time ms", "output bytes"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# Copyright 2002-2025, OpenNebula Project, OpenNebula Systems
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Per-call logging overhead: synchronous handlers vs. the queued pipeline.
+
+Simulates concurrent tool calls on one event loop, each logging like
+execute_one_command does (two DEBUG lines per command and an INFO line per
+call) around a short await. Logging goes through ``setup_logging`` at DEBUG
+level, with file logging under log/benchmarks and the console sent to
+/dev/null, either written synchronously (``queue_size=0``, the previous
+behaviour) or handed to the background writer. The time of each logging
+call is what the event loop, and so every concurrent tool call, waits for.
+
+Usage:
+    python -m benchmarks.bench_logging [--concurrency 1 10 50] [--calls 200]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+
+from benchmarks.common import Timer, patched, print_table, summarize
+from src.logging_config import dropped_log_records, flush_logging, reset_logging_config, setup_logging
+
+LOG_SUBDIRECTORY = "benchmarks"
+
+logger = logging.getLogger("opennebula_mcp.benchmarks")
+
+
+async def _tool_call(samples, commands: int) -> None:
+    for i in range(commands):
+        start = time.perf_counter()
+        logger.debug("Executing command: onevm show %s --xml", i)
+        samples.append(time.perf_counter() - start)
+        await asyncio.sleep(0)
+        start = time.perf_counter()
+        logger.debug("Command completed successfully: onevm show %s --xml", i)
+        samples.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    logger.info("Tool call done after %s commands", commands)
+    samples.append(time.perf_counter() - start)
+
+
+async def _load(concurrency: int, calls: int, commands: int):
+    samples = []
+    pending = [calls // concurrency] * concurrency
+
+    async def worker(count: int) -> None:
+        for _ in range(count):
+            await _tool_call(samples, commands)
+
+    with Timer() as t:
+        await asyncio.gather(*(worker(count) for count in pending))
+    return samples, t.elapsed
+
+
+def _run(queue_size: int, concurrency: int, calls: int, commands: int):
+    reset_logging_config()
+    with open(os.devnull, "w") as devnull, patched(sys, "stderr", devnull):
+        setup_logging(level="DEBUG", log_subdirectory=LOG_SUBDIRECTORY, queue_size=queue_size)
+        samples, elapsed = asyncio.run(_load(concurrency, calls, commands))
+        with Timer() as drain:
+            flush_logging()
+        dropped = sum(dropped_log_records().values())
+        reset_logging_config()
+    return summarize(samples), elapsed, drain.elapsed, dropped
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50], help="Concurrent tool calls")
+    parser.add_argument("--calls", type=int, default=200, help="Tool calls per run")
+    parser.add_argument("--commands", type=int, default=5, help="Commands logged per tool call")
+    parser.add_argument("--queue-size", type=int, default=10000, help="Queue size of the queued pipeline")
+    args = parser.parse_args()
+
+    rows = []
+    try:
+        for concurrency in args.concurrency:
+            for label, queue_size in (("sync", 0), ("queued", args.queue_size)):
+                stats, elapsed, drain, dropped = _run(queue_size, concurrency, args.calls, args.commands)
+                rows.append(
+                    [
+                        concurrency,
+                        label,
+                        f"{stats['p50'] * 1000:.1f}",
+                        f"{stats['p99'] * 1000:.1f}",
+                        f"{stats['mean'] * 1000:.1f}",
+                        f"{elapsed * 1000:.1f}",
+                        f"{drain * 1000:.1f}",
+                        dropped,
+                    ]
+                )
+    finally:
+        shutil.rmtree(Path(__file__).resolve().parent.parent / "log" / LOG_SUBDIRECTORY, ignore_errors=True)
+
+    print(f"Logging overhead per call ({args.calls} tool calls x {args.commands * 2 + 1} records, DEBUG level)")
+    print_table(
+        ["concurrency", "pipeline", "p50_us", "p99_us", "mean_us", "load_ms", "drain_ms", "dropped"], rows
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# Copyright 2002-2025, OpenNebula Project, OpenNebula Systems
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+
+"""Throughput and output size of the xml/json/csv output formats.
+
+Two paths are measured on synthetic VM pools:
+
+* ``convert``  – ``convert_xml`` on the full `onevm list --xml` document
+                 (unfiltered listings served from the pool cache).
+* ``pipeline`` – ``list_pool_page`` streaming the pool with a ``fields``
+                 projection (filtered, paged or projected listings).
+
+Usage:
+    python -m benchmarks.bench_output_formats [--sizes 1000,10000] [--repeat 3]
+"""
+
+import argparse
+import asyncio
+
+from benchmarks.common import Timer, patched, print_table
+from benchmarks.pool_generator import iter_vm_pool
+from src.tools.utils import pagination
+from src.tools.utils.formats import OUTPUT_FORMATS, convert_xml
+
+DEFAULT_SIZES = (1000, 10000)
+DEFAULT_FIELDS = "ID,NAME,STATE,LCM_STATE,TEMPLATE/NIC/IP,HISTORY_RECORDS/HISTORY[last()]/HOSTNAME"
+CHUNK_SIZE = 64 * 1024
+
+
+def _stream_from(data: bytes):
+    async def stream_one_command(command_parts, *args, **kwargs):
+        for offset in range(0, len(data), CHUNK_SIZE):
+            yield data[offset : offset + CHUNK_SIZE]
+
+    return stream_one_command
+
+
+def _best_of(repeat: int, fn):
+    best, result = None, None
+    for _ in range(repeat):
+        with Timer() as timer:
+            result = fn()
+        best = timer.elapsed if best is None else min(best, timer.elapsed)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        type=lambda v: [int(s) for s in v.split(",")],
+        default=list(DEFAULT_SIZES),
+        help="Comma separated pool sizes (default: 1000,10000)",
+    )
+    parser.add_argument("--fields", default=DEFAULT_FIELDS, help="Projection used by the pipeline rows")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement, best is kept")
+    args = parser.parse_args()
+
+    rows = []
+    for size in args.sizes:
+        xml_doc = "".join(iter_vm_pool(size))
+        xml_bytes = len(xml_doc.encode())
+
+        for output_format in OUTPUT_FORMATS:
+            seconds, output = _best_of(args.repeat, lambda: convert_xml(xml_doc, output_format))
+            rows.append(_row(size, "convert", output_format, xml_bytes, seconds, output))
+
+        with patched(pagination, "stream_one_command", _stream_from(xml_doc.encode())):
+            for output_format in OUTPUT_FORMATS:
+                seconds, output = _best_of(
+                    args.repeat,
+                    lambda: asyncio.run(
+                        pagination.list_pool_page(
+                            ["onevm", "list", "--xml"], fields=args.fields, output_format=output_format
+                        )
+                    ),
+                )
+                rows.append(_row(size, "pipeline+fields", output_format, xml_bytes, seconds, output))
+
+    print_table(
+        ["VMs", "path", "format", "time ms", "input MiB/s", "VMs/s", "output KiB", "vs XML input"],
+        rows,
+    )
+
+
+def _row(size, path, output_format, xml_bytes, seconds, output):
+    out_bytes = len(output.encode())
+    # convert_xml(..., "xml") is the identity, its rate is meaningless
+    measurable = seconds > 1e-4
+    return [
+        size,
+        path,
+        output_format,
+        f"{seconds * 1000:.1f}",
+        f"{xml_bytes / seconds / 2**20:.0f}" if measurable else "-",
+        f"{size / seconds:.0f}" if measurable else "-",
+        f"{out_bytes / 1024:.0f}",
+        f"{out_bytes / xml_bytes:.1%}",
+    ]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# Copyright 2002-2025, OpenNebula Project, OpenNebula Systems
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""execute_command latency: one SSH connection per command vs. persistent sessions.
+
+The fake CLI's ``ssh`` stands in for sshd: a new connection costs a simulated
+handshake (default 300 ms, within the 200-800 ms of a real TCP + key exchange +
+auth), while commands sent through a ControlMaster it left behind only pay
+for the client start-up. Agents typically run several small commands in a row
+on the same VMs, which is what each workload replays sequentially.
+
+Usage:
+    python -m benchmarks.bench_ssh_sessions [--handshake 0.3] [--commands 10] [--max-sessions 4]
+"""
+
+import argparse
+import asyncio
+import os
+
+from benchmarks.common import Timer, collect_tools, print_table, summarize
+from benchmarks.fake_cli import fake_cli
+from src.tools.utils.ssh import configure_ssh, ssh_sessions
+from src.tools.vm import vm
+
+# (label, number of VMs the commands are spread over round-robin)
+WORKLOADS = (("1 VM", 1), ("3 VMs", 3), ("8 VMs", 8))
+
+
+async def _run_workload(execute_command, vms: int, commands: int):
+    samples = []
+    for n in range(commands):
+        with Timer() as t:
+            await execute_command(f"10.0.0.{n % vms + 1}", f"df -h /var/{n}")
+        samples.append(t.elapsed)
+    return samples
+
+
+async def _run(commands: int, max_sessions: int) -> list:
+    execute_command = collect_tools(vm, allow_write=True)["execute_command"]
+    rows = []
+    for label, vms in WORKLOADS:
+        for multiplexing in (False, True):
+            # A fresh pool per run, so every workload starts without sessions
+            configure_ssh(enabled=multiplexing, max_sessions=max_sessions)
+            samples = await _run_workload(execute_command, vms, commands)
+            stats = summarize(samples)
+            rows.append(
+                [
+                    label,
+                    "persistent" if multiplexing else "per command",
+                    f"{stats['p50']:.1f}",
+                    f"{stats['p95']:.1f}",
+                    f"{sum(samples) * 1000:.0f}",
+                    ssh_sessions.evicted if multiplexing else "-",
+                ]
+            )
+    configure_ssh(enabled=False)
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--handshake", type=float, default=0.3, help="Simulated seconds per SSH handshake")
+    parser.add_argument("--commands", type=int, default=10, help="Commands per workload")
+    parser.add_argument("--max-sessions", type=int, default=4, help="Session cap of the pool")
+    args = parser.parse_args()
+
+    os.environ["FAKE_SSH_HANDSHAKE"] = str(args.handshake)
+    with fake_cli():
+        rows = asyncio.run(_run(args.commands, args.max_sessions))
+
+    print(
+        f"execute_command latency, {args.commands} sequential commands per workload "
+        f"({args.handshake * 1000:.0f} ms handshake, at most {args.max_sessions} sessions)"
+    )
+    print_table(["workload", "ssh", "p50 ms", "p95 ms", "total ms", "evictions"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+# Copyright 2002-2025, OpenNebula Project, OpenNebula Systems
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""End-to-end latency and peak RSS of every tool against the fake CLI.
+
+Nothing is mocked inside the server: each tool runs its real command path and
+spawns the `one*`/`ssh` shims from ``benchmarks.fake_cli``, which serve
+synthetic pools of the requested sizes. Every tool is measured in a fresh
+interpreter so its peak RSS is not polluted by the other tools; only the
+server process is reported, as the ru_maxrss of a CLI child also counts the
+forked parent before exec. The pool cache is disabled unless ``--cache`` is
+given, so every call pays for its commands.
+
+Usage:
+    python -m benchmarks.bench_tools [--sizes vm=10000,host=200] [--iterations 20]
+                                     [--tools list_vms,get_vm_status] [--latency 0] [--cache]
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import subprocess
+import sys
+from typing import Dict, List
+
+from benchmarks.common import Timer, collect_tools, print_table, summarize
+from benchmarks.fake_cli import fake_cli
+
+# Arguments each scenario calls its tool with ("tool[variant]" names a second
+# scenario of the same tool); IDs exist in the default pool sizes
+TOOL_ARGS: Dict[str, dict] = {
+    # vm
+    "get_vm_status": {"vm_id": "1"},
+    "execute_command": {"vm_ip_address": "10.0.0.1", "command": "uptime"},
+    "list_vms": {},
+    "list_vms[state]": {"state": "3"},
+    "list_vms[page]": {"limit": "50", "fields": "ID,NAME,STATE"},
+    "wait_for_vm_state": {"vm_ids": "1,2,7", "state": "3"},
+    "instantiate_vm": {"template_id": "0", "vm_name": "bench"},
+    "manage_vm": {"vm_id": "1", "operation": "reboot"},
+    "vm_disk_attach": {"vm_id": "1", "image_id": "0"},
+    "vm_disk_detach": {"vm_id": "1", "disk_id": "1"},
+    "vm_disk_resize": {"vm_id": "1", "disk_id": "0", "size": "20480"},
+    "vm_snapshot_create": {"vm_id": "1", "name": "bench"},
+    "vm_snapshot_revert": {"vm_id": "1", "snapshot_id": "0"},
+    "vm_nic_attach": {"vm_id": "1", "network_id": "0"},
+    "vm_nic_detach": {"vm_id": "1", "nic_id": "0"},
+    "get_vm_log": {"vm_id": "1"},
+    # infra
+    "list_clusters": {},
+    "list_hosts": {},
+    "list_hosts[cluster]": {"cluster_id": "1"},
+    "list_datastores": {},
+    "list_networks": {},
+    "list_images": {},
+    "list_images[json]": {"output_format": "json"},
+    "create_image": {"name": "bench", "path": "/tmp/bench.qcow2", "datastore_id": "1"},
+    "delete_image": {"image_id": "0"},
+    "update_image_type": {"image_id": "0", "type": "DATABLOCK"},
+    "create_vnet": {"template_content": 'NAME="bench"\nVN_MAD="bridge"'},
+    "delete_vnet": {"vnet_id": "0"},
+    "reserve_vnet": {"vnet_id": "0", "size": "10"},
+    "enable_host": {"host_id": "0"},
+    "disable_host": {"host_id": "0"},
+    "host_monitoring": {"host_id": "0"},
+    # market
+    "list_markets": {},
+    "search_market_apps": {},
+    "search_market_apps[filter]": {"filter_str": "ubuntu"},
+    "import_market_app": {"app_id": "0", "datastore_id": "1"},
+    # oneflow
+    "list_service_templates": {},
+    "deploy_service": {"template_id": "0"},
+    "list_services": {},
+    "get_service_info": {"service_id": "0"},
+    "delete_service": {"service_id": "0"},
+    "service_action": {"service_id": "0", "action": "suspend"},
+    "scale_service": {"service_id": "0", "role_name": "worker", "cardinality": "3"},
+    "get_service_log": {"service_id": "0"},
+    "recover_service": {"service_id": "0"},
+    # templates
+    "list_templates": {},
+    "update_template": {"template_id": "0", "content": 'CPU="2"', "append": True},
+    # tenancy
+    "list_users": {},
+    "create_user": {"name": "bench", "password": "bench"},
+    "update_user_quota": {"user_id": "1", "quota_template": "VM=[VMS=10]"},
+    "delete_user": {"user_id": "1"},
+    "list_groups": {},
+    "create_group": {"name": "bench"},
+    "add_user_to_group": {"group_id": "1", "user_id": "1"},
+    "delete_group": {"group_id": "1"},
+    "list_acls": {},
+    "create_acl": {"user": "@1", "resources": "VM+NET/*", "rights": "USE"},
+    "delete_acl": {"acl_id": "1"},
+}
+
+
+def _all_tools() -> dict:
+    from src.tools.infra import infra
+    from src.tools.market import market
+    from src.tools.oneflow import oneflow
+    from src.tools.templates import templates
+    from src.tools.tenancy import tenancy
+    from src.tools.vm import vm
+
+    tools = {}
+    for module in (vm, infra, market, oneflow, templates, tenancy):
+        tools.update(collect_tools(module, allow_write=True))
+    return tools
+
+
+def _peak_rss_mib() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def _run_tool(scenario: str, iterations: int) -> dict:
+    tool = _all_tools()[scenario.split("[")[0]]
+    kwargs = TOOL_ARGS[scenario]
+
+    # One warm-up call (imports, first subprocess) is not measured
+    output = await tool(**kwargs)
+    samples = []
+    for _ in range(iterations):
+        with Timer() as t:
+            output = await tool(**kwargs)
+        samples.append(t.elapsed)
+    return {"samples": samples, "output_bytes": len(output), "error": output.startswith("<error>")}
+
+
+def _worker(scenario: str, iterations: int, cache: bool) -> None:
+    """Measure one tool scenario and print the results as JSON."""
+    from src.tools.utils.cache import configure_pool_cache
+
+    configure_pool_cache(enabled=cache)
+    result = asyncio.run(_run_tool(scenario, iterations))
+    result["peak_mib"] = _peak_rss_mib()
+    print(json.dumps(result))
+
+
+def _measure(scenario: str, iterations: int, cache: bool) -> dict:
+    command = [sys.executable, "-m", "benchmarks.bench_tools", "--worker", scenario]
+    command += ["--iterations", str(iterations)] + (["--cache"] if cache else [])
+    result = subprocess.run(command, check=True, capture_output=True, text=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def _parse_sizes(value: str) -> Dict[str, int]:
+    sizes = {}
+    for item in filter(None, value.split(",")):
+        pool, _, count = item.partition("=")
+        sizes[pool.strip()] = int(count)
+    return sizes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        type=_parse_sizes,
+        default={},
+        help="Pool sizes as pool=count pairs, e.g. vm=10000,host=200 (defaults in fake_cli)",
+    )
+    parser.add_argument("--iterations", type=int, default=20, help="Measured calls per tool")
+    parser.add_argument(
+        "--tools",
+        type=lambda v: v.split(","),
+        default=list(TOOL_ARGS),
+        help="Comma separated scenarios to run (default: all)",
+    )
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds every fake command sleeps")
+    parser.add_argument("--cache", action="store_true", help="Keep the pool cache enabled")
+    parser.add_argument("--worker", metavar="SCENARIO", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(args.worker, args.iterations, args.cache)
+        return
+
+    unknown = [scenario for scenario in args.tools if scenario not in TOOL_ARGS]
+    if unknown:
+        parser.error(f"unknown tool scenarios: {', '.join(unknown)}")
+
+    rows: List[List[object]] = []
+    with fake_cli(args.sizes, latency=args.latency):
+        for scenario in args.tools:
+            m = _measure(scenario, args.iterations, args.cache)
+            stats = summarize(m["samples"])
+            rows.append(
+                [
+                    scenario,
+                    f"{stats['p50']:.1f}",
+                    f"{stats['p95']:.1f}",
+                    f"{stats['p99']:.1f}",
+                    f"{m['peak_mib']:.1f}",
+                    m["output_bytes"],
+                    "error" if m["error"] else "ok",
+                ]
+            )
+
+    print(
+        f"Tool latency over {args.iterations} calls against the fake CLI "
+        f"(pool cache {'on' if args.cache else 'off'}, {args.latency * 1000:.0f} ms per command)"
+    )
+    print_table(
+        ["tool", "p50 ms", "p95 ms", "p99 ms", "peak RSS MiB", "output bytes", "result"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
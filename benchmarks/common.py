@@ -0,0 +1,93 @@
+# Copyright 2002-2025, OpenNebula Project, OpenNebula Systems
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Helpers shared by the benchmark scripts."""
+
+import statistics
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List
+
+
+class ToolCollector:
+    """Minimal stand-in for FastMCP that records registered tools by name."""
+
+    def __init__(self) -> None:
+        self.tools: Dict[str, Callable] = {}
+
+    def tool(self, *, name: str, description: str):
+        def decorator(fn):
+            self.tools[name] = fn
+            return fn
+
+        return decorator
+
+
+def collect_tools(module, **register_kwargs) -> Dict[str, Callable]:
+    """Register *module*'s tools on a ToolCollector and return them."""
+    collector = ToolCollector()
+    module.register_tools(collector, **register_kwargs)
+    return collector.tools
+
+
+@contextmanager
+def patched(obj, attr: str, value) -> Iterator[None]:
+    """Temporarily replace ``obj.attr`` with *value*."""
+    original = getattr(obj, attr)
+    setattr(obj, attr, value)
+    try:
+        yield
+    finally:
+        setattr(obj, attr, original)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Return the *pct* percentile (0-100) of *samples* by nearest rank."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Return p50/p95/p99 and mean of *samples* (seconds) in milliseconds."""
+    return {
+        "p50": percentile(samples, 50) * 1000,
+        "p95": percentile(samples, 95) * 1000,
+        "p99": percentile(samples, 99) * 1000,
+        "mean": statistics.fmean(samples) * 1000,
+    }
+
+
+class Timer:
+    """Context manager measuring wall time with perf_counter."""
+
+    def __enter__(self) -> "Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.elapsed = time.perf_counter() - self.start
+
+
+def print_table(headers: List[str], rows: List[List[object]]) -> None:
+    """Print *rows* as a left-aligned plain-text table."""
+    widths = [
+        max(len(str(h)), *(len(str(r[i])) for r in rows)) if rows else len(str(h))
+        for i, h in enumerate(headers)
+    ]
+    print("  ".join(str(h).ljust(w) for h, w in zip(headers, widths)))
+    print("  ".join("-" * w for w in widths))
+    for row in rows:
+        print("  ".join(str(c).ljust(w) for c, w in zip(row, widths)))
@@ -0,0 +1,296 @@
+# Copyright 2002-2025, OpenNebula Project, OpenNebula Systems
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Offline stand-in for the OpenNebula CLI (`onevm`, `onehost`, ..., `ssh`).
+
+``fake_cli`` writes synthetic pool documents to a data directory and a shim
+executable per command to a bin directory; with the bin directory first on
+PATH the tools run their real subprocess code path against it. Each shim
+runs ``python -m benchmarks.fake_cli <command> <args>``, which:
+
+* ``list --xml``      – copies the pre-generated pool file to stdout
+                        (filter flags are accepted and ignored);
+* ``show <id> --xml`` – prints one generated element;
+* ``create``/``instantiate``/``export``/``reserve`` – print the ``ID: <n>``
+  lines the real CLI prints;
+* ``oneflow``/``oneflow-template`` ``list``/``show --json`` – print JSON;
+* ``onelog``          – prints a few lines of text;
+* ``ssh``             – stands in for sshd as well: a new connection sleeps
+                        FAKE_SSH_HANDSHAKE seconds (default 0.3, TCP + key
+                        exchange + auth). With ``ControlMaster``/``ControlPath``
+                        options it leaves a master process behind listening on
+                        the control socket, which later commands (and
+                        ``-O stop``/``-O exit``) talk to without a handshake,
+                        until ``ControlPersist`` seconds pass without commands;
+* anything else       – succeeds silently, like most CLI actions.
+
+Every call sleeps FAKE_ONE_LATENCY seconds first (default 0) to emulate oned
+(or network) round trips on top of the interpreter start-up.
+
+Usage (by the benchmark scripts):
+    with fake_cli({"vm": 10000, "host": 50}):
+        ...  # onevm/onehost/... on PATH now serve synthetic data
+"""
+
+import hashlib
+import json
+import os
+import shlex
+import shutil
+import socket
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from benchmarks.pool_generator import POOLS, write_pool
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Pool sizes used when the caller does not give one
+DEFAULT_POOL_SIZES = {
+    "vm": 1000,
+    "host": 50,
+    "image": 200,
+    "template": 100,
+    "marketapp": 300,
+    "cluster": 5,
+    "datastore": 3,
+    "vnet": 10,
+    "user": 20,
+    "group": 3,
+    "acl": 30,
+    "market": 2,
+}
+
+COMMANDS = tuple(f"one{pool}" for pool in POOLS) + (
+    "oneflow",
+    "oneflow-template",
+    "onelog",
+    "ssh",
+)
+
+CREATE_SUBCOMMANDS = {"create", "reserve", "instantiate", "export", "clone"}
+
+
+def install(bin_dir: str, data_dir: str, sizes: Optional[Dict[str, int]] = None) -> None:
+    """Generate the pool files in *data_dir* and the command shims in *bin_dir*.
+
+    Args:
+        bin_dir: Directory receiving one executable per CLI command
+        data_dir: Directory receiving ``<pool>.xml`` for every pool
+        sizes: Number of elements per pool, merged over DEFAULT_POOL_SIZES
+    """
+    counts = {**DEFAULT_POOL_SIZES, **(sizes or {})}
+    for pool, count in counts.items():
+        with open(os.path.join(data_dir, f"{pool}.xml"), "w", encoding="utf-8") as f:
+            write_pool(f, pool, count)
+    with open(os.path.join(data_dir, "sizes.json"), "w", encoding="utf-8") as f:
+        json.dump(counts, f)
+
+    for command in COMMANDS:
+        shim = os.path.join(bin_dir, command)
+        with open(shim, "w", encoding="utf-8") as f:
+            f.write(
+                "#!/bin/sh\n"
+                f"PYTHONPATH={shlex.quote(REPO_ROOT)} FAKE_ONE_DATA={shlex.quote(data_dir)} "
+                f"exec {shlex.quote(sys.executable)} -m benchmarks.fake_cli {command} \"$@\"\n"
+            )
+        os.chmod(shim, 0o755)
+
+
+@contextmanager
+def fake_cli(sizes: Optional[Dict[str, int]] = None, latency: float = 0.0) -> Iterator[str]:
+    """Put the fake CLI first on PATH for the duration of the block.
+
+    Args:
+        sizes: Number of elements per pool, merged over DEFAULT_POOL_SIZES
+        latency: Seconds every fake command sleeps before answering
+
+    Yields:
+        str: The data directory holding the generated pool files
+    """
+    saved = {key: os.environ.get(key) for key in ("PATH", "FAKE_ONE_LATENCY")}
+    with tempfile.TemporaryDirectory(prefix="fake-one-") as tmp:
+        bin_dir = os.path.join(tmp, "bin")
+        data_dir = os.path.join(tmp, "data")
+        os.mkdir(bin_dir)
+        os.mkdir(data_dir)
+        install(bin_dir, data_dir, sizes)
+
+        os.environ["PATH"] = bin_dir + os.pathsep + (saved["PATH"] or "")
+        os.environ["FAKE_ONE_LATENCY"] = str(latency)
+        try:
+            yield data_dir
+        finally:
+            for key, value in saved.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+
+
+def _service_json(service_id: int) -> dict:
+    roles = [
+        {"name": role, "cardinality": 2, "state": 2, "nodes": [{"deploy_id": service_id * 10 + n}]}
+        for n, role in enumerate(("frontend", "worker"))
+    ]
+    return {
+        "DOCUMENT": {
+            "ID": str(service_id),
+            "NAME": f"bench-service-{service_id}",
+            "TEMPLATE": {"BODY": {"state": 2, "roles": roles, "deployment": "straight"}},
+        }
+    }
+
+
+def _oneflow(args: List[str], template: bool) -> int:
+    subcommand = args[0] if args else ""
+    if subcommand == "list":
+        documents = [_service_json(i)["DOCUMENT"] for i in range(10)]
+        print(json.dumps({"DOCUMENT_POOL": {"DOCUMENT": documents}}))
+    elif subcommand == "show":
+        print(json.dumps(_service_json(int(args[1]))))
+    elif subcommand == "instantiate" and template:
+        print("ID: 100")
+    return 0
+
+
+def _one(pool: str, args: List[str], data_dir: str) -> int:
+    subcommand = args[0] if args else ""
+    if subcommand == "list":
+        with open(os.path.join(data_dir, f"{pool}.xml"), "rb") as f:
+            shutil.copyfileobj(f, sys.stdout.buffer)
+        return 0
+
+    if subcommand == "show":
+        if len(args) < 2 or not args[1].isdigit():
+            print(f"{pool.upper()} named {args[1:2]} not found.", file=sys.stderr)
+            return 255
+        print(POOLS[pool][1](int(args[1])))
+        return 0
+
+    if subcommand in CREATE_SUBCOMMANDS:
+        # New objects get the first ID past the generated pool
+        with open(os.path.join(data_dir, "sizes.json"), encoding="utf-8") as f:
+            sizes = json.load(f)
+        new_id = sizes.get(pool, 0)
+        if pool == "template" and subcommand == "instantiate":
+            copies = int(args[args.index("--multiple") + 1]) if "--multiple" in args else 1
+            for n in range(copies):
+                print(f"VM ID: {sizes['vm'] + n}")
+        elif pool == "marketapp" and subcommand == "export":
+            print(f"IMAGE\n    ID: {new_id}\nVMTEMPLATE\n    ID: {new_id}")
+        else:
+            print(f"ID: {new_id}")
+    return 0
+
+
+def _ssh_send(control_path: str, message: str) -> Optional[str]:
+    """Send *message* to the master listening on *control_path*, if any."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.connect(control_path)
+            conn.sendall(message.encode())
+            conn.shutdown(socket.SHUT_WR)
+            return b"".join(iter(lambda: conn.recv(65536), b"")).decode()
+    except OSError:
+        return None
+
+
+def _ssh_master(control_path: str, persist: float) -> None:
+    """Fork a detached master answering commands on *control_path*."""
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    if os.path.exists(control_path):
+        os.unlink(control_path)
+    server.bind(control_path)
+    server.listen()
+    sys.stdout.flush()
+    if os.fork():
+        server.close()
+        return
+
+    # Detach like ssh does, so the client's stdout pipe reaches EOF
+    os.setsid()
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+    server.settimeout(persist or None)
+    try:
+        while True:
+            conn, _ = server.accept()
+            with conn:
+                message = b"".join(iter(lambda: conn.recv(65536), b"")).decode()
+                if message.startswith("\0"):
+                    conn.sendall(b"ok")
+                    break  # -O stop / -O exit
+                conn.sendall(f"fake output of: {message}\n".encode())
+    except socket.timeout:
+        pass
+    finally:
+        os.unlink(control_path)
+        os._exit(0)
+
+
+def _ssh(args: List[str]) -> int:
+    options: Dict[str, str] = {}
+    control = None
+    while args and args[0].startswith("-"):
+        if args[0] == "-o":
+            key, _, value = args[1].partition("=")
+            options[key] = value
+            args = args[2:]
+        elif args[0] == "-O":
+            control, args = args[1], args[2:]
+        else:
+            args = args[1:]
+    target, remote = args[0], " ".join(args[1:])
+    control_path = options.get("ControlPath", "").replace(
+        "%C", hashlib.sha1(target.encode()).hexdigest()[:16]
+    )
+
+    if control:
+        return 0 if control_path and _ssh_send(control_path, f"\0{control}") else 255
+    if control_path:
+        output = _ssh_send(control_path, remote)
+        if output is not None:
+            sys.stdout.write(output)
+            return 0
+
+    time.sleep(float(os.environ.get("FAKE_SSH_HANDSHAKE") or 0.3))
+    if control_path and options.get("ControlMaster") in ("auto", "yes"):
+        _ssh_master(control_path, float(options.get("ControlPersist") or 0))
+    print(f"fake output of: {remote}")
+    return 0
+
+
+def main(argv: List[str]) -> int:
+    command, args = argv[0], argv[1:]
+    time.sleep(float(os.environ.get("FAKE_ONE_LATENCY") or 0))
+
+    if command == "ssh":
+        return _ssh(args)
+    if command == "onelog":
+        for n in range(20):
+            print(f"Mon Jan  1 00:00:{n:02d} 2024 [Z0][VM][I]: Benchmark log line {n} for {args[-1]}")
+        return 0
+    if command in ("oneflow", "oneflow-template"):
+        return _oneflow(args, template=command == "oneflow-template")
+    return _one(command[len("one"):], args, os.environ["FAKE_ONE_DATA"])
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,307 @@
+# Copyright 2002-2025, OpenNebula Project, OpenNebula Systems
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+
+"""Synthetic OpenNebula pool documents for offline benchmarks.
+
+The documents follow the shape of `one<resource> list --xml` closely enough
+for the tools' parsers and filters (IDs, states, cluster membership, history
+records, and TEMPLATE payloads of realistic size: a few KB per VM and host,
+around one KB per image, template and marketplace app).
+"""
+
+from typing import IO, Callable, Dict, Iterator, Tuple
+
+VM_STATES = (3, 3, 3, 8, 5, 1)  # weighted towards ACTIVE
+
+
+def vm_xml(vm_id: int, hosts: int = 50, clusters: int = 5) -> str:
+    """Return the XML of one synthetic VM."""
+    state = VM_STATES[vm_id % len(VM_STATES)]
+    lcm_state = 3 if state == 3 else 0
+    host_id = vm_id % hosts
+    cluster_id = host_id % clusters
+    ip = f"10.{(vm_id >> 16) & 255}.{(vm_id >> 8) & 255}.{vm_id & 255}"
+    disks = "".join(
+        f"<DISK><DISK_ID>{d}</DISK_ID><IMAGE_ID>{d}</IMAGE_ID><DATASTORE_ID>1</DATASTORE_ID>"
+        f"<SIZE>10240</SIZE><TARGET>vd{'abc'[d]}</TARGET><TYPE>FILE</TYPE>"
+        f"<SOURCE>/var/lib/one/datastores/1/{vm_id:08x}{d:024x}</SOURCE></DISK>"
+        for d in range(2)
+    )
+    # Two history records: a previous host, then the current one (last record)
+    history = "".join(
+        f"<HISTORY><OID>{vm_id}</OID><SEQ>{seq}</SEQ><HOSTNAME>kvm-{hid:03d}</HOSTNAME>"
+        f"<HID>{hid}</HID><CID>{hid % clusters}</CID>"
+        f"<STIME>1700000000</STIME><ETIME>0</ETIME><VM_MAD>kvm</VM_MAD><TM_MAD>ssh</TM_MAD>"
+        f"<DS_ID>0</DS_ID><ACTION>0</ACTION></HISTORY>"
+        for seq, hid in enumerate(((host_id + 1) % hosts, host_id))
+    )
+    return (
+        f"<VM><ID>{vm_id}</ID><UID>0</UID><GID>0</GID><UNAME>oneadmin</UNAME>"
+        f"<GNAME>oneadmin</GNAME><NAME>bench-vm-{vm_id}</NAME>"
+        f"<PERMISSIONS><OWNER_U>1</OWNER_U><OWNER_M>1</OWNER_M><OWNER_A>0</OWNER_A>"
+        f"<GROUP_U>0</GROUP_U><GROUP_M>0</GROUP_M><GROUP_A>0</GROUP_A>"
+        f"<OTHER_U>0</OTHER_U><OTHER_M>0</OTHER_M><OTHER_A>0</OTHER_A></PERMISSIONS>"
+        f"<LAST_POLL>1700000000</LAST_POLL><STATE>{state}</STATE><LCM_STATE>{lcm_state}</LCM_STATE>"
+        f"<PREV_STATE>{state}</PREV_STATE><PREV_LCM_STATE>{lcm_state}</PREV_LCM_STATE>"
+        f"<RESCHED>0</RESCHED><STIME>1700000000</STIME><ETIME>0</ETIME><DEPLOY_ID>one-{vm_id}</DEPLOY_ID>"
+        f"<MONITORING><CPU>{vm_id % 100}.0</CPU><MEMORY>524288</MEMORY><STATE>a</STATE></MONITORING>"
+        f"<TEMPLATE><AUTOMATIC_DS_REQUIREMENTS><![CDATA[(\"CLUSTERS/ID\" @> {cluster_id})]]></AUTOMATIC_DS_REQUIREMENTS>"
+        f"<CONTEXT><DISK_ID>2</DISK_ID><ETH0_IP>{ip}</ETH0_IP><ETH0_MAC>02:00:{ip}</ETH0_MAC>"
+        f"<NETWORK>YES</NETWORK><SSH_PUBLIC_KEY><![CDATA[ssh-ed25519 {'A' * 68} bench]]></SSH_PUBLIC_KEY>"
+        f"<TARGET>hda</TARGET></CONTEXT><CPU>1</CPU>{disks}"
+        f"<GRAPHICS><LISTEN>0.0.0.0</LISTEN><PORT>{5900 + vm_id}</PORT><TYPE>VNC</TYPE></GRAPHICS>"
+        f"<MEMORY>1024</MEMORY><NIC><AR_ID>0</AR_ID><BRIDGE>br0</BRIDGE><IP>{ip}</IP>"
+        f"<MAC>02:00:{ip}</MAC><NETWORK>public</NETWORK><NETWORK_ID>0</NETWORK_ID><NIC_ID>0</NIC_ID>"
+        f"<VN_MAD>bridge</VN_MAD></NIC><OS><ARCH>x86_64</ARCH></OS><TEMPLATE_ID>0</TEMPLATE_ID>"
+        f"<VCPU>1</VCPU><VMID>{vm_id}</VMID></TEMPLATE>"
+        f"<USER_TEMPLATE><DESCRIPTION>Synthetic benchmark VM {vm_id}</DESCRIPTION>"
+        f"<LOGO>images/logos/linux.png</LOGO><SCHED_REQUIREMENTS>ID=\"{host_id}\"</SCHED_REQUIREMENTS>"
+        f"</USER_TEMPLATE><HISTORY_RECORDS>{history}</HISTORY_RECORDS></VM>"
+    )
+
+
+_PERMISSIONS = (
+    "<PERMISSIONS><OWNER_U>1</OWNER_U><OWNER_M>1</OWNER_M><OWNER_A>0</OWNER_A>"
+    "<GROUP_U>0</GROUP_U><GROUP_M>0</GROUP_M><GROUP_A>0</GROUP_A>"
+    "<OTHER_U>0</OTHER_U><OTHER_M>0</OTHER_M><OTHER_A>0</OTHER_A></PERMISSIONS>"
+)
+_OWNER = "<UID>0</UID><GID>0</GID><UNAME>oneadmin</UNAME><GNAME>oneadmin</GNAME>"
+
+
+def host_xml(host_id: int, clusters: int = 5) -> str:
+    """Return the XML of one synthetic KVM host."""
+    cluster_id = host_id % clusters
+    vms = "".join(f"<ID>{vm_id}</ID>" for vm_id in range(host_id, host_id + 500, 50))
+    return (
+        f"<HOST><ID>{host_id}</ID><NAME>kvm-{host_id:03d}</NAME>"
+        f"<STATE>{8 if host_id % 17 == 16 else 2}</STATE><PREV_STATE>2</PREV_STATE>"
+        f"<IM_MAD>kvm</IM_MAD><VM_MAD>kvm</VM_MAD>"
+        f"<CLUSTER_ID>{cluster_id}</CLUSTER_ID><CLUSTER>cluster-{cluster_id}</CLUSTER>"
+        f"<HOST_SHARE><MEM_USAGE>10485760</MEM_USAGE><CPU_USAGE>1000</CPU_USAGE>"
+        f"<TOTAL_MEM>263839744</TOTAL_MEM><TOTAL_CPU>6400</TOTAL_CPU>"
+        f"<MAX_MEM>263839744</MAX_MEM><MAX_CPU>6400</MAX_CPU><RUNNING_VMS>10</RUNNING_VMS>"
+        f"<DATASTORES><DISK_USAGE>0</DISK_USAGE><FREE_DISK>1782579</FREE_DISK>"
+        f"<MAX_DISK>1906511</MAX_DISK><USED_DISK>26360</USED_DISK></DATASTORES>"
+        f"<PCI_DEVICES/><NUMA_NODES>"
+        + "".join(
+            f"<NODE><CORE><CPUS>{c * 2}:-1,{c * 2 + 1}:-1</CPUS><DEDICATED>NO</DEDICATED>"
+            f"<FREE>2</FREE><ID>{c}</ID><NODE_ID>0</NODE_ID></CORE>"
+            f"<MEMORY><DISTANCE>0</DISTANCE><TOTAL>131919872</TOTAL><USAGE>5242880</USAGE></MEMORY>"
+            f"<NODE_ID>0</NODE_ID></NODE>"
+            for c in range(8)
+        )
+        + f"</NUMA_NODES></HOST_SHARE><VMS>{vms}</VMS>"
+        f"<TEMPLATE><ARCH><![CDATA[x86_64]]></ARCH><CPUSPEED><![CDATA[2400]]></CPUSPEED>"
+        f"<HOSTNAME><![CDATA[kvm-{host_id:03d}.bench]]></HOSTNAME><HYPERVISOR><![CDATA[kvm]]></HYPERVISOR>"
+        f"<KVM_CPU_MODELS><![CDATA[EPYC Skylake-Server Haswell Broadwell qemu64 kvm64]]></KVM_CPU_MODELS>"
+        f"<KVM_MACHINES><![CDATA[pc-q35-6.2 pc-i440fx-6.2 q35 pc]]></KVM_MACHINES>"
+        f"<MODELNAME><![CDATA[AMD EPYC 7713 64-Core Processor]]></MODELNAME>"
+        f"<RESERVED_CPU><![CDATA[]]></RESERVED_CPU><RESERVED_MEM><![CDATA[]]></RESERVED_MEM>"
+        f"<VERSION><![CDATA[6.10.0]]></VERSION></TEMPLATE>"
+        f"<MONITORING><TIMESTAMP>1700000000</TIMESTAMP><ID>{host_id}</ID>"
+        f"<CAPACITY><FREE_CPU>5400</FREE_CPU><FREE_MEMORY>253353984</FREE_MEMORY>"
+        f"<USED_CPU>1000</USED_CPU><USED_MEMORY>10485760</USED_MEMORY></CAPACITY>"
+        f"<SYSTEM><NETRX>{host_id * 1000}</NETRX><NETTX>{host_id * 1000}</NETTX></SYSTEM></MONITORING></HOST>"
+    )
+
+
+def image_xml(image_id: int, datastores: int = 3) -> str:
+    """Return the XML of one synthetic image."""
+    datastore_id = 1 + image_id % datastores
+    return (
+        f"<IMAGE><ID>{image_id}</ID>{_OWNER}<NAME>bench-image-{image_id}</NAME>"
+        f"<LOCK/>{_PERMISSIONS}<TYPE>{0 if image_id % 4 else 2}</TYPE><DISK_TYPE>0</DISK_TYPE>"
+        f"<PERSISTENT>{image_id % 2}</PERSISTENT><REGTIME>1700000000</REGTIME>"
+        f"<SOURCE><![CDATA[/var/lib/one/datastores/{datastore_id}/{image_id:032x}]]></SOURCE>"
+        f"<PATH><![CDATA[https://images.bench/ubuntu-{image_id}.qcow2]]></PATH>"
+        f"<FORMAT><![CDATA[qcow2]]></FORMAT><FS><![CDATA[]]></FS>"
+        f"<SIZE>{2048 + image_id % 8 * 1024}</SIZE><STATE>{1 if image_id % 7 else 2}</STATE>"
+        f"<PREV_STATE>1</PREV_STATE><RUNNING_VMS>{image_id % 3}</RUNNING_VMS>"
+        f"<CLONING_OPS>0</CLONING_OPS><CLONING_ID>-1</CLONING_ID><TARGET_SNAPSHOT>-1</TARGET_SNAPSHOT>"
+        f"<DATASTORE_ID>{datastore_id}</DATASTORE_ID><DATASTORE>images-{datastore_id}</DATASTORE>"
+        f"<VMS>{''.join(f'<ID>{image_id + v}</ID>' for v in range(image_id % 3))}</VMS><CLONES/>"
+        f"<APP_CLONES/><TEMPLATE><DEV_PREFIX><![CDATA[vd]]></DEV_PREFIX>"
+        f"<DRIVER><![CDATA[qcow2]]></DRIVER><DESCRIPTION><![CDATA[Synthetic benchmark image {image_id}]]></DESCRIPTION>"
+        f"</TEMPLATE><SNAPSHOTS><ALLOW_ORPHANS><![CDATA[NO]]></ALLOW_ORPHANS>"
+        f"<CURRENT_BASE><![CDATA[-1]]></CURRENT_BASE><NEXT_SNAPSHOT><![CDATA[0]]></NEXT_SNAPSHOT></SNAPSHOTS>"
+        f"<BACKUP_INCREMENTS/><BACKUP_DISK_IDS/></IMAGE>"
+    )
+
+
+def template_xml(template_id: int, images: int = 100) -> str:
+    """Return the XML of one synthetic VM template."""
+    return (
+        f"<VMTEMPLATE><ID>{template_id}</ID>{_OWNER}<NAME>bench-template-{template_id}</NAME>"
+        f"<LOCK/>{_PERMISSIONS}<REGTIME>1700000000</REGTIME>"
+        f"<TEMPLATE><CONTEXT><NETWORK><![CDATA[YES]]></NETWORK>"
+        f"<SSH_PUBLIC_KEY><![CDATA[$USER[SSH_PUBLIC_KEY]]]></SSH_PUBLIC_KEY></CONTEXT>"
+        f"<CPU><![CDATA[{1 + template_id % 4}]]></CPU><VCPU><![CDATA[{1 + template_id % 4}]]></VCPU>"
+        f"<MEMORY><![CDATA[{1024 * (1 + template_id % 8)}]]></MEMORY>"
+        f"<DISK><IMAGE_ID><![CDATA[{template_id % images}]]></IMAGE_ID></DISK>"
+        f"<GRAPHICS><LISTEN><![CDATA[0.0.0.0]]></LISTEN><TYPE><![CDATA[VNC]]></TYPE></GRAPHICS>"
+        f"<HYPERVISOR><![CDATA[kvm]]></HYPERVISOR><LOGO><![CDATA[images/logos/ubuntu.png]]></LOGO>"
+        f"<NIC><NETWORK><![CDATA[public]]></NETWORK><NETWORK_UNAME><![CDATA[oneadmin]]></NETWORK_UNAME></NIC>"
+        f"<NIC_DEFAULT><MODEL><![CDATA[virtio]]></MODEL></NIC_DEFAULT>"
+        f"<OS><ARCH><![CDATA[x86_64]]></ARCH><FIRMWARE><![CDATA[]]></FIRMWARE></OS>"
+        f"<SCHED_REQUIREMENTS><![CDATA[CLUSTER_ID=\"{template_id % 5}\"]]></SCHED_REQUIREMENTS>"
+        f"<DESCRIPTION><![CDATA[Synthetic benchmark template {template_id}]]></DESCRIPTION>"
+        f"</TEMPLATE></VMTEMPLATE>"
+    )
+
+
+_APP_FLAVOURS = ("Ubuntu", "Debian", "AlmaLinux", "Alpine", "WordPress", "Kubernetes")
+
+
+def marketapp_xml(app_id: int, markets: int = 2) -> str:
+    """Return the XML of one synthetic marketplace appliance."""
+    flavour = _APP_FLAVOURS[app_id % len(_APP_FLAVOURS)]
+    return (
+        f"<MARKETPLACEAPP><ID>{app_id}</ID>{_OWNER}<LOCK/><REGTIME>1700000000</REGTIME>"
+        f"<NAME>{flavour} {app_id}</NAME><ZONE_ID>0</ZONE_ID><ORIGIN_ID>-1</ORIGIN_ID>"
+        f"<SOURCE><![CDATA[https://marketplace.bench/appliance/{app_id:032x}/download/0]]></SOURCE>"
+        f"<MD5><![CDATA[{app_id:032x}]]></MD5><SIZE>{2252 + app_id % 10 * 100}</SIZE>"
+        f"<DESCRIPTION><![CDATA[{flavour} appliance {app_id} for the synthetic benchmark marketplace]]></DESCRIPTION>"
+        f"<VERSION><![CDATA[{app_id % 7}.{app_id % 3}.0]]></VERSION><FORMAT><![CDATA[qcow2]]></FORMAT>"
+        f"<APPTEMPLATE64><![CDATA[{'RFVWX1BSRUZJWD0idmQiCkRSSVZFUj0icWNvdzIiClRZUEU9Ik9TIgo=' * 2}]]></APPTEMPLATE64>"
+        f"<MARKETPLACE_ID>{app_id % markets}</MARKETPLACE_ID><MARKETPLACE>market-{app_id % markets}</MARKETPLACE>"
+        f"<STATE>1</STATE><TYPE>1</TYPE>{_PERMISSIONS}"
+        f"<TEMPLATE><IMPORTED><![CDATA[NO]]></IMPORTED><LINK><![CDATA[https://marketplace.bench/appliance/{app_id}]]></LINK>"
+        f"<PUBLISHER><![CDATA[Bench Systems]]></PUBLISHER><TAGS><![CDATA[{flavour.lower()},linux,bench]]></TAGS>"
+        f"<VMTEMPLATE64><![CDATA[{'Q09OVEVYVCA9IFsgTkVUV09SSyA9IllFUyIgXQpDUFUgPSAiMSIK' * 2}]]></VMTEMPLATE64>"
+        f"</TEMPLATE></MARKETPLACEAPP>"
+    )
+
+
+def cluster_xml(cluster_id: int, hosts: int = 50) -> str:
+    """Return the XML of one synthetic cluster."""
+    members = "".join(f"<ID>{h}</ID>" for h in range(cluster_id, hosts, 5))
+    return (
+        f"<CLUSTER><ID>{cluster_id}</ID><NAME>cluster-{cluster_id}</NAME>"
+        f"<HOSTS>{members}</HOSTS><DATASTORES><ID>0</ID><ID>1</ID><ID>2</ID></DATASTORES>"
+        f"<VNETS><ID>0</ID></VNETS><TEMPLATE><RESERVED_CPU><![CDATA[]]></RESERVED_CPU>"
+        f"<RESERVED_MEM><![CDATA[]]></RESERVED_MEM></TEMPLATE></CLUSTER>"
+    )
+
+
+def datastore_xml(datastore_id: int) -> str:
+    """Return the XML of one synthetic datastore (0 is the system datastore)."""
+    return (
+        f"<DATASTORE><ID>{datastore_id}</ID>{_OWNER}<NAME>images-{datastore_id}</NAME>"
+        f"{_PERMISSIONS}<DS_MAD><![CDATA[fs]]></DS_MAD><TM_MAD><![CDATA[ssh]]></TM_MAD>"
+        f"<BASE_PATH><![CDATA[/var/lib/one//datastores/{datastore_id}]]></BASE_PATH>"
+        f"<TYPE>{1 if datastore_id == 0 else 0}</TYPE><DISK_TYPE>0</DISK_TYPE><STATE>0</STATE>"
+        f"<CLUSTERS><ID>0</ID></CLUSTERS><TOTAL_MB>1906511</TOTAL_MB><FREE_MB>1782579</FREE_MB>"
+        f"<USED_MB>26360</USED_MB><IMAGES/><TEMPLATE><ALLOW_ORPHANS><![CDATA[YES]]></ALLOW_ORPHANS>"
+        f"</TEMPLATE></DATASTORE>"
+    )
+
+
+def vnet_xml(vnet_id: int) -> str:
+    """Return the XML of one synthetic bridged virtual network."""
+    return (
+        f"<VNET><ID>{vnet_id}</ID>{_OWNER}<NAME>bench-net-{vnet_id}</NAME><LOCK/>"
+        f"{_PERMISSIONS}<CLUSTERS><ID>0</ID></CLUSTERS><BRIDGE><![CDATA[br{vnet_id}]]></BRIDGE>"
+        f"<BRIDGE_TYPE><![CDATA[linux]]></BRIDGE_TYPE><STATE>1</STATE><PREV_STATE>0</PREV_STATE>"
+        f"<PARENT_NETWORK_ID/><VN_MAD><![CDATA[bridge]]></VN_MAD><PHYDEV/><VLAN_ID/>"
+        f"<USED_LEASES>{vnet_id % 250}</USED_LEASES><VROUTERS/><UPDATED_VMS/><OUTDATED_VMS/>"
+        f"<TEMPLATE><DNS><![CDATA[10.{vnet_id % 256}.0.1]]></DNS>"
+        f"<GATEWAY><![CDATA[10.{vnet_id % 256}.0.1]]></GATEWAY></TEMPLATE>"
+        f"<AR_POOL><AR><AR_ID><![CDATA[0]]></AR_ID><IP><![CDATA[10.{vnet_id % 256}.0.2]]></IP>"
+        f"<MAC><![CDATA[02:00:0a:{vnet_id % 256:02x}:00:02]]></MAC><SIZE><![CDATA[250]]></SIZE>"
+        f"<TYPE><![CDATA[IP4]]></TYPE></AR></AR_POOL></VNET>"
+    )
+
+
+def user_xml(user_id: int) -> str:
+    """Return the XML of one synthetic user."""
+    return (
+        f"<USER><ID>{user_id}</ID><GID>{user_id % 3}</GID><GROUPS><ID>{user_id % 3}</ID></GROUPS>"
+        f"<GNAME>group-{user_id % 3}</GNAME><NAME>user-{user_id}</NAME>"
+        f"<PASSWORD>{user_id:064x}</PASSWORD><AUTH_DRIVER>core</AUTH_DRIVER><ENABLED>1</ENABLED>"
+        f"<LOGIN_TOKEN/><TEMPLATE><TOKEN_PASSWORD><![CDATA[{user_id:040x}]]></TOKEN_PASSWORD></TEMPLATE>"
+        f"<VM_QUOTA/><DATASTORE_QUOTA/><NETWORK_QUOTA/><IMAGE_QUOTA/></USER>"
+    )
+
+
+def group_xml(group_id: int, users: int = 10) -> str:
+    """Return the XML of one synthetic group."""
+    members = "".join(f"<ID>{u}</ID>" for u in range(group_id, users, 3))
+    return (
+        f"<GROUP><ID>{group_id}</ID><NAME>group-{group_id}</NAME>"
+        f"<TEMPLATE><SUNSTONE><DEFAULT_VIEW><![CDATA[cloud]]></DEFAULT_VIEW></SUNSTONE></TEMPLATE>"
+        f"<USERS>{members}</USERS><ADMINS/></GROUP>"
+    )
+
+
+def acl_xml(acl_id: int) -> str:
+    """Return the XML of one synthetic ACL rule."""
+    return (
+        f"<ACL><ID>{acl_id}</ID><USER>4294967304</USER><RESOURCE>{0x21000000000 + acl_id}</RESOURCE>"
+        f"<RIGHTS>1</RIGHTS><ZONE>17179869184</ZONE><STRING>@{acl_id} VM+NET/* USE *</STRING></ACL>"
+    )
+
+
+def market_xml(market_id: int) -> str:
+    """Return the XML of one synthetic marketplace."""
+    return (
+        f"<MARKETPLACE><ID>{market_id}</ID>{_OWNER}<NAME>market-{market_id}</NAME>"
+        f"<STATE>0</STATE><MARKET_MAD><![CDATA[one]]></MARKET_MAD><ZONE_ID><![CDATA[0]]></ZONE_ID>"
+        f"<TOTAL_MB>0</TOTAL_MB><FREE_MB>0</FREE_MB><USED_MB>0</USED_MB><MARKETPLACEAPPS/>"
+        f"{_PERMISSIONS}<TEMPLATE><DESCRIPTION><![CDATA[Synthetic marketplace {market_id}]]></DESCRIPTION>"
+        f"</TEMPLATE></MARKETPLACE>"
+    )
+
+
+# Pool name (CLI command without the "one" prefix) -> (pool root tag, element generator)
+POOLS: Dict[str, Tuple[str, Callable[[int], str]]] = {
+    "vm": ("VM_POOL", vm_xml),
+    "host": ("HOST_POOL", host_xml),
+    "image": ("IMAGE_POOL", image_xml),
+    "template": ("VMTEMPLATE_POOL", template_xml),
+    "marketapp": ("MARKETPLACEAPP_POOL", marketapp_xml),
+    "cluster": ("CLUSTER_POOL", cluster_xml),
+    "datastore": ("DATASTORE_POOL", datastore_xml),
+    "vnet": ("VNET_POOL", vnet_xml),
+    "user": ("USER_POOL", user_xml),
+    "group": ("GROUP_POOL", group_xml),
+    "acl": ("ACL_POOL", acl_xml),
+    "market": ("MARKETPLACE_POOL", market_xml),
+}
+
+
+def iter_pool(pool: str, count: int) -> Iterator[str]:
+    """Yield a *pool* document (e.g. ``"host"``) with *count* elements piece by piece."""
+    root_tag, element_xml = POOLS[pool]
+    yield f"<{root_tag}>"
+    for element_id in range(count):
+        yield element_xml(element_id)
+    yield f"</{root_tag}>"
+
+
+def write_pool(stream: IO[str], pool: str, count: int) -> None:
+    """Write a *pool* document with *count* elements to *stream*."""
+    for piece in iter_pool(pool, count):
+        stream.write(piece)
+
+
+def iter_vm_pool(count: int) -> Iterator[str]:
+    """Yield a `<VM_POOL>` document with *count* VMs piece by piece."""
+    return iter_pool("vm", count)
+
+
+def write_vm_pool(stream: IO[str], count: int) -> None:
+    """Write a `<VM_POOL>` document with *count* VMs to *stream*."""
+    write_pool(stream, "vm", count)
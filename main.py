@@ -14,8 +14,17 @@
 
 from mcp.server.fastmcp import FastMCP
 from src.static import MCP_SERVER_PROMPT
-from src.tools import infra, templates, vm, oneflow, tenancy, market
-from src.logging_config import setup_logging
+from src.tools import infra, templates, vm, oneflow, tenancy, market, server
+from src.logging_config import configure_slow_call_log, setup_logging
+from src.tools.utils.backends import configure_backend
+from src.tools.utils.base import configure_execution
+from src.tools.utils.cache import configure_pool_cache, parse_ttls
+from src.tools.utils.coalescing import configure_write_coalescing
+from src.tools.utils.events import configure_vm_events
+from src.tools.utils.metrics import InstrumentedMCP, configure_metrics
+from src.tools.utils.singleflight import configure_single_flight
+from src.tools.utils.ssh import configure_ssh
+from src.tools.utils.tracing import configure_tracing
 import argparse
 from logging import getLogger
 
@@ -49,24 +58,192 @@ if __name__ == "__main__":
         help="Enable file logging with automatic timestamped filename in ./log directory",
     )
 
+    parser.add_argument(
+        "--log-format",
+        choices=["text", "json"],
+        help="Log record format; json writes one object per line with the correlation ID, tool and VM ID "
+        "of the tool call and duration fields (default: text, or ONE_MCP_LOG_FORMAT env var)",
+    )
+
+    parser.add_argument(
+        "--log-queue-size",
+        type=int,
+        help="Log records buffered for the background log writer before new ones are dropped; "
+        "0 writes synchronously (default: 10000, or ONE_MCP_LOG_QUEUE_SIZE env var)",
+    )
+
+    # Command execution backend
+    parser.add_argument(
+        "--backend",
+        choices=["cli", "xmlrpc"],
+        help="Backend used to run OpenNebula commands (default: cli, or ONE_MCP_BACKEND env var). "
+        "The xmlrpc backend talks to oned directly and falls back to the CLI for unsupported commands",
+    )
+
+    parser.add_argument(
+        "--one-xmlrpc",
+        help="oned XML-RPC endpoint for the xmlrpc backend (default: ONE_XMLRPC env var or http://localhost:2633/RPC2)",
+    )
+
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        help="Maximum number of OpenNebula commands run concurrently across all tool calls "
+        "(default: 16, or ONE_MCP_MAX_CONCURRENCY env var)",
+    )
+
+    parser.add_argument(
+        "--command-timeout",
+        type=float,
+        help="Seconds an OpenNebula command may run before it is killed, unless the tool sets its own "
+        "(default: 120, or ONE_MCP_COMMAND_TIMEOUT env var)",
+    )
+
+    # Pool cache configuration
+    parser.add_argument(
+        "--pool-cache",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Cache pool listings (list_* tools) in memory; writes through this server invalidate them",
+    )
+
+    parser.add_argument(
+        "--pool-cache-ttl",
+        type=parse_ttls,
+        help="Per resource type cache TTL overrides in seconds, e.g. 'vm=2,host=30' (0 disables a type)",
+    )
+
+    parser.add_argument(
+        "--coalesce-reads",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Let identical read-only commands issued at the same time share one execution",
+    )
+
+    parser.add_argument(
+        "--coalesce-window",
+        type=float,
+        help="Seconds same-operation manage_vm calls are collected to run as one command "
+        "(default: 0, disabled, or ONE_MCP_COALESCE_WINDOW env var)",
+    )
+
+    # VM state table fed by oned events
+    parser.add_argument(
+        "--one-events",
+        help="oned ZeroMQ event endpoint, e.g. tcp://frontend:2101, to serve VM state from events "
+        "(default: ONE_MCP_EVENTS_ENDPOINT env var, disabled if unset; requires pyzmq)",
+    )
+
+    parser.add_argument(
+        "--events-resync",
+        type=float,
+        help="Seconds between two reloads of the VM state table from the VM pool "
+        "(default: 300, or ONE_MCP_EVENTS_RESYNC env var)",
+    )
+
+    # Metrics of tool calls and commands
+    parser.add_argument(
+        "--metrics",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Record latency histograms of tool calls and commands, reported by the server_metrics tool",
+    )
+
+    parser.add_argument(
+        "--metrics-file",
+        help="File to periodically write the metrics to in the OpenMetrics text format "
+        "(default: ONE_MCP_METRICS_FILE env var, disabled if unset)",
+    )
+
+    parser.add_argument(
+        "--metrics-interval",
+        type=float,
+        help="Seconds between two writes of the metrics file (default: 60, or ONE_MCP_METRICS_INTERVAL env var)",
+    )
+
+    parser.add_argument(
+        "--trace-file",
+        help="JSONL file to write a trace of every tool call to, with spans for its commands, XML parsing "
+        "and serialisation (default: ONE_MCP_TRACE_FILE env var, disabled if unset)",
+    )
+
+    parser.add_argument(
+        "--slow-call-threshold",
+        type=float,
+        help="Log tool calls and commands taking longer than this many seconds, with their arguments, "
+        "command and duration breakdown; 0 disables (default: 5, or ONE_MCP_SLOW_CALL_THRESHOLD env var)",
+    )
+
+    parser.add_argument(
+        "--slow-call-log",
+        help="Dedicated JSON lines file for slow calls, in addition to the main log "
+        "(default: ONE_MCP_SLOW_CALL_LOG env var, none if unset)",
+    )
+
+    # SSH sessions used by execute_command
+    parser.add_argument(
+        "--ssh-multiplexing",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Keep one persistent SSH connection per VM (OpenSSH ControlMaster) for execute_command",
+    )
+
+    parser.add_argument(
+        "--ssh-max-sessions",
+        type=int,
+        help="Maximum number of persistent SSH connections (default: 32, or ONE_MCP_SSH_MAX_SESSIONS env var)",
+    )
+
+    parser.add_argument(
+        "--ssh-idle-timeout",
+        type=int,
+        help="Seconds an unused SSH connection is kept open (default: 300, or ONE_MCP_SSH_IDLE_TIMEOUT env var)",
+    )
+
     args = parser.parse_args()
 
     # Setup logging before any other operations
-    setup_logging(level=args.log_level, enable_file_logging=args.log_file)
+    setup_logging(
+        level=args.log_level,
+        enable_file_logging=args.log_file,
+        queue_size=args.log_queue_size,
+        log_format=args.log_format,
+    )
+    configure_slow_call_log(threshold=args.slow_call_threshold, log_file=args.slow_call_log)
 
     # Get logger for this module
     logger = getLogger("opennebula_mcp.main")
 
     allow_write = True if args.allow_write else False
 
-    # Register tool modules
-    infra.register_tools(mcp, allow_write)
-    vm.register_tools(mcp, allow_write)
-    templates.register_tools(mcp, allow_write)
-    oneflow.register_tools(mcp, allow_write)
-    tenancy.register_tools(mcp, allow_write)
-    market.register_tools(mcp, allow_write)
+    configure_backend(args.backend, endpoint=args.one_xmlrpc)
+    configure_execution(
+        max_concurrency=args.max_concurrency, command_timeout=args.command_timeout
+    )
+    configure_pool_cache(enabled=args.pool_cache, ttls=args.pool_cache_ttl)
+    configure_vm_events(endpoint=args.one_events, resync_interval=args.events_resync)
+    configure_single_flight(enabled=args.coalesce_reads)
+    configure_write_coalescing(window=args.coalesce_window)
+    configure_metrics(
+        enabled=args.metrics, dump_path=args.metrics_file, dump_interval=args.metrics_interval
+    )
+    configure_tracing(path=args.trace_file)
+    configure_ssh(
+        enabled=args.ssh_multiplexing,
+        max_sessions=args.ssh_max_sessions,
+        idle_timeout=args.ssh_idle_timeout,
+    )
+
+    # Register tool modules; every call is timed for server_metrics
+    instrumented = InstrumentedMCP(mcp)
+    infra.register_tools(instrumented, allow_write)
+    vm.register_tools(instrumented, allow_write)
+    templates.register_tools(instrumented, allow_write)
+    oneflow.register_tools(instrumented, allow_write)
+    tenancy.register_tools(instrumented, allow_write)
+    market.register_tools(instrumented, allow_write)
+    server.register_tools(instrumented, allow_write)
 
-    logger.info(f"Starting MCP server - allow_write: {allow_write}")
+    logger.info("Starting MCP server - allow_write: %s", allow_write)
 
     mcp.run()
@@ -16,24 +16,90 @@
 
 This module provides a singleton logging setup that prevents duplicate handlers
 and allows easy configuration of log levels and destinations.
+
+Log records are handed to a bounded in-memory queue and written to the console
+and log file by a background thread, so logging never does I/O (including
+file rollover) on the request path. When the writer falls behind and the queue
+is full, records are dropped and counted per level rather than blocking.
+
+Records are written as text or, with the ``json`` log format, as one JSON
+object per line. Every record logged during a tool call carries the call's
+correlation ID, the tool name and, for VM tools, the VM ID(s) it was called
+with; ``extra`` fields such as ``duration_ms`` are included as JSON fields.
+Messages are formatted lazily from %-style arguments, only for records that
+pass the level check.
+
+It also provides the slow-call log: every tool call or command execution
+taking longer than a threshold is logged as one WARNING record on the
+``opennebula_mcp.slow_calls`` logger, with the tool name, its arguments
+(sensitive values redacted), the command, a duration breakdown and the
+output size. The record is also attached to the log record as its
+``slow_call`` attribute, and written as one JSON line to a dedicated file if
+one is configured.
 """
 
+import atexit
+import copy
+import json
 import logging
 import logging.handlers
 import os
+import queue
+import re
+from contextvars import ContextVar
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional
 
 
 # Singleton guard to prevent duplicate handler setup
 _logging_configured = False
 
+DEFAULT_LOG_QUEUE_SIZE = 10000
+LOG_FORMATS = ("text", "json")
+
+# Background writers of the queued handlers, stopped by reset_logging_config
+_listeners: List["_LogListener"] = []
+
+SLOW_CALL_LOGGER = "opennebula_mcp.slow_calls"
+DEFAULT_SLOW_CALL_THRESHOLD = 5.0
+
+# Seconds above which a call is logged as slow; 0 disables the slow-call log
+_slow_call_threshold = DEFAULT_SLOW_CALL_THRESHOLD
+
+
+
+class CallContext(NamedTuple):
+    """Tool call the current task works for."""
+
+    tool: str
+    correlation_id: str
+    vm_id: Optional[str] = None
+
+
+_call_context: ContextVar[Optional[CallContext]] = ContextVar("call_context", default=None)
+
+# Attributes of every LogRecord; any other attribute is an ``extra`` field
+_RECORD_ATTRIBUTES = set(logging.makeLogRecord({}).__dict__) | {"message", "asctime"}
+
+# Argument names whose values are never logged
+_SENSITIVE_NAME = re.compile(r"pass(word|wd)?|secret|token|key|credential|auth", re.IGNORECASE)
+# Sensitive attributes inside template-like values, e.g. PASSWORD="..."
+_SENSITIVE_ATTRIBUTE = re.compile(
+    r"\b(\w*(?:PASSWORD|PASSWD|SECRET|TOKEN|KEY)\w*)(\s*=\s*)(\"[^\"]*\"|[^\s,\]]*)", re.IGNORECASE
+)
+# Positional password of the oneuser subcommands taking one
+_PASSWORD_POSITION = {("oneuser", "create"): 3, ("oneuser", "passwd"): 3}
+_REDACTED = "***"
+MAX_LOGGED_ARG_LENGTH = 200
+
 
 def setup_logging(
     level: Optional[str] = None, 
     enable_file_logging: bool = True,
-    log_subdirectory: Optional[str] = None
+    log_subdirectory: Optional[str] = None,
+    queue_size: Optional[int] = None,
+    log_format: Optional[str] = None,
 ) -> None:
     """Configure logging for the OpenNebula MCP server.
 
@@ -47,6 +113,15 @@ def setup_logging(
                            filename in ./log directory (created if doesn't exist).
         log_subdirectory: Optional subdirectory within ./log for organizing logs
                          (e.g., "tests" for test logs). If None, logs go directly in ./log.
+        queue_size: Records waiting for the background writer before new ones
+                    are dropped. If None, uses the ONE_MCP_LOG_QUEUE_SIZE
+                    environment variable or defaults to 10000; 0 writes
+                    synchronously from the logging thread instead.
+        log_format: ``text`` or ``json``. If None, uses the ONE_MCP_LOG_FORMAT
+                    environment variable or defaults to ``text``.
+
+    Raises:
+        ValueError: If the log level, queue size or format is invalid.
 
     Note:
         This function should be called only once at application startup.
@@ -61,26 +136,43 @@ def setup_logging(
     # Resolve log level with precedence: CLI arg > env var > default
     effective_level = _resolve_log_level(level)
 
+    queue_size = _resolve_queue_size(queue_size)
+    log_format = (log_format or os.getenv("ONE_MCP_LOG_FORMAT") or "text").lower()
+    if log_format not in LOG_FORMATS:
+        raise ValueError(f"Invalid log format '{log_format}'. Valid formats: {', '.join(LOG_FORMATS)}")
+
     # Get root logger for our application
     root_logger = logging.getLogger("opennebula_mcp")
     root_logger.setLevel(effective_level)
+    handlers: List[logging.Handler] = []
 
     # Create formatter
-    formatter = logging.Formatter(
-        fmt="%(asctime)s %(levelname)-8s %(name)s: %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
+    if log_format == "json":
+        formatter: logging.Formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(
+            fmt="%(asctime)s %(levelname)-8s %(name)s: %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S",
+        )
 
     # Always add console handler (stdout)
     console_handler = logging.StreamHandler()
     console_handler.setLevel(effective_level)
     console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
+    handlers.append(console_handler)
 
     # Add file handler if file logging is enabled
+    log_file_path = None
     if enable_file_logging:
         log_file_path = _generate_log_file_path(log_subdirectory)
-        _add_file_handler(root_logger, log_file_path, effective_level, formatter)
+        file_handler = _create_file_handler(log_file_path, effective_level, formatter)
+        if file_handler is not None:
+            handlers.append(file_handler)
+
+    for handler in _queued(handlers, queue_size):
+        root_logger.addHandler(handler)
+    if log_file_path and len(handlers) > 1:
+        logging.getLogger("opennebula_mcp.logging_config").info("File logging enabled: %s", log_file_path)
 
     # Prevent propagation to avoid duplicate messages
     root_logger.propagate = False
@@ -182,16 +274,18 @@ def _parse_log_level(level_str: str) -> int:
     return level_mapping[level_str]
 
 
-def _add_file_handler(
-    logger: logging.Logger, log_file: str, level: int, formatter: logging.Formatter
-) -> None:
-    """Add rotating file handler to logger.
+def _create_file_handler(
+    log_file: str, level: int, formatter: logging.Formatter
+) -> Optional[logging.Handler]:
+    """Create the rotating file handler of the main log.
 
     Args:
-        logger: Logger instance to add handler to
         log_file: Path to log file
         level: Log level for the handler
         formatter: Formatter instance for the handler
+
+    Returns:
+        Optional[logging.Handler]: The handler, or None if the file cannot be opened
     """
     try:
         # Ensure log directory exists
@@ -207,16 +301,193 @@ def _add_file_handler(
         )
         file_handler.setLevel(level)
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
-
-        # Log the file path for user information
-        console_logger = logging.getLogger("opennebula_mcp.logging_config")
-        console_logger.info(f"File logging enabled: {log_file}")
+        return file_handler
 
     except (OSError, PermissionError) as e:
         # If file logging fails, emit warning to console but continue
         console_logger = logging.getLogger("opennebula_mcp.logging_config")
-        console_logger.warning(f"Failed to setup file logging to '{log_file}': {e}")
+        console_logger.warning("Failed to setup file logging to '%s': %s", log_file, e)
+        return None
+
+
+def _resolve_queue_size(queue_size: Optional[int]) -> int:
+    if queue_size is None:
+        env_value = os.getenv("ONE_MCP_LOG_QUEUE_SIZE")
+        queue_size = int(env_value) if env_value else DEFAULT_LOG_QUEUE_SIZE
+    if queue_size < 0:
+        raise ValueError(f"Invalid log queue size {queue_size}: must be 0 or positive")
+    return queue_size
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue records without blocking, counting those dropped when the queue is full."""
+
+    def __init__(self, log_queue: "queue.Queue[Any]") -> None:
+        super().__init__(log_queue)
+        self.dropped: Dict[str, int] = {}
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the arguments into the message, as they may change before the
+        # writer gets to them, but leave the formatting to the writer's handlers
+        record = copy.copy(record)
+        record.message = record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped[record.levelname] = self.dropped.get(record.levelname, 0) + 1
+
+
+class _LogListener(logging.handlers.QueueListener):
+    """Writer thread of a ``_DroppingQueueHandler``."""
+
+    def __init__(self, handler: _DroppingQueueHandler, handlers: List[logging.Handler]) -> None:
+        super().__init__(handler.queue, *handlers, respect_handler_level=True)
+        self.queue_handler = handler
+
+    def enqueue_sentinel(self) -> None:
+        # Wait for room rather than failing to stop when the queue is full
+        self.queue.put(self._sentinel)
+
+    def flush(self) -> None:
+        """Wait until every queued record is written."""
+        if self._thread is not None:
+            self.queue.join()
+        for handler in self.handlers:
+            handler.flush()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        super().stop()
+        for handler in self.handlers:
+            handler.close()
+        dropped = self.queue_handler.dropped
+        if dropped:
+            # The writer is gone: report straight to stderr
+            counts = ", ".join(f"{count} {level}" for level, count in sorted(dropped.items()))
+            logging.lastResort.handle(
+                logging.makeLogRecord(
+                    {
+                        "name": "opennebula_mcp.logging_config",
+                        "levelno": logging.WARNING,
+                        "levelname": "WARNING",
+                        "msg": f"Log records dropped because the log queue was full: {counts}",
+                    }
+                )
+            )
+
+
+def _queued(handlers: List[logging.Handler], queue_size: int) -> List[logging.Handler]:
+    """Return the handlers to attach to a logger to write through *handlers*.
+
+    With a queue size of 0 that is *handlers* themselves; otherwise one queue
+    handler feeding them from a background thread. Either way, they add the
+    tool call context to the records in the logging thread.
+    """
+    if queue_size == 0 or not handlers:
+        attached = handlers
+    else:
+        handler = _DroppingQueueHandler(queue.Queue(queue_size))
+        listener = _LogListener(handler, handlers)
+        listener.start()
+        _listeners.append(listener)
+        attached = [handler]
+    for handler in attached:
+        handler.addFilter(_add_call_context)
+    return attached
+
+
+def _add_call_context(record: logging.LogRecord) -> bool:
+    context = _call_context.get()
+    if context is not None and not hasattr(record, "correlation_id"):
+        record.correlation_id = context.correlation_id
+        record.tool = context.tool
+        if context.vm_id is not None:
+            record.vm_id = context.vm_id
+    return True
+
+
+_exception_formatter = logging.Formatter()
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line.
+
+    Fields are ``time``, ``level``, ``logger`` and ``message``, the tool call
+    context (``correlation_id``, ``tool``, ``vm_id``) when there is one, any
+    ``extra`` fields and, for errors, ``exception``.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for name, value in record.__dict__.items():
+            if name not in _RECORD_ATTRIBUTES:
+                entry[name] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class _JsonArg:
+    """Log argument serialised to JSON only if the record is formatted."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+    def __str__(self) -> str:
+        return json.dumps(self.value, default=str)
+
+
+def flush_logging() -> None:
+    """Wait until every record logged so far is written."""
+    for listener in _listeners[:]:
+        listener.flush()
+
+
+def dropped_log_records() -> Dict[str, int]:
+    """Return the number of log records dropped so far, per level."""
+    totals: Dict[str, int] = {}
+    for listener in _listeners:
+        for level, count in listener.queue_handler.dropped.items():
+            totals[level] = totals.get(level, 0) + count
+    return totals
+
+
+def _stop_listeners() -> None:
+    while _listeners:
+        _listeners.pop().stop()
+
+
+def _remove_handlers(logger: logging.Logger) -> None:
+    """Remove and close the handlers of *logger*, stopping their writer threads."""
+    for handler in logger.handlers[:]:
+        for listener in [l for l in _listeners if l.queue_handler is handler]:
+            _listeners.remove(listener)
+            listener.stop()
+        try:
+            handler.flush()
+            handler.close()
+        finally:
+            logger.removeHandler(handler)
+
+
+atexit.register(_stop_listeners)
 
 
 def reset_logging_config() -> None:
@@ -228,13 +499,10 @@ def reset_logging_config() -> None:
     global _logging_configured
 
     # Remove **and close** all handlers attached to the project root logger
-    root_logger = logging.getLogger("opennebula_mcp")
-    for handler in root_logger.handlers[:]:
-        try:
-            handler.flush()
-            handler.close()
-        finally:
-            root_logger.removeHandler(handler)
+    # and to the slow-call log, writing out the queued records first
+    for logger in (logging.getLogger("opennebula_mcp"), logging.getLogger(SLOW_CALL_LOGGER)):
+        _remove_handlers(logger)
+    _stop_listeners()
 
     # Also run the global shutdown to close any other remaining logging resources
     # (e.g. handlers attached to other loggers). This is safe to call multiple
@@ -243,3 +511,187 @@ def reset_logging_config() -> None:
 
     # Reset configuration state so that setup_logging() can be called again
     _logging_configured = False
+
+
+class _SlowCallFormatter(logging.Formatter):
+    """Format slow-call records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {"time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds")}
+        if hasattr(record, "correlation_id"):
+            entry["correlation_id"] = record.correlation_id
+        entry.update(getattr(record, "slow_call", {"message": record.getMessage()}))
+        return json.dumps(entry, default=str)
+
+
+def configure_slow_call_log(threshold: Optional[float] = None, log_file: Optional[str] = None) -> None:
+    """Configure the slow-call log.
+
+    Slow calls are logged at WARNING level through the ``opennebula_mcp``
+    handlers and, if *log_file* is set, also to that file as JSON lines.
+
+    Args:
+        threshold: Seconds above which a tool call or command is logged. If
+            None, uses the ONE_MCP_SLOW_CALL_THRESHOLD environment variable or
+            defaults to 5 seconds; 0 disables the slow-call log.
+        log_file: Dedicated file for the slow-call records. If None, uses the
+            ONE_MCP_SLOW_CALL_LOG environment variable; if that is unset too,
+            slow calls only go to the main log.
+
+    Raises:
+        ValueError: If the threshold is negative.
+    """
+    global _slow_call_threshold
+
+    if threshold is None:
+        env_value = os.getenv("ONE_MCP_SLOW_CALL_THRESHOLD")
+        threshold = float(env_value) if env_value else DEFAULT_SLOW_CALL_THRESHOLD
+    if not threshold >= 0:  # also rejects nan
+        raise ValueError(f"Invalid slow-call threshold {threshold}: must be 0 or positive")
+    _slow_call_threshold = threshold
+
+    slow_logger = logging.getLogger(SLOW_CALL_LOGGER)
+    # Slow calls are logged whatever the level of the rest of the server
+    slow_logger.setLevel(logging.WARNING)
+    _remove_handlers(slow_logger)
+
+    log_file = log_file or os.getenv("ONE_MCP_SLOW_CALL_LOG")
+    if log_file and threshold > 0:
+        try:
+            Path(log_file).parent.mkdir(parents=True, exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(
+                filename=log_file,
+                maxBytes=100 * 1024 * 1024,  # 100MB
+                backupCount=5,
+                encoding="utf-8",
+            )
+        except OSError as e:
+            logging.getLogger("opennebula_mcp.logging_config").warning(
+                "Failed to setup slow-call log '%s': %s", log_file, e
+            )
+        else:
+            handler.setFormatter(_SlowCallFormatter())
+            for queued in _queued([handler], _resolve_queue_size(None)):
+                slow_logger.addHandler(queued)
+
+    logging.getLogger("opennebula_mcp.logging_config").debug(
+        "Slow-call threshold=%ss, log file=%s", threshold, log_file or "none"
+    )
+
+
+def slow_calls_enabled() -> bool:
+    return _slow_call_threshold > 0
+
+
+def start_call(tool: str, vm_id: Any = None):
+    """Start the context of a tool call with a new correlation ID; returns a reset token.
+
+    Records logged until ``end_call`` carry the correlation ID, *tool* and
+    *vm_id*; so do the spans of its trace, whose trace ID is the correlation ID.
+    """
+    return _call_context.set(
+        CallContext(tool, os.urandom(16).hex(), None if vm_id is None else str(vm_id))
+    )
+
+
+def end_call(token) -> None:
+    _call_context.reset(token)
+
+
+def current_call() -> Optional[CallContext]:
+    return _call_context.get()
+
+
+def _sanitize_value(value: Any) -> Any:
+    if isinstance(value, (int, float, bool)) or value is None:
+        return value
+    text = _SENSITIVE_ATTRIBUTE.sub(lambda m: m.group(1) + m.group(2) + _REDACTED, str(value))
+    if len(text) > MAX_LOGGED_ARG_LENGTH:
+        text = f"{text[:MAX_LOGGED_ARG_LENGTH]}... ({len(text)} chars)"
+    return text
+
+
+def sanitize_args(args: Mapping[str, Any]) -> Dict[str, Any]:
+    """Return *args* safe to log.
+
+    Values of arguments named like passwords, secrets, tokens or keys are
+    replaced with ``***``, as are sensitive attributes inside other values
+    (e.g. ``PASSWORD="..."`` in a template); long values are truncated.
+    """
+    return {
+        name: _REDACTED if _SENSITIVE_NAME.search(name) else _sanitize_value(value)
+        for name, value in args.items()
+    }
+
+
+def sanitize_command(command_parts: List[str]) -> str:
+    """Return the command line *command_parts* with passwords redacted."""
+    parts = list(command_parts)
+    position = _PASSWORD_POSITION.get(tuple(parts[:2]))
+    if position is not None and len(parts) > position:
+        parts[position] = _REDACTED
+    for i, part in enumerate(parts[:-1]):
+        if part.startswith("--") and _SENSITIVE_NAME.search(part):
+            parts[i + 1] = _REDACTED
+    return _sanitize_value(" ".join(parts))
+
+
+def log_slow_call(
+    kind: str,
+    name: str,
+    duration: float,
+    *,
+    args: Optional[Mapping[str, Any]] = None,
+    command: Optional[List[str]] = None,
+    breakdown: Optional[Mapping[str, float]] = None,
+    output_bytes: Optional[int] = None,
+    error: bool = False,
+) -> bool:
+    """Log a call that took longer than the slow-call threshold.
+
+    Args:
+        kind: ``tool`` or ``command``.
+        name: Tool name or command binary.
+        duration: Seconds the call took.
+        args: Tool arguments; sanitised before logging.
+        command: Command parts; sanitised before logging.
+        breakdown: Seconds spent per stage of the call.
+        output_bytes: Size of the output.
+        error: Whether the call failed.
+
+    Returns:
+        bool: True if the call was logged.
+    """
+    if _slow_call_threshold <= 0 or duration < _slow_call_threshold:
+        return False
+
+    record: Dict[str, Any] = {
+        "kind": kind,
+        "name": name,
+        "duration_ms": round(duration * 1000, 3),
+        "threshold_ms": round(_slow_call_threshold * 1000, 3),
+    }
+    context = _call_context.get()
+    if kind == "tool":
+        record["tool"] = name
+    elif context is not None:
+        record["tool"] = context.tool
+    if args is not None:
+        record["args"] = sanitize_args(args)
+    if command is not None:
+        record["command"] = sanitize_command(command)
+    if breakdown:
+        record["breakdown_ms"] = {stage: round(seconds * 1000, 3) for stage, seconds in breakdown.items()}
+    if output_bytes is not None:
+        record["output_bytes"] = output_bytes
+    record["error"] = error
+
+    logging.getLogger(SLOW_CALL_LOGGER).warning(
+        "Slow %s %s: %.3fs %s",
+        kind,
+        name,
+        duration,
+        _JsonArg(record),
+        extra={"slow_call": record, "duration_ms": record["duration_ms"]},
+    )
+    return True
@@ -48,3 +48,24 @@ with (
     .open("r", encoding="utf-8") as f
 ):
     VM_TEMPLATE_DESCRIPTION = f.read()
+
+with (
+    resources.files("src.static")
+    .joinpath("pagination_description.md")
+    .open("r", encoding="utf-8") as f
+):
+    PAGINATION_DESCRIPTION = f.read()
+
+with (
+    resources.files("src.static")
+    .joinpath("fields_description.md")
+    .open("r", encoding="utf-8") as f
+):
+    FIELDS_DESCRIPTION = f.read()
+
+with (
+    resources.files("src.static")
+    .joinpath("output_format_description.md")
+    .open("r", encoding="utf-8") as f
+):
+    OUTPUT_FORMAT_DESCRIPTION = f.read()
@@ -45,7 +45,7 @@ async def test_instantiate_vm_allow_write_false(mcp_server_read_only):
         output = result.content[0].text
         expected_error = "Write operations are disabled"
         assert expected_error in output
-        cleanup_test_vms()
+        await cleanup_test_vms()
 
 
 @pytest.mark.asyncio
@@ -69,7 +69,7 @@ async def test_instantiate_vm(mcp_server):
             f"Expected pattern '<ID>\\d+</ID>' not found in output: {output}"
         )
 
-        cleanup_test_vms()
+        await cleanup_test_vms()
 
 
 @pytest.mark.asyncio
@@ -107,7 +107,7 @@ async def test_instantiate_vm_invalid_cpu_and_memory(mcp_server):
         )
         output = result.content[0].text
         assert "error" in output
-        cleanup_test_vms()
+        await cleanup_test_vms()
 
 
 @pytest.mark.asyncio
@@ -130,7 +130,7 @@ async def test_instantiate_vm_with_network_name(mcp_server):
             output, r"<NETWORK><!\[CDATA\[service\]\]></NETWORK>"
         ), f"Expected network 'service' not found in output: {output}"
 
-        cleanup_test_vms()
+        await cleanup_test_vms()
 
 
 @pytest.mark.asyncio
@@ -159,7 +159,7 @@ async def test_instantiate_vm_multiple_instances(mcp_server):
         except ET.ParseError as e:
             pytest.fail(f"Failed to parse XML output: {e}\nOutput was: {output}")
         finally:
-            cleanup_test_vms()
+            await cleanup_test_vms()
 
 
 @pytest.mark.asyncio
@@ -201,4 +201,4 @@ async def test_instantiate_vm_invalid_num_instances(mcp_server):
         )
         output = result.content[0].text
         assert "error" in output
-        cleanup_test_vms()
+        await cleanup_test_vms()
@@ -166,7 +166,7 @@ async def test_manage_vm_lifecycle_operations(mcp_server):
             assert "<result>" in term_xml or "<error>" in term_xml
 
     finally:
-        cleanup_test_vms()
+        await cleanup_test_vms()
 
 
 @pytest.mark.asyncio
@@ -238,7 +238,7 @@ async def test_manage_vm_hard_operations(mcp_server):
             print(f"Hard stopped VM {vm_id}")
 
     finally:
-        cleanup_test_vms()
+        await cleanup_test_vms()
 
 
 @pytest.mark.asyncio
@@ -278,7 +278,7 @@ async def test_manage_vm_terminate_multiple_vms_comma_separated(mcp_server):
 
 
     finally:
-        cleanup_test_vms()
+        await cleanup_test_vms()
 
 
 @pytest.mark.asyncio
@@ -321,7 +321,7 @@ async def test_manage_vm_terminate_multiple_vms_range(mcp_server):
             assert "<result>" in term_xml
 
     finally:
-        cleanup_test_vms()
+        await cleanup_test_vms()
 
 
 @pytest.mark.asyncio
@@ -363,7 +363,7 @@ async def test_manage_vm_terminate_mixed_valid_invalid_ids(mcp_server):
             assert "Error" in term_xml and "999999" in term_xml
 
     finally:
-        cleanup_test_vms()
+        await cleanup_test_vms()
 
 
 @pytest.mark.asyncio
@@ -405,7 +405,7 @@ async def test_manage_vm_stop_multiple_vms_comma(mcp_server):
                 *[wait_for_state(client, vid, "8", timeout=120) for vid in vm_ids]
             )
     finally:
-        cleanup_test_vms()
+        await cleanup_test_vms()
 
 
 @pytest.mark.asyncio
@@ -447,7 +447,7 @@ async def test_manage_vm_reboot_multiple_vms_range_hard(mcp_server):
                 *[wait_for_state(client, str(vid), "3", target_lcm_state="3", timeout=180) for vid in vm_ids]
             )
     finally:
-        cleanup_test_vms()
+        await cleanup_test_vms()
 
 
 @pytest.mark.asyncio
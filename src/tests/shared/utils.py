@@ -12,7 +12,6 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import asyncio
 import re
 from fastmcp import Client
 from typing import Optional
@@ -29,7 +28,7 @@ __all__ = [
 ]
 
 
-def cleanup_test_vms():
+async def cleanup_test_vms():
     """Clean up any leftover test VMs from previous runs.
 
     This function looks for VMs with test-related names and deletes them.
@@ -39,7 +38,7 @@ def cleanup_test_vms():
     """
     try:
         # Get all VMs and filter for test VMs
-        result = execute_one_command(["onevm", "list", "--list", "ID,NAME", "--csv"])
+        result = await execute_one_command(["onevm", "list", "--list", "ID,NAME", "--csv"])
         if "error" not in result:
             cleaned_count = 0
             for line in result.strip().split("\n"):
@@ -47,7 +46,7 @@ def cleanup_test_vms():
                     try:
                         vm_id = line.split(",")[0].strip()
                         if vm_id.isdigit():
-                            execute_one_command(["onevm", "recover", "--delete", vm_id])
+                            await execute_one_command(["onevm", "recover", "--delete", vm_id])
                             print(f"Cleaned up leftover test VM: {vm_id}")
                             cleaned_count += 1
                     except Exception as e:
@@ -135,7 +134,7 @@ async def wait_for_state(
     target_lcm_state: Optional[str] = None,
     timeout: int = 60,
 ):
-    """Poll get_vm_status until VM reaches the target STATE and optional LCM_STATE.
+    """Wait with wait_for_vm_state until VM reaches the target STATE and optional LCM_STATE.
     Used mainly for testing the manage_vm tool and the lifecycle of a VM.
 
     Args:
@@ -146,27 +145,12 @@ async def wait_for_state(
         timeout: The timeout in seconds
 
     Returns:
-        The XML string of the VM status
+        The XML string of the VM status (the last seen one on timeout)
     """
+    arguments = {"vm_ids": vm_id, "state": target_state, "timeout": str(timeout)}
+    if target_lcm_state is not None:
+        arguments["lcm_state"] = target_lcm_state
+    await client.call_tool("wait_for_vm_state", arguments)
 
-    deadline = asyncio.get_event_loop().time() + timeout
-    while True:
-        status_out = await client.call_tool("get_vm_status", {"vm_id": vm_id})
-        status_xml = status_out.content[0].text
-
-        state_match = search_for_pattern(status_xml, rf"<STATE>{target_state}</STATE>")
-        if state_match:
-            # If no LCM state is specified, a match on the main state is sufficient
-            if target_lcm_state is None:
-                return status_xml
-
-            # If an LCM state is specified, both must match
-            lcm_state_match = search_for_pattern(
-                status_xml, rf"<LCM_STATE>{target_lcm_state}</LCM_STATE>"
-            )
-            if lcm_state_match:
-                return status_xml
-
-        if asyncio.get_event_loop().time() > deadline:
-            return status_xml  # return last seen
-        await asyncio.sleep(3)
+    status_out = await client.call_tool("get_vm_status", {"vm_id": vm_id})
+    return status_out.content[0].text
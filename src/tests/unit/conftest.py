@@ -1,9 +1,28 @@
 """Shared fixtures and helpers for unit tests."""
 
+import asyncio
+import functools
+import inspect
 from typing import Callable
 import pytest
 
 
+def sync_tool(fn: Callable) -> Callable:
+    """Return a synchronous callable for an ``async def`` tool.
+
+    Tools are coroutines so that they do not block the MCP event loop; unit tests
+    call them like plain functions through this wrapper.
+    """
+    if not inspect.iscoroutinefunction(fn):
+        return fn
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return asyncio.run(fn(*args, **kwargs))
+
+    return wrapper
+
+
 class DummyMCP:
     """Minimal stub that mimics FastMCP's ``.tool`` decorator.
 
@@ -18,12 +37,63 @@ class DummyMCP:
         """Return a decorator that stores *fn* under the given *name*."""
 
         def decorator(fn):
-            self.tools[name] = fn
+            self.tools[name] = sync_tool(fn)
             return fn
 
         return decorator
 
 
+class FakeStream:
+    """Stand-in for asyncio.StreamReader over a fixed payload."""
+
+    def __init__(self, data: bytes):
+        self._data = data
+
+    async def read(self, n: int = -1) -> bytes:
+        if n < 0:
+            n = len(self._data)
+        chunk, self._data = self._data[:n], self._data[n:]
+        return chunk
+
+
+class FakeProcess:
+    """Stand-in for asyncio.subprocess.Process."""
+
+    # Above any pid_max, so killing its process group is a harmless no-op
+    pid = 2**30
+
+    def __init__(self, stdout: str = "", stderr: str = "", returncode: int = 0):
+        self._stdout = stdout.encode()
+        self._stderr = stderr.encode()
+        self._exit_code = returncode
+        self.returncode = None
+        self.stdout = FakeStream(self._stdout)
+        self.stderr = FakeStream(self._stderr)
+        self.killed = False
+
+    async def communicate(self):
+        self.returncode = self._exit_code
+        return self._stdout, self._stderr
+
+    async def wait(self):
+        self.returncode = self._exit_code
+        return self.returncode
+
+    def kill(self):
+        self.killed = True
+        self.returncode = -9
+
+
+@pytest.fixture(autouse=True)
+def reset_pool_cache():
+    """Start every test with an empty shared pool cache."""
+    from src.tools.utils.cache import configure_pool_cache
+
+    configure_pool_cache()
+    yield
+    configure_pool_cache()
+
+
 # ---------------------------------------------------------------------------
 # Helper to register infra tools quickly
 # ---------------------------------------------------------------------------
@@ -31,19 +101,29 @@ class DummyMCP:
 def register_tools(monkeypatch, module_path: str, xml_out: str = "<xml/>", **register_kwargs):
     """
     Register all tools defined in *module_path* with a DummyMCP instance,
-    while patching that module's ``execute_one_command`` to return *xml_out*.
+    while patching that module's ``execute_one_command`` and the streamed pool
+    listings of ``src.tools.utils.pagination`` to return *xml_out*.
 
     Example:
         tools = register_tools(monkeypatch, "src.tools.infra.infra")
         tools = register_tools(monkeypatch, "src.tools.templates.templates")
     """
     import importlib
+    from src.tools.utils import pagination
 
     module = importlib.import_module(module_path)
 
+    async def fake_execute_one_command(*a, **k):
+        return xml_out
+
     dummy = DummyMCP()
     monkeypatch.setattr(module, "execute_one_command",
-                        lambda *a, **k: xml_out,
+                        fake_execute_one_command,
                         raising=True)
+
+    async def fake_stream_one_command(*a, **k):
+        yield xml_out.encode()
+
+    monkeypatch.setattr(pagination, "stream_one_command", fake_stream_one_command)
     module.register_tools(dummy, **register_kwargs)
     return dummy.tools
\ No newline at end of file
@@ -2,6 +2,7 @@ import pytest
 from unittest.mock import MagicMock, patch
 import xml.etree.ElementTree as ET
 from src.tools.infra import infra
+from src.tests.unit.conftest import sync_tool
 
 @pytest.fixture
 def infra_tools():
@@ -10,7 +11,7 @@ def infra_tools():
     
     def tool_decorator(name=None, description=None):
         def decorator(func):
-            tools[name] = func
+            tools[name] = sync_tool(func)
             return func
         return decorator
     
@@ -26,7 +27,7 @@ def infra_tools_read_only():
     
     def tool_decorator(name=None, description=None):
         def decorator(func):
-            tools[name] = func
+            tools[name] = sync_tool(func)
             return func
         return decorator
     
@@ -12,7 +12,7 @@ def test_list_clusters_happy_path(monkeypatch):
 
     xml_out = "<CLUSTER_POOL></CLUSTER_POOL>"
 
-    def fake_exec(cmd_parts, *a, **k):
+    async def fake_exec(cmd_parts, *a, **k):
         # Record the command we got from list_clusters() so we can assert on it later
         captured["cmd"] = cmd_parts
         # Return dummy XML that the wrapper should pass through untouched
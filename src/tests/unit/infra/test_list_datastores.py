@@ -10,7 +10,7 @@ def test_list_datastores_cli(monkeypatch):
 
     xml_out = "<DATASTORE_POOL></DATASTORE_POOL>"
 
-    def fake(cmd_parts, *a, **k):
+    async def fake(cmd_parts, *a, **k):
         captured["cmd"] = cmd_parts
         return xml_out  
 
@@ -39,9 +39,11 @@ def test_list_hosts_filters_by_cluster(monkeypatch):
 def test_list_hosts_no_hosts_found(monkeypatch):
     list_hosts = _get_list_hosts_func(monkeypatch, HOSTS_XML)
 
-    output = list_hosts("999")
-    assert output.startswith("<error>")
-    assert "No hosts found" in output
+    # An empty pool, with or without pagination
+    for output in (list_hosts("999"), list_hosts("999", limit="10")):
+        root = ET.fromstring(output)
+        assert root.tag == "HOST_POOL"
+        assert root.findall("HOST") == []
 
 
 def test_list_hosts_non_digit_cluster(monkeypatch):
@@ -10,7 +10,7 @@ def test_list_images_cli(monkeypatch):
 
     xml_out = "<IMAGE_POOL></IMAGE_POOL>"
 
-    def fake(cmd_parts, *a, **k):
+    async def fake(cmd_parts, *a, **k):
         captured["cmd"] = cmd_parts
         return xml_out
 
@@ -20,4 +20,11 @@ def test_list_images_cli(monkeypatch):
     )
 
     assert tools["list_images"]() == xml_out
-    assert captured["cmd"] == ["oneimage", "list", "--xml"]
\ No newline at end of file
+    assert captured["cmd"] == ["oneimage", "list", "--xml"]
+
+def test_list_images_paginated(monkeypatch):
+    xml_out = "<IMAGE_POOL><IMAGE><ID>0</ID></IMAGE><IMAGE><ID>1</ID></IMAGE></IMAGE_POOL>"
+    tools = register_tools(monkeypatch, "src.tools.infra.infra", xml_out=xml_out)
+
+    assert tools["list_images"](limit="1") == '<IMAGE_POOL NEXT_CURSOR="1"><IMAGE><ID>0</ID></IMAGE></IMAGE_POOL>'
+    assert tools["list_images"](limit="1", cursor="1") == "<IMAGE_POOL><IMAGE><ID>1</ID></IMAGE></IMAGE_POOL>"
@@ -10,7 +10,7 @@ def test_list_networks_cli(monkeypatch):
 
     xml_out = "<VNET_POOL></VNET_POOL>"
 
-    def fake(cmd_parts, *a, **k):
+    async def fake(cmd_parts, *a, **k):
         captured["cmd"] = cmd_parts
         return xml_out
 
@@ -2,6 +2,7 @@ import pytest
 from unittest.mock import MagicMock, patch
 import xml.etree.ElementTree as ET
 from src.tools.market import market
+from src.tests.unit.conftest import sync_tool
 
 @pytest.fixture
 def market_tools():
@@ -10,7 +11,7 @@ def market_tools():
     
     def tool_decorator(name=None, description=None):
         def decorator(func):
-            tools[name] = func
+            tools[name] = sync_tool(func)
             return func
         return decorator
     
@@ -26,7 +27,7 @@ def market_tools_read_only():
     
     def tool_decorator(name=None, description=None):
         def decorator(func):
-            tools[name] = func
+            tools[name] = sync_tool(func)
             return func
         return decorator
     
@@ -130,3 +131,27 @@ def test_import_market_app_invalid_input(market_tools):
 def test_import_market_app_read_only(market_tools_read_only):
     result_xml = market_tools_read_only['import_market_app'](app_id="5", datastore_id="100")
     assert "Write operations are disabled" in result_xml
+
+def test_search_market_apps_paginated(monkeypatch, market_tools):
+    from src.tools.utils import pagination
+
+    pool = "<MARKETPLACEAPP_POOL>" + "".join(
+        f"<MARKETPLACEAPP><ID>{i}</ID><NAME>{'Ubuntu' if i % 2 else 'Debian'} {i}</NAME></MARKETPLACEAPP>"
+        for i in range(6)
+    ) + "</MARKETPLACEAPP_POOL>"
+
+    async def fake_stream(*a, **k):
+        yield pool.encode()
+
+    monkeypatch.setattr(pagination, "stream_one_command", fake_stream)
+
+    first = ET.fromstring(market_tools['search_market_apps'](filter_str="ubuntu", limit="2"))
+    assert [app.findtext("ID") for app in first] == ["1", "3"]
+
+    second = ET.fromstring(
+        market_tools['search_market_apps'](filter_str="ubuntu", limit="2", cursor=first.get("NEXT_CURSOR"))
+    )
+    assert [app.findtext("ID") for app in second] == ["5"]
+    assert second.get("NEXT_CURSOR") is None
+
+    assert market_tools['search_market_apps'](limit="zero").startswith("<error>")
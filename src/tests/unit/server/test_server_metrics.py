@@ -0,0 +1,60 @@
+"""Unit tests for server.server_metrics tool."""
+
+import json
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from src.tests.unit.conftest import DummyMCP
+from src.tools.server import server
+from src.tools.utils.metrics import metrics
+
+
+@pytest.fixture
+def server_metrics():
+    metrics.clear()
+    metrics.record_tool("list_vms", 0.2, {"subprocess": 0.15, "parse": 0.03}, 2048, False)
+    metrics.record_tool("list_vms", 0.4, {"subprocess": 0.3}, 4096, True)
+    metrics.record_tool("list_hosts", 0.05, {}, 512, False)
+    metrics.record_command("onevm", 0.3, 4096, False)
+    metrics.record_subprocess("onevm", 0.25)
+    mcp = DummyMCP()
+    server.register_tools(mcp)
+    yield mcp.tools["server_metrics"]
+    metrics.clear()
+
+
+def test_server_metrics_xml(server_metrics):
+    root = ET.fromstring(server_metrics())
+
+    tools = root.findall("TOOLS/TOOL")
+    # Slowest in total first
+    assert [tool.findtext("NAME") for tool in tools] == ["list_vms", "list_hosts"]
+    assert tools[0].findtext("CALLS") == "2"
+    assert tools[0].findtext("ERRORS") == "1"
+    assert float(tools[0].findtext("DURATION_SUM")) == pytest.approx(0.6)
+    assert float(tools[0].findtext("SUBPROCESS_SUM")) == pytest.approx(0.45)
+    assert float(tools[0].findtext("PARSE_SUM")) == pytest.approx(0.03)
+    assert tools[0].findtext("OUTPUT_BYTES_SUM") == "6144"
+
+    command = root.find("COMMANDS/COMMAND")
+    assert command.findtext("BINARY") == "onevm"
+    assert float(command.findtext("SUBPROCESS_SUM")) == pytest.approx(0.25)
+
+
+def test_server_metrics_formats(server_metrics):
+    data = json.loads(server_metrics(output_format="json"))
+    assert data["METRICS"]["TOOLS"]["TOOL"][1]["NAME"] == "list_hosts"
+
+    text = server_metrics(output_format="openmetrics")
+    assert 'one_mcp_tool_errors_total{tool="list_vms"} 1' in text
+
+    assert "Invalid output_format" in server_metrics(output_format="yaml")
+
+
+def test_server_metrics_disabled(server_metrics):
+    metrics.enabled = False
+    try:
+        assert "disabled" in server_metrics()
+    finally:
+        metrics.enabled = True
@@ -7,7 +7,7 @@ def test_list_templates_cli(monkeypatch):
     captured = {}
     xml_out = "<VMTEMPLATE_POOL></VMTEMPLATE_POOL>"
 
-    def fake(cmd_parts, *a, **k):
+    async def fake(cmd_parts, *a, **k):
         captured["cmd"] = cmd_parts
         return xml_out
 
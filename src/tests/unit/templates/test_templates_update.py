@@ -3,6 +3,7 @@ from unittest.mock import MagicMock, patch
 import xml.etree.ElementTree as ET
 import os
 from src.tools.templates import templates
+from src.tests.unit.conftest import sync_tool
 
 @pytest.fixture
 def template_tools():
@@ -11,7 +12,7 @@ def template_tools():
     
     def tool_decorator(name=None, description=None):
         def decorator(func):
-            tools[name] = func
+            tools[name] = sync_tool(func)
             return func
         return decorator
     
@@ -27,7 +28,7 @@ def template_tools_read_only():
     
     def tool_decorator(name=None, description=None):
         def decorator(func):
-            tools[name] = func
+            tools[name] = sync_tool(func)
             return func
         return decorator
     
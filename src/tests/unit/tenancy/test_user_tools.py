@@ -2,6 +2,7 @@ import pytest
 from unittest.mock import MagicMock, patch
 import xml.etree.ElementTree as ET
 from src.tools.tenancy import tenancy
+from src.tests.unit.conftest import sync_tool
 
 @pytest.fixture
 def tenancy_tools():
@@ -10,7 +11,7 @@ def tenancy_tools():
     
     def tool_decorator(name=None, description=None):
         def decorator(func):
-            tools[name] = func
+            tools[name] = sync_tool(func)
             return func
         return decorator
     
@@ -26,7 +27,7 @@ def tenancy_tools_read_only():
     
     def tool_decorator(name=None, description=None):
         def decorator(func):
-            tools[name] = func
+            tools[name] = sync_tool(func)
             return func
         return decorator
     
@@ -56,6 +57,18 @@ def test_list_users_success(tenancy_tools):
         mock_exec.assert_called_once_with(["oneuser", "list", "--xml"])
         assert result == "<USER_POOL></USER_POOL>"
 
+def test_list_users_csv(tenancy_tools):
+    with patch('src.tools.tenancy.tenancy.execute_one_command') as mock_exec:
+        mock_exec.return_value = (
+            "<USER_POOL><USER><ID>0</ID><NAME>oneadmin</NAME></USER>"
+            "<QUOTAS><ID>0</ID></QUOTAS><DEFAULT_USER_QUOTAS/></USER_POOL>"
+        )
+
+        result = tenancy_tools['list_users'](output_format="csv")
+
+        # Only the users are rows, pool-level quota elements are not
+        assert result == "ID,NAME\n0,oneadmin\n"
+
 # --- create_user ---
 
 def test_create_user_success(tenancy_tools):
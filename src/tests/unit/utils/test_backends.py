@@ -0,0 +1,311 @@
+"""Unit tests for src.tools.utils.backends against a local XML-RPC stand-in."""
+
+import asyncio
+import os
+import socket
+import threading
+from socketserver import ThreadingMixIn
+from xmlrpc.server import SimpleXMLRPCRequestHandler, SimpleXMLRPCServer
+
+import pytest
+
+from src.tools.utils import backends
+from src.tools.utils import base as base_utils
+from src.tests.unit.conftest import FakeProcess
+
+VM_POOL_XML = "<VM_POOL><VM><ID>1</ID><STATE>3</STATE></VM><VM><ID>2</ID><STATE>8</STATE></VM></VM_POOL>"
+HOST_POOL_XML = "<HOST_POOL><HOST><ID>0</ID><NAME>kvm0</NAME></HOST></HOST_POOL>"
+
+
+class _KeepAliveHandler(SimpleXMLRPCRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+
+class _StandInOned(ThreadingMixIn, SimpleXMLRPCServer):
+    """Minimal oned stand-in that serves canned pool XML."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(
+            ("127.0.0.1", 0), requestHandler=_KeepAliveHandler, logRequests=False
+        )
+        self.connections = 0
+        self.calls = []
+
+        def record(name, result):
+            def handler(*params):
+                self.calls.append((name, params))
+                return result(*params) if callable(result) else result
+
+            self.register_function(handler, name)
+
+        record("one.vmpool.info", [True, VM_POOL_XML, 0])
+        record("one.hostpool.info", [True, HOST_POOL_XML, 0])
+        record(
+            "one.vm.info",
+            lambda session, vm_id: [True, f"<VM><ID>{vm_id}</ID></VM>", 0]
+            if vm_id < 100
+            else [False, f"[one.vm.info] Error getting virtual machine [{vm_id}].", 1024],
+        )
+        record("one.vm.action", lambda session, action, vm_id: [True, vm_id, 0])
+
+    @property
+    def endpoint(self):
+        host, port = self.server_address
+        return f"http://{host}:{port}/RPC2"
+
+
+@pytest.fixture
+def oned():
+    server = _StandInOned()
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+@pytest.fixture
+def xmlrpc_backend(oned):
+    backends.configure_backend("xmlrpc", endpoint=oned.endpoint, session="oneadmin:pw")
+    yield backends.get_backend()
+    backends.configure_backend("cli")
+
+
+def test_default_backend_is_cli():
+    assert isinstance(backends.get_backend(), backends.CliBackend)
+
+
+def test_configure_backend_invalid_name():
+    with pytest.raises(ValueError):
+        backends.configure_backend("soap")
+
+
+@pytest.mark.asyncio
+async def test_pool_list_served_over_xmlrpc(oned, xmlrpc_backend):
+    assert await base_utils.execute_one_command(["onevm", "list", "--xml"]) == VM_POOL_XML
+    assert await base_utils.execute_one_command(["onehost", "list", "--xml"]) == HOST_POOL_XML
+
+    assert oned.calls[0] == ("one.vmpool.info", ("oneadmin:pw", -2, -1, -1, -1))
+    assert oned.calls[1] == ("one.hostpool.info", ("oneadmin:pw",))
+
+
+@pytest.mark.asyncio
+async def test_show_and_action_translation(oned, xmlrpc_backend):
+    assert await base_utils.execute_one_command(["onevm", "show", "7", "--xml"]) == "<VM><ID>7</ID></VM>"
+    assert await base_utils.execute_one_command(["onevm", "poweroff", "--hard", "7"]) == ""
+    assert oned.calls[-1] == ("one.vm.action", ("oneadmin:pw", "poweroff-hard", 7))
+
+
+@pytest.mark.asyncio
+async def test_oned_error_is_wrapped_like_cli_error(xmlrpc_backend):
+    output = await base_utils.execute_one_command(["onevm", "show", "404", "--xml"])
+    assert "<exit_code>1024</exit_code>" in output
+    assert "Error getting virtual machine [404]" in output
+
+
+@pytest.mark.asyncio
+async def test_connections_are_kept_alive(oned, xmlrpc_backend):
+    for _ in range(5):
+        await base_utils.execute_one_command(["onevm", "show", "1", "--xml"])
+    assert len(oned.calls) == 5
+    assert oned.connections == 1
+
+
+@pytest.mark.asyncio
+async def test_untranslated_command_falls_back_to_cli(monkeypatch, oned, xmlrpc_backend):
+    async def fake_exec(*cmd, stdout, stderr, **kwargs):  # noqa: D401
+        return FakeProcess(stdout=f"cli:{' '.join(cmd)}")
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_exec)
+
+    assert await base_utils.execute_one_command(["onevm", "terminate", "1,2"]) == "cli:onevm terminate 1,2"
+    assert await base_utils.execute_one_command(["onelog", "get-vm", "1"]) == "cli:onelog get-vm 1"
+    assert oned.calls == []
+
+
+@pytest.mark.asyncio
+async def test_unreachable_oned_falls_back_to_cli(monkeypatch):
+    async def fake_exec(*cmd, stdout, stderr, **kwargs):  # noqa: D401
+        return FakeProcess(stdout="<VM_POOL/>")
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_exec)
+    backend = backends.XmlRpcBackend(endpoint="http://127.0.0.1:1/RPC2", session="u:p")
+    assert await backend.execute(["onevm", "list", "--xml"]) == "<VM_POOL/>"
+
+
+class _StaleProxy:
+    """Pooled proxy whose connection oned closed while it was idle."""
+
+    def __getattr__(self, method):
+        def call(*params):
+            raise ConnectionResetError("Connection reset by peer")
+
+        return call
+
+    def __call__(self, attr):
+        return lambda: None
+
+
+def _no_cli(monkeypatch):
+    async def fake_exec(*cmd, stdout, stderr, **kwargs):
+        raise AssertionError(f"unexpected CLI fallback: {cmd}")
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_exec)
+
+
+@pytest.mark.asyncio
+async def test_read_on_stale_connection_is_retried_on_a_new_one(monkeypatch, oned, xmlrpc_backend):
+    _no_cli(monkeypatch)
+    xmlrpc_backend._pool.put_nowait(_StaleProxy())
+
+    assert await xmlrpc_backend.execute(["onevm", "show", "3", "--xml"]) == "<VM><ID>3</ID></VM>"
+    assert oned.calls == [("one.vm.info", ("oneadmin:pw", 3))]
+
+
+@pytest.mark.asyncio
+async def test_actions_use_a_new_connection_and_never_fall_back(monkeypatch, oned, xmlrpc_backend):
+    _no_cli(monkeypatch)
+    xmlrpc_backend._pool.put_nowait(_StaleProxy())
+
+    assert await xmlrpc_backend.execute(["onevm", "reboot", "3"]) == ""
+    assert oned.calls == [("one.vm.action", ("oneadmin:pw", "reboot", 3))]
+
+    unreachable = backends.XmlRpcBackend(endpoint="http://127.0.0.1:1/RPC2", session="u:p")
+    with pytest.raises(ConnectionRefusedError):
+        await unreachable.execute(["onevm", "terminate", "3"])
+
+
+@pytest.mark.asyncio
+async def test_calls_time_out(monkeypatch):
+    _no_cli(monkeypatch)
+    # Accepts connections (in the backlog) but never answers
+    silent = socket.socket()
+    silent.bind(("127.0.0.1", 0))
+    silent.listen(8)
+    try:
+        host, port = silent.getsockname()
+        backend = backends.XmlRpcBackend(endpoint=f"http://{host}:{port}/RPC2", session="u:p", timeout=0.2)
+        with pytest.raises(TimeoutError):
+            await backend.execute(["onevm", "poweroff", "3"])
+    finally:
+        silent.close()
+
+
+@pytest.mark.asyncio
+async def test_owner_and_state_are_pushed_down(oned, xmlrpc_backend):
+    chunks = [
+        c
+        async for c in base_utils.stream_one_command(["onevm", "list", "5", "--xml"], state=3)
+    ]
+    assert b"".join(chunks) == VM_POOL_XML.encode()
+    assert oned.calls[-1] == ("one.vmpool.info", ("oneadmin:pw", 5, -1, -1, 3))
+
+
+@pytest.mark.asyncio
+async def test_id_range_is_pushed_down(oned, xmlrpc_backend):
+    chunks = [
+        c
+        async for c in base_utils.stream_one_command(
+            ["onevm", "list", "--xml"], id_range=(100, 199), cache=False
+        )
+    ]
+    assert b"".join(chunks) == VM_POOL_XML.encode()
+    assert oned.calls[-1] == ("one.vmpool.info", ("oneadmin:pw", -2, 100, 199, -1))
+
+
+def test_pool_range_takes_precedence_over_id_range():
+    _, params, _ = backends._translate(
+        ["onevm", "list", "--xml"], pool_range=(40, 11), id_range=(1, 5)
+    )
+    assert params == (-2, 40, -11, -1)
+
+
+@pytest.mark.parametrize(
+    "filterflag, expected",
+    [("a", -2), ("mine", -3), ("g", -4), ("12", 12)],
+)
+def test_pool_filterflag_translation(filterflag, expected):
+    method, params, _ = backends._translate(["oneimage", "list", filterflag, "--xml"])
+    assert method == "one.imagepool.info"
+    assert params == (expected, -1, -1)
+
+
+def test_unsupported_filterflag_is_not_translated():
+    # Username filterflags need a lookup only the CLI does
+    assert backends._translate(["onevm", "list", "alice", "--xml"]) is None
+    # Pools without filter arguments
+    assert backends._translate(["onehost", "list", "5", "--xml"]) is None
+
+
+@pytest.mark.asyncio
+async def test_pool_page_is_queried_by_range(oned, xmlrpc_backend):
+    from src.tools.utils.pagination import list_pool_page
+
+    assert xmlrpc_backend.supports_pool_range(["onevm", "list", "--xml"])
+    assert not xmlrpc_backend.supports_pool_range(["onehost", "list", "--xml"])
+
+    page = await list_pool_page(["onevm", "list", "--xml"], limit=1, cursor="40", state=3)
+    # One extra element is requested to detect the next page
+    assert oned.calls[-1] == ("one.vmpool.info", ("oneadmin:pw", -2, 40, -2, 3))
+    # The stand-in ignores the range; its second VM is dropped by the state check
+    assert page == "<VM_POOL><VM><ID>1</ID><STATE>3</STATE></VM></VM_POOL>"
+
+    page = await list_pool_page(["onevm", "list", "--xml"], limit=1, cursor="40")
+    assert page == '<VM_POOL NEXT_CURSOR="41"><VM><ID>1</ID><STATE>3</STATE></VM></VM_POOL>'
+
+
+@pytest.mark.asyncio
+async def test_cancelled_cli_command_is_killed(monkeypatch):
+    processes = []
+    create = asyncio.create_subprocess_exec
+
+    async def recording_exec(*cmd, **kwargs):
+        processes.append(await create(*cmd, **kwargs))
+        return processes[-1]
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", recording_exec)
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(backends.CliBackend().execute(["sleep", "30"]), 0.2)
+    assert processes[0].returncode is not None
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="needs procfs")
+@pytest.mark.asyncio
+async def test_cli_command_is_killed_with_its_children(tmp_path):
+    """Background children of a killed command do not outlive it."""
+    pid_file = tmp_path / "child.pid"
+    script = f"sleep 30 & echo $! > {pid_file}; wait"
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(backends.CliBackend().execute(["sh", "-c", script]), 0.5)
+    # A surviving child holds the stdout pipe open until it exits
+    assert loop.time() - start < 5
+
+    stat = f"/proc/{int(pid_file.read_text())}/stat"
+    for _ in range(50):
+        try:
+            with open(stat) as f:
+                # Killed but not yet reaped by init counts as gone
+                if f.read().rsplit(")", 1)[1].split()[0] == "Z":
+                    break
+        except FileNotFoundError:
+            break
+        await asyncio.sleep(0.02)
+    else:
+        pytest.fail("child process survived the kill")
+
+
+@pytest.mark.asyncio
+async def test_cli_command_stdin_is_closed():
+    """A command reading stdin sees EOF instead of waiting for input."""
+    assert await asyncio.wait_for(backends.CliBackend().execute(["cat"]), 5) == ""
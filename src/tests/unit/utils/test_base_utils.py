@@ -1,10 +1,10 @@
 """Unit tests for src.tools.utils.base module."""
 
-import subprocess
+import asyncio
 import pytest
-from types import SimpleNamespace
 
 from src.tools.utils import base as base_utils
+from src.tests.unit.conftest import FakeProcess
 
 # ----------------------------- is_valid_ip_address -----------------------------
 
@@ -26,60 +26,220 @@ def test_is_valid_ip_address(ip, expected):
 
 # ----------------------------- execute_one_command -----------------------------
 
-def test_execute_one_command_success(monkeypatch):
+@pytest.mark.asyncio
+async def test_execute_one_command_success(monkeypatch):
     """Should return stdout when subprocess completes successfully."""
 
-    def fake_run(cmd, capture_output, text, check):  # noqa: D401
-        assert cmd == ["onehost", "list", "--xml"]
-        return SimpleNamespace(stdout="<xml>OK</xml>")
+    async def fake_exec(*cmd, stdout, stderr, **kwargs):  # noqa: D401
+        assert list(cmd) == ["onehost", "list", "--xml"]
+        return FakeProcess(stdout="<xml>OK</xml>")
 
-    monkeypatch.setattr(subprocess, "run", fake_run)
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_exec)
 
-    output = base_utils.execute_one_command(["onehost", "list", "--xml"])
+    output = await base_utils.execute_one_command(["onehost", "list", "--xml"])
     assert output == "<xml>OK</xml>"
 
 
-def test_execute_one_command_called_process_error(monkeypatch):
-    """Should wrap CalledProcessError into XML <error>."""
+@pytest.mark.asyncio
+async def test_execute_one_command_called_process_error(monkeypatch):
+    """Should wrap a non-zero exit status into XML <error>."""
 
-    class FakeError(subprocess.CalledProcessError):
-        def __init__(self):
-            super().__init__(returncode=42, cmd="cmd")
-            self.stderr = "Boom"
-            self.stdout = ""
+    async def fake_exec(*args, **kwargs):
+        return FakeProcess(stderr="Boom", returncode=42)
 
-    def fake_run(*args, **kwargs):
-        raise FakeError()
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_exec)
 
-    monkeypatch.setattr(subprocess, "run", fake_run)
-
-    output = base_utils.execute_one_command(["cmd"])
+    output = await base_utils.execute_one_command(["cmd"])
     assert "<error>" in output
     assert "<exit_code>42</exit_code>" in output
     assert "Boom" in output
 
 
-def test_execute_one_command_file_not_found(monkeypatch):
+@pytest.mark.asyncio
+async def test_execute_one_command_file_not_found(monkeypatch):
     """Should produce exit_code 127 when binary is missing."""
 
-    def fake_run(*args, **kwargs):
+    async def fake_exec(*args, **kwargs):
         raise FileNotFoundError()
 
-    monkeypatch.setattr(subprocess, "run", fake_run)
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_exec)
 
-    output = base_utils.execute_one_command(["missing-binary"])
+    output = await base_utils.execute_one_command(["missing-binary"])
     assert "<exit_code>127</exit_code>" in output
     assert "Command not found" in output
 
 
-def test_execute_one_command_unexpected_error(monkeypatch):
+@pytest.mark.asyncio
+async def test_execute_one_command_unexpected_error(monkeypatch):
     """Generic exception should map to exit_code -1."""
 
-    def fake_run(*args, **kwargs):
+    async def fake_exec(*args, **kwargs):
         raise RuntimeError("bad things")
 
-    monkeypatch.setattr(subprocess, "run", fake_run)
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_exec)
 
-    output = base_utils.execute_one_command(["cmd"])
+    output = await base_utils.execute_one_command(["cmd"])
     assert "<exit_code>-1</exit_code>" in output
-    assert "RuntimeError" in output 
\ No newline at end of file
+    assert "RuntimeError" in output
+
+
+@pytest.mark.asyncio
+async def test_execute_one_command_real_subprocess():
+    """Should run a real child process without blocking the event loop."""
+    output = await base_utils.execute_one_command(["echo", "hello"])
+    assert output == "hello\n"
+
+
+@pytest.mark.asyncio
+async def test_execute_one_command_respects_concurrency_budget(monkeypatch):
+    """No more than max_concurrency commands should run at the same time."""
+    running = 0
+    peak = 0
+
+    async def fake_exec(*args, **kwargs):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return FakeProcess(stdout="ok")
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_exec)
+    base_utils.configure_execution(max_concurrency=3)
+    try:
+        results = await asyncio.gather(
+            *(base_utils.execute_one_command(["cmd"]) for _ in range(10))
+        )
+    finally:
+        base_utils.configure_execution(max_concurrency=base_utils.DEFAULT_MAX_CONCURRENCY)
+
+    assert results == ["ok"] * 10
+    assert peak == 3
+
+
+def test_configure_execution_rejects_invalid_limit():
+    with pytest.raises(ValueError):
+        base_utils.configure_execution(max_concurrency=0)
+
+
+def test_configure_execution_rejects_invalid_timeout():
+    with pytest.raises(ValueError):
+        base_utils.configure_execution(command_timeout=0)
+
+
+# ----------------------------- command deadlines -----------------------------
+
+@pytest.mark.asyncio
+async def test_command_past_deadline_is_killed():
+    """A command still running at the deadline is killed and reported as exit 124."""
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    with base_utils.command_deadline(0.2):
+        output = await base_utils.execute_one_command(["sleep", "30"])
+
+    assert loop.time() - start < 5
+    assert "<exit_code>124</exit_code>" in output
+    assert "Command timed out" in output
+
+
+def test_nested_deadline_only_shortens_outer_one():
+    with base_utils.command_deadline(10):
+        with base_utils.command_deadline(60):
+            assert base_utils.remaining_time() <= 10
+        with base_utils.command_deadline(1):
+            assert base_utils.remaining_time() <= 1
+        assert 1 < base_utils.remaining_time() <= 10
+    assert base_utils.remaining_time() == base_utils.DEFAULT_COMMAND_TIMEOUT
+
+
+@pytest.mark.asyncio
+async def test_stream_past_deadline_raises_timeout():
+    stream = base_utils.stream_one_command(["sh", "-c", "echo start; sleep 30"])
+    with base_utils.command_deadline(0.2), pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(_collect(stream), timeout=5)
+
+
+# ----------------------------- stream_one_command -----------------------------
+
+async def _collect(chunks):
+    return b"".join([chunk async for chunk in chunks])
+
+
+@pytest.mark.asyncio
+async def test_stream_one_command_yields_chunks(monkeypatch):
+    """Should yield stdout in chunks no larger than chunk_size."""
+
+    async def fake_exec(*cmd, stdout, stderr, **kwargs):  # noqa: D401
+        return FakeProcess(stdout="<VM_POOL>" + "x" * 100 + "</VM_POOL>")
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_exec)
+
+    chunks = [c async for c in base_utils.stream_one_command(["onevm", "list", "--xml"], chunk_size=16)]
+    assert all(len(c) <= 16 for c in chunks)
+    assert b"".join(chunks) == b"<VM_POOL>" + b"x" * 100 + b"</VM_POOL>"
+
+
+@pytest.mark.asyncio
+async def test_stream_one_command_error_builds_envelope(monkeypatch):
+    """A non-zero exit is raised and maps onto the usual XML error envelope."""
+    import subprocess
+
+    async def fake_exec(*args, **kwargs):
+        return FakeProcess(stderr="Boom", returncode=42)
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_exec)
+
+    with pytest.raises(subprocess.CalledProcessError) as excinfo:
+        await _collect(base_utils.stream_one_command(["onevm", "list", "--xml"]))
+
+    output = base_utils.command_error_xml(["onevm", "list", "--xml"], excinfo.value)
+    assert "<exit_code>42</exit_code>" in output
+    assert "Boom" in output
+
+
+@pytest.mark.asyncio
+async def test_stream_one_command_kills_process_on_early_exit(monkeypatch):
+    """Closing the stream before EOF should kill the process."""
+    process = FakeProcess(stdout="y" * 1000)
+
+    async def fake_exec(*args, **kwargs):
+        return process
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_exec)
+
+    stream = base_utils.stream_one_command(["onevm", "list", "--xml"], chunk_size=10)
+    assert await stream.__anext__() == b"y" * 10
+    await stream.aclose()
+    assert process.killed
+
+
+@pytest.mark.asyncio
+async def test_stream_one_command_real_subprocess():
+    """Streams the stdout of a real process end to end."""
+    output = await _collect(base_utils.stream_one_command(["echo", "streamed"], chunk_size=4))
+    assert output == b"streamed\n"
+
+
+@pytest.mark.asyncio
+async def test_stream_one_command_early_exit_reaps_real_subprocess():
+    """Closing early must not hang on a process blocked on a full stdout pipe."""
+    stream = base_utils.stream_one_command(["yes"], chunk_size=10)
+    assert await stream.__anext__() == b"y\n" * 5
+    await asyncio.wait_for(stream.aclose(), timeout=5)
+
+
+@pytest.mark.asyncio
+async def test_stream_one_command_replays_cached_pool(monkeypatch):
+    """A cached pool listing is replayed without running the command."""
+    calls = []
+
+    async def fake_exec(*cmd, stdout, stderr, **kwargs):  # noqa: D401
+        calls.append(cmd)
+        return FakeProcess(stdout="<VM_POOL/>")
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_exec)
+
+    await base_utils.execute_one_command(["onevm", "list", "--xml"])
+    output = await _collect(base_utils.stream_one_command(["onevm", "list", "--xml"]))
+    assert output == b"<VM_POOL/>"
+    assert len(calls) == 1
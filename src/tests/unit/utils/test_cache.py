@@ -0,0 +1,171 @@
+"""Unit tests for the shared pool cache in src.tools.utils.cache."""
+
+import asyncio
+
+import pytest
+
+from src.tools.utils import base as base_utils
+from src.tools.utils import cache
+from src.tests.unit.conftest import FakeProcess
+
+
+@pytest.fixture
+def cli_calls(monkeypatch):
+    """Fake CLI that records every command and returns a numbered output."""
+    calls = []
+
+    async def fake_exec(*cmd, stdout, stderr, **kwargs):  # noqa: D401
+        calls.append(list(cmd))
+        return FakeProcess(stdout=f"<POOL n='{len(calls)}'/>")
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_exec)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_pool_list_is_served_from_cache(cli_calls):
+    first = await base_utils.execute_one_command(["onehost", "list", "--xml"])
+    second = await base_utils.execute_one_command(["onehost", "list", "--xml"])
+
+    assert first == second
+    assert len(cli_calls) == 1
+    assert cache.pool_cache.stats()["host"] == {"hits": 1, "misses": 1, "invalidations": 0}
+
+
+@pytest.mark.asyncio
+async def test_show_commands_are_not_cached(cli_calls):
+    await base_utils.execute_one_command(["onevm", "show", "1", "--xml"])
+    await base_utils.execute_one_command(["onevm", "show", "1", "--xml"])
+    assert len(cli_calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_write_invalidates_own_and_side_effect_types(cli_calls):
+    await base_utils.execute_one_command(["onevm", "list", "--xml"])
+    await base_utils.execute_one_command(["onetemplate", "list", "--xml"])
+    await base_utils.execute_one_command(["onetemplate", "instantiate", "0"])
+
+    await base_utils.execute_one_command(["onevm", "list", "--xml"])
+    await base_utils.execute_one_command(["onetemplate", "list", "--xml"])
+
+    assert [c[:2] for c in cli_calls] == [
+        ["onevm", "list"],
+        ["onetemplate", "list"],
+        ["onetemplate", "instantiate"],
+        ["onevm", "list"],
+        ["onetemplate", "list"],
+    ]
+    assert cache.pool_cache.stats()["vm"]["invalidations"] == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "write",
+    [
+        ["oneflow-template", "instantiate", "0"],
+        ["oneflow", "scale", "3", "worker", "2"],
+        ["oneflow", "delete", "3"],
+    ],
+)
+async def test_oneflow_writes_invalidate_vm_pools(cli_calls, write):
+    await base_utils.execute_one_command(["onevm", "list", "--xml"])
+    await base_utils.execute_one_command(["onehost", "list", "--xml"])
+    await base_utils.execute_one_command(write)
+
+    await base_utils.execute_one_command(["onevm", "list", "--xml"])
+    await base_utils.execute_one_command(["onehost", "list", "--xml"])
+
+    assert [c[:2] for c in cli_calls] == [
+        ["onevm", "list"],
+        ["onehost", "list"],
+        write[:2],
+        ["onevm", "list"],
+        ["onehost", "list"],
+    ]
+    assert cache.pool_cache.stats()["vm"]["invalidations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_oneflow_listings_are_not_cached_by_default(cli_calls):
+    await base_utils.execute_one_command(["oneflow", "list", "--json"])
+    await base_utils.execute_one_command(["oneflow", "list", "--json"])
+    assert len(cli_calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_write_still_invalidates(monkeypatch):
+    calls = []
+
+    async def fake_exec(*cmd, stdout, stderr, **kwargs):  # noqa: D401
+        calls.append(cmd[1])
+        return FakeProcess(stdout="<VM_POOL/>", returncode=0 if cmd[1] == "list" else 1)
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_exec)
+
+    await base_utils.execute_one_command(["onevm", "list", "--xml"])
+    out = await base_utils.execute_one_command(["onevm", "terminate", "1,2"])
+    await base_utils.execute_one_command(["onevm", "list", "--xml"])
+
+    assert "<error>" in out
+    assert calls == ["list", "terminate", "list"]
+
+
+@pytest.mark.asyncio
+async def test_errors_are_not_cached(monkeypatch):
+    calls = []
+
+    async def fake_exec(*cmd, stdout, stderr, **kwargs):  # noqa: D401
+        calls.append(cmd)
+        return FakeProcess(stderr="oned down", returncode=255)
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_exec)
+
+    await base_utils.execute_one_command(["oneimage", "list", "--xml"])
+    await base_utils.execute_one_command(["oneimage", "list", "--xml"])
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_read_racing_a_write_is_not_stored(monkeypatch):
+    release = asyncio.Event()
+
+    async def fake_exec(*cmd, stdout, stderr, **kwargs):  # noqa: D401
+        if cmd[1] == "list":
+            await release.wait()
+        return FakeProcess(stdout="<VM_POOL/>")
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_exec)
+
+    read = asyncio.create_task(base_utils.execute_one_command(["onevm", "list", "--xml"]))
+    await asyncio.sleep(0)
+    await base_utils.execute_one_command(["onevm", "poweroff", "3"])
+    release.set()
+    await read
+
+    assert cache.pool_cache.get(["onevm", "list", "--xml"]) is None
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    pool = cache.PoolCache(ttls={"vm": 5})
+
+    pool.put(["onevm", "list", "--xml"], "<VM_POOL/>", pool.generation("vm"))
+    now[0] += 4
+    assert pool.get(["onevm", "list", "--xml"]) == "<VM_POOL/>"
+    now[0] += 2
+    assert pool.get(["onevm", "list", "--xml"]) is None
+
+
+def test_disabled_cache_never_stores():
+    pool = cache.PoolCache(enabled=False)
+    pool.put(["onevm", "list", "--xml"], "<VM_POOL/>", 0)
+    assert pool.get(["onevm", "list", "--xml"]) is None
+
+
+def test_parse_ttls():
+    assert cache.parse_ttls("vm=2, host=0") == {"vm": 2.0, "host": 0.0}
+    with pytest.raises(ValueError):
+        cache.parse_ttls("pizza=1")
+    with pytest.raises(ValueError):
+        cache.parse_ttls("vm=soon")
@@ -0,0 +1,97 @@
+"""Unit tests for src.tools.utils.coalescing."""
+
+import asyncio
+
+import pytest
+
+from src.tools.utils import coalescing
+from src.tools.utils.coalescing import CoalescingWindow
+
+
+def _recording_execute(calls):
+    async def execute(targets):
+        calls.append(targets)
+        await asyncio.sleep(0.01)
+        return {target: f"done {target}" for target in targets}
+
+    return execute
+
+
+@pytest.mark.asyncio
+async def test_calls_within_the_window_share_one_execution():
+    calls = []
+    window = CoalescingWindow(0.05)
+    execute = _recording_execute(calls)
+
+    results = await asyncio.gather(
+        window.run("stop", ["1"], execute),
+        window.run("stop", ["2", "3"], execute),
+        window.run("stop", ["3"], execute),
+    )
+
+    assert calls == [["1", "2", "3"]]
+    assert all(result["2"] == "done 2" for result in results)
+    assert (window.batches, window.calls) == (1, 3)
+
+
+@pytest.mark.asyncio
+async def test_different_keys_and_later_calls_run_separately():
+    calls = []
+    window = CoalescingWindow(0.02)
+    execute = _recording_execute(calls)
+
+    await asyncio.gather(window.run("stop", ["1"], execute), window.run("reboot", ["2"], execute))
+    await window.run("stop", ["3"], execute)
+
+    assert sorted(calls) == [["1"], ["2"], ["3"]]
+
+
+@pytest.mark.asyncio
+async def test_errors_are_raised_to_every_caller():
+    async def execute(targets):
+        raise RuntimeError("oned unreachable")
+
+    window = CoalescingWindow(0.01)
+    results = await asyncio.gather(
+        window.run("stop", ["1"], execute), window.run("stop", ["2"], execute), return_exceptions=True
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_caller_cancelled_during_the_window_withdraws_its_targets():
+    calls = []
+    window = CoalescingWindow(0.05)
+    execute = _recording_execute(calls)
+
+    leaving = asyncio.ensure_future(window.run("stop", ["1"], execute))
+    staying = asyncio.ensure_future(window.run("stop", ["2"], execute))
+    await asyncio.sleep(0)
+    leaving.cancel()
+
+    assert await staying == {"2": "done 2"}
+    assert calls == [["2"]]
+
+
+@pytest.mark.asyncio
+async def test_disabled_window_runs_every_call():
+    calls = []
+    window = CoalescingWindow()
+    execute = _recording_execute(calls)
+
+    await asyncio.gather(window.run("stop", ["1"], execute), window.run("stop", ["2"], execute))
+
+    assert calls == [["1"], ["2"]]
+
+
+def test_configure_write_coalescing(monkeypatch):
+    monkeypatch.setenv("ONE_MCP_COALESCE_WINDOW", "0.02")
+    try:
+        coalescing.configure_write_coalescing()
+        assert coalescing.write_window.window == 0.02
+        with pytest.raises(ValueError):
+            coalescing.configure_write_coalescing(-1)
+    finally:
+        coalescing.configure_write_coalescing(0)
+    assert not coalescing.write_window.enabled
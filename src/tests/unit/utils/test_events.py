@@ -0,0 +1,245 @@
+"""Unit tests for src.tools.utils.events against a local oned publisher stand-in."""
+
+import asyncio
+import base64
+import threading
+import time
+
+import pytest
+
+from src.tools.utils import events
+from src.tools.utils.cache import pool_cache
+from src.tests.unit.conftest import FakeProcess
+
+POOL_XML = (
+    "<VM_POOL>"
+    "<VM><ID>1</ID><UID>0</UID><GID>0</GID><NAME>web</NAME><STATE>3</STATE><LCM_STATE>3</LCM_STATE>"
+    "<TEMPLATE><NIC><IP>10.0.0.1</IP></NIC></TEMPLATE></VM>"
+    "<VM><ID>2</ID><UID>5</UID><GID>1</GID><NAME>db</NAME><STATE>8</STATE><LCM_STATE>0</LCM_STATE></VM>"
+    "</VM_POOL>"
+)
+
+
+def _event(vm_id, name, state, lcm_state, state_name, lcm_name):
+    """A state event as published by oned: key frame and base64 HOOK_MESSAGE."""
+    message = (
+        "<HOOK_MESSAGE><HOOK_TYPE>STATE</HOOK_TYPE><HOOK_OBJECT>VM</HOOK_OBJECT>"
+        f"<STATE>{state_name}</STATE><LCM_STATE>{lcm_name}</LCM_STATE><RESOURCE_ID>{vm_id}</RESOURCE_ID>"
+        f"<VM><ID>{vm_id}</ID><UID>0</UID><GID>0</GID><NAME>{name}</NAME>"
+        f"<STATE>{state}</STATE><LCM_STATE>{lcm_state}</LCM_STATE></VM></HOOK_MESSAGE>"
+    )
+    key = f"EVENT STATE VM/{state_name}/{lcm_name}"
+    return [key.encode(), base64.b64encode(message.encode())]
+
+
+# Recorded sequence: VM 2 powered on, VM 3 created and booted, VM 1 terminated
+RECORDED_EVENTS = [
+    _event(2, "db", 3, 2, "ACTIVE", "BOOT_POWEROFF"),
+    [b"EVENT API one.vm.deploy 1", b"ignored"],
+    _event(3, "cache", 1, 0, "PENDING", "LCM_INIT"),
+    _event(2, "db", 3, 3, "ACTIVE", "RUNNING"),
+    _event(3, "cache", 3, 3, "ACTIVE", "RUNNING"),
+    _event(1, "web", 6, 0, "DONE", "LCM_INIT"),
+]
+
+
+class EventReplayer:
+    """Stand-in for oned's event publisher replaying recorded events.
+
+    An XPUB socket sees the subscriptions, so the events are published only
+    once the subscriber is listening and none is lost.
+    """
+
+    def __init__(self, frames):
+        zmq = pytest.importorskip("zmq")
+        self._context = zmq.Context()
+        self._socket = self._context.socket(zmq.XPUB)
+        self._socket.bind("tcp://127.0.0.1:*")
+        self.endpoint = self._socket.getsockopt_string(zmq.LAST_ENDPOINT)
+        self.done = threading.Event()
+        self._thread = threading.Thread(target=self._replay, args=(frames,), daemon=True)
+        self._thread.start()
+
+    def _replay(self, frames):
+        self._socket.recv()  # the subscription
+        for frame in frames:
+            self._socket.send_multipart(frame)
+        self.done.set()
+
+    def close(self):
+        self._thread.join(timeout=5)
+        self._socket.close(linger=0)
+        self._context.term()
+
+
+@pytest.fixture
+def pool_listing(monkeypatch):
+    async def fake_exec(*cmd, stdout, stderr, **kwargs):
+        assert cmd == ("onevm", "list", "--xml")
+        return FakeProcess(stdout=POOL_XML)
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_exec)
+
+
+def _states(table):
+    return {vm.findtext("ID"): (vm.findtext("STATE"), vm.findtext("LCM_STATE")) for vm in table.elements()}
+
+
+def test_subscriber_applies_replayed_events(pool_listing):
+    replayer = EventReplayer(RECORDED_EVENTS)
+    table = events.VmStateTable()
+    subscriber = events.VmStateSubscriber(replayer.endpoint, table)
+    subscriber.start()
+    try:
+        assert subscriber.wait_connected(5)
+        assert replayer.done.wait(5)
+        for _ in range(100):
+            if table.events == 5:
+                break
+            time.sleep(0.02)
+    finally:
+        subscriber.stop()
+        replayer.close()
+
+    assert table.synced
+    assert table.events == 5
+    assert _states(table) == {"2": ("3", "3"), "3": ("3", "3")}
+    assert table.get("3").findtext("NAME") == "cache"
+
+
+def _wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.02)
+
+
+class FailingTable(events.VmStateTable):
+    """Table whose first applied event raises, as an unexpected bug would."""
+
+    def apply_event(self, frames):
+        if self.events == 0:
+            self.events = -1
+            raise RuntimeError("bug")
+        return super().apply_event(frames)
+
+
+def test_subscriber_failure_marks_the_table_stale(monkeypatch):
+    listings = []
+
+    async def fake_exec(*cmd, stdout, stderr, **kwargs):
+        listings.append(cmd)
+        # oned goes away after the first seed
+        if len(listings) > 1:
+            return FakeProcess(stderr="connection refused", returncode=255)
+        return FakeProcess(stdout=POOL_XML)
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_exec)
+    monkeypatch.setattr(events, "RECONNECT_MIN_DELAY", 0.05)
+    replayer = EventReplayer(RECORDED_EVENTS[:1])
+    table = FailingTable()
+    subscriber = events.VmStateSubscriber(replayer.endpoint, table)
+    subscriber.start()
+    try:
+        assert subscriber.wait_connected(5)
+        _wait_until(lambda: len(listings) >= 2)
+        assert not table.synced
+        assert not table.covers(["STATE"])
+        # The thread keeps retrying rather than dying
+        assert subscriber._thread.is_alive()
+    finally:
+        subscriber.stop()
+        replayer.close()
+
+
+def test_subscriber_reconnects_and_resyncs_after_a_failure(monkeypatch, pool_listing):
+    monkeypatch.setattr(events, "RECONNECT_MIN_DELAY", 0.05)
+    replayer = EventReplayer(RECORDED_EVENTS[:1])
+    table = FailingTable()
+    subscriber = events.VmStateSubscriber(replayer.endpoint, table)
+    subscriber.start()
+    try:
+        _wait_until(lambda: table.resyncs >= 2 and table.synced)
+    finally:
+        subscriber.stop()
+        replayer.close()
+
+
+def test_resync_bypasses_the_pool_cache(monkeypatch, pool_listing):
+    stale = "<VM_POOL><VM><ID>1</ID><STATE>8</STATE><LCM_STATE>0</LCM_STATE></VM></VM_POOL>"
+    command_parts = ["onevm", "list", "--xml"]
+    pool_cache.put(command_parts, stale, pool_cache.generation("vm"))
+    try:
+        table = events.VmStateTable()
+        subscriber = events.VmStateSubscriber("tcp://127.0.0.1:1", table)
+        subscriber._resync()
+    finally:
+        pool_cache.clear()
+
+    assert _states(table) == {"1": ("3", "3"), "2": ("8", "0")}
+
+
+def test_failed_resync_raises_and_keeps_the_table_stale(monkeypatch):
+    async def fake_exec(*cmd, stdout, stderr, **kwargs):
+        return FakeProcess(stdout="<error><message>oned down</message></error>")
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_exec)
+    table = events.VmStateTable()
+    subscriber = events.VmStateSubscriber("tcp://127.0.0.1:1", table)
+
+    with pytest.raises(RuntimeError):
+        subscriber._resync()
+    assert not table.synced
+    assert not subscriber.wait_connected(0)
+
+
+def test_seed_keeps_only_state_fields():
+    table = events.VmStateTable()
+    assert not table.covers(["STATE"])
+
+    assert table.load_pool(POOL_XML)
+
+    assert table.covers(["ID", "STATE", "LCM_STATE"])
+    assert not table.covers(["TEMPLATE/NIC/IP"])
+    assert [child.tag for child in table.get("1")] == list(events.STATE_FIELDS)
+    assert table.get("9") is None
+
+
+def test_failed_seed_leaves_table_unsynced():
+    table = events.VmStateTable()
+    assert not table.load_pool("<error><message>oned down</message></error>")
+    assert not table.synced
+
+
+def test_malformed_and_foreign_events_are_ignored():
+    table = events.VmStateTable()
+    table.load_pool(POOL_XML)
+
+    assert not table.apply_event([b"EVENT API one.vm.allocate 1", b""])
+    assert not table.apply_event([b"EVENT STATE VM/ACTIVE/RUNNING", b"%%%"])
+    assert not table.apply_event(
+        [b"EVENT STATE VM/ACTIVE/RUNNING", base64.b64encode(b"<HOOK_MESSAGE/>")]
+    )
+    assert table.events == 0
+    assert _states(table) == {"1": ("3", "3"), "2": ("8", "0")}
+
+
+def test_returned_elements_are_copies():
+    table = events.VmStateTable()
+    table.load_pool(POOL_XML)
+
+    table.get("1").find("STATE").text = "99"
+    table.elements()[0].find("STATE").text = "99"
+
+    assert table.get("1").findtext("STATE") == "3"
+
+
+def test_configure_vm_events_disabled_without_endpoint(monkeypatch):
+    monkeypatch.delenv("ONE_MCP_EVENTS_ENDPOINT", raising=False)
+    assert events.configure_vm_events() is None
+    assert not events.vm_states.synced
+
+
+def test_configure_vm_events_rejects_invalid_interval():
+    with pytest.raises(ValueError):
+        events.configure_vm_events(resync_interval=0)
@@ -0,0 +1,67 @@
+"""Unit tests for src.tools.utils.formats."""
+
+import json
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from src.tools.utils.formats import PoolRenderer, check_output_format, convert_xml
+
+POOL = (
+    "<VM_POOL>"
+    "<VM><ID>1</ID><NAME>a,b</NAME><TEMPLATE><NIC><IP>10.0.0.1</IP></NIC><NIC><IP>10.0.0.2</IP></NIC></TEMPLATE></VM>"
+    "<VM><ID>2</ID><NAME>c</NAME><TEMPLATE><NIC><IP>10.0.0.3</IP></NIC></TEMPLATE><USER_TEMPLATE/></VM>"
+    "</VM_POOL>"
+)
+
+
+def test_json_pool():
+    data = json.loads(convert_xml(POOL, "json"))
+    vms = data["VM_POOL"]["VM"]
+    assert [vm["ID"] for vm in vms] == ["1", "2"]
+    assert vms[0]["TEMPLATE"]["NIC"] == [{"IP": "10.0.0.1"}, {"IP": "10.0.0.2"}]
+    assert vms[1]["TEMPLATE"]["NIC"] == {"IP": "10.0.0.3"}
+    assert vms[1]["USER_TEMPLATE"] == ""
+
+
+@pytest.mark.parametrize("xml_str", ["<VM_POOL/>", "<VM_POOL><VM><ID>1</ID></VM></VM_POOL>"])
+def test_json_pool_resources_are_always_a_list(xml_str):
+    assert isinstance(json.loads(convert_xml(xml_str, "json"))["VM_POOL"]["VM"], list)
+
+
+def test_json_is_compact():
+    assert " " not in convert_xml(POOL, "json")
+
+
+def test_csv_pool():
+    assert convert_xml(POOL, "csv") == (
+        "ID,NAME,TEMPLATE/NIC/IP,USER_TEMPLATE\n"
+        '1,"a,b",10.0.0.1;10.0.0.2,\n'
+        "2,c,10.0.0.3,\n"
+    )
+
+
+def test_csv_single_resource():
+    assert convert_xml("<VM><ID>7</ID><STATE>3</STATE></VM>", "csv") == "ID,STATE\n7,3\n"
+
+
+@pytest.mark.parametrize("output_format", ["json", "csv", "xml"])
+def test_errors_are_returned_unchanged(output_format):
+    error = "<error><message>boom</message></error>"
+    assert convert_xml(error, output_format) == error
+
+
+def test_pool_renderer_attributes():
+    for output_format, expected in [
+        ("xml", '<VM_POOL NEXT_CURSOR="5"><VM><ID>1</ID></VM></VM_POOL>'),
+        ("json", '{"VM_POOL":{"@NEXT_CURSOR":"5","VM":[{"ID":"1"}]}}'),
+        ("csv", "# NEXT_CURSOR: 5\nID\n1\n"),
+    ]:
+        renderer = PoolRenderer("VM_POOL", output_format)
+        renderer.add(ET.fromstring("<VM><ID>1</ID></VM>"))
+        assert renderer.render({"NEXT_CURSOR": "5"}) == expected
+
+
+def test_check_output_format():
+    assert check_output_format("json") is None
+    assert check_output_format("yaml").startswith("<error>")
@@ -14,11 +14,30 @@
 
 """Minimal logging tests focusing on core functionality (unit)."""
 
+import asyncio
+import io
+import json
 import logging
+import logging.handlers
+import threading
 from pathlib import Path
 import pytest
 
-from src.logging_config import setup_logging, reset_logging_config
+from src import logging_config
+from src.logging_config import (
+    configure_slow_call_log,
+    dropped_log_records,
+    flush_logging,
+    log_slow_call,
+    reset_logging_config,
+    sanitize_args,
+    sanitize_command,
+    setup_logging,
+)
+from src.tests.unit.conftest import DummyMCP, FakeProcess
+from src.tools.utils import base as base_utils
+from src.tools.utils.cache import pool_cache
+from src.tools.utils.metrics import InstrumentedMCP, metrics
 
 
 def cleanup_logs():
@@ -30,6 +49,13 @@ def cleanup_logs():
         shutil.rmtree(test_log_dir)
 
 
+def written_handlers():
+    """Return the handlers the queued records of the opennebula_mcp logger are written to."""
+    (queue_handler,) = logging.getLogger("opennebula_mcp").handlers
+    (listener,) = [l for l in logging_config._listeners if l.queue_handler is queue_handler]
+    return listener.handlers
+
+
 @pytest.fixture(autouse=True)
 def reset_logging_state():
     """Reset logging before and after each test."""
@@ -46,7 +72,7 @@ def test_basic_setup():
     logger = logging.getLogger("opennebula_mcp")
 
     assert logger.level == logging.INFO
-    assert len(logger.handlers) == 2  # Console + file (default)
+    assert len(written_handlers()) == 2  # Console + file (default)
     assert not logger.propagate
 
 
@@ -54,14 +80,14 @@ def test_file_logging_toggle():
     """Test file logging enable/disable."""
     # Test enabled (default behavior now)
     setup_logging(enable_file_logging=True, log_subdirectory="tests")
-    assert len(logging.getLogger("opennebula_mcp").handlers) == 2  # Console + file
+    assert len(written_handlers()) == 2  # Console + file
     assert Path("log/tests").exists()
 
     reset_logging_config()
 
     # Test disabled (explicit --no-log-file)
     setup_logging(enable_file_logging=False, log_subdirectory="tests")
-    assert len(logging.getLogger("opennebula_mcp").handlers) == 1  # Console only
+    assert len(written_handlers()) == 1  # Console only
 
 
 def test_log_levels():
@@ -81,6 +107,7 @@ def test_file_content():
 
     logger = logging.getLogger("opennebula_mcp.test")
     logger.info("Test message")
+    flush_logging()
 
     # Find log file and verify content
     log_files = list(Path("log/tests").glob("*.log"))
@@ -89,3 +116,208 @@ def test_file_content():
     content = log_files[0].read_text()
     assert "Test message" in content
     assert "opennebula_mcp.test" in content
+
+
+# Slow-call log
+
+
+@pytest.fixture
+def slow_log(tmp_path, monkeypatch):
+    """Log calls over 5 ms to a dedicated file; return a reader of its records."""
+    monkeypatch.delenv("ONE_MCP_SLOW_CALL_THRESHOLD", raising=False)
+    monkeypatch.delenv("ONE_MCP_SLOW_CALL_LOG", raising=False)
+    path = tmp_path / "slow.jsonl"
+    configure_slow_call_log(threshold=0.005, log_file=str(path))
+
+    def records():
+        flush_logging()
+        return [json.loads(line) for line in path.read_text().splitlines()] if path.exists() else []
+
+    yield records
+    configure_slow_call_log()
+
+
+def test_sanitize_args_and_command():
+    args = sanitize_args(
+        {"name": "alice", "password": "hunter2", "api_token": "t", "count": 3, "template": 'A=1, PASSWORD="x y"'}
+    )
+    assert args == {
+        "name": "alice",
+        "password": "***",
+        "api_token": "***",
+        "count": 3,
+        "template": "A=1, PASSWORD=***",
+    }
+    assert sanitize_args({"template": "x" * 500})["template"].endswith("... (500 chars)")
+
+    assert sanitize_command(["oneuser", "create", "alice", "hunter2"]) == "oneuser create alice ***"
+    assert sanitize_command(["onevm", "list", "--password", "p", "--xml"]) == "onevm list --password *** --xml"
+    assert sanitize_command(["onevm", "show", "3", "--xml"]) == "onevm show 3 --xml"
+
+
+def test_only_calls_over_the_threshold_are_logged(slow_log):
+    assert not log_slow_call("tool", "list_vms", 0.001)
+    assert log_slow_call("tool", "list_vms", 0.2, args={"secret": "s"}, output_bytes=10)
+
+    configure_slow_call_log(threshold=0)
+    assert not log_slow_call("tool", "list_vms", 100)
+
+    (record,) = slow_log()
+    assert record["kind"] == "tool" and record["tool"] == "list_vms"
+    assert record["duration_ms"] == 200
+    assert record["args"] == {"secret": "***"}
+    assert record["output_bytes"] == 10
+
+
+def test_slow_tool_and_command_records(slow_log, monkeypatch):
+    async def fake_exec(*cmd, stdout, stderr, **kwargs):
+        await asyncio.sleep(0.01)
+        return FakeProcess(stdout="<USER_POOL/>")
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_exec)
+    monkeypatch.setattr(pool_cache, "enabled", False)
+    # The slow-call log does not depend on metrics
+    monkeypatch.setattr(metrics, "enabled", False)
+    mcp = DummyMCP()
+
+    @InstrumentedMCP(mcp).tool(name="create_user", description="")
+    async def create_user(name: str, password: str):
+        return await base_utils.execute_one_command(["oneuser", "create", name, password])
+
+    asyncio.run(mcp.tools["create_user"].__wrapped__("alice", password="hunter2"))
+
+    command, tool = slow_log()
+    assert command["kind"] == "command" and command["tool"] == "create_user"
+    assert command["command"] == "oneuser create alice ***"
+    assert set(command["breakdown_ms"]) == {"slot_wait", "run"}
+    assert command["output_bytes"] == len("<USER_POOL/>")
+    assert tool["kind"] == "tool" and tool["name"] == "create_user"
+    assert tool["args"] == {"name": "alice", "password": "***"}
+    assert tool["breakdown_ms"]["subprocess"] >= 10
+    assert tool["error"] is False
+
+
+def test_slow_call_threshold_from_env(monkeypatch):
+    monkeypatch.setenv("ONE_MCP_SLOW_CALL_THRESHOLD", "0")
+    configure_slow_call_log()
+    assert not log_slow_call("tool", "list_vms", 100)
+
+    with pytest.raises(ValueError):
+        configure_slow_call_log(threshold=-1)
+
+    monkeypatch.delenv("ONE_MCP_SLOW_CALL_THRESHOLD")
+    configure_slow_call_log()
+
+
+# Queued logging
+
+
+def test_records_are_written_by_a_background_thread():
+    setup_logging(enable_file_logging=False, queue_size=10)
+    (listener,) = logging_config._listeners
+    written = []
+
+    class Capture(logging.Handler):
+        def emit(self, record):
+            written.append((record.getMessage(), threading.current_thread()))
+
+    listener.handlers = (Capture(),)
+    logging.getLogger("opennebula_mcp.test").info("Queued %s", "message")
+    flush_logging()
+
+    assert isinstance(logging.getLogger("opennebula_mcp").handlers[0], logging.handlers.QueueHandler)
+    assert written == [("Queued message", listener._thread)]
+
+
+def test_full_queue_drops_and_counts_records():
+    setup_logging(enable_file_logging=False, queue_size=2)
+    # Stop the writer so that nothing leaves the queue
+    (listener,) = logging_config._listeners
+    listener.queue.put(listener._sentinel)
+    listener._thread.join()
+    listener._thread = None
+
+    logger = logging.getLogger("opennebula_mcp.test")
+    for i in range(3):
+        logger.info("info %d", i)
+    logger.error("error")
+
+    assert dropped_log_records() == {"INFO": 1, "ERROR": 1}
+
+
+def test_queue_can_be_disabled():
+    setup_logging(enable_file_logging=False, queue_size=0)
+    (handler,) = logging.getLogger("opennebula_mcp").handlers
+    assert isinstance(handler, logging.StreamHandler)
+    assert logging_config._listeners == []
+
+    reset_logging_config()
+    with pytest.raises(ValueError):
+        setup_logging(enable_file_logging=False, queue_size=-1)
+
+
+# JSON log format
+
+
+def _json_console(queue_size, **kwargs):
+    """Set up JSON logging to a string buffer; return a reader of the records."""
+    setup_logging(enable_file_logging=False, log_format="json", queue_size=queue_size, **kwargs)
+    stream = io.StringIO()
+    (console,) = written_handlers() if queue_size else logging.getLogger("opennebula_mcp").handlers
+    console.setStream(stream)
+
+    def records():
+        flush_logging()
+        return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    return records
+
+
+@pytest.mark.parametrize("queue_size", [0, 10])
+def test_json_records_carry_the_call_context(queue_size):
+    records = _json_console(queue_size)
+    logger = logging.getLogger("opennebula_mcp.test")
+
+    logger.info("outside %s", "calls")
+    token = logging_config.start_call("get_vm_status", vm_id="4,5")
+    try:
+        logger.info("Fetched VM %s", 4, extra={"duration_ms": 12.5})
+        try:
+            raise RuntimeError("boom")
+        except RuntimeError:
+            logger.exception("Failed")
+    finally:
+        logging_config.end_call(token)
+
+    outside, fetched, failed = records()
+    assert outside["message"] == "outside calls" and "correlation_id" not in outside
+    assert fetched["message"] == "Fetched VM 4"
+    assert fetched["level"] == "INFO" and fetched["logger"] == "opennebula_mcp.test"
+    assert (fetched["tool"], fetched["vm_id"], fetched["duration_ms"]) == ("get_vm_status", "4,5", 12.5)
+    assert len(fetched["correlation_id"]) == 32
+    assert failed["correlation_id"] == fetched["correlation_id"]
+    assert "RuntimeError: boom" in failed["exception"]
+
+
+def test_tool_calls_get_their_own_correlation_id():
+    records = _json_console(0, level="DEBUG")
+    mcp = DummyMCP()
+
+    @InstrumentedMCP(mcp).tool(name="get_vm_status", description="")
+    async def get_vm_status(vm_id: str):
+        logging.getLogger("opennebula_mcp.test").debug("Getting VM %s", vm_id)
+        return "<VM/>"
+
+    asyncio.run(mcp.tools["get_vm_status"].__wrapped__("7"))
+    asyncio.run(mcp.tools["get_vm_status"].__wrapped__(vm_id="8"))
+
+    first, first_done, second, second_done = records()
+    assert first["vm_id"] == "7" and second["vm_id"] == "8"
+    assert first["correlation_id"] == first_done["correlation_id"] != second["correlation_id"]
+    assert first_done["message"].startswith("Tool get_vm_status completed in")
+    assert first_done["output_bytes"] == len("<VM/>") and first_done["duration_ms"] >= 0
+
+
+def test_invalid_log_format():
+    with pytest.raises(ValueError):
+        setup_logging(enable_file_logging=False, log_format="xml")
@@ -0,0 +1,151 @@
+"""Unit tests for src.tools.utils.metrics."""
+
+import asyncio
+import math
+import time
+
+import pytest
+
+from src.tools.utils import base as base_utils
+from src.tools.utils import metrics as metrics_module
+from src.tools.utils.cache import pool_cache
+from src.tools.utils.metrics import Histogram, InstrumentedMCP, metrics
+from src.tools.utils.xml_stream import iter_pool_elements
+from src.tests.unit.conftest import DummyMCP, FakeProcess
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    metrics.clear()
+    pool_cache.enabled = False
+    yield
+    pool_cache.enabled = True
+    metrics.enabled = True
+    metrics.clear()
+
+
+@pytest.fixture
+def fake_cli(monkeypatch):
+    async def fake_exec(*cmd, stdout, stderr, **kwargs):
+        if cmd[1] == "fail":
+            return FakeProcess(stderr="boom", returncode=1)
+        return FakeProcess(stdout="<VM_POOL><VM><ID>1</ID></VM><VM><ID>2</ID></VM></VM_POOL>")
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_exec)
+
+
+def _series(name):
+    return metrics._families[name].series
+
+
+def test_histogram_buckets_and_quantiles():
+    histogram = Histogram((1, 2, 4))
+    for value in (0.5, 1.5, 1.5, 3, 10):
+        histogram.observe(value)
+
+    assert histogram.counts == [1, 2, 1, 1]
+    assert (histogram.count, histogram.sum) == (5, 16.5)
+    assert histogram.quantile(0.5) == pytest.approx(1.75)
+    # Beyond the last bucket the last bound is reported
+    assert histogram.quantile(1.0) == 4
+    assert math.isnan(Histogram((1,)).quantile(0.5))
+
+
+def test_tool_calls_record_duration_stages_and_errors(fake_cli):
+    mcp = DummyMCP()
+    server = InstrumentedMCP(mcp)
+
+    @server.tool(name="list_things", description="")
+    async def list_things(fail: bool = False):
+        output = await base_utils.execute_one_command(["onevm", "fail" if fail else "list", "--xml"])
+        await asyncio.sleep(0.01)
+        return output
+
+    asyncio.run(mcp.tools["list_things"].__wrapped__())
+    asyncio.run(mcp.tools["list_things"].__wrapped__(fail=True))
+
+    duration = _series("one_mcp_tool_duration_seconds")["list_things"]
+    subprocess = _series("one_mcp_tool_subprocess_seconds")["list_things"]
+    assert duration.count == 2
+    assert duration.sum >= 0.02
+    assert subprocess.sum < duration.sum
+    assert _series("one_mcp_tool_errors") == {"list_things": 1}
+    assert _series("one_mcp_tool_output_bytes")["list_things"].count == 2
+
+    assert _series("one_mcp_command_duration_seconds")["onevm"].count == 2
+    assert _series("one_mcp_command_subprocess_seconds")["onevm"].count == 2
+    assert _series("one_mcp_command_errors") == {"onevm": 1}
+
+
+def test_raising_tool_is_an_error():
+    mcp = DummyMCP()
+
+    @InstrumentedMCP(mcp).tool(name="broken", description="")
+    async def broken():
+        raise RuntimeError("bug")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(mcp.tools["broken"].__wrapped__())
+    assert _series("one_mcp_tool_errors") == {"broken": 1}
+
+
+@pytest.mark.asyncio
+async def test_streamed_command_and_parse_time_are_recorded(fake_cli):
+    stages = {}
+    token = metrics_module._call_stages.set(stages)
+    try:
+        chunks = base_utils.stream_one_command(["onevm", "list", "--xml"], chunk_size=8)
+        ids = [vm.findtext("ID") async for vm in iter_pool_elements(chunks, "VM")]
+    finally:
+        metrics_module._call_stages.reset(token)
+
+    assert ids == ["1", "2"]
+    assert set(stages) == {"subprocess", "parse"}
+    assert _series("one_mcp_command_output_bytes")["onevm"].sum == 57
+    assert _series("one_mcp_command_errors") == {}
+
+
+def test_disabled_metrics_record_nothing(fake_cli):
+    metrics.enabled = False
+    asyncio.run(base_utils.execute_one_command(["onevm", "list", "--xml"]))
+    assert _series("one_mcp_command_duration_seconds") == {}
+
+
+def test_openmetrics_exposition():
+    metrics.observe("one_mcp_tool_duration_seconds", "list_vms", 0.02)
+    metrics.observe("one_mcp_tool_duration_seconds", "list_vms", 7)
+    metrics.inc("one_mcp_command_errors", 'one"vm')
+
+    text = metrics.to_openmetrics()
+
+    assert "# TYPE one_mcp_tool_duration_seconds histogram" in text
+    assert 'one_mcp_tool_duration_seconds_bucket{tool="list_vms",le="0.01"} 0' in text
+    assert 'one_mcp_tool_duration_seconds_bucket{tool="list_vms",le="0.025"} 1' in text
+    assert 'one_mcp_tool_duration_seconds_bucket{tool="list_vms",le="+Inf"} 2' in text
+    assert 'one_mcp_tool_duration_seconds_count{tool="list_vms"} 2' in text
+    assert 'one_mcp_tool_duration_seconds_sum{tool="list_vms"} 7.02' in text
+    assert 'one_mcp_command_errors_total{binary="one\\"vm"} 1' in text
+    assert text.endswith("# EOF\n")
+
+
+def test_metrics_are_dumped_to_a_file(tmp_path):
+    path = tmp_path / "one_mcp.prom"
+    try:
+        dumper = metrics_module.configure_metrics(dump_path=str(path), dump_interval=30)
+        for _ in range(100):
+            if path.exists():
+                break
+            time.sleep(0.01)
+        metrics.observe("one_mcp_tool_duration_seconds", "list_vms", 0.5)
+        # stop() writes the final figures
+        dumper.stop()
+    finally:
+        metrics_module.configure_metrics()
+
+    assert 'one_mcp_tool_duration_seconds_count{tool="list_vms"} 1' in path.read_text()
+    assert not (tmp_path / "one_mcp.prom.tmp").exists()
+
+
+def test_configure_metrics_rejects_invalid_interval():
+    with pytest.raises(ValueError):
+        metrics_module.configure_metrics(dump_interval=0)
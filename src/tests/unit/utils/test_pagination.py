@@ -0,0 +1,103 @@
+"""Unit tests for src.tools.utils.pagination."""
+
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from src.tools.utils import pagination
+
+POOL = "<IMAGE_POOL>" + "".join(
+    f"<IMAGE><ID>{i}</ID><STATE>{i % 2}</STATE></IMAGE>" for i in range(7)
+) + "</IMAGE_POOL>"
+
+
+@pytest.fixture
+def stream_calls(monkeypatch):
+    calls = []
+
+    async def fake_stream(command_parts, *a, **k):
+        calls.append(k)
+        for offset in range(0, len(POOL), 5):
+            yield POOL[offset : offset + 5].encode()
+
+    monkeypatch.setattr(pagination, "stream_one_command", fake_stream)
+    return calls
+
+
+def _page(xml_str):
+    root = ET.fromstring(xml_str)
+    return [e.findtext("ID") for e in root], root.get("NEXT_CURSOR")
+
+
+@pytest.mark.asyncio
+async def test_walk_pages_with_cursor(stream_calls):
+    pages, cursor = [], None
+    while True:
+        ids, cursor = _page(
+            await pagination.list_pool_page(["oneimage", "list", "--xml"], limit=3, cursor=cursor)
+        )
+        pages.append(ids)
+        if cursor is None:
+            break
+
+    assert pages == [["0", "1", "2"], ["3", "4", "5"], ["6"]]
+    # The CLI backend cannot slice pools, so nothing is pushed down
+    assert all(call["pool_range"] is None for call in stream_calls)
+
+
+@pytest.mark.asyncio
+async def test_full_page_closes_stream(monkeypatch):
+    closed = []
+
+    async def fake_stream(command_parts, *a, **k):
+        try:
+            for offset in range(0, len(POOL), 5):
+                yield POOL[offset : offset + 5].encode()
+        finally:
+            closed.append(True)
+
+    monkeypatch.setattr(pagination, "stream_one_command", fake_stream)
+    await pagination.list_pool_page(["oneimage", "list", "--xml"], limit=2)
+    # The command is stopped as soon as the page is full, not on garbage collection
+    assert closed == [True]
+
+
+@pytest.mark.asyncio
+async def test_exact_last_page_has_no_cursor(stream_calls):
+    ids, cursor = _page(
+        await pagination.list_pool_page(["oneimage", "list", "--xml"], limit=7)
+    )
+    assert len(ids) == 7
+    assert cursor is None
+
+
+@pytest.mark.asyncio
+async def test_cursor_counts_matching_elements(stream_calls):
+    def odd(image):
+        return image.findtext("STATE") == "1"
+
+    first = await pagination.list_pool_page(["oneimage", "list", "--xml"], limit=2, match=odd)
+    ids, cursor = _page(first)
+    assert (ids, cursor) == (["1", "3"], "2")
+
+    ids, cursor = _page(
+        await pagination.list_pool_page(["oneimage", "list", "--xml"], limit=2, cursor=cursor, match=odd)
+    )
+    assert (ids, cursor) == (["5"], None)
+
+
+@pytest.mark.asyncio
+async def test_cursor_without_limit_uses_default_page_size(stream_calls, monkeypatch):
+    monkeypatch.setattr(pagination, "DEFAULT_PAGE_SIZE", 4)
+    ids, cursor = _page(
+        await pagination.list_pool_page(["oneimage", "list", "--xml"], cursor="1")
+    )
+    assert (ids, cursor) == (["1", "2", "3", "4"], "5")
+
+
+@pytest.mark.parametrize(
+    "limit, cursor, valid",
+    [(None, None, True), ("10", "20", True), ("0", None, False), ("-1", None, False), ("5", "abc", False)],
+)
+def test_parse_page_args(limit, cursor, valid):
+    assert (pagination.parse_page_args(limit, cursor) is None) is valid
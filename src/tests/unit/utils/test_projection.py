@@ -0,0 +1,50 @@
+"""Unit tests for src.tools.utils.projection."""
+
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from src.tools.utils.projection import parse_fields, project
+
+VM = ET.fromstring(
+    "<VM><ID>1</ID><NAME>a</NAME>"
+    "<TEMPLATE><NIC><IP>10.0.0.1</IP><MAC>m1</MAC></NIC><NIC><IP>10.0.0.2</IP></NIC><CPU>1</CPU></TEMPLATE>"
+    "<HISTORY_RECORDS><HISTORY><HID>0</HID></HISTORY><HISTORY><HID>5</HID></HISTORY></HISTORY_RECORDS></VM>"
+)
+
+
+def _project(fields):
+    return ET.tostring(project(VM, parse_fields(fields)), encoding="unicode")
+
+
+def test_nested_paths_keep_structure():
+    assert _project("ID,TEMPLATE/NIC/IP") == (
+        "<VM><ID>1</ID><TEMPLATE><NIC><IP>10.0.0.1</IP></NIC><NIC><IP>10.0.0.2</IP></NIC></TEMPLATE></VM>"
+    )
+
+
+def test_positional_step():
+    assert _project("HISTORY_RECORDS/HISTORY[last()]/HID") == (
+        "<VM><HISTORY_RECORDS><HISTORY><HID>5</HID></HISTORY></HISTORY_RECORDS></VM>"
+    )
+
+
+@pytest.mark.parametrize("fields", ["TEMPLATE/NIC/IP,TEMPLATE", "TEMPLATE,TEMPLATE/NIC/IP"])
+def test_whole_element_wins_over_descendant(fields):
+    expected = ET.tostring(VM.find("TEMPLATE"), encoding="unicode")
+    assert _project(fields) == f"<VM>{expected}</VM>"
+
+
+def test_missing_path_is_skipped():
+    assert _project("ID,NOPE/X") == "<VM><ID>1</ID></VM>"
+
+
+def test_source_is_not_modified():
+    before = ET.tostring(VM)
+    _project("ID,TEMPLATE")
+    assert ET.tostring(VM) == before
+
+
+@pytest.mark.parametrize("fields", ["", " , ", "ID,bad path", "TEMPLATE//NIC", "NIC[@x]"])
+def test_invalid_fields(fields):
+    assert parse_fields(fields).startswith("<error>")
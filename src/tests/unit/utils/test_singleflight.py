@@ -0,0 +1,160 @@
+"""Unit tests for src.tools.utils.singleflight."""
+
+import asyncio
+
+import pytest
+
+from src.tools.utils import base as base_utils
+from src.tools.utils.cache import pool_cache
+from src.tools.utils.singleflight import SingleFlight, single_flight
+from src.tests.unit.conftest import FakeProcess
+
+
+@pytest.fixture
+def slow_exec(monkeypatch):
+    """Fake CLI whose commands take 50 ms; returns the list of spawned commands."""
+    calls = []
+
+    async def fake_exec(*cmd, stdout, stderr, **kwargs):
+        calls.append(cmd)
+        await asyncio.sleep(0.05)
+        return FakeProcess(stdout=f"<out n='{len(calls)}'/>")
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_exec)
+    pool_cache.enabled = False
+    single_flight.clear()
+    yield calls
+    pool_cache.enabled = True
+
+
+@pytest.mark.asyncio
+async def test_identical_reads_share_one_command(slow_exec):
+    results = await asyncio.gather(
+        *(base_utils.execute_one_command(["onevm", "list", "--xml"]) for _ in range(5))
+    )
+
+    assert len(slow_exec) == 1
+    assert results == ["<out n='1'/>"] * 5
+    assert single_flight.stats() == {"vm": {"executed": 1, "coalesced": 4}}
+    assert single_flight.in_flight() == 0
+
+
+@pytest.mark.asyncio
+async def test_different_reads_and_writes_are_not_shared(slow_exec):
+    await asyncio.gather(
+        base_utils.execute_one_command(["onevm", "list", "--xml"]),
+        base_utils.execute_one_command(["onehost", "list", "--xml"]),
+        base_utils.execute_one_command(["onevm", "terminate", "1"]),
+        base_utils.execute_one_command(["onevm", "terminate", "1"]),
+    )
+
+    assert len(slow_exec) == 4
+
+
+@pytest.mark.asyncio
+async def test_read_after_write_does_not_join_earlier_read(slow_exec):
+    first = asyncio.ensure_future(base_utils.execute_one_command(["onevm", "list", "--xml"]))
+    await asyncio.sleep(0.01)  # the first read is running
+    pool_cache.invalidate("vm")  # what any onevm write does before running
+    await asyncio.gather(first, base_utils.execute_one_command(["onevm", "list", "--xml"]))
+
+    assert len(slow_exec) == 2
+
+
+@pytest.mark.asyncio
+async def test_sequential_reads_run_again(slow_exec):
+    await base_utils.execute_one_command(["onevm", "show", "1", "--xml"])
+    await base_utils.execute_one_command(["onevm", "show", "1", "--xml"])
+
+    assert len(slow_exec) == 2
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared(monkeypatch):
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("oned unreachable")
+
+    flight = SingleFlight()
+    results = await asyncio.gather(
+        *(flight.run(["onehost", "list"], failing) for _ in range(3)), return_exceptions=True
+    )
+
+    assert len(calls) == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_the_others():
+    started = asyncio.Event()
+
+    async def execute():
+        started.set()
+        await asyncio.sleep(0.05)
+        return "pool"
+
+    flight = SingleFlight()
+    first = asyncio.ensure_future(flight.run(["onevm", "list"], execute))
+    second = asyncio.ensure_future(flight.run(["onevm", "list"], execute))
+    await started.wait()
+    first.cancel()
+
+    assert await second == "pool"
+    assert first.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_command_is_cancelled_when_every_caller_gives_up():
+    cancelled = asyncio.Event()
+
+    async def execute():
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    flight = SingleFlight()
+    callers = [asyncio.ensure_future(flight.run(["onevm", "list"], execute)) for _ in range(2)]
+    await asyncio.sleep(0)
+    for caller in callers:
+        caller.cancel()
+
+    await asyncio.wait_for(cancelled.wait(), 1)
+    assert flight.in_flight() == 0
+
+
+@pytest.mark.asyncio
+async def test_call_right_after_the_last_caller_gives_up_runs_again():
+    runs = []
+
+    async def execute():
+        runs.append(len(runs))
+        await asyncio.sleep(0.05)
+        return f"pool {len(runs)}"
+
+    flight = SingleFlight()
+    first = asyncio.ensure_future(flight.run(["onevm", "list"], execute))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    # The cancelled command has not finished yet; this call must not join it
+    assert first.cancelled()
+    assert await flight.run(["onevm", "list"], execute) == "pool 2"
+    assert flight.in_flight() == 0
+
+
+@pytest.mark.asyncio
+async def test_disabled_runs_every_call(slow_exec):
+    single_flight.enabled = False
+    try:
+        await asyncio.gather(
+            *(base_utils.execute_one_command(["onevm", "list", "--xml"]) for _ in range(3))
+        )
+    finally:
+        single_flight.enabled = True
+
+    assert len(slow_exec) == 3
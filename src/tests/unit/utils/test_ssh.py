@@ -0,0 +1,101 @@
+"""Unit tests for src.tools.utils.ssh."""
+
+import asyncio
+
+import pytest
+
+from src.tools.utils import ssh
+from src.tests.unit.conftest import FakeProcess
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """Session pool recording the ``ssh -O`` control commands it runs."""
+    control_commands = []
+
+    async def fake_exec(*cmd, stdout, stderr, **kwargs):
+        control_commands.append(cmd)
+        return FakeProcess()
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_exec)
+    sessions = ssh.SshSessionPool(max_sessions=2, idle_timeout=60)
+    sessions.control_commands = control_commands
+    yield sessions
+    sessions.close()
+
+
+@pytest.mark.asyncio
+async def test_multiplex_adds_control_master_options(pool):
+    parts = await pool.multiplex(["ssh", "root@10.0.0.1", "uptime"])
+
+    assert parts[0] == "ssh"
+    assert parts[-2:] == ["root@10.0.0.1", "uptime"]
+    assert f"ControlPath={pool.control_dir}/%C" in parts
+    assert "ControlMaster=auto" in parts
+    assert "ControlPersist=60" in parts
+
+
+@pytest.mark.asyncio
+async def test_disabled_pool_leaves_command_unchanged(pool):
+    pool.enabled = False
+    assert await pool.multiplex(["ssh", "root@10.0.0.1", "uptime"]) == ["ssh", "root@10.0.0.1", "uptime"]
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_session_is_stopped_over_cap(pool):
+    await pool.multiplex(["ssh", "root@10.0.0.1", "a"])
+    await pool.multiplex(["ssh", "root@10.0.0.2", "b"])
+    await pool.multiplex(["ssh", "root@10.0.0.1", "c"])  # .2 is now the LRU
+    assert pool.control_commands == []
+
+    await pool.multiplex(["ssh", "root@10.0.0.3", "d"])
+
+    assert len(pool.control_commands) == 1
+    stop = pool.control_commands[0]
+    assert stop[-3:] == ("-O", "stop", "root@10.0.0.2")
+    assert (pool.opened, pool.evicted) == (3, 1)
+
+
+@pytest.mark.asyncio
+async def test_idle_sessions_are_forgotten_without_stopping(pool, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(ssh.time, "monotonic", lambda: clock[0])
+
+    await pool.multiplex(["ssh", "root@10.0.0.1", "a"])
+    await pool.multiplex(["ssh", "root@10.0.0.2", "b"])
+    clock[0] += 61  # both masters have exited through ControlPersist
+    await pool.multiplex(["ssh", "root@10.0.0.3", "c"])
+
+    assert pool.control_commands == []
+    assert pool.evicted == 0
+
+
+def test_configure_ssh_rejects_invalid_limits():
+    with pytest.raises(ValueError):
+        ssh.configure_ssh(max_sessions=0)
+    with pytest.raises(ValueError):
+        ssh.configure_ssh(idle_timeout=-1)
+
+
+def test_configure_ssh_reads_environment(monkeypatch):
+    monkeypatch.setenv("ONE_MCP_SSH_MAX_SESSIONS", "4")
+    monkeypatch.setenv("ONE_MCP_SSH_IDLE_TIMEOUT", "30")
+    ssh.configure_ssh()
+    try:
+        assert ssh.ssh_sessions.max_sessions == 4
+        assert ssh.ssh_sessions.idle_timeout == 30
+    finally:
+        ssh.configure_ssh(max_sessions=ssh.DEFAULT_MAX_SESSIONS, idle_timeout=ssh.DEFAULT_IDLE_TIMEOUT)
+
+
+@pytest.mark.asyncio
+async def test_existing_session_is_reused_without_opening_new_ones(pool):
+    await pool.multiplex(["ssh", "root@10.0.0.1", "a"])
+
+    reused = await pool.multiplex(["ssh", "root@10.0.0.1", "b"], open_session=False)
+    direct = await pool.multiplex(["ssh", "root@10.0.0.2", "c"], open_session=False)
+
+    assert "ControlMaster=auto" in reused
+    assert "ControlMaster=auto" not in direct
+    assert f"ControlPath={pool.control_dir}/%C" in direct
+    assert pool.opened == 1
@@ -0,0 +1,137 @@
+"""Unit tests for src.tools.utils.tracing."""
+
+import asyncio
+import json
+
+import pytest
+
+from src.logging_config import current_call
+from src.tools.utils import tracing
+from src.tools.utils.base import execute_one_command, stream_one_command
+from src.tools.utils.cache import pool_cache
+from src.tools.utils.metrics import InstrumentedMCP
+from src.tools.utils.pagination import list_pool_page
+from src.tests.unit.conftest import DummyMCP, FakeProcess
+
+POOL_XML = "<VM_POOL>" + "".join(f"<VM><ID>{i}</ID><STATE>3</STATE></VM>" for i in range(50)) + "</VM_POOL>"
+
+
+@pytest.fixture
+def trace_file(tmp_path, monkeypatch):
+    async def fake_exec(*cmd, stdout, stderr, **kwargs):
+        if cmd[1] == "fail":
+            return FakeProcess(stderr="boom", returncode=1)
+        return FakeProcess(stdout=POOL_XML)
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_exec)
+    path = tmp_path / "trace.jsonl"
+    tracing.configure_tracing(str(path))
+    yield path
+    tracing.configure_tracing()
+
+
+def _spans(path):
+    # Closing the exporter writes every queued span
+    tracing.tracer.exporter.close()
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def _tool(name, fn):
+    mcp = DummyMCP()
+    InstrumentedMCP(mcp).tool(name=name, description="")(fn)
+    return mcp.tools[name].__wrapped__
+
+
+def test_tool_call_is_a_trace_of_nested_spans(trace_file):
+    async def list_vms():
+        return await list_pool_page(["onevm", "list", "--xml"], limit=10, output_format="json")
+
+    asyncio.run(_tool("list_vms", list_vms)())
+    spans = {span["name"]: span for span in _spans(trace_file)}
+
+    assert set(spans) == {"tool", "command", "parse", "serialise"}
+    tool = spans["tool"]
+    assert tool["parent_id"] is None
+    assert tool["attributes"]["tool"] == "list_vms"
+    assert len({span["trace_id"] for span in spans.values()}) == 1
+    # Streamed command and the aggregated stages hang off the tool span
+    assert all(spans[name]["parent_id"] == tool["span_id"] for name in ("command", "parse", "serialise"))
+    assert spans["command"]["attributes"]["streamed"] is True
+    assert spans["parse"]["attributes"]["aggregated"] is True
+    assert spans["serialise"]["attributes"]["count"] == 11  # 10 elements and the page
+    assert spans["parse"]["duration_ms"] <= tool["duration_ms"]
+
+
+def test_executed_commands_have_subprocess_children(trace_file):
+    pool_cache.enabled = True
+
+    async def get_pools():
+        await execute_one_command(["onevm", "list", "--xml"])
+        await execute_one_command(["onevm", "list", "--xml"])
+        return await execute_one_command(["onevm", "fail"])
+
+    out = asyncio.run(_tool("get_pools", get_pools)())
+    spans = _spans(trace_file)
+    commands = [span for span in spans if span["name"] == "command"]
+    subprocesses = [span for span in spans if span["name"] == "subprocess"]
+
+    assert [c["attributes"].get("cached", False) for c in commands] == [False, True, False]
+    assert commands[2]["status"] == "error"
+    # The cache hit ran nothing
+    assert sorted(s["parent_id"] for s in subprocesses) == sorted([commands[0]["span_id"], commands[2]["span_id"]])
+    tool = next(span for span in spans if span["name"] == "tool")
+    assert tool["status"] == "error" and "<error>" in out
+
+
+def test_command_spans_redact_passwords(trace_file):
+    async def create_user():
+        await execute_one_command(["oneuser", "create", "alice", "hunter2"])
+        chunks = stream_one_command(["onevm", "list", "--password", "hunter2", "--xml"], cache=False)
+        async for _ in chunks:
+            pass
+        return "<ok/>"
+
+    asyncio.run(_tool("create_user", create_user)())
+    commands = [span["attributes"]["command"] for span in _spans(trace_file) if span["name"] == "command"]
+
+    assert commands == ["oneuser create alice ***", "onevm list --password *** --xml"]
+    assert "hunter2" not in trace_file.read_text()
+
+
+def test_each_tool_call_gets_its_own_trace(trace_file):
+    async def noop():
+        return "<ok/>"
+
+    tool = _tool("noop", noop)
+
+    async def calls():
+        await asyncio.gather(tool(), tool())
+
+    asyncio.run(calls())
+    assert len({span["trace_id"] for span in _spans(trace_file)}) == 2
+
+
+def test_trace_id_is_the_correlation_id_of_the_call(trace_file):
+    correlation_ids = []
+
+    async def noop():
+        correlation_ids.append(current_call().correlation_id)
+        return "<ok/>"
+
+    asyncio.run(_tool("noop", noop)())
+    (span,) = _spans(trace_file)
+    assert span["trace_id"] == correlation_ids[0]
+
+
+def test_disabled_tracing_creates_no_spans():
+    tracing.configure_tracing()
+    with tracing.tracer.span("tool") as span:
+        assert span is None
+    assert tracing.tracer.start_span("command") is None
+
+
+def test_full_queue_drops_spans(tmp_path):
+    exporter = tracing.JsonlExporter(str(tmp_path / "trace.jsonl"), max_queue=1)
+    exporter.close()  # no writer left to drain the queue
+    exporter.export([{"name": "span"}] * 5)
+    assert exporter.dropped == 4
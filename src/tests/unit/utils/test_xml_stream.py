@@ -0,0 +1,46 @@
+"""Unit tests for src.tools.utils.xml_stream."""
+
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from src.tools.utils.xml_stream import iter_pool_elements
+
+
+async def _chunked(data: bytes, size: int):
+    for offset in range(0, len(data), size):
+        yield data[offset : offset + size]
+
+
+POOL = (
+    b"<VM_POOL>"
+    b"<VM><ID>1</ID><TEMPLATE><VM><ID>nested</ID></VM></TEMPLATE></VM>"
+    b"<OTHER><ID>x</ID></OTHER>"
+    b"<VM><ID>2</ID></VM>"
+    b"</VM_POOL>"
+)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+async def test_yields_direct_children_only(chunk_size):
+    ids = [vm.findtext("ID") async for vm in iter_pool_elements(_chunked(POOL, chunk_size), "VM")]
+    assert ids == ["1", "2"]
+
+
+@pytest.mark.asyncio
+async def test_elements_are_complete():
+    vms = [ET.tostring(vm, encoding="unicode") async for vm in iter_pool_elements(_chunked(POOL, 5), "VM")]
+    assert vms[0] == "<VM><ID>1</ID><TEMPLATE><VM><ID>nested</ID></VM></TEMPLATE></VM>"
+
+
+@pytest.mark.asyncio
+async def test_empty_pool():
+    assert [vm async for vm in iter_pool_elements(_chunked(b"<VM_POOL/>", 4), "VM")] == []
+
+
+@pytest.mark.asyncio
+async def test_truncated_document_raises():
+    with pytest.raises(ET.ParseError):
+        async for _ in iter_pool_elements(_chunked(b"<VM_POOL><VM><ID>1</ID>", 4), "VM"):
+            pass
@@ -1,6 +1,7 @@
 """Unit tests for vm.execute_command tool."""
 
 from src.tests.unit.conftest import register_tools
+from src.tools.utils import base
 
 MODULE_PATH = "src.tools.vm.vm"
 
@@ -25,4 +26,40 @@ def test_execute_command_write_enabled(monkeypatch):
 def test_execute_command_invalid_ip(monkeypatch):
     execute_command = _tool(monkeypatch)
     out = execute_command("not_an_ip", "echo hi")
-    assert "Invalid IP address" in out 
\ No newline at end of file
+    assert "Invalid IP address" in out 
+
+def test_execute_command_reuses_ssh_session(monkeypatch):
+    execute_command = _tool(monkeypatch)
+    calls = []
+
+    async def fake_execute_one_command(command_parts):
+        calls.append(command_parts)
+        return "up 3 days"
+
+    monkeypatch.setattr(MODULE_PATH + ".execute_one_command", fake_execute_one_command)
+    out = execute_command("192.168.1.1", "uptime")
+
+    assert "ControlMaster=auto" in calls[0]
+    assert calls[0][-2:] == ["root@192.168.1.1", "uptime"]
+    # The reported command stays the plain ssh invocation
+    assert "<command>ssh root@192.168.1.1 uptime</command>" in out
+
+
+def test_execute_command_invalid_timeout(monkeypatch):
+    execute_command = _tool(monkeypatch)
+    for timeout in ("0", "-5", "soon"):
+        out = execute_command("192.168.1.1", "echo hi", timeout=timeout)
+        assert "timeout must be a positive number of seconds" in out
+
+
+def test_execute_command_applies_timeout(monkeypatch):
+    execute_command = _tool(monkeypatch)
+    remaining = []
+
+    async def fake_execute_one_command(command_parts):
+        remaining.append(base.remaining_time())
+        return "done"
+
+    monkeypatch.setattr(MODULE_PATH + ".execute_one_command", fake_execute_one_command)
+    assert "done" in execute_command("192.168.1.1", "make", timeout="5")
+    assert 0 < remaining[0] <= 5
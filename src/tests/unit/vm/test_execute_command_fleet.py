@@ -0,0 +1,132 @@
+"""Unit tests for vm.execute_command_fleet tool."""
+
+import asyncio
+import xml.etree.ElementTree as ET
+
+from src.tests.unit.conftest import register_tools
+from src.tools.utils import base
+from src.tools.vm import vm as vm_module
+
+MODULE_PATH = "src.tools.vm.vm"
+
+POOL_XML = (
+    "<VM_POOL>"
+    "<VM><ID>12</ID><TEMPLATE><NIC><IP>10.0.0.12</IP></NIC></TEMPLATE></VM>"
+    "<VM><ID>13</ID><TEMPLATE><CONTEXT><ETH0_IP>10.0.0.13</ETH0_IP></CONTEXT></TEMPLATE></VM>"
+    "<VM><ID>14</ID><TEMPLATE/></VM>"
+    "</VM_POOL>"
+)
+
+SSH_ERROR = (
+    "<error><exit_code>255</exit_code><command>ssh root@10.0.0.3 df</command>"
+    "<stderr>Connection refused</stderr><stdout></stdout><message>...</message></error>"
+)
+
+
+def _tool(monkeypatch, outputs=None, allow_write=True, delays=None):
+    """Register the tool with a fake executor; returns (tool, executed commands)."""
+    tools = register_tools(monkeypatch, MODULE_PATH, allow_write=allow_write)
+    calls = []
+
+    async def fake_stream_one_command(command_parts, **kwargs):
+        calls.append((command_parts, kwargs))
+        yield POOL_XML.encode()
+
+    async def fake_execute_one_command(command_parts):
+        calls.append(command_parts)
+        ip = command_parts[-2].split("@")[1]
+        delay = (delays or {}).get(ip, 0)
+        if delay > base.remaining_time():
+            # What execute_one_command does when the call deadline passes
+            await asyncio.sleep(base.remaining_time())
+            return base.command_error_xml(command_parts, asyncio.TimeoutError("deadline"))
+        await asyncio.sleep(delay)
+        return (outputs or {}).get(ip, "42% used")
+
+    monkeypatch.setattr(MODULE_PATH + ".execute_one_command", fake_execute_one_command)
+    monkeypatch.setattr(MODULE_PATH + ".stream_one_command", fake_stream_one_command)
+    return tools["execute_command_fleet"], calls
+
+
+def _groups(xml_str):
+    root = ET.fromstring(xml_str)
+    return [
+        (g.get("status"), int(g.get("count")), g.findtext("targets"), g.findtext("output"))
+        for g in root.findall("group")
+    ]
+
+
+def test_identical_outputs_are_grouped(monkeypatch):
+    fleet, _ = _tool(monkeypatch, outputs={"10.0.0.2": "97% used", "10.0.0.3": SSH_ERROR})
+
+    out = fleet("10.0.0.1,10.0.0.2,10.0.0.3,10.0.0.4", "df")
+
+    assert ET.fromstring(out).findtext("hosts") == "4"
+    assert _groups(out) == [
+        ("ok", 2, "10.0.0.1,10.0.0.4", "42% used"),
+        ("ok", 1, "10.0.0.2", "97% used"),
+        ("exit 255", 1, "10.0.0.3", "Connection refused"),
+    ]
+
+
+def test_vm_ids_are_resolved_through_the_pool(monkeypatch):
+    fleet, calls = _tool(monkeypatch)
+
+    out = fleet("12,13,14,99", "df")
+
+    # One streamed query over the ID span, not a possibly stale cached listing
+    assert [c for c in calls if isinstance(c, tuple)] == [
+        (["onevm", "list", "--xml"], {"id_range": (12, 99), "cache": False})
+    ]
+    assert not any(c[0] == "onevm" for c in calls if isinstance(c, list))
+    hosts = {c[-2] for c in calls if c[0] == "ssh"}
+    assert hosts == {"root@10.0.0.12", "root@10.0.0.13"}
+    assert _groups(out) == [
+        ("ok", 2, "12,13", "42% used"),
+        ("unresolved", 2, "14,99", "VM not found or without an IP address"),
+    ]
+
+
+def test_slow_host_times_out(monkeypatch):
+    fleet, _ = _tool(monkeypatch, delays={"10.0.0.2": 5})
+
+    out = fleet("10.0.0.1,10.0.0.2", "df", timeout="0.2")
+
+    assert _groups(out) == [
+        ("ok", 1, "10.0.0.1", "42% used"),
+        ("timeout", 1, "10.0.0.2", "No result within 0.2 seconds"),
+    ]
+
+
+def test_parallelism_is_bounded(monkeypatch):
+    fleet, _ = _tool(monkeypatch)
+    running, peak = [0], [0]
+    execute = vm_module.execute_one_command
+
+    async def tracking(command_parts):
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        await asyncio.sleep(0.01)
+        running[0] -= 1
+        return await execute(command_parts)
+
+    monkeypatch.setattr(MODULE_PATH + ".execute_one_command", tracking)
+    fleet(",".join(f"10.0.1.{i}" for i in range(10)), "df", max_parallel="3")
+
+    assert peak[0] == 3
+
+
+def test_invalid_arguments(monkeypatch):
+    fleet, calls = _tool(monkeypatch)
+
+    assert "Invalid targets not-a-host" in fleet("10.0.0.1,not-a-host", "df")
+    assert "at least one" in fleet(" , ", "df")
+    assert "max_parallel must be a positive integer" in fleet("10.0.0.1", "df", max_parallel="0")
+    assert "timeout must be a positive number" in fleet("10.0.0.1", "df", timeout="soon")
+    assert calls == []
+
+
+def test_write_disabled(monkeypatch):
+    fleet, calls = _tool(monkeypatch, allow_write=False)
+    assert "Write operations are disabled" in fleet("10.0.0.1", "df")
+    assert calls == []
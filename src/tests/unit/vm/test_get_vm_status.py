@@ -46,4 +46,101 @@ def test_get_vm_status_xml_success_structure(monkeypatch):
 
 def test_get_vm_status_happy_path(monkeypatch):
     get_vm_status = _setup(monkeypatch)
-    assert get_vm_status("1") == "<VM><ID>1</ID></VM>"
\ No newline at end of file
+    assert get_vm_status("1") == "<VM><ID>1</ID></VM>"
+
+def test_get_vm_status_multi_preserves_order_and_errors(monkeypatch):
+    """Multi-VM output keeps request order and reports per-VM failures."""
+    import asyncio
+    import importlib
+
+    module = importlib.import_module(MODULE_PATH)
+    get_vm_status = _setup(monkeypatch)
+
+    async def fake_execute(cmd_parts, *a, **k):
+        vmid = cmd_parts[2]
+        # Finish in reverse order to make sure results are not appended as they arrive
+        await asyncio.sleep(0.001 * (10 - int(vmid)))
+        if vmid == "3":
+            return "not xml"
+        return f"<VM><ID>{vmid}</ID></VM>"
+
+    monkeypatch.setattr(module, "execute_one_command", fake_execute, raising=True)
+
+    out = get_vm_status("1,2,3,4")
+    assert out.startswith("<VMS><VM><ID>1</ID></VM><VM><ID>2</ID></VM><error><vm_id>3</vm_id>")
+    assert out.endswith("<VM><ID>4</ID></VM></VMS>")
+
+
+def test_get_vm_status_multi_fetches_in_parallel(monkeypatch):
+    """Multi-VM fetches overlap but never exceed MAX_PARALLEL_VM_FETCH."""
+    import asyncio
+    import importlib
+
+    module = importlib.import_module(MODULE_PATH)
+    get_vm_status = _setup(monkeypatch)
+    running = 0
+    peak = 0
+
+    async def fake_execute(cmd_parts, *a, **k):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return f"<VM><ID>{cmd_parts[2]}</ID></VM>"
+
+    monkeypatch.setattr(module, "execute_one_command", fake_execute, raising=True)
+
+    out = get_vm_status(",".join(str(i) for i in range(25)))
+    assert out.count("<VM>") == 25
+    assert peak == module.MAX_PARALLEL_VM_FETCH
+
+
+VM_XML = (
+    "<VM><ID>7</ID><NAME>web</NAME><STATE>3</STATE>"
+    "<TEMPLATE><CPU>1</CPU><NIC><IP>10.0.0.7</IP><MAC>02:00</MAC></NIC></TEMPLATE>"
+    "<MONITORING><CPU>5</CPU></MONITORING></VM>"
+)
+
+
+def test_get_vm_status_fields_projection(monkeypatch):
+    get_vm_status = _setup(monkeypatch, xml_out=VM_XML)
+
+    expected = "<VM><ID>7</ID><STATE>3</STATE><TEMPLATE><NIC><IP>10.0.0.7</IP></NIC></TEMPLATE></VM>"
+    assert get_vm_status("7", fields="ID,STATE,TEMPLATE/NIC/IP") == expected
+    assert get_vm_status("7,8", fields="ID,STATE,TEMPLATE/NIC/IP") == f"<VMS>{expected}{expected}</VMS>"
+
+
+def test_get_vm_status_fields_invalid(monkeypatch):
+    get_vm_status = _setup(monkeypatch, xml_out=VM_XML)
+    assert get_vm_status("7", fields="ID,<NAME>").startswith("<error>")
+
+
+def test_get_vm_status_json(monkeypatch):
+    import json
+
+    get_vm_status = _setup(monkeypatch, xml_out=VM_XML)
+    data = json.loads(get_vm_status("7,8", fields="ID,TEMPLATE/NIC/IP", output_format="json"))
+    assert data == {"VMS": {"VM": [{"ID": "7", "TEMPLATE": {"NIC": {"IP": "10.0.0.7"}}}] * 2}}
+
+
+def test_get_vm_status_state_fields_served_from_state_table(monkeypatch):
+    from src.tools.utils import events
+
+    get_vm_status = _setup(monkeypatch, xml_out="<VM><ID>1</ID><STATE>0</STATE></VM>")
+    table = events.VmStateTable()
+    table.load_pool(
+        "<VM_POOL><VM><ID>1</ID><NAME>a</NAME><STATE>3</STATE><LCM_STATE>3</LCM_STATE></VM>"
+        "<VM><ID>2</ID><NAME>b</NAME><STATE>8</STATE><LCM_STATE>0</LCM_STATE></VM></VM_POOL>"
+    )
+    monkeypatch.setattr(MODULE_PATH + ".vm_states", table)
+
+    assert get_vm_status("1", fields="STATE,LCM_STATE") == (
+        "<VM><STATE>3</STATE><LCM_STATE>3</LCM_STATE></VM>"
+    )
+    assert get_vm_status("1,2", fields="ID,STATE") == (
+        "<VMS><VM><ID>1</ID><STATE>3</STATE></VM><VM><ID>2</ID><STATE>8</STATE></VM></VMS>"
+    )
+    # Unknown VM or other fields: the command runs
+    assert get_vm_status("7", fields="STATE") == "<VM><STATE>0</STATE></VM>"
+    assert get_vm_status("1", fields="ID,TEMPLATE") == "<VM><ID>1</ID></VM>"
@@ -1,5 +1,8 @@
 """Unit tests for vm.instantiate_vm parameter validation."""
 
+import importlib
+import xml.etree.ElementTree as ET
+
 from src.tests.unit.conftest import register_tools
 
 MODULE_PATH = "src.tools.vm.vm"
@@ -34,7 +37,7 @@ def test_instantiate_vm_zero_template_id_spec_conformance(monkeypatch):
     import importlib
     module = importlib.import_module(MODULE_PATH)
     
-    def mock_execute(cmd_parts):
+    async def mock_execute(cmd_parts):
         if "instantiate" in cmd_parts:
             return "VM ID: 100"
         else:  # onevm show command
@@ -45,4 +48,147 @@ def test_instantiate_vm_zero_template_id_spec_conformance(monkeypatch):
     out = instantiate_vm(template_id="0")
     
     # Should succeed since "0" is a valid non-negative integer
-    assert out == "<VM><ID>100</ID><STATE>1</STATE></VM>"
\ No newline at end of file
+    assert out == "<VM><ID>100</ID><STATE>1</STATE></VM>"
+
+def _running_pool(*vms):
+    return "".join(
+        f"<VM><ID>{vm_id}</ID><NAME>web-{vm_id}</NAME><STATE>{state}</STATE><LCM_STATE>{lcm}</LCM_STATE>"
+        f"<TEMPLATE><NIC><IP>10.0.0.{vm_id}</IP></NIC></TEMPLATE></VM>"
+        for vm_id, state, lcm in vms
+    )
+
+
+def _wait_tool(monkeypatch, pools):
+    """instantiate_vm creating VMs 7 and 8; pool queries return *pools* in turn."""
+    from src.tools.utils import events
+
+    instantiate_vm = _tool(monkeypatch)
+    module = importlib.import_module(MODULE_PATH)
+    monkeypatch.setattr(module, "WAIT_MIN_INTERVAL", 0.01)
+    monkeypatch.setattr(module, "vm_states", events.VmStateTable())
+    commands = []
+
+    async def mock_execute(cmd_parts):
+        commands.append(cmd_parts)
+        return "VM ID: 7\nVM ID: 8"
+
+    async def fake_stream(command_parts, **kwargs):
+        commands.append(command_parts)
+        polls = sum(1 for c in commands if c[:2] == ["onevm", "list"])
+        yield f"<VM_POOL>{pools[min(polls, len(pools)) - 1]}</VM_POOL>".encode()
+
+    monkeypatch.setattr(module, "execute_one_command", mock_execute)
+    monkeypatch.setattr(module, "stream_one_command", fake_stream)
+    return instantiate_vm, commands
+
+
+def test_instantiate_vm_wait_returns_ips_once_running(monkeypatch):
+    instantiate_vm, commands = _wait_tool(
+        monkeypatch,
+        [_running_pool((7, 1, 0), (8, 1, 0)), _running_pool((7, 3, 3), (8, 3, 2)), _running_pool((7, 3, 3), (8, 3, 3))],
+    )
+
+    out = instantiate_vm(template_id="0", num_instances="2", wait=True)
+
+    root = ET.fromstring(out)
+    assert [
+        (vm.get("status"), vm.findtext("ID"), vm.findtext("NAME"), vm.findtext("STATE"), vm.findtext("IP"))
+        for vm in root.findall("VM")
+    ] == [("reached", "7", "web-7", "3", "10.0.0.7"), ("reached", "8", "web-8", "3", "10.0.0.8")]
+    # No `onevm show` per VM: only pool queries
+    assert [c[:2] for c in commands[1:]] == [["onevm", "list"]] * 3
+
+
+def test_instantiate_vm_wait_reports_failures_and_timeouts(monkeypatch):
+    instantiate_vm, _ = _wait_tool(monkeypatch, [_running_pool((7, 3, 36), (8, 1, 0))])
+
+    out = instantiate_vm(template_id="0", num_instances="2", wait=True, wait_timeout="0.1")
+
+    assert [vm.get("status") for vm in ET.fromstring(out).findall("VM")] == ["failed", "timeout"]
+
+
+def test_instantiate_vm_invalid_wait_timeout(monkeypatch):
+    instantiate_vm = _tool(monkeypatch)
+    assert "wait_timeout must be" in instantiate_vm(template_id="0", wait=True, wait_timeout="0")
+
+
+def test_instantiate_vm_wait_on_state_table_fetches_ips_once(monkeypatch):
+    instantiate_vm, commands = _wait_tool(monkeypatch, [_running_pool((7, 3, 3), (8, 3, 3))])
+    module = importlib.import_module(MODULE_PATH)
+    module.vm_states.load_pool(f"<VM_POOL>{_running_pool((7, 3, 3), (8, 3, 3))}</VM_POOL>")
+
+    out = instantiate_vm(template_id="0", num_instances="2", wait=True)
+
+    assert [vm.findtext("IP") for vm in ET.fromstring(out).findall("VM")] == ["10.0.0.7", "10.0.0.8"]
+    assert [c[:2] for c in commands[1:]] == [["onevm", "list"]]
+
+
+def test_instantiate_vm_wait_on_state_table_without_the_new_vms(monkeypatch):
+    instantiate_vm, commands = _wait_tool(
+        monkeypatch, [_running_pool((7, 1, 0), (8, 1, 0)), _running_pool((7, 3, 3), (8, 3, 3))]
+    )
+    module = importlib.import_module(MODULE_PATH)
+    # Synced, but the creation events of VMs 7 and 8 have not arrived yet
+    module.vm_states.load_pool("<VM_POOL/>")
+
+    out = instantiate_vm(template_id="0", num_instances="2", wait=True)
+
+    assert [
+        (vm.get("status"), vm.findtext("STATE"), vm.findtext("IP")) for vm in ET.fromstring(out).findall("VM")
+    ] == [("reached", "3", "10.0.0.7"), ("reached", "3", "10.0.0.8")]
+    assert [c[:2] for c in commands[1:]] == [["onevm", "list"]] * 2
+
+
+def _multi_tool(monkeypatch, pool):
+    """instantiate_vm creating VMs 7, 8 and 9; the pool listing holds *pool*."""
+    instantiate_vm = _tool(monkeypatch)
+    module = importlib.import_module(MODULE_PATH)
+    commands = []
+
+    async def mock_execute(cmd_parts):
+        commands.append((cmd_parts, {}))
+        if "instantiate" in cmd_parts:
+            return "VM ID: 9\nVM ID: 7\nVM ID: 8"
+        return f"<VM><ID>{cmd_parts[2]}</ID><NAME>shown</NAME></VM>"
+
+    async def fake_stream(command_parts, **kwargs):
+        commands.append((command_parts, kwargs))
+        yield f"<VM_POOL>{pool}</VM_POOL>".encode()
+
+    monkeypatch.setattr(module, "execute_one_command", mock_execute)
+    monkeypatch.setattr(module, "stream_one_command", fake_stream)
+    return instantiate_vm, commands
+
+
+def test_instantiate_vm_multiple_fetches_details_with_one_pool_query(monkeypatch):
+    instantiate_vm, commands = _multi_tool(
+        monkeypatch, _running_pool((6, 3, 3), (7, 1, 0), (8, 1, 0), (9, 1, 0))
+    )
+
+    out = instantiate_vm(template_id="0", num_instances="3")
+
+    # Request order, VMs outside the new ones dropped
+    assert [vm.findtext("NAME") for vm in ET.fromstring(out).findall("VM")] == [
+        "web-9",
+        "web-7",
+        "web-8",
+    ]
+    assert commands[1:] == [
+        (["onevm", "list", "--xml"], {"id_range": (7, 9), "cache": False})
+    ]
+
+
+def test_instantiate_vm_multiple_shows_vms_missing_from_pool(monkeypatch):
+    instantiate_vm, commands = _multi_tool(monkeypatch, _running_pool((7, 1, 0)))
+
+    out = instantiate_vm(template_id="0", num_instances="3")
+
+    assert [vm.findtext("NAME") for vm in ET.fromstring(out).findall("VM")] == [
+        "shown",
+        "web-7",
+        "shown",
+    ]
+    assert sorted(c for c, _ in commands if c[1] == "show") == [
+        ["onevm", "show", "8", "--xml"],
+        ["onevm", "show", "9", "--xml"],
+    ]
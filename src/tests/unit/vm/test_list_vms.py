@@ -1,6 +1,9 @@
 """Unit tests for vm.list_vms validation."""
 
-from src.tests.unit.conftest import register_tools
+import pytest
+
+from src.tests.unit.conftest import FakeProcess, register_tools
+from src.tests.unit.utils.test_backends import oned, xmlrpc_backend  # noqa: F401
 
 MODULE_PATH = "src.tools.vm.vm"
 
@@ -30,10 +33,188 @@ def test_list_vms_xml_success_structure(monkeypatch):
     # Mock the execute_one_command to return specific XML
     import importlib
     module = importlib.import_module(MODULE_PATH)
-    monkeypatch.setattr(module, "execute_one_command", lambda *a, **k: expected_xml, raising=True)
+    async def fake_execute_one_command(*a, **k):
+        return expected_xml
+
+    monkeypatch.setattr(module, "execute_one_command", fake_execute_one_command, raising=True)
     
     out = list_vms()
     
     # Should return the XML with VM_POOL structure
     assert "<VM_POOL>" in out
-    assert "</VM_POOL>" in out 
\ No newline at end of file
+    assert "</VM_POOL>" in out 
+
+POOL_XML = (
+    "<VM_POOL>"
+    "<VM><ID>1</ID><STATE>3</STATE><HISTORY_RECORDS><HISTORY><HID>0</HID><CID>0</CID></HISTORY>"
+    "<HISTORY><HID>5</HID><CID>1</CID></HISTORY></HISTORY_RECORDS></VM>"
+    "<VM><ID>2</ID><STATE>8</STATE><HISTORY_RECORDS><HISTORY><HID>5</HID><CID>1</CID></HISTORY></HISTORY_RECORDS></VM>"
+    "<VM><ID>3</ID><STATE>3</STATE></VM>"
+    "</VM_POOL>"
+)
+
+
+def _ids(xml_str):
+    import xml.etree.ElementTree as ET
+
+    return [vm.findtext("ID") for vm in ET.fromstring(xml_str).findall("VM")]
+
+
+def test_list_vms_filters_streamed_pool(monkeypatch):
+    """Filters are applied to the streamed pool, using the last history record."""
+    tools = register_tools(monkeypatch, MODULE_PATH, xml_out=POOL_XML, allow_write=True)
+    list_vms = tools["list_vms"]
+
+    assert _ids(list_vms(state="3")) == ["1", "3"]
+    assert _ids(list_vms(host_id="5")) == ["1", "2"]
+    assert _ids(list_vms(host_id="0")) == []
+    assert _ids(list_vms(state="3", cluster_id="1")) == ["1"]
+
+
+def test_list_vms_stream_error_returns_error_xml(monkeypatch):
+    """A failing command is reported with the usual error envelope."""
+    import subprocess
+    from src.tools.utils import pagination
+
+    list_vms = _tool(monkeypatch)
+
+    async def failing_stream(*a, **k):
+        raise subprocess.CalledProcessError(255, a[0], output="", stderr="oned down")
+        yield b""  # pragma: no cover
+
+    monkeypatch.setattr(pagination, "stream_one_command", failing_stream)
+
+    out = list_vms(state="3")
+    assert out.startswith("<error>")
+    assert "oned down" in out
+
+
+def test_list_vms_pushes_owner_and_state_down(monkeypatch):
+    """Owner goes into the command as filterflag, state is handed to the backend."""
+    from src.tools.utils import pagination
+
+    list_vms = _tool(monkeypatch)
+    calls = []
+
+    async def recording_stream(command_parts, *a, **k):
+        calls.append((command_parts, k))
+        yield POOL_XML.encode()
+
+    monkeypatch.setattr(pagination, "stream_one_command", recording_stream)
+
+    # The CLI backend ignores the state hint, so it is still checked here
+    assert _ids(list_vms(state="8", owner_id="5")) == ["2"]
+    assert calls == [(["onevm", "list", "5", "--xml"], {"state": 8, "pool_range": None})]
+
+
+def test_list_vms_group_filter(monkeypatch):
+    """group_id is applied client side on GID."""
+    pool = (
+        "<VM_POOL><VM><ID>1</ID><GID>0</GID></VM><VM><ID>2</ID><GID>100</GID></VM>"
+        "<VM><ID>3</ID></VM></VM_POOL>"
+    )
+    tools = register_tools(monkeypatch, MODULE_PATH, xml_out=pool, allow_write=True)
+
+    assert _ids(tools["list_vms"](group_id="100")) == ["2"]
+    assert tools["list_vms"](owner_id="me").startswith("<error>")
+
+
+def test_list_vms_fields_projection(monkeypatch):
+    tools = register_tools(monkeypatch, MODULE_PATH, xml_out=POOL_XML, allow_write=True)
+
+    out = tools["list_vms"](state="3", fields="ID,HISTORY_RECORDS/HISTORY[last()]/HID")
+    assert out == (
+        "<VM_POOL>"
+        "<VM><ID>1</ID><HISTORY_RECORDS><HISTORY><HID>5</HID></HISTORY></HISTORY_RECORDS></VM>"
+        "<VM><ID>3</ID></VM>"
+        "</VM_POOL>"
+    )
+
+
+def test_list_vms_output_formats(monkeypatch):
+    import json
+
+    tools = register_tools(monkeypatch, MODULE_PATH, xml_out=POOL_XML, allow_write=True)
+    list_vms = tools["list_vms"]
+
+    unfiltered = json.loads(list_vms(output_format="json"))
+    assert [vm["ID"] for vm in unfiltered["VM_POOL"]["VM"]] == ["1", "2", "3"]
+
+    assert list_vms(state="3", fields="ID,STATE", output_format="csv") == "ID,STATE\n1,3\n3,3\n"
+    assert list_vms(output_format="yaml").startswith("<error>")
+
+
+TABLE_POOL = (
+    "<VM_POOL>"
+    "<VM><ID>1</ID><UID>0</UID><GID>0</GID><NAME>a</NAME><STATE>3</STATE><LCM_STATE>3</LCM_STATE></VM>"
+    "<VM><ID>2</ID><UID>5</UID><GID>1</GID><NAME>b</NAME><STATE>8</STATE><LCM_STATE>0</LCM_STATE></VM>"
+    "<VM><ID>3</ID><UID>5</UID><GID>1</GID><NAME>c</NAME><STATE>3</STATE><LCM_STATE>3</LCM_STATE></VM>"
+    "</VM_POOL>"
+)
+
+
+def test_list_vms_state_fields_served_from_state_table(monkeypatch):
+    from src.tools.utils import events, pagination
+
+    list_vms = _tool(monkeypatch)
+    table = events.VmStateTable()
+    table.load_pool(TABLE_POOL)
+    monkeypatch.setattr(MODULE_PATH + ".vm_states", table)
+
+    async def no_command(*a, **k):
+        raise AssertionError("the command must not run")
+        yield
+
+    monkeypatch.setattr(pagination, "stream_one_command", no_command)
+
+    assert list_vms(state="3", owner_id="5", fields="ID,STATE") == (
+        "<VM_POOL><VM><ID>3</ID><STATE>3</STATE></VM></VM_POOL>"
+    )
+    assert list_vms(fields="ID", limit="2") == (
+        '<VM_POOL NEXT_CURSOR="2"><VM><ID>1</ID></VM><VM><ID>2</ID></VM></VM_POOL>'
+    )
+
+
+def test_list_vms_other_fields_bypass_state_table(monkeypatch):
+    from src.tools.utils import events
+
+    list_vms = _tool(monkeypatch)
+    table = events.VmStateTable()
+    table.load_pool(TABLE_POOL)
+    monkeypatch.setattr(MODULE_PATH + ".vm_states", table)
+
+    # Served from the (patched) command output, which is empty
+    assert list_vms(fields="ID,TEMPLATE/NIC/IP") == "<VM_POOL></VM_POOL>"
+    assert list_vms(host_id="1", fields="ID") == "<VM_POOL></VM_POOL>"
+
+
+@pytest.mark.parametrize("backend", ["cli", "xmlrpc"])
+def test_list_vms_rejects_done_state_on_every_backend(monkeypatch, request, backend):
+    """oned can list DONE VMs but `onevm list` cannot: refuse before asking either."""
+    import asyncio
+
+    from src.tests.unit.conftest import DummyMCP
+    from src.tools.vm import vm as vm_module
+
+    commands = []
+
+    async def fake_exec(*cmd, stdout, stderr, **kwargs):  # noqa: D401
+        commands.append(cmd)
+        return FakeProcess(stdout="<VM_POOL/>")
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_exec)
+    if backend == "xmlrpc":
+        oned = request.getfixturevalue("oned")
+        request.getfixturevalue("xmlrpc_backend")
+        done_pool = "<VM_POOL><VM><ID>3</ID><STATE>6</STATE></VM></VM_POOL>"
+        oned.register_function(lambda *params: [True, done_pool, 0], "one.vmpool.info")
+    mcp = DummyMCP()
+    vm_module.register_tools(mcp, allow_write=False)
+
+    for kwargs in ({}, {"limit": "10"}):
+        out = mcp.tools["list_vms"](state="6", **kwargs)
+        assert out.startswith("<error>")
+        assert "DONE" in out
+    assert commands == []
+    if backend == "xmlrpc":
+        assert oned.calls == []
@@ -115,3 +115,154 @@ def test_manage_vm_xml_success_structure(monkeypatch):
     assert "</message>" in out
     assert "<command_output>" in out
     assert "</command_output>" in out
+
+
+def _batch_tool(monkeypatch, pool, error=None):
+    """manage_vm whose VM pool holds *pool*; the action returns *error* if given."""
+    import importlib
+
+    from src.tools.utils import events
+
+    tools = register_tools(monkeypatch, MODULE_PATH, allow_write=True)
+    module = importlib.import_module(MODULE_PATH)
+    monkeypatch.setattr(module, "vm_states", events.VmStateTable())
+    commands = []
+
+    async def fake_execute(cmd_parts):
+        commands.append(cmd_parts)
+        if cmd_parts[1] == "show":
+            for vm_id, state, lcm in pool:
+                if str(vm_id) == cmd_parts[2]:
+                    return f"<VM><ID>{vm_id}</ID><STATE>{state}</STATE><LCM_STATE>{lcm}</LCM_STATE></VM>"
+            return f"<error><message>[one.vm.info] Error getting virtual machine [{cmd_parts[2]}].</message></error>"
+        return error or "<output/>"
+
+    async def fake_stream(command_parts, **kwargs):
+        commands.append(command_parts)
+        vms = "".join(
+            f"<VM><ID>{vm_id}</ID><STATE>{state}</STATE><LCM_STATE>{lcm}</LCM_STATE></VM>"
+            for vm_id, state, lcm in pool
+        )
+        yield f"<VM_POOL>{vms}</VM_POOL>".encode()
+
+    monkeypatch.setattr(module, "execute_one_command", fake_execute)
+    monkeypatch.setattr(module, "stream_one_command", fake_stream)
+    return tools["manage_vm"], commands
+
+
+def _outcomes(out):
+    import xml.etree.ElementTree as ET
+
+    return [(vm.get("id"), vm.get("status")) for vm in ET.fromstring(out).find("vms")]
+
+
+def test_manage_vm_batch_acts_only_on_eligible_vms(monkeypatch):
+    manage_vm, commands = _batch_tool(monkeypatch, [(1, 3, 3), (2, 8, 0), (3, 3, 3), (4, 3, 1)])
+
+    out = manage_vm(vm_id="1..5", operation="stop", hard=True)
+
+    assert _outcomes(out) == [
+        ("1", "eligible"),
+        ("2", "skipped"),
+        ("3", "eligible"),
+        ("4", "skipped"),
+        ("5", "skipped"),
+    ]
+    assert "current LCM state: 1" in out
+    assert "VM 5 does not exist" in out
+    assert '<vms eligible="2" skipped="3" failed="0">' in out
+    # One pool snapshot, one action for the eligible VMs
+    assert commands == [["onevm", "list", "--xml"], ["onevm", "poweroff", "--hard", "1,3"]]
+
+
+def test_manage_vm_batch_without_eligible_vms_runs_no_action(monkeypatch):
+    manage_vm, commands = _batch_tool(monkeypatch, [(1, 3, 3), (2, 3, 3)])
+
+    out = manage_vm(vm_id="2,1", operation="start")
+
+    assert _outcomes(out) == [("2", "skipped"), ("1", "skipped")]
+    assert commands == [["onevm", "list", "--xml"]]
+
+
+def test_manage_vm_batch_reports_vms_rejected_by_opennebula(monkeypatch):
+    error = (
+        "<error><exit_code>255</exit_code><stderr>"
+        "[one.vm.action] User [0] : Not authorized to perform MANAGE VM [2]."
+        "</stderr><message>failed</message></error>"
+    )
+    manage_vm, _ = _batch_tool(monkeypatch, [(0, 3, 3), (1, 3, 3), (2, 3, 3)], error=error)
+
+    out = manage_vm(vm_id="0,1,2", operation="reboot")
+
+    # User [0] is not VM 0
+    assert _outcomes(out) == [("0", "eligible"), ("1", "eligible"), ("2", "failed")]
+    assert "MANAGE VM [2]" in out
+
+
+def test_manage_vm_batch_unattributed_error_fails_every_vm(monkeypatch):
+    error = "<error><stderr>oned is not responding</stderr><message>failed</message></error>"
+    manage_vm, _ = _batch_tool(monkeypatch, [(1, 3, 3), (2, 3, 3)], error=error)
+
+    assert _outcomes(manage_vm(vm_id="1,2", operation="terminate")) == [
+        ("1", "failed"),
+        ("2", "failed"),
+    ]
+
+
+def test_manage_vm_batch_invalid_lists(monkeypatch):
+    manage_vm, commands = _batch_tool(monkeypatch, [])
+
+    for vm_id in ("1..2,3", "5..1", "1,a", "0..20000"):
+        assert "vm_id must be a comma-separated list" in manage_vm(vm_id=vm_id, operation="stop")
+    assert commands == []
+
+
+def test_manage_vm_validates_writes_against_oned_not_state_table(monkeypatch):
+    import importlib
+
+    # The event-fed table may be stale: it says POWEROFF, oned says RUNNING
+    manage_vm, commands = _batch_tool(monkeypatch, [(7, 3, 3), (8, 3, 3)])
+    importlib.import_module(MODULE_PATH).vm_states.load_pool(
+        "<VM_POOL>"
+        "<VM><ID>7</ID><STATE>8</STATE><LCM_STATE>0</LCM_STATE></VM>"
+        "<VM><ID>8</ID><STATE>8</STATE><LCM_STATE>0</LCM_STATE></VM>"
+        "</VM_POOL>"
+    )
+
+    assert "<error>" in manage_vm(vm_id="7", operation="start")
+    assert commands == [["onevm", "show", "7", "--xml"]]
+
+    commands.clear()
+    out = manage_vm(vm_id="7,8", operation="stop")
+    assert _outcomes(out) == [("7", "eligible"), ("8", "eligible")]
+    assert commands[0] == ["onevm", "list", "--xml"]
+    assert commands[1][:2] == ["onevm", "poweroff"]
+
+
+def test_manage_vm_calls_in_coalescing_window_run_one_command(monkeypatch):
+    import asyncio
+    import xml.etree.ElementTree as ET
+
+    from src.tools.utils.coalescing import write_window
+
+    manage_vm, commands = _batch_tool(monkeypatch, [(1, 3, 3), (2, 3, 3), (3, 8, 0), (4, 3, 3)])
+    monkeypatch.setattr(write_window, "window", 0.05)
+
+    async def burst():
+        return await asyncio.gather(
+            manage_vm.__wrapped__(vm_id="1", operation="stop"),
+            manage_vm.__wrapped__(vm_id="3", operation="stop"),
+            manage_vm.__wrapped__(vm_id="2,4", operation="stop"),
+            manage_vm.__wrapped__(vm_id="4", operation="stop", hard=True),
+        )
+
+    first, skipped, batch, hard = asyncio.run(burst())
+
+    # Each caller gets its own result, in the format it would have had alone
+    assert "<vm_id>1</vm_id>" in first and "VM stop operation executed successfully" in first
+    assert "VM must be in RUNNING state to stop" in skipped
+    assert _outcomes(batch) == [("2", "eligible"), ("4", "eligible")]
+    assert ET.fromstring(hard).findtext("hard") == "True"
+    # --hard calls are a different batch
+    actions = sorted(c for c in commands if c[1] == "poweroff")
+    assert actions == [["onevm", "poweroff", "--hard", "4"], ["onevm", "poweroff", "1,2,4"]]
@@ -1,6 +1,7 @@
 import pytest
 from unittest.mock import MagicMock, patch
 from src.tools.vm import vm
+from src.tests.unit.conftest import sync_tool
 
 @pytest.fixture
 def vm_tools():
@@ -9,7 +10,7 @@ def vm_tools():
     
     def tool_decorator(name=None, description=None):
         def decorator(func):
-            tools[name] = func
+            tools[name] = sync_tool(func)
             return func
         return decorator
     
@@ -0,0 +1,139 @@
+"""Unit tests for vm.wait_for_vm_state tool."""
+
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from src.tests.unit.conftest import register_tools
+from src.tools.utils import events
+from src.tools.vm import vm as vm_module
+
+MODULE_PATH = "src.tools.vm.vm"
+
+
+def _vm(vm_id, state, lcm_state=0):
+    return f"<VM><ID>{vm_id}</ID><STATE>{state}</STATE><LCM_STATE>{lcm_state}</LCM_STATE></VM>"
+
+
+@pytest.fixture
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(vm_module, "WAIT_MIN_INTERVAL", 0.01)
+    monkeypatch.setattr(vm_module, "WAIT_MAX_INTERVAL", 0.05)
+    monkeypatch.setattr(vm_module, "vm_states", events.VmStateTable())
+
+
+def _tool(monkeypatch, pools):
+    """Register the tool; each pool query returns the next of *pools* (the last one repeats)."""
+    tools = register_tools(monkeypatch, MODULE_PATH, allow_write=False)
+    queries = []
+
+    async def fake_stream_one_command(command_parts, **kwargs):
+        queries.append((command_parts, kwargs))
+        pool = pools[min(len(queries), len(pools)) - 1]
+        if isinstance(pool, Exception):
+            raise pool
+        yield f"<VM_POOL>{pool}</VM_POOL>".encode()
+
+    monkeypatch.setattr(MODULE_PATH + ".stream_one_command", fake_stream_one_command)
+    return tools["wait_for_vm_state"], queries
+
+
+def _vms(xml_str):
+    root = ET.fromstring(xml_str)
+    return [
+        (vm.get("id"), vm.get("status"), vm.findtext("STATE"), vm.findtext("LCM_STATE"))
+        for vm in root.findall("vm")
+    ]
+
+
+def test_waits_for_all_vms_with_one_query_per_tick(monkeypatch, fast_polling):
+    wait, queries = _tool(
+        monkeypatch,
+        [
+            _vm(1, 1) + _vm(2, 1),
+            _vm(1, 3, 2) + _vm(2, 1),
+            _vm(1, 3, 3) + _vm(2, 3, 2),
+            _vm(1, 3, 3) + _vm(2, 3, 3),
+        ],
+    )
+
+    out = wait("2,1", "3", lcm_state="3")
+
+    assert _vms(out) == [("2", "reached", "3", "3"), ("1", "reached", "3", "3")]
+    assert len(queries) == 4
+    # Polling must see state changes, not a cached listing
+    assert all(kwargs.get("cache") is False for _, kwargs in queries)
+
+
+def test_failed_and_missing_vms_stop_the_wait(monkeypatch, fast_polling):
+    wait, queries = _tool(monkeypatch, [_vm(1, 3, 2) + _vm(2, 1), _vm(1, 3, 36) + _vm(2, 3, 3)])
+
+    out = wait("1,2,9", "3", lcm_state="3")
+
+    assert _vms(out) == [
+        ("1", "failed", "3", "36"),
+        ("2", "reached", "3", "3"),
+        ("9", "not_found", None, None),
+    ]
+
+
+def test_terminated_vm_reaches_done_by_leaving_the_pool(monkeypatch, fast_polling):
+    wait, _ = _tool(monkeypatch, [_vm(1, 3, 12), ""])
+
+    assert _vms(wait("1", "6")) == [("1", "reached", "3", "12")]
+
+
+def test_timeout_reports_last_state(monkeypatch, fast_polling):
+    wait, queries = _tool(monkeypatch, [_vm(1, 1)])
+
+    out = wait("1", "3", timeout="0.2")
+
+    assert _vms(out) == [("1", "timeout", "1", "0")]
+    assert float(ET.fromstring(out).findtext("elapsed")) >= 0.2
+    # Backing off: far fewer queries than 0.2 s / 0.01 s
+    assert len(queries) < 12
+
+
+def test_query_errors_after_the_first_are_retried(monkeypatch, fast_polling):
+    wait, _ = _tool(monkeypatch, [_vm(1, 1), RuntimeError("oned busy"), _vm(1, 3, 3)])
+    assert _vms(wait("1", "3")) == [("1", "reached", "3", "3")]
+
+
+def test_first_query_error_is_returned(monkeypatch, fast_polling):
+    wait, _ = _tool(monkeypatch, [FileNotFoundError()])
+    out = wait("1", "3")
+    assert "<exit_code>127</exit_code>" in out
+
+
+def test_state_table_is_used_when_in_sync(monkeypatch, fast_polling):
+    wait, queries = _tool(monkeypatch, [""])
+    vm_module.vm_states.load_pool(f"<VM_POOL>{_vm(4, 8)}</VM_POOL>")
+
+    assert _vms(wait("4", "8")) == [("4", "reached", "8", "0")]
+    assert queries == []
+
+
+def test_vms_missing_from_a_synced_table_are_looked_up_in_the_pool(monkeypatch, fast_polling):
+    wait, queries = _tool(monkeypatch, [_vm(5, 8)])
+    vm_module.vm_states.load_pool(f"<VM_POOL>{_vm(4, 8)}</VM_POOL>")
+
+    assert _vms(wait("4,5", "8")) == [("4", "reached", "8", "0"), ("5", "reached", "8", "0")]
+    assert [kwargs for _, kwargs in queries] == [{"id_range": (5, 5), "cache": False}]
+
+
+def test_vm_missing_from_a_synced_table_has_not_reached_done(monkeypatch, fast_polling):
+    wait, queries = _tool(monkeypatch, [_vm(1, 3, 3)])
+    vm_module.vm_states.load_pool("<VM_POOL/>")
+
+    assert _vms(wait("1", "6", timeout="0.1")) == [("1", "timeout", "3", "3")]
+
+
+def test_invalid_arguments(monkeypatch, fast_polling):
+    wait, queries = _tool(monkeypatch, [""])
+
+    assert "vm_ids must be" in wait("1,a", "3")
+    assert "vm_ids must be" in wait(" ", "3")
+    assert "state and lcm_state" in wait("1", "ACTIVE")
+    assert "state and lcm_state" in wait("1", "3", lcm_state="-1")
+    assert "timeout must be" in wait("1", "3", timeout="0")
+    assert queries == []
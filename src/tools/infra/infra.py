@@ -20,7 +20,15 @@ from logging import getLogger
 import tempfile
 import os
 from src.tools.utils.base import execute_one_command
-from src.static import HOST_STATES_DESCRIPTION, VM_IMAGES_STATES_DESCRIPTION
+from src.tools.utils.formats import check_output_format, convert_xml
+from src.tools.utils.pagination import list_pool_page, parse_page_args
+from src.static import (
+    FIELDS_DESCRIPTION,
+    HOST_STATES_DESCRIPTION,
+    OUTPUT_FORMAT_DESCRIPTION,
+    PAGINATION_DESCRIPTION,
+    VM_IMAGES_STATES_DESCRIPTION,
+)
 
 logger = getLogger("opennebula_mcp.tools.infra")
 
@@ -28,40 +36,82 @@ logger = getLogger("opennebula_mcp.tools.infra")
 def register_tools(mcp, allow_write=False):
     @mcp.tool(
         name="list_clusters",
-        description="List all OpenNebula clusters accessible to the current user.",
+        description=f"""List all OpenNebula clusters accessible to the current user.
+        {OUTPUT_FORMAT_DESCRIPTION}
+        """,
     )
-    def list_clusters() -> str:
+    async def list_clusters(output_format: str = "xml") -> str:
         """List all OpenNebula clusters accessible to the current user.
+        Args:
+            output_format: "xml" (default), "json" or "csv"
         Returns:
             str: XML string conforming to Cluster Pool XSD Schema
         """
+        format_error = check_output_format(output_format)
+        if format_error:
+            return format_error
         logger.debug("Listing OpenNebula clusters")
-        return execute_one_command(["onecluster", "list", "--xml"])
+        return convert_xml(await execute_one_command(["onecluster", "list", "--xml"]), output_format)
 
     @mcp.tool(
         name="list_hosts",
         description=f"""
             List compute hosts, optionally filtered by cluster ID. 
             {HOST_STATES_DESCRIPTION}
+            {PAGINATION_DESCRIPTION}
+            {FIELDS_DESCRIPTION}
+            {OUTPUT_FORMAT_DESCRIPTION}
             """,
     )
-    def list_hosts(cluster_id: Optional[str] = None) -> str:
+    async def list_hosts(
+        cluster_id: Optional[str] = None,
+        limit: Optional[str] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None,
+        output_format: str = "xml",
+    ) -> str:
         """List compute hosts, optionally filtered by cluster.
         Args:
             cluster_id: Optional[str]: Filter hosts by cluster ID
+            limit: Optional[str]: Maximum number of hosts to return (page size)
+            cursor: Optional[str]: NEXT_CURSOR of the previous page
+            fields: Optional[str]: Comma-separated paths to keep in every host
+            output_format: str: "xml" (default), "json" or "csv"
         Returns:
             str: XML string conforming to Host Pool XSD Schema
         """
+        format_error = check_output_format(output_format)
+        if format_error:
+            return format_error
+
         if cluster_id:
-            logger.debug(f"Listing hosts for cluster {cluster_id}")
+            logger.debug("Listing hosts for cluster %s", cluster_id)
         else:
             logger.debug("Listing all hosts")
 
-        result = execute_one_command(["onehost", "list", "--xml"])
+        if limit is not None or cursor is not None or fields is not None:
+            page_error = parse_page_args(limit, cursor)
+            if page_error:
+                return page_error
+
+            def in_cluster(host: ET.Element) -> bool:
+                return host.findtext("CLUSTER_ID") == cluster_id
+
+            filtered = bool(cluster_id and cluster_id.isdigit())
+            return await list_pool_page(
+                ["onehost", "list", "--xml"],
+                limit=int(limit) if limit is not None else None,
+                cursor=cursor,
+                match=in_cluster if filtered else None,
+                fields=fields,
+                output_format=output_format,
+            )
+
+        result = await execute_one_command(["onehost", "list", "--xml"])
 
         # If cluster_id is provided, filter the results
         if cluster_id and cluster_id.isdigit():
-            logger.debug(f"Filtering hosts by cluster ID: {cluster_id}")
+            logger.debug("Filtering hosts by cluster ID: %s", cluster_id)
             try:
                 root = ET.fromstring(result)
                 # Filter hosts by cluster
@@ -71,68 +121,131 @@ def register_tools(mcp, allow_write=False):
                     if host.find("CLUSTER_ID").text == str(cluster_id)
                 ]
 
-                if not filtered_hosts:
-                    logger.debug(f"No hosts found in cluster {cluster_id}")
-                    return f"<error><message>No hosts found in cluster {cluster_id}</message></error>"
-
                 logger.debug(
-                    f"Found {len(filtered_hosts)} hosts in cluster {cluster_id}"
+                    "Found %s hosts in cluster %s", len(filtered_hosts), cluster_id
                 )
-                # Create new XML with filtered hosts
+                # Create new XML with filtered hosts; an empty cluster gives an
+                # empty pool, as on the paginated path
                 new_root = ET.Element("HOST_POOL")
                 for host in filtered_hosts:
                     new_root.append(host)
-                return ET.tostring(new_root, encoding="unicode")
+                return convert_xml(ET.tostring(new_root, encoding="unicode"), output_format)
 
             except ET.ParseError as e:
-                logger.error(f"Failed to parse host list XML: {str(e)}")
+                logger.error("Failed to parse host list XML: %s", str(e))
                 return "<error><message>Failed to parse host list XML</message></error>"
 
-        return result
+        return convert_xml(result, output_format)
 
     @mcp.tool(
         name="list_datastores",
-        description="List available storage datastores and their types. Possible STATE values are 0 (READY) and 1 (DISABLE) only.",
+        description=f"""List available storage datastores and their types. Possible STATE values are 0 (READY) and 1 (DISABLE) only.
+        {OUTPUT_FORMAT_DESCRIPTION}
+        """,
     )
-    def list_datastores() -> str:
+    async def list_datastores(output_format: str = "xml") -> str:
         """List available storage datastores and their types.
+        Args:
+            output_format: "xml" (default), "json" or "csv"
         Returns:
             str: XML string conforming to Datastore Pool XSD Schema
         """
+        format_error = check_output_format(output_format)
+        if format_error:
+            return format_error
         logger.debug("Listing OpenNebula datastores")
-        return execute_one_command(["onedatastore", "list", "--xml"])
+        return convert_xml(await execute_one_command(["onedatastore", "list", "--xml"]), output_format)
 
     @mcp.tool(
         name="list_networks",
-        description="List virtual networks available for VM connectivity.",
+        description=f"""List virtual networks available for VM connectivity.
+        {PAGINATION_DESCRIPTION}
+        {FIELDS_DESCRIPTION}
+        {OUTPUT_FORMAT_DESCRIPTION}
+        """,
     )
-    def list_networks() -> str:
+    async def list_networks(
+        limit: Optional[str] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None,
+        output_format: str = "xml",
+    ) -> str:
         """List virtual networks available for VM connectivity.
+        Args:
+            limit: Optional[str]: Maximum number of networks to return (page size)
+            cursor: Optional[str]: NEXT_CURSOR of the previous page
+            fields: Optional[str]: Comma-separated paths to keep in every network
+            output_format: str: "xml" (default), "json" or "csv"
         Returns:
             str: XML string conforming to VNet Pool XSD Schema
         """
+        format_error = check_output_format(output_format)
+        if format_error:
+            return format_error
         logger.debug("Listing OpenNebula networks")
-        return execute_one_command(["onevnet", "list", "--xml"])
+        command_parts = ["onevnet", "list", "--xml"]
+        if limit is None and cursor is None and fields is None:
+            return convert_xml(await execute_one_command(command_parts), output_format)
+
+        page_error = parse_page_args(limit, cursor)
+        if page_error:
+            return page_error
+        return await list_pool_page(
+            command_parts,
+            limit=int(limit) if limit is not None else None,
+            cursor=cursor,
+            fields=fields,
+            output_format=output_format,
+        )
 
     @mcp.tool(
         name="list_images",
         description=f"""List virtual machine images available for VM creation.
         {VM_IMAGES_STATES_DESCRIPTION}
+        {PAGINATION_DESCRIPTION}
+        {FIELDS_DESCRIPTION}
+        {OUTPUT_FORMAT_DESCRIPTION}
         """,
     )
-    def list_images() -> str:
+    async def list_images(
+        limit: Optional[str] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None,
+        output_format: str = "xml",
+    ) -> str:
         """List virtual machine images available for VM creation.
+        Args:
+            limit: Optional[str]: Maximum number of images to return (page size)
+            cursor: Optional[str]: NEXT_CURSOR of the previous page
+            fields: Optional[str]: Comma-separated paths to keep in every image
+            output_format: str: "xml" (default), "json" or "csv"
         Returns:
             str: XML string conforming to Image Pool XSD Schema
         """
+        format_error = check_output_format(output_format)
+        if format_error:
+            return format_error
         logger.debug("Listing OpenNebula images")
-        return execute_one_command(["oneimage", "list", "--xml"])
+        command_parts = ["oneimage", "list", "--xml"]
+        if limit is None and cursor is None and fields is None:
+            return convert_xml(await execute_one_command(command_parts), output_format)
+
+        page_error = parse_page_args(limit, cursor)
+        if page_error:
+            return page_error
+        return await list_pool_page(
+            command_parts,
+            limit=int(limit) if limit is not None else None,
+            cursor=cursor,
+            fields=fields,
+            output_format=output_format,
+        )
 
     @mcp.tool(
         name="create_image",
         description="Create a new image in the datastore.",
     )
-    def create_image(
+    async def create_image(
         name: str,
         path: str,
         datastore_id: str,
@@ -175,8 +288,8 @@ def register_tools(mcp, allow_write=False):
         if persistent:
             cmd.append("--persistent")
 
-        logger.debug(f"Creating image {name} in datastore {datastore_id}")
-        output = execute_one_command(cmd)
+        logger.debug("Creating image %s in datastore %s", name, datastore_id)
+        output = await execute_one_command(cmd)
         
         # oneimage create returns "ID: <id>" on success
         if output.startswith("ID:"):
@@ -189,7 +302,7 @@ def register_tools(mcp, allow_write=False):
         name="delete_image",
         description="Delete an image.",
     )
-    def delete_image(image_id: str) -> str:
+    async def delete_image(image_id: str) -> str:
         """Delete an image.
         Args:
             image_id: ID of the image to delete
@@ -202,8 +315,8 @@ def register_tools(mcp, allow_write=False):
         if not image_id.isdigit():
             return "<error><message>image_id must be a non-negative integer</message></error>"
 
-        logger.debug(f"Deleting image {image_id}")
-        result = execute_one_command(["oneimage", "delete", image_id])
+        logger.debug("Deleting image %s", image_id)
+        result = await execute_one_command(["oneimage", "delete", image_id])
         
         if "Error" in result:
              return f"<error><message>{result}</message></error>"
@@ -214,7 +327,7 @@ def register_tools(mcp, allow_write=False):
         name="update_image_type",
         description="Change the type of an image.",
     )
-    def update_image_type(image_id: str, type: str) -> str:
+    async def update_image_type(image_id: str, type: str) -> str:
         """Change the type of an image.
         Args:
             image_id: ID of the image
@@ -228,8 +341,8 @@ def register_tools(mcp, allow_write=False):
         if not image_id.isdigit():
             return "<error><message>image_id must be a non-negative integer</message></error>"
 
-        logger.debug(f"Changing type of image {image_id} to {type}")
-        result = execute_one_command(["oneimage", "chtype", image_id, type])
+        logger.debug("Changing type of image %s to %s", image_id, type)
+        result = await execute_one_command(["oneimage", "chtype", image_id, type])
         
         if "Error" in result:
              return f"<error><message>{result}</message></error>"
@@ -240,7 +353,7 @@ def register_tools(mcp, allow_write=False):
         name="create_vnet",
         description="Create a new virtual network from a template string.",
     )
-    def create_vnet(template_content: str) -> str:
+    async def create_vnet(template_content: str) -> str:
         """Create a new virtual network.
         Args:
             template_content: Content of the network template
@@ -256,12 +369,12 @@ def register_tools(mcp, allow_write=False):
                 temp_file.write(template_content)
                 temp_file_path = temp_file.name
         except Exception as e:
-            logger.error(f"Failed to create temporary file: {str(e)}")
+            logger.error("Failed to create temporary file: %s", str(e))
             return f"<error><message>Failed to create temporary file: {str(e)}</message></error>"
 
         try:
             logger.debug("Creating new virtual network from template")
-            output = execute_one_command(["onevnet", "create", temp_file_path])
+            output = await execute_one_command(["onevnet", "create", temp_file_path])
             
             # onevnet create returns "ID: <id>" on success
             if output.startswith("ID:"):
@@ -278,7 +391,7 @@ def register_tools(mcp, allow_write=False):
         name="delete_vnet",
         description="Delete a virtual network.",
     )
-    def delete_vnet(vnet_id: str) -> str:
+    async def delete_vnet(vnet_id: str) -> str:
         """Delete a virtual network.
         Args:
             vnet_id: ID of the virtual network to delete
@@ -291,8 +404,8 @@ def register_tools(mcp, allow_write=False):
         if not vnet_id.isdigit():
             return "<error><message>vnet_id must be a non-negative integer</message></error>"
 
-        logger.debug(f"Deleting virtual network {vnet_id}")
-        result = execute_one_command(["onevnet", "delete", vnet_id])
+        logger.debug("Deleting virtual network %s", vnet_id)
+        result = await execute_one_command(["onevnet", "delete", vnet_id])
         
         if "Error" in result:
              return f"<error><message>{result}</message></error>"
@@ -303,7 +416,7 @@ def register_tools(mcp, allow_write=False):
         name="reserve_vnet",
         description="Reserve addresses from a virtual network.",
     )
-    def reserve_vnet(vnet_id: str, size: str, name: Optional[str] = None) -> str:
+    async def reserve_vnet(vnet_id: str, size: str, name: Optional[str] = None) -> str:
         """Reserve addresses from a virtual network.
         Args:
             vnet_id: ID of the virtual network
@@ -325,8 +438,8 @@ def register_tools(mcp, allow_write=False):
         if name:
             cmd.extend(["--name", name])
 
-        logger.debug(f"Reserving {size} addresses from vnet {vnet_id}")
-        output = execute_one_command(cmd)
+        logger.debug("Reserving %s addresses from vnet %s", size, vnet_id)
+        output = await execute_one_command(cmd)
         
         # onevnet reserve returns "ID: <id>" on success (ID of the new reservation VNET)
         if output.startswith("ID:"):
@@ -339,7 +452,7 @@ def register_tools(mcp, allow_write=False):
         name="enable_host",
         description="Enable a host.",
     )
-    def enable_host(host_id: str) -> str:
+    async def enable_host(host_id: str) -> str:
         """Enable a host.
         Args:
             host_id: ID of the host to enable
@@ -352,8 +465,8 @@ def register_tools(mcp, allow_write=False):
         if not host_id.isdigit():
             return "<error><message>host_id must be a non-negative integer</message></error>"
 
-        logger.debug(f"Enabling host {host_id}")
-        result = execute_one_command(["onehost", "enable", host_id])
+        logger.debug("Enabling host %s", host_id)
+        result = await execute_one_command(["onehost", "enable", host_id])
         
         if "Error" in result:
              return f"<error><message>{result}</message></error>"
@@ -364,7 +477,7 @@ def register_tools(mcp, allow_write=False):
         name="disable_host",
         description="Disable a host.",
     )
-    def disable_host(host_id: str) -> str:
+    async def disable_host(host_id: str) -> str:
         """Disable a host.
         Args:
             host_id: ID of the host to disable
@@ -377,8 +490,8 @@ def register_tools(mcp, allow_write=False):
         if not host_id.isdigit():
             return "<error><message>host_id must be a non-negative integer</message></error>"
 
-        logger.debug(f"Disabling host {host_id}")
-        result = execute_one_command(["onehost", "disable", host_id])
+        logger.debug("Disabling host %s", host_id)
+        result = await execute_one_command(["onehost", "disable", host_id])
         
         if "Error" in result:
              return f"<error><message>{result}</message></error>"
@@ -389,7 +502,7 @@ def register_tools(mcp, allow_write=False):
         name="host_monitoring",
         description="Show monitoring information for a host.",
     )
-    def host_monitoring(host_id: str) -> str:
+    async def host_monitoring(host_id: str) -> str:
         """Show monitoring information for a host.
         Args:
             host_id: ID of the host
@@ -400,5 +513,5 @@ def register_tools(mcp, allow_write=False):
         if not host_id.isdigit():
             return "<error><message>host_id must be a non-negative integer</message></error>"
 
-        logger.debug(f"Getting monitoring info for host {host_id}")
-        return execute_one_command(["onehost", "show", host_id, "--xml"])
+        logger.debug("Getting monitoring info for host %s", host_id)
+        return await execute_one_command(["onehost", "show", host_id, "--xml"])
@@ -17,90 +17,131 @@
 from typing import Optional
 from logging import getLogger
 import xml.etree.ElementTree as ET
-from src.tools.utils.base import execute_one_command
+from src.static import (
+    FIELDS_DESCRIPTION,
+    OUTPUT_FORMAT_DESCRIPTION,
+    PAGINATION_DESCRIPTION,
+)
+from src.tools.utils.base import command_deadline, execute_one_command
+from src.tools.utils.formats import check_output_format, convert_xml
+from src.tools.utils.pagination import list_pool_page, parse_page_args
 
 logger = getLogger("opennebula_mcp.tools.market")
 
+# Seconds allowed for `onemarketapp export`, which downloads the appliance
+MARKET_EXPORT_TIMEOUT = 1800
+
 
 def register_tools(mcp, allow_write=False):
     @mcp.tool(
         name="list_markets",
-        description="List available marketplaces.",
+        description=f"""List available marketplaces.
+        {OUTPUT_FORMAT_DESCRIPTION}
+        """,
     )
-    def list_markets() -> str:
+    async def list_markets(output_format: str = "xml") -> str:
         """List available marketplaces.
+        Args:
+            output_format: "xml" (default), "json" or "csv"
         Returns:
             str: XML string with marketplaces
         """
+        format_error = check_output_format(output_format)
+        if format_error:
+            return format_error
         logger.debug("Listing marketplaces")
-        return execute_one_command(["onemarket", "list", "--xml"])
+        return convert_xml(await execute_one_command(["onemarket", "list", "--xml"]), output_format)
 
     @mcp.tool(
         name="search_market_apps",
-        description="""List or search for appliances in the marketplace by name, description, or tags (case-insensitive).
+        description=f"""List or search for appliances in the marketplace by name, description, or tags (case-insensitive).
         
         **IMPORTANT**: Use this tool when the user requests to "list all marketplace apps" or "show marketplace apps". 
         The `list_markets` tool lists marketplaces (repositories), NOT the apps within them. This tool lists the actual 
         marketplace applications/appliances.
         
         If no filter_str is provided, returns ALL marketplace apps. If filter_str is provided, performs a case-insensitive 
-        search in NAME, DESCRIPTION, and TAGS fields.""",
+        search in NAME, DESCRIPTION, and TAGS fields.
+
+        {PAGINATION_DESCRIPTION}
+        {FIELDS_DESCRIPTION}
+        {OUTPUT_FORMAT_DESCRIPTION}""",
     )
-    def search_market_apps(filter_str: Optional[str] = None) -> str:
+    async def search_market_apps(
+        filter_str: Optional[str] = None,
+        limit: Optional[str] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None,
+        output_format: str = "xml",
+    ) -> str:
         """Search for appliances in the marketplace.
         Args:
             filter_str: Optional string to filter results. Performs case-insensitive search in NAME, DESCRIPTION, and TAGS fields.
                        If not provided, returns all marketplace apps.
+            limit: Optional maximum number of apps to return (page size).
+            cursor: Optional NEXT_CURSOR of the previous page.
+            fields: Optional comma-separated paths to keep in every app.
+            output_format: "xml" (default), "json" or "csv".
         Returns:
             str: XML string with marketplace apps matching the filter
         """
-        logger.debug(f"Searching marketplace apps with filter: {filter_str}")
-        
+        format_error = check_output_format(output_format)
+        if format_error:
+            return format_error
+        logger.debug("Searching marketplace apps with filter: %s", filter_str)
+
+        filter_lower = filter_str.lower() if filter_str else ""
+
+        def matches(app: ET.Element) -> bool:
+            # Check if filter matches name, description, or tags (case-insensitive)
+            for field in ("NAME", "DESCRIPTION", "TAGS"):
+                elem = app.find(field)
+                if elem is not None and elem.text and filter_lower in elem.text.lower():
+                    return True
+            return False
+
         # Get full XML output (filter doesn't work with --xml, so we filter client-side)
         cmd = ["onemarketapp", "list", "--xml"]
-        result = execute_one_command(cmd)
+
+        if limit is not None or cursor is not None or fields is not None:
+            page_error = parse_page_args(limit, cursor)
+            if page_error:
+                return page_error
+            return await list_pool_page(
+                cmd,
+                limit=int(limit) if limit is not None else None,
+                cursor=cursor,
+                match=matches if filter_str else None,
+                fields=fields,
+                output_format=output_format,
+            )
+
+        result = await execute_one_command(cmd)
         
         # If no filter is provided, return all apps
         if not filter_str:
-            return result
+            return convert_xml(result, output_format)
         
         # Parse XML and filter by name, description, or tags (case-insensitive)
         try:
             root = ET.fromstring(result)
-            filter_lower = filter_str.lower()
             
             # Find all MARKETPLACEAPP elements
-            filtered_apps = []
-            for app in root.findall(".//MARKETPLACEAPP"):
-                # Check if filter matches name, description, or tags (case-insensitive)
-                name_elem = app.find("NAME")
-                desc_elem = app.find("DESCRIPTION")
-                tags_elem = app.find("TAGS")
-                
-                matches = False
-                if name_elem is not None and name_elem.text and filter_lower in name_elem.text.lower():
-                    matches = True
-                elif desc_elem is not None and desc_elem.text and filter_lower in desc_elem.text.lower():
-                    matches = True
-                elif tags_elem is not None and tags_elem.text and filter_lower in tags_elem.text.lower():
-                    matches = True
-                
-                if matches:
-                    filtered_apps.append(app)
+            filtered_apps = [app for app in root.findall(".//MARKETPLACEAPP") if matches(app)]
             
             # If no matches found, return empty result
             if not filtered_apps:
-                return "<MARKETPLACEAPP_POOL></MARKETPLACEAPP_POOL>"
+                return convert_xml("<MARKETPLACEAPP_POOL></MARKETPLACEAPP_POOL>", output_format)
             
             # Create new XML with filtered apps
             new_root = ET.Element("MARKETPLACEAPP_POOL")
             for app in filtered_apps:
                 new_root.append(app)
             
-            return ET.tostring(new_root, encoding="unicode")
+            return convert_xml(ET.tostring(new_root, encoding="unicode"), output_format)
             
         except ET.ParseError as e:
-            logger.error(f"Failed to parse marketplace apps XML: {e}")
+            logger.error("Failed to parse marketplace apps XML: %s", e)
             # If parsing fails, return the original result
             return result
 
@@ -108,7 +149,7 @@ def register_tools(mcp, allow_write=False):
         name="import_market_app",
         description="Import an appliance from the marketplace to a datastore.",
     )
-    def import_market_app(
+    async def import_market_app(
         app_id: str,
         datastore_id: str,
         name: Optional[str] = None,
@@ -141,8 +182,9 @@ def register_tools(mcp, allow_write=False):
         
         final_cmd.extend(["--datastore", datastore_id])
 
-        logger.debug(f"Importing market app {app_id} to datastore {datastore_id}")
-        output = execute_one_command(final_cmd)
+        logger.debug("Importing market app %s to datastore %s", app_id, datastore_id)
+        with command_deadline(MARKET_EXPORT_TIMEOUT):
+            output = await execute_one_command(final_cmd)
         
         # onemarketapp export returns "IMAGE ID: <id>" or similar on success
         if "ID:" in output:
@@ -26,19 +26,19 @@ def register_tools(mcp, allow_write=False):
         name="list_service_templates",
         description="List available OneFlow service templates.",
     )
-    def list_service_templates() -> str:
+    async def list_service_templates() -> str:
         """List available OneFlow service templates.
         Returns:
             str: JSON string with service templates
         """
         logger.debug("Listing OneFlow service templates")
-        return execute_one_command(["oneflow-template", "list", "--json"])
+        return await execute_one_command(["oneflow-template", "list", "--json"])
 
     @mcp.tool(
         name="deploy_service",
         description="Deploy a service from a template.",
     )
-    def deploy_service(
+    async def deploy_service(
         template_id: str,
         name: Optional[str] = None,
         custom_attrs: Optional[str] = None,
@@ -67,8 +67,8 @@ def register_tools(mcp, allow_write=False):
         # but the CLI usually takes them as extra arguments or a file.
         # Simpler approach for now: just basic instantiation.
         
-        logger.debug(f"Deploying service from template {template_id}")
-        output = execute_one_command(cmd)
+        logger.debug("Deploying service from template %s", template_id)
+        output = await execute_one_command(cmd)
         
         # oneflow-template instantiate returns "ID: <id>" on success
         if output.startswith("ID:"):
@@ -81,19 +81,19 @@ def register_tools(mcp, allow_write=False):
         name="list_services",
         description="List running OneFlow services.",
     )
-    def list_services() -> str:
+    async def list_services() -> str:
         """List running OneFlow services.
         Returns:
             str: JSON string with services
         """
         logger.debug("Listing OneFlow services")
-        return execute_one_command(["oneflow", "list", "--json"])
+        return await execute_one_command(["oneflow", "list", "--json"])
 
     @mcp.tool(
         name="get_service_info",
         description="Get detailed information about a service.",
     )
-    def get_service_info(service_id: str) -> str:
+    async def get_service_info(service_id: str) -> str:
         """Get detailed information about a service.
         Args:
             service_id: ID of the service
@@ -103,14 +103,14 @@ def register_tools(mcp, allow_write=False):
         if not service_id.isdigit():
             return "<error><message>service_id must be a non-negative integer</message></error>"
 
-        logger.debug(f"Getting info for service {service_id}")
-        return execute_one_command(["oneflow", "show", service_id, "--json"])
+        logger.debug("Getting info for service %s", service_id)
+        return await execute_one_command(["oneflow", "show", service_id, "--json"])
 
     @mcp.tool(
         name="delete_service",
         description="Delete a service.",
     )
-    def delete_service(service_id: str) -> str:
+    async def delete_service(service_id: str) -> str:
         """Delete a service.
         Args:
             service_id: ID of the service to delete
@@ -123,9 +123,9 @@ def register_tools(mcp, allow_write=False):
         if not service_id.isdigit():
             return "<error><message>service_id must be a non-negative integer</message></error>"
 
-        logger.debug(f"Deleting service {service_id}")
+        logger.debug("Deleting service %s", service_id)
         # oneflow delete doesn't output XML, usually just empty or text
-        result = execute_one_command(["oneflow", "delete", service_id])
+        result = await execute_one_command(["oneflow", "delete", service_id])
         
         if "Error" in result:
              return f"<error><message>{result}</message></error>"
@@ -136,7 +136,7 @@ def register_tools(mcp, allow_write=False):
         name="service_action",
         description="Perform an action on a service (shutdown, recover, hold, release, etc.).",
     )
-    def service_action(service_id: str, action: str) -> str:
+    async def service_action(service_id: str, action: str) -> str:
         """Perform an action on a service.
         Args:
             service_id: ID of the service
@@ -153,8 +153,8 @@ def register_tools(mcp, allow_write=False):
         # Validate action against a known list could be good, but CLI handles it too.
         # Common actions: shutdown, shutdown-hard, undeploy, undeploy-hard, hold, release, stop, suspend, resume, boot, delete-recreate, reboot, reboot-hard, poweroff, poweroff-hard, snapshot-create
         
-        logger.debug(f"Performing action {action} on service {service_id}")
-        result = execute_one_command(["oneflow", "action", action, service_id])
+        logger.debug("Performing action %s on service %s", action, service_id)
+        result = await execute_one_command(["oneflow", "action", action, service_id])
         
         if "Error" in result:
              return f"<error><message>{result}</message></error>"
@@ -165,7 +165,7 @@ def register_tools(mcp, allow_write=False):
         name="scale_service",
         description="Scale a role in a service.",
     )
-    def scale_service(service_id: str, role_name: str, cardinality: str) -> str:
+    async def scale_service(service_id: str, role_name: str, cardinality: str) -> str:
         """Scale a role in a service.
         Args:
             service_id: ID of the service
@@ -183,8 +183,8 @@ def register_tools(mcp, allow_write=False):
         if not cardinality.isdigit():
              return "<error><message>cardinality must be a non-negative integer</message></error>"
 
-        logger.debug(f"Scaling role {role_name} in service {service_id} to {cardinality}")
-        result = execute_one_command(["oneflow", "scale", service_id, role_name, cardinality])
+        logger.debug("Scaling role %s in service %s to %s", role_name, service_id, cardinality)
+        result = await execute_one_command(["oneflow", "scale", service_id, role_name, cardinality])
         
         if "Error" in result:
              return f"<error><message>{result}</message></error>"
@@ -195,7 +195,7 @@ def register_tools(mcp, allow_write=False):
         name="get_service_log",
         description="Get the log of a OneFlow service.",
     )
-    def get_service_log(service_id: str) -> str:
+    async def get_service_log(service_id: str) -> str:
         """Get the log of a OneFlow service.
         Args:
             service_id: ID of the service
@@ -205,15 +205,15 @@ def register_tools(mcp, allow_write=False):
         if not service_id.isdigit():
             return "<error><message>service_id must be a non-negative integer</message></error>"
 
-        logger.debug(f"Getting log for service {service_id}")
+        logger.debug("Getting log for service %s", service_id)
         # onelog get-service <id> returns raw text log
-        return execute_one_command(["onelog", "get-service", service_id])
+        return await execute_one_command(["onelog", "get-service", service_id])
 
     @mcp.tool(
         name="recover_service",
         description="Recover a failed service.",
     )
-    def recover_service(service_id: str) -> str:
+    async def recover_service(service_id: str) -> str:
         """Recover a failed service.
         Args:
             service_id: ID of the service
@@ -226,8 +226,8 @@ def register_tools(mcp, allow_write=False):
         if not service_id.isdigit():
             return "<error><message>service_id must be a non-negative integer</message></error>"
 
-        logger.debug(f"Recovering service {service_id}")
-        result = execute_one_command(["oneflow", "recover", service_id])
+        logger.debug("Recovering service %s", service_id)
+        result = await execute_one_command(["oneflow", "recover", service_id])
         
         if "Error" in result:
              return f"<error><message>{result}</message></error>"
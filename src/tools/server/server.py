@@ -0,0 +1,66 @@
+# Copyright 2002-2025, OpenNebula Project, OpenNebula Systems
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tools reporting on the MCP server itself."""
+
+from logging import getLogger
+
+from src.tools.utils.formats import OUTPUT_FORMATS, convert_xml
+from src.tools.utils.metrics import metrics
+
+logger = getLogger("opennebula_mcp.tools.server")
+
+METRICS_FORMATS = OUTPUT_FORMATS + ("openmetrics",)
+
+
+def register_tools(mcp, allow_write=False):
+    @mcp.tool(
+        name="server_metrics",
+        description="""Report the latency, output size and error count of this MCP server's tools and of the
+        OpenNebula commands they run, since the server started.
+
+        Use it to find out which tools or commands are slow; it does not query OpenNebula.
+
+        Args:
+            output_format: "xml" (default), "json", "csv" or "openmetrics" (the OpenMetrics text format with
+                every histogram bucket).
+
+        Returns:
+            str: A <METRICS> document with one <TOOL> per tool (by NAME) and one <COMMAND> per CLI binary
+            (by BINARY), slowest in total first. Each holds CALLS, ERRORS, DURATION_SUM and estimated
+            DURATION_P50/P95/P99 in seconds, SUBPROCESS_SUM (time spent in OpenNebula commands),
+            PARSE_SUM (tools only, time spent parsing XML) and OUTPUT_BYTES_SUM.
+        """,
+    )
+    async def server_metrics(output_format: str = "xml") -> str:
+        """Return the server's tool and command metrics.
+
+        Args:
+            output_format: "xml" (default), "json", "csv" or "openmetrics"
+
+        Returns:
+            str: <METRICS> document, or OpenMetrics text
+        """
+        if output_format not in METRICS_FORMATS:
+            return (
+                f"<error><message>Invalid output_format '{output_format}'. "
+                f"Valid formats: {', '.join(METRICS_FORMATS)}</message></error>"
+            )
+        if not metrics.enabled:
+            return "<error><message>Metrics are disabled on this MCP instance.</message></error>"
+
+        logger.debug("Reporting server metrics")
+        if output_format == "openmetrics":
+            return metrics.to_openmetrics()
+        return convert_xml(metrics.to_xml(), output_format)
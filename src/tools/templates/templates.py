@@ -19,7 +19,14 @@ from typing import Optional
 import tempfile
 import os
 import xml.etree.ElementTree as ET
+from src.static import (
+    FIELDS_DESCRIPTION,
+    OUTPUT_FORMAT_DESCRIPTION,
+    PAGINATION_DESCRIPTION,
+)
 from src.tools.utils.base import execute_one_command
+from src.tools.utils.formats import check_output_format, convert_xml
+from src.tools.utils.pagination import list_pool_page, parse_page_args
 
 logger = getLogger("opennebula_mcp.tools.templates")
 
@@ -27,15 +34,45 @@ logger = getLogger("opennebula_mcp.tools.templates")
 def register_tools(mcp, allow_write):
     @mcp.tool(
         name="list_templates",
-        description="List all OpenNebula VM templates accessible to the current user.",
+        description=f"""List all OpenNebula VM templates accessible to the current user.
+        {PAGINATION_DESCRIPTION}
+        {FIELDS_DESCRIPTION}
+        {OUTPUT_FORMAT_DESCRIPTION}
+        """,
     )
-    def list_templates() -> str:
+    async def list_templates(
+        limit: Optional[str] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None,
+        output_format: str = "xml",
+    ) -> str:
         """List all OpenNebula VM templates accessible to the current user.
+        Args:
+            limit: Optional[str]: Maximum number of templates to return (page size)
+            cursor: Optional[str]: NEXT_CURSOR of the previous page
+            fields: Optional[str]: Comma-separated paths to keep in every template
+            output_format: str: "xml" (default), "json" or "csv"
         Returns:
             str: XML string conforming to Template Pool XSD Schema
         """
+        format_error = check_output_format(output_format)
+        if format_error:
+            return format_error
         logger.debug("Listing OpenNebula VM templates")
-        return execute_one_command(["onetemplate", "list", "--xml"])
+        command_parts = ["onetemplate", "list", "--xml"]
+        if limit is None and cursor is None and fields is None:
+            return convert_xml(await execute_one_command(command_parts), output_format)
+
+        page_error = parse_page_args(limit, cursor)
+        if page_error:
+            return page_error
+        return await list_pool_page(
+            command_parts,
+            limit=int(limit) if limit is not None else None,
+            cursor=cursor,
+            fields=fields,
+            output_format=output_format,
+        )
 
     @mcp.tool(
         name="update_template",
@@ -54,7 +91,7 @@ def register_tools(mcp, allow_write):
             str: XML string with operation result or error message.
         """,
     )
-    def update_template(template_id: str, content: str, append: bool = False) -> str:
+    async def update_template(template_id: str, content: str, append: bool = False) -> str:
         """Update the content of an existing template."""
         if not allow_write:
             logger.warning("update_template called while allow_write=False")
@@ -68,13 +105,13 @@ def register_tools(mcp, allow_write):
             tmp.write(content)
             tmp_path = tmp.name
 
-        logger.debug(f"Updating template {template_id} (append={append})")
+        logger.debug("Updating template %s (append=%s)", template_id, append)
         try:
             cmd_parts = ["onetemplate", "update", template_id, tmp_path]
             if append:
                 cmd_parts.append("--append")
 
-            result = execute_one_command(cmd_parts)
+            result = await execute_one_command(cmd_parts)
 
             # Success wrapper
             success_root = ET.Element("result")
@@ -86,7 +123,7 @@ def register_tools(mcp, allow_write):
             return ET.tostring(success_root, encoding="unicode")
 
         except Exception as e:
-            logger.error(f"Failed to update template {template_id}: {e}")
+            logger.error("Failed to update template %s: %s", template_id, e)
             return f"<error><message>Failed to update template: {e}</message></error>"
         finally:
             if os.path.exists(tmp_path):
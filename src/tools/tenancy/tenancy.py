@@ -18,7 +18,9 @@ from typing import Optional
 from logging import getLogger
 import tempfile
 import os
+from src.static import OUTPUT_FORMAT_DESCRIPTION
 from src.tools.utils.base import execute_one_command
+from src.tools.utils.formats import check_output_format, convert_xml
 
 logger = getLogger("opennebula_mcp.tools.tenancy")
 
@@ -29,15 +31,22 @@ def register_tools(mcp, allow_write=False):
     
     @mcp.tool(
         name="list_users",
-        description="List all users.",
+        description=f"""List all users.
+        {OUTPUT_FORMAT_DESCRIPTION}
+        """,
     )
-    def list_users() -> str:
+    async def list_users(output_format: str = "xml") -> str:
         """List all users.
+        Args:
+            output_format: "xml" (default), "json" or "csv"
         Returns:
             str: XML string with users
         """
+        format_error = check_output_format(output_format)
+        if format_error:
+            return format_error
         logger.debug("Listing users")
-        return execute_one_command(["oneuser", "list", "--xml"])
+        return convert_xml(await execute_one_command(["oneuser", "list", "--xml"]), output_format)
 
     @mcp.tool(
         name="create_user",
@@ -53,7 +62,7 @@ def register_tools(mcp, allow_write=False):
         If the user explicitly mentions "public user" or "public authentication", set `auth_driver='public'`.
         """,
     )
-    def create_user(
+    async def create_user(
         name: str,
         password: str,
         auth_driver: Optional[str] = None,
@@ -73,8 +82,8 @@ def register_tools(mcp, allow_write=False):
         if auth_driver:
             cmd.extend(["--driver", auth_driver])
             
-        logger.debug(f"Creating user {name}")
-        output = execute_one_command(cmd)
+        logger.debug("Creating user %s", name)
+        output = await execute_one_command(cmd)
         
         # oneuser create returns "ID: <id>" on success
         if output.startswith("ID:"):
@@ -87,7 +96,7 @@ def register_tools(mcp, allow_write=False):
         name="update_user_quota",
         description="Update user quotas.",
     )
-    def update_user_quota(user_id: str, quota_template: str) -> str:
+    async def update_user_quota(user_id: str, quota_template: str) -> str:
         """Update user quotas.
         Args:
             user_id: ID of the user
@@ -101,14 +110,14 @@ def register_tools(mcp, allow_write=False):
         if not user_id.isdigit():
             return "<error><message>user_id must be a non-negative integer</message></error>"
 
-        logger.debug(f"Updating quotas for user {user_id}")
+        logger.debug("Updating quotas for user %s", user_id)
         
         with tempfile.NamedTemporaryFile(mode='w', delete=False) as tmp:
             tmp.write(quota_template)
             tmp_path = tmp.name
 
         try:
-            result = execute_one_command(["oneuser", "quota", user_id, tmp_path])
+            result = await execute_one_command(["oneuser", "quota", user_id, tmp_path])
             if "Error" in result:
                  return f"<error><message>{result}</message></error>"
             return f"<success><message>Quotas updated for user {user_id}</message><user_id>{user_id}</user_id></success>"
@@ -120,7 +129,7 @@ def register_tools(mcp, allow_write=False):
         name="delete_user",
         description="Delete a user.",
     )
-    def delete_user(user_id: str) -> str:
+    async def delete_user(user_id: str) -> str:
         """Delete a user.
         Args:
             user_id: ID of the user to delete
@@ -133,8 +142,8 @@ def register_tools(mcp, allow_write=False):
         if not user_id.isdigit():
             return "<error><message>user_id must be a non-negative integer</message></error>"
 
-        logger.debug(f"Deleting user {user_id}")
-        result = execute_one_command(["oneuser", "delete", user_id])
+        logger.debug("Deleting user %s", user_id)
+        result = await execute_one_command(["oneuser", "delete", user_id])
         
         if "Error" in result:
              return f"<error><message>{result}</message></error>"
@@ -145,21 +154,28 @@ def register_tools(mcp, allow_write=False):
 
     @mcp.tool(
         name="list_groups",
-        description="List all groups.",
+        description=f"""List all groups.
+        {OUTPUT_FORMAT_DESCRIPTION}
+        """,
     )
-    def list_groups() -> str:
+    async def list_groups(output_format: str = "xml") -> str:
         """List all groups.
+        Args:
+            output_format: "xml" (default), "json" or "csv"
         Returns:
             str: XML string with groups
         """
+        format_error = check_output_format(output_format)
+        if format_error:
+            return format_error
         logger.debug("Listing groups")
-        return execute_one_command(["onegroup", "list", "--xml"])
+        return convert_xml(await execute_one_command(["onegroup", "list", "--xml"]), output_format)
 
     @mcp.tool(
         name="create_group",
         description="Create a new group.",
     )
-    def create_group(name: str) -> str:
+    async def create_group(name: str) -> str:
         """Create a new group.
         Args:
             name: Group name
@@ -169,8 +185,8 @@ def register_tools(mcp, allow_write=False):
         if not allow_write:
             return "<error><message>Write operations are disabled</message></error>"
 
-        logger.debug(f"Creating group {name}")
-        output = execute_one_command(["onegroup", "create", name])
+        logger.debug("Creating group %s", name)
+        output = await execute_one_command(["onegroup", "create", name])
         
         # onegroup create returns "ID: <id>" on success
         if output.startswith("ID:"):
@@ -183,7 +199,7 @@ def register_tools(mcp, allow_write=False):
         name="add_user_to_group",
         description="Add a user to a group.",
     )
-    def add_user_to_group(group_id: str, user_id: str, admin: bool = False) -> str:
+    async def add_user_to_group(group_id: str, user_id: str, admin: bool = False) -> str:
         """Add a user to a group.
         Args:
             group_id: ID of the group
@@ -201,9 +217,9 @@ def register_tools(mcp, allow_write=False):
             return "<error><message>user_id must be a non-negative integer</message></error>"
 
         action = "add_admin" if admin else "add_user"
-        logger.debug(f"Adding user {user_id} to group {group_id} (admin={admin})")
+        logger.debug("Adding user %s to group %s (admin=%s)", user_id, group_id, admin)
         
-        result = execute_one_command(["onegroup", action, group_id, user_id])
+        result = await execute_one_command(["onegroup", action, group_id, user_id])
         
         if "Error" in result:
              return f"<error><message>{result}</message></error>"
@@ -214,7 +230,7 @@ def register_tools(mcp, allow_write=False):
         name="delete_group",
         description="Delete a group.",
     )
-    def delete_group(group_id: str) -> str:
+    async def delete_group(group_id: str) -> str:
         """Delete a group.
         Args:
             group_id: ID of the group to delete
@@ -227,8 +243,8 @@ def register_tools(mcp, allow_write=False):
         if not group_id.isdigit():
             return "<error><message>group_id must be a non-negative integer</message></error>"
 
-        logger.debug(f"Deleting group {group_id}")
-        result = execute_one_command(["onegroup", "delete", group_id])
+        logger.debug("Deleting group %s", group_id)
+        result = await execute_one_command(["onegroup", "delete", group_id])
         
         if "Error" in result:
              return f"<error><message>{result}</message></error>"
@@ -239,15 +255,22 @@ def register_tools(mcp, allow_write=False):
 
     @mcp.tool(
         name="list_acls",
-        description="List all ACLs.",
+        description=f"""List all ACLs.
+        {OUTPUT_FORMAT_DESCRIPTION}
+        """,
     )
-    def list_acls() -> str:
+    async def list_acls(output_format: str = "xml") -> str:
         """List all ACLs.
+        Args:
+            output_format: "xml" (default), "json" or "csv"
         Returns:
             str: XML string with ACLs
         """
+        format_error = check_output_format(output_format)
+        if format_error:
+            return format_error
         logger.debug("Listing ACLs")
-        return execute_one_command(["oneacl", "list", "--xml"])
+        return convert_xml(await execute_one_command(["oneacl", "list", "--xml"]), output_format)
 
     @mcp.tool(
         name="create_acl",
@@ -266,7 +289,7 @@ def register_tools(mcp, allow_write=False):
         - All users using all resources: `user='*'`, `resources='*'`, `rights='USE'`
         """,
     )
-    def create_acl(user: str, resources: str, rights: str) -> str:
+    async def create_acl(user: str, resources: str, rights: str) -> str:
         """Create a new ACL rule.
         Args:
             user: User component (e.g., '#<id>', '@<id>', '*'). **MUST include '#' prefix for user IDs**.
@@ -281,8 +304,8 @@ def register_tools(mcp, allow_write=False):
         # Construct the rule string
         rule = f"{user} {resources} {rights}"
         
-        logger.debug(f"Creating ACL rule: {rule}")
-        output = execute_one_command(["oneacl", "create", rule])
+        logger.debug("Creating ACL rule: %s", rule)
+        output = await execute_one_command(["oneacl", "create", rule])
         
         # oneacl create returns "ID: <id>" on success
         if output.startswith("ID:"):
@@ -295,7 +318,7 @@ def register_tools(mcp, allow_write=False):
         name="delete_acl",
         description="Delete an ACL rule.",
     )
-    def delete_acl(acl_id: str) -> str:
+    async def delete_acl(acl_id: str) -> str:
         """Delete an ACL rule.
         Args:
             acl_id: ID of the ACL rule to delete
@@ -308,8 +331,8 @@ def register_tools(mcp, allow_write=False):
         if not acl_id.isdigit():
             return "<error><message>acl_id must be a non-negative integer</message></error>"
 
-        logger.debug(f"Deleting ACL {acl_id}")
-        result = execute_one_command(["oneacl", "delete", acl_id])
+        logger.debug("Deleting ACL %s", acl_id)
+        result = await execute_one_command(["oneacl", "delete", acl_id])
         
         if "Error" in result:
              return f"<error><message>{result}</message></error>"
@@ -0,0 +1,541 @@
+# Copyright 2002-2025, OpenNebula Project, OpenNebula Systems
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Command execution backends used by ``execute_one_command``.
+
+Two backends are available:
+
+* ``cli``    – forks the OpenNebula Ruby CLI (``onevm``, ``onehost``, ...). This is
+               the default and supports every command.
+* ``xmlrpc`` – talks to oned directly over XML-RPC using a small pool of
+               keep-alive HTTP connections. Only the commands listed in
+               ``_translate`` are handled natively; everything else (and any
+               transport failure) falls back to the CLI backend.
+
+Both backends return the same text the CLI would print and signal command
+failures by raising ``subprocess.CalledProcessError`` so that the XML error
+envelope built by ``execute_one_command`` stays identical.
+"""
+
+import asyncio
+import os
+import queue
+import signal
+import subprocess
+import xmlrpc.client
+from contextlib import contextmanager
+from logging import getLogger
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, List, Optional, Tuple
+
+logger = getLogger("opennebula_mcp.utils.backends")
+
+DEFAULT_XMLRPC_ENDPOINT = "http://localhost:2633/RPC2"
+DEFAULT_POOL_SIZE = 8
+# Seconds an XML-RPC call may wait on its socket; a hung call would otherwise
+# hold its worker thread forever, as deadlines cannot interrupt it
+DEFAULT_XMLRPC_TIMEOUT = 60.0
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Pool filter flag used by the CLI when no filter is given: every resource the
+# user is allowed to see.
+POOL_FILTER_ALL = -2
+
+# CLI filterflag keywords (`onevm list <filterflag>`) -> oned pool filter flag.
+# A non-negative integer filterflag selects the resources owned by that UID.
+POOL_FILTER_FLAGS = {
+    "a": POOL_FILTER_ALL,
+    "all": POOL_FILTER_ALL,
+    "m": -3,
+    "mine": -3,
+    "g": -4,
+    "group": -4,
+}
+
+# VM state filter used by `onevm list`: any state except DONE.
+VM_STATE_ANY_BUT_DONE = -1
+
+# `<binary> list --xml` -> (XML-RPC method, whether the pool takes filter/range args)
+POOL_METHODS = {
+    "onevm": ("one.vmpool.info", True),
+    "onehost": ("one.hostpool.info", False),
+    "onecluster": ("one.clusterpool.info", False),
+    "onedatastore": ("one.datastorepool.info", False),
+    "onevnet": ("one.vnpool.info", True),
+    "oneimage": ("one.imagepool.info", True),
+    "onetemplate": ("one.templatepool.info", True),
+    "oneuser": ("one.userpool.info", False),
+    "onegroup": ("one.grouppool.info", False),
+    "oneacl": ("one.acl.info", False),
+    "onemarket": ("one.marketpool.info", False),
+    "onemarketapp": ("one.marketapppool.info", True),
+}
+
+# `<binary> show <id> --xml` -> XML-RPC method
+SHOW_METHODS = {
+    "onevm": "one.vm.info",
+    "onehost": "one.host.info",
+    "onecluster": "one.cluster.info",
+    "onedatastore": "one.datastore.info",
+    "onevnet": "one.vn.info",
+    "oneimage": "one.image.info",
+    "onetemplate": "one.template.info",
+    "oneuser": "one.user.info",
+    "onegroup": "one.group.info",
+    "onemarket": "one.market.info",
+    "onemarketapp": "one.marketapp.info",
+}
+
+# `onevm <subcommand>` -> one.vm.action action name (plain, --hard)
+VM_ACTIONS = {
+    "resume": ("resume", "resume"),
+    "poweroff": ("poweroff", "poweroff-hard"),
+    "reboot": ("reboot", "reboot-hard"),
+    "terminate": ("terminate", "terminate-hard"),
+}
+
+
+async def _spawn(command_parts: List[str]) -> asyncio.subprocess.Process:
+    """Start a command with piped output in a session of its own.
+
+    stdin is /dev/null so that a prompt fails instead of waiting forever (or
+    reading the MCP stdio stream), and the new session makes the command the
+    leader of a process group that ``_kill`` can terminate as a whole.
+    """
+    return await asyncio.create_subprocess_exec(
+        *command_parts,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        start_new_session=True,
+    )
+
+
+def _kill(process: asyncio.subprocess.Process) -> None:
+    """Kill a command started by ``_spawn`` and every process it started."""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+    if process.returncode is None:
+        process.kill()
+
+
+class CliBackend:
+    """Execute commands by forking the OpenNebula CLI."""
+
+    name = "cli"
+
+    def supports_pool_range(self, command_parts: List[str]) -> bool:
+        """The CLI has no way to list a slice of a pool."""
+        return False
+
+    async def execute(self, command_parts: List[str]) -> str:
+        process = await _spawn(command_parts)
+        try:
+            stdout, stderr = await process.communicate()
+        finally:
+            if process.returncode is None:
+                # Cancelled (e.g. by a timeout): do not leave the command running
+                _kill(process)
+                await process.wait()
+
+        stdout_text = stdout.decode("utf-8", errors="replace")
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(
+                returncode=process.returncode,
+                cmd=command_parts,
+                output=stdout_text,
+                stderr=stderr.decode("utf-8", errors="replace"),
+            )
+        return stdout_text
+
+    async def stream(
+        self,
+        command_parts: List[str],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        state: Optional[int] = None,
+        pool_range: Optional[Tuple[int, int]] = None,
+        id_range: Optional[Tuple[int, int]] = None,
+    ) -> AsyncIterator[bytes]:
+        """Yield the command's stdout in chunks as the process writes it.
+
+        stderr is drained concurrently so a chatty command cannot block on a
+        full pipe. If the consumer stops early the process is killed. The CLI
+        has no VM state or ID filter, so *state* and *id_range* are ignored.
+        """
+        if pool_range is not None:
+            raise ValueError("The CLI backend cannot list a range of a pool")
+        process = await _spawn(command_parts)
+        stderr_task = asyncio.ensure_future(process.stderr.read())
+        try:
+            while True:
+                chunk = await process.stdout.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+            stderr = await stderr_task
+            returncode = await process.wait()
+            if returncode != 0:
+                raise subprocess.CalledProcessError(
+                    returncode=returncode,
+                    cmd=command_parts,
+                    output="",
+                    stderr=stderr.decode("utf-8", errors="replace"),
+                )
+        finally:
+            if process.returncode is None:
+                _kill(process)
+                # wait() only returns once both pipes are closed, and reading
+                # stdout is paused when the consumer stopped early.
+                await process.stdout.read()
+                await process.wait()
+            stderr_task.cancel()
+
+
+class XmlRpcBackend:
+    """Execute commands through oned's XML-RPC API.
+
+    Args:
+        endpoint: oned XML-RPC URL. Defaults to ``$ONE_XMLRPC`` or
+            ``http://localhost:2633/RPC2``.
+        session: ``user:password`` session string. Defaults to the content of
+            ``$ONE_AUTH`` or ``~/.one/one_auth``.
+        pool_size: Maximum number of idle keep-alive connections kept around.
+        fallback: Backend used for commands without a native translation.
+        timeout: Socket timeout in seconds of every XML-RPC call.
+
+    Note:
+        A read whose connection fails is retried once on a new connection
+        (a pooled one may have been closed by oned while idle), then run by
+        the fallback. An action is sent on a new connection and never
+        re-sent: oned may have received it before the connection failed, so
+        the error is raised instead of risking running it twice.
+    """
+
+    name = "xmlrpc"
+
+    def __init__(
+        self,
+        endpoint: Optional[str] = None,
+        session: Optional[str] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        fallback: Optional[CliBackend] = None,
+        timeout: float = DEFAULT_XMLRPC_TIMEOUT,
+    ) -> None:
+        self.endpoint = endpoint or os.getenv("ONE_XMLRPC") or DEFAULT_XMLRPC_ENDPOINT
+        self.timeout = timeout
+        self._session = session
+        self._pool: "queue.LifoQueue[xmlrpc.client.ServerProxy]" = queue.LifoQueue(
+            maxsize=pool_size
+        )
+        self.fallback = fallback or CliBackend()
+
+    @property
+    def session(self) -> str:
+        if self._session is None:
+            self._session = _read_one_auth()
+        return self._session
+
+    def supports_pool_range(self, command_parts: List[str]) -> bool:
+        """Whether *command_parts* is a pool listing oned can slice by range."""
+        call = _translate(command_parts)
+        return call is not None and len(call[1]) >= 3
+
+    async def execute(
+        self,
+        command_parts: List[str],
+        state: Optional[int] = None,
+        pool_range: Optional[Tuple[int, int]] = None,
+        id_range: Optional[Tuple[int, int]] = None,
+    ) -> str:
+        call = _translate(command_parts, state, pool_range, id_range)
+        if call is None:
+            if pool_range is not None:
+                raise ValueError(f"No XML-RPC pool range query for {command_parts[0]}")
+            logger.debug(
+                "No XML-RPC translation for %s, falling back to CLI", command_parts[0]
+            )
+            return await self.fallback.execute(command_parts)
+
+        method, params, render = call
+        # xmlrpc.client is blocking; run it off the event loop
+        if not _is_read(method):
+            # Never re-sent nor run by the CLI: it may already have been applied
+            response = await asyncio.to_thread(self._call, method, *params, fresh=True)
+        else:
+            try:
+                try:
+                    response = await asyncio.to_thread(self._call, method, *params)
+                except (OSError, xmlrpc.client.ProtocolError) as e:
+                    logger.debug("XML-RPC call %s failed (%s), retrying on a new connection", method, e)
+                    response = await asyncio.to_thread(self._call, method, *params, fresh=True)
+            except (OSError, xmlrpc.client.ProtocolError) as e:
+                if pool_range is not None:
+                    # The CLI cannot list a range, so the result would be wrong
+                    raise
+                logger.warning(
+                    "XML-RPC call %s to %s failed (%s), falling back to CLI", method, self.endpoint, e
+                )
+                return await self.fallback.execute(command_parts)
+
+        success, body = response[0], response[1]
+        if not success:
+            error_code = response[2] if len(response) > 2 else 1
+            raise subprocess.CalledProcessError(
+                returncode=error_code, cmd=command_parts, output="", stderr=str(body)
+            )
+        return render(body)
+
+    async def stream(
+        self,
+        command_parts: List[str],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        state: Optional[int] = None,
+        pool_range: Optional[Tuple[int, int]] = None,
+        id_range: Optional[Tuple[int, int]] = None,
+    ) -> AsyncIterator[bytes]:
+        """Yield the command output in chunks.
+
+        oned returns whole XML-RPC responses, so translated commands are
+        fetched in one call and re-chunked; the rest stream from the CLI.
+        *state*, *pool_range* and *id_range* are pushed down to oned for pool
+        listings.
+        """
+        if pool_range is None and _translate(command_parts, state) is None:
+            async for chunk in self.fallback.stream(command_parts, chunk_size):
+                yield chunk
+            return
+
+        data = (await self.execute(command_parts, state, pool_range, id_range)).encode("utf-8")
+        for offset in range(0, len(data), chunk_size):
+            yield data[offset : offset + chunk_size]
+
+    def close(self) -> None:
+        """Close every pooled connection."""
+        while True:
+            try:
+                proxy = self._pool.get_nowait()
+            except queue.Empty:
+                return
+            proxy("close")()
+
+    def _call(self, method: str, *params: Any, fresh: bool = False) -> list:
+        with self._connection(fresh) as proxy:
+            return getattr(proxy, method)(self.session, *params)
+
+    @contextmanager
+    def _connection(self, fresh: bool = False):
+        """Borrow a keep-alive ServerProxy from the pool.
+
+        ServerProxy is not thread-safe, so each concurrent caller gets its own
+        proxy; idle ones are returned to the pool and their HTTP/1.1 connection
+        is reused by the next call. A proxy that raised is discarded. If
+        *fresh*, a new proxy (and so a new connection) is used.
+        """
+        proxy = None
+        if not fresh:
+            try:
+                proxy = self._pool.get_nowait()
+            except queue.Empty:
+                pass
+        if proxy is None:
+            if self.endpoint.startswith("https"):
+                transport: xmlrpc.client.Transport = _TimeoutSafeTransport(self.timeout)
+            else:
+                transport = _TimeoutTransport(self.timeout)
+            proxy = xmlrpc.client.ServerProxy(self.endpoint, transport=transport, allow_none=True)
+
+        try:
+            yield proxy
+        except BaseException:
+            proxy("close")()
+            raise
+
+        try:
+            self._pool.put_nowait(proxy)
+        except queue.Full:
+            proxy("close")()
+
+
+class _TimeoutTransport(xmlrpc.client.Transport):
+    """HTTP transport whose connections time out after *timeout* seconds."""
+
+    def __init__(self, timeout: float) -> None:
+        super().__init__()
+        self.timeout = timeout
+
+    def make_connection(self, host):
+        connection = super().make_connection(host)
+        connection.timeout = self.timeout
+        return connection
+
+
+class _TimeoutSafeTransport(xmlrpc.client.SafeTransport):
+    """HTTPS transport whose connections time out after *timeout* seconds."""
+
+    def __init__(self, timeout: float) -> None:
+        super().__init__()
+        self.timeout = timeout
+
+    def make_connection(self, host):
+        connection = super().make_connection(host)
+        connection.timeout = self.timeout
+        return connection
+
+
+def _is_read(method: str) -> bool:
+    """Whether the XML-RPC *method* only reads (``one.vm.info``, ``one.vmpool.info``, ...)."""
+    return method.rsplit(".", 1)[-1].startswith("info")
+
+
+def _read_one_auth() -> str:
+    """Return the session string from $ONE_AUTH or ~/.one/one_auth."""
+    auth_path = Path(os.getenv("ONE_AUTH") or Path.home() / ".one" / "one_auth")
+    try:
+        return auth_path.read_text(encoding="utf-8").strip()
+    except OSError as e:
+        raise RuntimeError(f"Unable to read OpenNebula credentials from {auth_path}: {e}")
+
+
+def _as_text(body: Any) -> str:
+    return body if isinstance(body, str) else str(body)
+
+
+def _action_output(body: Any) -> str:
+    # The CLI prints nothing for successful lifecycle actions
+    return ""
+
+
+def _pool_filter_flag(filterflag: str) -> Optional[int]:
+    """Return the oned pool filter flag for a CLI filterflag, if supported."""
+    if filterflag.isdigit():
+        return int(filterflag)
+    return POOL_FILTER_FLAGS.get(filterflag)
+
+
+def _translate(
+    command_parts: List[str],
+    state: Optional[int] = None,
+    pool_range: Optional[Tuple[int, int]] = None,
+    id_range: Optional[Tuple[int, int]] = None,
+) -> Optional[Tuple[str, Tuple[Any, ...], Callable[[Any], str]]]:
+    """Map a CLI invocation to an XML-RPC call.
+
+    Args:
+        command_parts: CLI command, e.g. ``['onevm', 'list', '5', '--xml']``
+        state: VM state to filter VM pool listings on (any but DONE if None)
+        pool_range: (offset, size) slice of a filterable pool listing. size
+            must be at least 2, as -1 would select the whole pool.
+        id_range: (first ID, last ID) of a filterable pool listing, ignored
+            if *pool_range* is given.
+
+    Returns:
+        (method, params, render) where *render* turns the response body into the
+        text the CLI would have printed, or None if the command is not supported.
+    """
+    if len(command_parts) < 2:
+        return None
+
+    binary, subcommand, args = command_parts[0], command_parts[1], command_parts[2:]
+
+    if subcommand == "list" and args[-1:] == ["--xml"] and binary in POOL_METHODS:
+        method, filtered = POOL_METHODS[binary]
+        params: Tuple[Any, ...] = ()
+        if len(args) == 1:
+            filter_flag: Optional[int] = POOL_FILTER_ALL
+        elif len(args) == 2 and filtered:
+            filter_flag = _pool_filter_flag(args[0])
+        else:
+            filter_flag = None
+        if filter_flag is None or (pool_range is not None and not filtered):
+            return None
+        if filtered:
+            if pool_range:
+                # oned reads an end below -1 as "LIMIT start, -end"
+                start, end = pool_range[0], -pool_range[1]
+            else:
+                start, end = id_range or (-1, -1)
+            params = (filter_flag, start, end)
+            if binary == "onevm":
+                params += (VM_STATE_ANY_BUT_DONE if state is None else state,)
+        return method, params, _as_text
+
+    if (
+        subcommand == "show"
+        and len(args) == 2
+        and args[0].isdigit()
+        and args[1] == "--xml"
+        and binary in SHOW_METHODS
+    ):
+        return SHOW_METHODS[binary], (int(args[0]),), _as_text
+
+    if binary == "onevm" and subcommand in VM_ACTIONS:
+        hard = "--hard" in args
+        ids = [a for a in args if a != "--hard"]
+        # Lists and ranges are expanded by the CLI, keep using it for those
+        if len(ids) == 1 and ids[0].isdigit():
+            action = VM_ACTIONS[subcommand][1 if hard else 0]
+            return "one.vm.action", (action, int(ids[0])), _action_output
+
+    return None
+
+
+_backend: Any = CliBackend()
+
+
+def get_backend():
+    """Return the backend currently used by ``execute_one_command``."""
+    return _backend
+
+
+def configure_backend(
+    name: Optional[str] = None,
+    endpoint: Optional[str] = None,
+    session: Optional[str] = None,
+    pool_size: int = DEFAULT_POOL_SIZE,
+    timeout: float = DEFAULT_XMLRPC_TIMEOUT,
+) -> None:
+    """Select the command execution backend.
+
+    Args:
+        name: "cli" or "xmlrpc". If None, uses the ONE_MCP_BACKEND environment
+              variable or defaults to "cli".
+        endpoint: oned XML-RPC endpoint (xmlrpc backend only).
+        session: ``user:password`` session string (xmlrpc backend only).
+        pool_size: Maximum number of idle keep-alive connections (xmlrpc only).
+        timeout: Socket timeout in seconds of XML-RPC calls (xmlrpc only).
+
+    Raises:
+        ValueError: If *name* is not a known backend.
+    """
+    global _backend
+
+    name = (name or os.getenv("ONE_MCP_BACKEND") or "cli").strip().lower()
+
+    if name == "cli":
+        new_backend: Any = CliBackend()
+    elif name == "xmlrpc":
+        new_backend = XmlRpcBackend(
+            endpoint=endpoint, session=session, pool_size=pool_size, timeout=timeout
+        )
+    else:
+        raise ValueError(f"Invalid backend '{name}'. Valid backends: cli, xmlrpc")
+
+    if isinstance(_backend, XmlRpcBackend):
+        _backend.close()
+    _backend = new_backend
+
+    logger.info("Command backend set to %s", name)
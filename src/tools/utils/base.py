@@ -14,13 +14,44 @@
 
 """Base utilities for OpenNebula infrastructure tools."""
 
+import asyncio
 import ipaddress
+import os
 import subprocess
-from typing import List
+import time
+import weakref
+from contextlib import aclosing, contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
 from logging import getLogger
 
+from src.logging_config import log_slow_call, sanitize_command
+from src.tools.utils.backends import DEFAULT_CHUNK_SIZE, get_backend
+from src.tools.utils.cache import pool_cache
+from src.tools.utils.metrics import add_stage_time, metrics
+from src.tools.utils.singleflight import single_flight
+from src.tools.utils.tracing import tracer
+
 logger = getLogger("opennebula_mcp.utils.base")
 
+DEFAULT_MAX_CONCURRENCY = 16
+DEFAULT_COMMAND_TIMEOUT = 120.0
+
+# Exit code reported for commands killed on timeout, as timeout(1) does
+TIMEOUT_EXIT_CODE = 124
+
+# Global budget of commands allowed to run at the same time (CLI processes,
+# SSH sessions or XML-RPC calls). One semaphore is kept per event loop.
+_max_concurrency = DEFAULT_MAX_CONCURRENCY
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+# Seconds a command may run when no deadline is set with ``command_deadline``
+_command_timeout = DEFAULT_COMMAND_TIMEOUT
+# time.monotonic() by which every command of the current tool call must finish
+_deadline: ContextVar[Optional[float]] = ContextVar("command_deadline", default=None)
+
 
 def is_valid_ip_address(ip_address: str) -> bool:
     """Check if the given string is a valid IP address."""
@@ -31,7 +62,92 @@ def is_valid_ip_address(ip_address: str) -> bool:
         return False
 
 
-def execute_one_command(command_parts: List[str]) -> str:
+def configure_execution(
+    max_concurrency: Optional[int] = None, command_timeout: Optional[float] = None
+) -> None:
+    """Configure the global command execution budget and default timeout.
+
+    Args:
+        max_concurrency: Maximum number of commands executed concurrently across
+            all tool calls. If None, uses the ONE_MCP_MAX_CONCURRENCY environment
+            variable or defaults to 16.
+        command_timeout: Seconds a command may run, unless the tool sets its own
+            deadline. If None, uses the ONE_MCP_COMMAND_TIMEOUT environment
+            variable or defaults to 120.
+
+    Raises:
+        ValueError: If the resolved limit or timeout is not positive.
+    """
+    global _max_concurrency, _command_timeout
+
+    if max_concurrency is None:
+        env_value = os.getenv("ONE_MCP_MAX_CONCURRENCY")
+        max_concurrency = int(env_value) if env_value else DEFAULT_MAX_CONCURRENCY
+    if command_timeout is None:
+        env_value = os.getenv("ONE_MCP_COMMAND_TIMEOUT")
+        command_timeout = float(env_value) if env_value else DEFAULT_COMMAND_TIMEOUT
+
+    if max_concurrency < 1:
+        raise ValueError(
+            f"Invalid max concurrency {max_concurrency}: must be a positive integer"
+        )
+    if command_timeout <= 0:
+        raise ValueError(f"Invalid command timeout {command_timeout}: must be positive")
+
+    _max_concurrency = max_concurrency
+    _command_timeout = command_timeout
+    _semaphores.clear()
+    logger.debug(
+        "Command execution budget set to %s, timeout %ss", max_concurrency, command_timeout
+    )
+
+
+@contextmanager
+def command_deadline(seconds: float) -> Iterator[None]:
+    """Give every command run inside the block at most *seconds* in total.
+
+    The deadline replaces the default command timeout and is inherited by the
+    tasks the block spawns (e.g. parallel fetches). Nested deadlines can only
+    shorten the outer one.
+    """
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(deadline if outer is None else min(outer, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> float:
+    """Return the seconds left for the next command of the current tool call."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return _command_timeout
+    return deadline - time.monotonic()
+
+
+async def _within(awaitable, deadline: float, command_parts: List[str], budget: float):
+    """Await *awaitable*, cancelling it (and so killing the command) at *deadline*."""
+    try:
+        return await asyncio.wait_for(awaitable, max(deadline - time.monotonic(), 0))
+    except asyncio.TimeoutError:
+        raise asyncio.TimeoutError(
+            f"{' '.join(command_parts)} did not finish within {max(budget, 0):g} seconds"
+        ) from None
+
+
+def _execution_slot() -> asyncio.Semaphore:
+    """Return the execution semaphore bound to the running event loop."""
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(_max_concurrency)
+        _semaphores[loop] = semaphore
+    return semaphore
+
+
+async def execute_one_command(command_parts: List[str]) -> str:
     """Execute an OpenNebula command and return XML output.
 
     Args:
@@ -41,53 +157,276 @@ def execute_one_command(command_parts: List[str]) -> str:
         str: XML string output from the command, or XML error format if command fails
 
     Note:
-        Returns XML-formatted error with exit code and detailed messages on failure
+        Returns XML-formatted error with exit code and detailed messages on failure.
+        The command is run by the backend selected with ``configure_backend``
+        (the OpenNebula CLI by default) without blocking the event loop, and waits
+        for a free slot if the budget set by ``configure_execution`` is exhausted.
+        Waiting and running must fit in the ``command_deadline`` of the tool
+        call, or the default command timeout; on expiry the command is killed
+        together with its child processes and exit code 124 is reported.
+        Pool listings are served from the shared pool cache while fresh; any
+        other command on a pool invalidates the cached listings it affects.
+        A read-only command identical to one already running shares its
+        result instead of running again. Each call is a ``command`` span of
+        the current trace when tracing is enabled, and executions over the
+        slow-call threshold are written to the slow-call log.
     """
+    # Spans are written to disk: never record a password given on the command line
+    command = sanitize_command(command_parts) if tracer.enabled else None
+    with tracer.span("command", command=command):
+        return await _execute_one_command(command_parts)
+
+
+async def _execute_one_command(command_parts: List[str]) -> str:
     command_str = " ".join(command_parts)
 
-    logger.debug(f"Executing command: {command_str}")
+    if pool_cache.is_cacheable(command_parts):
+        cached = pool_cache.get(command_parts)
+        if cached is not None:
+            logger.debug("Pool cache hit: %s", command_str)
+            span = tracer.current()
+            if span is not None:
+                span.set(cached=True, output_bytes=len(cached))
+            return cached
+        generation = pool_cache.generation(pool_cache.resource_type(command_parts))
+    elif pool_cache.is_write(command_parts):
+        # Invalidate before running as well, so concurrent reads do not refill
+        # the cache with pre-write data; a failed command may still have
+        # partially applied (e.g. VM lists), so invalidation is unconditional.
+        pool_cache.invalidate(pool_cache.resource_type(command_parts))
+
+    logger.debug("Executing command: %s", command_str)
 
+    start = time.perf_counter()
+    output = None
     try:
-        result = subprocess.run(
-            command_parts,
-            capture_output=True,
-            text=True,
-            check=True,
+        try:
+            budget = remaining_time()
+            output = await _within(
+                single_flight.run(command_parts, lambda: _run_in_slot(command_parts)),
+                time.monotonic() + budget,
+                command_parts,
+                budget,
+            )
+        finally:
+            if pool_cache.is_write(command_parts):
+                pool_cache.invalidate(pool_cache.resource_type(command_parts))
+
+        if pool_cache.is_cacheable(command_parts):
+            pool_cache.put(command_parts, output, generation)
+
+        logger.debug(
+            "Command completed successfully: %s",
+            command_str,
+            extra={"duration_ms": round((time.perf_counter() - start) * 1000, 3)},
+        )
+        return output
+
+    except Exception as e:
+        output = None
+        return command_error_xml(command_parts, e)
+
+    finally:
+        elapsed = time.perf_counter() - start
+        size = len(output.encode("utf-8")) if output else 0
+        add_stage_time("subprocess", elapsed)
+        metrics.record_command(command_parts[0], elapsed, size, output is None)
+        span = tracer.current()
+        if span is not None:
+            span.set(output_bytes=size)
+            if output is None:
+                span.status = "error"
+
+
+async def _run_in_slot(command_parts: List[str]) -> str:
+    queued = time.perf_counter()
+    async with _execution_slot():
+        start = time.perf_counter()
+        output = None
+        try:
+            with tracer.span("subprocess", backend=type(get_backend()).__name__):
+                output = await get_backend().execute(command_parts)
+                return output
+        finally:
+            running = time.perf_counter() - start
+            metrics.record_subprocess(command_parts[0], running)
+            log_slow_call(
+                "command",
+                command_parts[0],
+                time.perf_counter() - queued,
+                command=command_parts,
+                breakdown={"slot_wait": start - queued, "run": running},
+                output_bytes=len(output.encode("utf-8")) if output is not None else None,
+                error=output is None,
+            )
+
+
+async def stream_one_command(
+    command_parts: List[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    state: Optional[int] = None,
+    pool_range: Optional[Tuple[int, int]] = None,
+    id_range: Optional[Tuple[int, int]] = None,
+    cache: bool = True,
+) -> AsyncIterator[bytes]:
+    """Execute a read-only OpenNebula command and yield its output incrementally.
+
+    Meant for large pool listings that are filtered while being parsed, so the
+    full output never has to be held in memory. A fresh pool cache entry is
+    replayed instead of running the command; streamed output is not cached.
+
+    Args:
+        command_parts: List of command parts (e.g., ['onevm', 'list', '--xml'])
+        chunk_size: Maximum size in bytes of each yielded chunk
+        state: VM state the backend may filter a VM pool listing on. Only the
+            XML-RPC backend can push it down to oned, so callers must still
+            check the state of every VM they receive.
+        pool_range: (offset, size) slice of the pool to query. Only valid if
+            the backend ``supports_pool_range`` for the command; the pool
+            cache is bypassed since it holds whole listings.
+        id_range: (first ID, last ID) the backend may restrict a pool listing
+            to. Like *state*, only the XML-RPC backend pushes it down, so
+            callers must still check the ID of every element they receive.
+        cache: If False, the command runs even if the pool cache has a fresh
+            entry, e.g. when polling for changes.
+
+    Yields:
+        bytes: Consecutive chunks of the command's stdout
+
+    Raises:
+        subprocess.CalledProcessError: If the command exits with a non-zero status.
+            Use ``command_error_xml`` to build the usual XML error envelope.
+        asyncio.TimeoutError: If the output is not complete by the deadline of
+            the tool call (or the default command timeout); the command is killed.
+    """
+    if cache and pool_range is None and pool_cache.is_cacheable(command_parts):
+        cached = pool_cache.get(command_parts)
+        if cached is not None:
+            logger.debug("Pool cache hit: %s", " ".join(command_parts))
+            data = cached.encode("utf-8")
+            for offset in range(0, len(data), chunk_size):
+                yield data[offset : offset + chunk_size]
+            return
+
+    logger.debug("Streaming command: %s", " ".join(command_parts))
+
+    # The deadline is fixed up front, so time spent by the consumer counts too
+    budget = remaining_time()
+    deadline = time.monotonic() + budget
+    slot = _execution_slot()
+    start = time.perf_counter()
+    # Not made current: the generator runs in its consumer's context
+    span = tracer.start_span(
+        "command", command=sanitize_command(command_parts) if tracer.enabled else None, streamed=True
+    )
+    try:
+        await _within(slot.acquire(), deadline, command_parts, budget)
+    except BaseException:
+        if span is not None:
+            span.status = "error"
+        tracer.finish(span)
+        raise
+    acquired = time.perf_counter()
+    add_stage_time("subprocess", acquired - start)
+    # Time spent waiting for the backend's output, not for the consumer
+    running = 0.0
+    size = 0
+    error = False
+    try:
+        stream = get_backend().stream(
+            command_parts, chunk_size, state=state, pool_range=pool_range, id_range=id_range
         )
+        async with aclosing(stream) as chunks:
+            while True:
+                chunk_start = time.perf_counter()
+                try:
+                    chunk = await _within(chunks.__anext__(), deadline, command_parts, budget)
+                except StopAsyncIteration:
+                    break
+                finally:
+                    waited = time.perf_counter() - chunk_start
+                    running += waited
+                    add_stage_time("subprocess", waited)
+                size += len(chunk)
+                yield chunk
+    except Exception:
+        error = True
+        raise
+    finally:
+        slot.release()
+        elapsed = time.perf_counter() - start
+        metrics.record_subprocess(command_parts[0], running)
+        metrics.record_command(command_parts[0], elapsed, size, error)
+        # Whatever is neither waiting for a slot nor for output is the consumer's
+        log_slow_call(
+            "command",
+            command_parts[0],
+            elapsed,
+            command=command_parts,
+            breakdown={
+                "slot_wait": acquired - start,
+                "run": running,
+                "consumer": max(elapsed - (acquired - start) - running, 0.0),
+            },
+            output_bytes=size,
+            error=error,
+        )
+        if span is not None:
+            span.set(output_bytes=size, subprocess_ms=round(running * 1000, 3))
+            span.status = "error" if error else "ok"
+            tracer.finish(span)
+
 
-        logger.debug(f"Command completed successfully: {command_str}")
-        return result.stdout
+def command_error_xml(command_parts: List[str], error: BaseException) -> str:
+    """Build the XML error envelope returned for a failed command.
+
+    Args:
+        command_parts: The command that failed
+        error: Exception raised while executing it
 
-    except subprocess.CalledProcessError as e:
+    Returns:
+        str: ``<error>`` XML with exit code, command, stderr, stdout and message
+    """
+    command_str = " ".join(command_parts)
+
+    if isinstance(error, subprocess.CalledProcessError):
         # Capture detailed error information including exit code and stderr
-        stderr_msg = e.stderr.strip() if e.stderr else "No error message available"
-        stdout_msg = e.stdout.strip() if e.stdout else ""
+        stderr_msg = error.stderr.strip() if error.stderr else "No error message available"
+        stdout_msg = error.stdout.strip() if error.stdout else ""
 
         logger.error(
-            f"Command failed: {command_str} (exit code: {e.returncode}, stderr: {stderr_msg}, stdout: {stdout_msg})"
+            "Command failed: %s (exit code: %s, stderr: %s, stdout: %s)",
+            command_str,
+            error.returncode,
+            stderr_msg,
+            stdout_msg,
         )
 
         # Build comprehensive error message
         error_details = f"Command: {command_str}"
-        error_details += f"\nExit code: {e.returncode}"
+        error_details += f"\nExit code: {error.returncode}"
         error_details += f"\nError message: {stderr_msg}"
         if stdout_msg:
             error_details += f"\nStdout: {stdout_msg}"
 
-        return f"<error><exit_code>{e.returncode}</exit_code><command>{command_str}</command><stderr>{stderr_msg}</stderr><stdout>{stdout_msg}</stdout><message>{error_details}</message></error>"
+        return f"<error><exit_code>{error.returncode}</exit_code><command>{command_str}</command><stderr>{stderr_msg}</stderr><stdout>{stdout_msg}</stdout><message>{error_details}</message></error>"
 
-    except FileNotFoundError:
+    if isinstance(error, asyncio.TimeoutError):
+        error_msg = f"Command timed out: {error}"
+        logger.error(error_msg)
+        return f"<error><exit_code>{TIMEOUT_EXIT_CODE}</exit_code><command>{command_str}</command><stderr>Timed out</stderr><stdout></stdout><message>{error_msg}</message></error>"
+
+    if isinstance(error, FileNotFoundError):
         # Handle case where the command itself doesn't exist
         error_msg = f"Command not found: {command_parts[0]}. Make sure OpenNebula is installed and in PATH."
         logger.error(
-            f"Command not found: {command_parts[0]} - OpenNebula may not be installed"
+            "Command not found: %s - OpenNebula may not be installed", command_parts[0]
         )
         return f"<error><exit_code>127</exit_code><command>{command_str}</command><stderr>Command not found</stderr><stdout></stdout><message>{error_msg}</message></error>"
 
-    except Exception as e:
-        # Handle any other unexpected errors
-        error_msg = (
-            f"Unexpected error executing {command_str}: {type(e).__name__}: {str(e)}"
-        )
-        logger.error(f"Unexpected error: {command_str} - {type(e).__name__}: {str(e)}")
-        return f"<error><exit_code>-1</exit_code><command>{command_str}</command><stderr>Unexpected error</stderr><stdout></stdout><message>{error_msg}</message></error>"
+    # Handle any other unexpected errors
+    error_msg = (
+        f"Unexpected error executing {command_str}: {type(error).__name__}: {str(error)}"
+    )
+    logger.error("Unexpected error: %s - %s: %s", command_str, type(error).__name__, str(error))
+    return f"<error><exit_code>-1</exit_code><command>{command_str}</command><stderr>Unexpected error</stderr><stdout></stdout><message>{error_msg}</message></error>"
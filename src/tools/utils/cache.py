@@ -0,0 +1,225 @@
+# Copyright 2002-2025, OpenNebula Project, OpenNebula Systems
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""In-process TTL cache for OpenNebula pool listings.
+
+``execute_one_command`` serves ``<binary> list`` commands from this cache while
+the entry is younger than the TTL of its resource type. Every other command
+issued through a known binary is treated as a write: it invalidates the cached
+pools of that resource type and of the types it affects as a side effect
+(e.g. ``onetemplate instantiate`` invalidates the VM pool).
+"""
+
+import time
+from logging import getLogger
+from typing import Dict, List, Optional, Tuple
+
+logger = getLogger("opennebula_mcp.utils.cache")
+
+# CLI binary -> cached resource type
+RESOURCE_TYPES = {
+    "onevm": "vm",
+    "onehost": "host",
+    "onecluster": "cluster",
+    "onedatastore": "datastore",
+    "onevnet": "vnet",
+    "oneimage": "image",
+    "onetemplate": "template",
+    "oneuser": "user",
+    "onegroup": "group",
+    "oneacl": "acl",
+    "onemarket": "market",
+    "onemarketapp": "marketapp",
+    "oneflow": "service",
+    "oneflow-template": "service_template",
+}
+
+# Default time-to-live in seconds per resource type. Pools that change with VM
+# activity expire quickly; mostly static pools are kept longer.
+DEFAULT_TTLS = {
+    "vm": 5.0,
+    "host": 10.0,
+    "cluster": 60.0,
+    "datastore": 30.0,
+    "vnet": 30.0,
+    "image": 30.0,
+    "template": 60.0,
+    "user": 60.0,
+    "group": 60.0,
+    "acl": 60.0,
+    "market": 300.0,
+    "marketapp": 300.0,
+    # OneFlow pools are tracked only so that their writes invalidate the VM
+    # pools; listings are not cached unless enabled with a TTL override.
+    "service": 0.0,
+    "service_template": 0.0,
+}
+
+# Resource types changed as a side effect of writes on another type
+SIDE_EFFECTS = {
+    "vm": ("host", "image", "vnet"),
+    "template": ("vm",),
+    "image": ("datastore",),
+    "user": ("group",),
+    "group": ("user",),
+    "marketapp": ("image", "template", "datastore"),
+    "cluster": ("host", "datastore", "vnet"),
+    # Services create, scale and delete their role VMs
+    "service": ("vm", "host", "image", "vnet"),
+    "service_template": ("service", "vm", "host", "image", "vnet"),
+}
+
+# Subcommands that never modify the pool
+READ_ONLY_SUBCOMMANDS = {"list", "show", "top"}
+
+
+class PoolCache:
+    """Pool output cache keyed by resource type and full command line.
+
+    Args:
+        ttls: Per resource type TTL overrides in seconds. A TTL of 0 disables
+            caching for that type.
+        enabled: If False, lookups always miss and nothing is stored.
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self._entries: Dict[str, Dict[Tuple[str, ...], Tuple[float, str]]] = {}
+        # Bumped on every invalidation so that reads started before a write
+        # cannot store a pre-write result afterwards.
+        self._generations: Dict[str, int] = {}
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self.invalidations: Dict[str, int] = {}
+
+    @staticmethod
+    def resource_type(command_parts: List[str]) -> Optional[str]:
+        """Return the resource type handled by the command's binary, if any."""
+        return RESOURCE_TYPES.get(command_parts[0]) if command_parts else None
+
+    @staticmethod
+    def is_cacheable(command_parts: List[str]) -> bool:
+        """Return True for pool listing commands (``<binary> list ...``)."""
+        return (
+            len(command_parts) >= 2
+            and command_parts[0] in RESOURCE_TYPES
+            and command_parts[1] == "list"
+        )
+
+    @staticmethod
+    def is_write(command_parts: List[str]) -> bool:
+        """Return True if the command may modify a cached pool."""
+        return (
+            len(command_parts) >= 2
+            and command_parts[0] in RESOURCE_TYPES
+            and command_parts[1] not in READ_ONLY_SUBCOMMANDS
+        )
+
+    def generation(self, resource: str) -> int:
+        return self._generations.get(resource, 0)
+
+    def get(self, command_parts: List[str]) -> Optional[str]:
+        """Return the cached output for a pool listing, or None on a miss."""
+        resource = self.resource_type(command_parts)
+        if not self.enabled or resource is None or self.ttls.get(resource, 0) <= 0:
+            return None
+
+        entry = self._entries.get(resource, {}).get(tuple(command_parts))
+        if entry is not None and time.monotonic() - entry[0] < self.ttls[resource]:
+            self.hits[resource] = self.hits.get(resource, 0) + 1
+            return entry[1]
+
+        self.misses[resource] = self.misses.get(resource, 0) + 1
+        return None
+
+    def put(self, command_parts: List[str], output: str, generation: int) -> None:
+        """Store *output* unless the type was invalidated since *generation*."""
+        resource = self.resource_type(command_parts)
+        if not self.enabled or resource is None or self.ttls.get(resource, 0) <= 0:
+            return
+        if self.generation(resource) != generation:
+            logger.debug("Discarding stale %s pool read", resource)
+            return
+        self._entries.setdefault(resource, {})[tuple(command_parts)] = (
+            time.monotonic(),
+            output,
+        )
+
+    def invalidate(self, resource: str) -> None:
+        """Drop every cached pool of *resource* and of its side-effect types."""
+        for affected in (resource, *SIDE_EFFECTS.get(resource, ())):
+            self._generations[affected] = self.generation(affected) + 1
+            if self._entries.pop(affected, None):
+                self.invalidations[affected] = self.invalidations.get(affected, 0) + 1
+                logger.debug("Invalidated cached %s pool", affected)
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        self._entries.clear()
+        self._generations.clear()
+        self.hits.clear()
+        self.misses.clear()
+        self.invalidations.clear()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Return hit/miss/invalidation counters per resource type."""
+        resources = sorted(set(self.hits) | set(self.misses) | set(self.invalidations))
+        return {
+            resource: {
+                "hits": self.hits.get(resource, 0),
+                "misses": self.misses.get(resource, 0),
+                "invalidations": self.invalidations.get(resource, 0),
+            }
+            for resource in resources
+        }
+
+
+pool_cache = PoolCache()
+
+
+def parse_ttls(spec: str) -> Dict[str, float]:
+    """Parse a ``type=seconds[,type=seconds...]`` TTL override string.
+
+    Raises:
+        ValueError: On unknown resource types or invalid durations.
+    """
+    ttls: Dict[str, float] = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        resource, _, value = item.partition("=")
+        resource = resource.strip().lower()
+        if resource not in DEFAULT_TTLS:
+            valid = ", ".join(sorted(DEFAULT_TTLS))
+            raise ValueError(f"Unknown resource type '{resource}'. Valid types: {valid}")
+        try:
+            ttls[resource] = float(value)
+        except ValueError:
+            raise ValueError(f"Invalid TTL '{value}' for resource type '{resource}'")
+        if ttls[resource] < 0:
+            raise ValueError(f"Invalid TTL '{value}' for resource type '{resource}'")
+    return ttls
+
+
+def configure_pool_cache(enabled: bool = True, ttls: Optional[Dict[str, float]] = None) -> None:
+    """Enable or disable the shared pool cache and override TTLs.
+
+    Args:
+        enabled: If False, every pool listing goes to OpenNebula.
+        ttls: Per resource type TTL overrides in seconds.
+    """
+    pool_cache.enabled = enabled
+    pool_cache.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+    pool_cache.clear()
+    logger.debug("Pool cache enabled=%s, ttls=%s", enabled, pool_cache.ttls)
@@ -0,0 +1,170 @@
+# Copyright 2002-2025, OpenNebula Project, OpenNebula Systems
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Coalescing window merging bursts of same-kind write calls.
+
+The first call of a kind (e.g. ``manage_vm`` stop) opens a window of a few
+milliseconds; every call of the same kind arriving before it closes adds its
+targets to the same batch. When the window closes, the batch runs once for
+the union of the targets and every caller receives its result, picking out
+its own targets. A burst of N calls thus costs one command instead of N, for
+at most one window of added latency.
+
+The window is disabled (0) by default: every call then runs on its own.
+"""
+
+import asyncio
+import os
+import weakref
+from logging import getLogger
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+logger = getLogger("opennebula_mcp.utils.coalescing")
+
+
+class _Batch:
+    """Targets collected during one window and the future of their execution."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        # Targets per waiting caller, so a caller leaving early can withdraw them
+        self.callers: Dict[object, List[str]] = {}
+        self.future: "asyncio.Future[Any]" = loop.create_future()
+        # Mark an error as retrieved even if every caller has gone
+        self.future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self.started = False
+
+
+class CoalescingWindow:
+    """Merge calls of the same kind issued within *window* seconds.
+
+    Args:
+        window: Seconds a batch stays open after its first call; 0 disables
+            coalescing.
+    """
+
+    def __init__(self, window: float = 0.0) -> None:
+        self.window = window
+        # Futures are bound to their event loop, so batches are kept per loop
+        self._pending: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, _Batch]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self.batches = 0
+        self.calls = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0
+
+    async def run(
+        self,
+        key: Hashable,
+        targets: List[str],
+        execute: Callable[[List[str]], Awaitable[Any]],
+    ) -> Any:
+        """Return ``execute(all_targets)`` for the batch *targets* joined.
+
+        Args:
+            key: Kind of the call; only calls with equal keys are merged.
+            targets: Targets of this call.
+            execute: Runs the batch for the union of the targets of all its
+                calls, in arrival order and without duplicates.
+
+        Returns:
+            Whatever ``execute`` returns, shared by every call of the batch.
+            Errors it raises are raised to each of them.
+
+        Note:
+            A caller cancelled while the window is open withdraws its targets;
+            once the batch runs it completes whether or not callers remain.
+        """
+        if not self.enabled:
+            return await execute(targets)
+
+        loop = asyncio.get_running_loop()
+        pending = self._pending.setdefault(loop, {})
+        batch = pending.get(key)
+        if batch is None:
+            batch = _Batch(loop)
+            pending[key] = batch
+            loop.call_later(self.window, self._flush, pending, key, batch, execute)
+
+        token = object()
+        batch.callers[token] = targets
+        self.calls += 1
+        try:
+            return await asyncio.shield(batch.future)
+        finally:
+            if not batch.started:
+                batch.callers.pop(token, None)
+
+    def _flush(
+        self,
+        pending: Dict[Hashable, _Batch],
+        key: Hashable,
+        batch: _Batch,
+        execute: Callable[[List[str]], Awaitable[Any]],
+    ) -> None:
+        """Close *batch* and start its execution."""
+        if pending.get(key) is batch:
+            del pending[key]
+        batch.started = True
+        if not batch.callers:
+            batch.future.cancel()
+            return
+
+        targets = list(dict.fromkeys(t for ts in batch.callers.values() for t in ts))
+        self.batches += 1
+        logger.debug("Running %s for %s coalesced calls: %s", key, len(batch.callers), ",".join(targets))
+
+        def done(task: "asyncio.Task[Any]") -> None:
+            if batch.future.done():
+                return
+            if task.cancelled():
+                batch.future.cancel()
+            elif task.exception() is not None:
+                batch.future.set_exception(task.exception())
+            else:
+                batch.future.set_result(task.result())
+
+        asyncio.ensure_future(execute(targets)).add_done_callback(done)
+
+    def clear(self) -> None:
+        """Reset the counters."""
+        self.batches = 0
+        self.calls = 0
+
+
+write_window = CoalescingWindow()
+
+
+def configure_write_coalescing(window: Optional[float] = None) -> None:
+    """Set the coalescing window of lifecycle write calls.
+
+    Args:
+        window: Seconds same-operation calls are collected before running as
+            one command. If None, uses the ONE_MCP_COALESCE_WINDOW environment
+            variable or defaults to 0 (disabled).
+
+    Raises:
+        ValueError: If the window is negative.
+    """
+    if window is None:
+        env_value = os.getenv("ONE_MCP_COALESCE_WINDOW")
+        window = float(env_value) if env_value else 0.0
+    if not window >= 0:  # also rejects nan
+        raise ValueError(f"Invalid coalescing window {window}: must be 0 or positive")
+    write_window.window = window
+    write_window.clear()
+    logger.debug("Write coalescing window=%ss", window)
@@ -0,0 +1,323 @@
+# Copyright 2002-2025, OpenNebula Project, OpenNebula Systems
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""VM state table kept current by oned's state-change events.
+
+oned publishes an event on its ZeroMQ PUB socket (``tcp://<frontend>:2101``
+by default) every time a VM changes state. The message is a two-part frame:
+the key ``EVENT STATE VM/<STATE>/<LCM_STATE>`` and a base64 encoded
+``<HOOK_MESSAGE>`` whose ``<VM>`` child is the VM after the change.
+
+When an endpoint is configured, a background thread subscribes to those
+events and keeps a table of the VMs' identity and state fields
+(``STATE_FIELDS``). The table is seeded with one ``onevm list --xml`` and
+re-seeded every ``resync_interval`` seconds, which bounds the effect of events
+lost while disconnected. Tools serve requests asking only for those fields
+from the table instead of running a command.
+
+If subscribing, seeding or applying an event fails, the table is marked out
+of sync, so tools query oned again, and the thread reconnects and re-seeds
+with exponential backoff.
+
+Subscribing requires the optional ``pyzmq`` package (``events`` extra).
+"""
+
+import asyncio
+import base64
+import binascii
+import os
+import threading
+import time
+import xml.etree.ElementTree as ET
+from logging import getLogger
+from typing import Dict, List, Optional, Sequence
+
+logger = getLogger("opennebula_mcp.utils.events")
+
+DEFAULT_RESYNC_INTERVAL = 300
+
+# Seconds between reconnection attempts after a failure, doubling up to the max
+RECONNECT_MIN_DELAY = 1.0
+RECONNECT_MAX_DELAY = 60.0
+
+# Subscription prefix of VM state-change events
+VM_STATE_TOPIC = b"EVENT STATE VM/"
+
+# Fields of every VM kept in the table, in `onevm show` order
+STATE_FIELDS = ("ID", "UID", "GID", "NAME", "STATE", "LCM_STATE")
+
+# VMs in the DONE state are no longer part of the VM pool
+DONE_STATE = "6"
+
+
+def _summary(vm: ET.Element) -> Optional[ET.Element]:
+    """Return a copy of *vm* holding only STATE_FIELDS, None if it has no ID."""
+    if not (vm.findtext("ID") or "").isdigit():
+        return None
+    summary = ET.Element("VM")
+    for field in STATE_FIELDS:
+        ET.SubElement(summary, field).text = vm.findtext(field) or ""
+    return summary
+
+
+class VmStateTable:
+    """Thread-safe table of VM state fields, fed by oned events."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._vms: Dict[int, ET.Element] = {}
+        # True once seeded from the pool; before that the table is incomplete
+        self.synced = False
+        self.events = 0
+        self.resyncs = 0
+
+    def covers(self, paths: Optional[Sequence[str]]) -> bool:
+        """Return True if the table can answer a request for *paths* alone."""
+        return bool(self.synced and paths and all(path in STATE_FIELDS for path in paths))
+
+    def load_pool(self, pool_xml: str) -> bool:
+        """Replace the table with the VMs of a ``onevm list --xml`` output."""
+        try:
+            root = ET.fromstring(pool_xml)
+        except ET.ParseError as e:
+            logger.warning("Cannot seed the VM state table: %s", e)
+            return False
+        if root.tag != "VM_POOL":
+            logger.warning("Cannot seed the VM state table: %s", pool_xml[:200])
+            return False
+
+        vms = {}
+        for vm in root.iter("VM"):
+            summary = _summary(vm)
+            if summary is not None:
+                vms[int(summary.findtext("ID"))] = summary
+        with self._lock:
+            self._vms = vms
+            self.synced = True
+            self.resyncs += 1
+        logger.debug("VM state table seeded with %s VMs", len(vms))
+        return True
+
+    def apply_event(self, frames: Sequence[bytes]) -> bool:
+        """Apply one ``[key, base64 HOOK_MESSAGE]`` state event.
+
+        Returns:
+            bool: False if the event is not a VM state event or is malformed.
+        """
+        if len(frames) < 2 or not frames[0].startswith(VM_STATE_TOPIC):
+            return False
+        try:
+            message = ET.fromstring(base64.b64decode(frames[1]))
+        except (binascii.Error, ET.ParseError) as e:
+            logger.warning("Ignoring malformed event %r: %s", frames[0], e)
+            return False
+
+        vm = message.find("VM")
+        summary = _summary(vm) if vm is not None else None
+        if summary is None:
+            logger.warning("Ignoring event %r without a VM body", frames[0])
+            return False
+
+        vm_id = int(summary.findtext("ID"))
+        with self._lock:
+            self.events += 1
+            if summary.findtext("STATE") == DONE_STATE:
+                self._vms.pop(vm_id, None)
+            else:
+                self._vms[vm_id] = summary
+        logger.debug(
+            "VM %s is now STATE=%s, LCM_STATE=%s",
+            vm_id,
+            summary.findtext("STATE"),
+            summary.findtext("LCM_STATE"),
+        )
+        return True
+
+    def mark_stale(self) -> None:
+        """Stop serving from the table until it is seeded again."""
+        with self._lock:
+            self.synced = False
+
+    def get(self, vm_id: str) -> Optional[ET.Element]:
+        """Return a copy of the state fields of VM *vm_id*, None if unknown."""
+        with self._lock:
+            summary = self._vms.get(int(vm_id))
+            return ET.fromstring(ET.tostring(summary)) if summary is not None else None
+
+    def elements(self) -> List[ET.Element]:
+        """Return copies of every VM, ordered by ID as in the VM pool."""
+        with self._lock:
+            summaries = [self._vms[vm_id] for vm_id in sorted(self._vms)]
+        return [ET.fromstring(ET.tostring(summary)) for summary in summaries]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._vms.clear()
+            self.synced = False
+            self.events = 0
+            self.resyncs = 0
+
+
+vm_states = VmStateTable()
+
+
+class VmStateSubscriber:
+    """Background thread feeding a VmStateTable from oned's event socket.
+
+    Args:
+        endpoint: ZeroMQ endpoint of oned's publisher, e.g. ``tcp://frontend:2101``.
+        table: Table to keep current.
+        resync_interval: Seconds between two seeds of the table from the VM pool.
+
+    Raises:
+        ImportError: If pyzmq is not installed.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        table: VmStateTable,
+        resync_interval: float = DEFAULT_RESYNC_INTERVAL,
+    ) -> None:
+        import zmq  # optional dependency, only needed when events are enabled
+
+        self._zmq = zmq
+        self.endpoint = endpoint
+        self.table = table
+        self.resync_interval = resync_interval
+        self._stopped = threading.Event()
+        self._connected = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="one-mcp-vm-events", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def wait_connected(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the thread has subscribed and seeded the table once."""
+        return self._connected.wait(timeout)
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=5)
+
+    def _resync(self) -> None:
+        """Seed the table from a fresh VM pool listing.
+
+        The listing is run by the backend directly: a pool cache entry or a
+        listing shared with a concurrent call may predate events already
+        applied, which the seed would then overwrite.
+
+        Raises:
+            RuntimeError: If the listing fails or cannot be parsed.
+        """
+        # Imported here: base imports the backends, which must not depend on events
+        from src.tools.utils.backends import get_backend
+        from src.tools.utils.base import remaining_time
+
+        command_parts = ["onevm", "list", "--xml"]
+        try:
+            pool_xml = asyncio.run(
+                asyncio.wait_for(get_backend().execute(command_parts), remaining_time())
+            )
+        except Exception as e:
+            raise RuntimeError(f"cannot list the VM pool: {type(e).__name__}: {e}") from e
+        if not self.table.load_pool(pool_xml):
+            raise RuntimeError("cannot seed the VM state table from the VM pool listing")
+
+    def _run(self) -> None:
+        delay = RECONNECT_MIN_DELAY
+        while not self._stopped.is_set():
+            resyncs = self.table.resyncs
+            try:
+                self._follow()
+                return
+            except Exception as e:
+                # Stale answers are worse than none: tools fall back to oned
+                self.table.mark_stale()
+                if self.table.resyncs > resyncs:
+                    # The table was in sync before this failure: retry promptly
+                    delay = RECONNECT_MIN_DELAY
+                logger.error("VM state event subscriber failed, reconnecting in %ss: %s", delay, e)
+            if self._stopped.wait(delay):
+                return
+            delay = min(delay * 2, RECONNECT_MAX_DELAY)
+
+    def _follow(self) -> None:
+        """Subscribe, seed the table and apply events until stopped."""
+        zmq = self._zmq
+        context = zmq.Context()
+        socket = context.socket(zmq.SUB)
+        socket.setsockopt(zmq.SUBSCRIBE, VM_STATE_TOPIC)
+        try:
+            socket.connect(self.endpoint)
+            logger.info("Subscribed to VM state events at %s", self.endpoint)
+            next_resync = 0.0
+            while not self._stopped.is_set():
+                if time.monotonic() >= next_resync:
+                    # Subscribed first, so no change made while seeding is missed
+                    self._resync()
+                    next_resync = time.monotonic() + self.resync_interval
+                    self._connected.set()
+                if socket.poll(timeout=200):
+                    self.table.apply_event(socket.recv_multipart())
+        finally:
+            socket.close(linger=0)
+            context.term()
+
+
+_subscriber: Optional[VmStateSubscriber] = None
+
+
+def configure_vm_events(
+    endpoint: Optional[str] = None, resync_interval: Optional[float] = None
+) -> Optional[VmStateSubscriber]:
+    """Start (or stop) the VM state event subscriber.
+
+    Args:
+        endpoint: oned event endpoint. If None, uses the ONE_MCP_EVENTS_ENDPOINT
+            environment variable; if that is unset too, events are disabled and
+            every state request runs a command.
+        resync_interval: Seconds between two seeds of the table from the VM
+            pool. If None, uses ONE_MCP_EVENTS_RESYNC or defaults to 300.
+
+    Returns:
+        Optional[VmStateSubscriber]: The running subscriber, if enabled.
+
+    Raises:
+        ImportError: If events are enabled but pyzmq is not installed.
+        ValueError: If the resync interval is not positive.
+    """
+    global _subscriber
+
+    endpoint = endpoint or os.getenv("ONE_MCP_EVENTS_ENDPOINT")
+    if resync_interval is None:
+        env_value = os.getenv("ONE_MCP_EVENTS_RESYNC")
+        resync_interval = float(env_value) if env_value else DEFAULT_RESYNC_INTERVAL
+    if resync_interval <= 0:
+        raise ValueError(f"Invalid events resync interval {resync_interval}: must be positive")
+
+    if _subscriber is not None:
+        _subscriber.stop()
+        _subscriber = None
+    vm_states.clear()
+
+    if endpoint:
+        _subscriber = VmStateSubscriber(endpoint, vm_states, resync_interval)
+        _subscriber.start()
+    logger.debug("VM state events endpoint=%s, resync_interval=%ss", endpoint, resync_interval)
+    return _subscriber
@@ -0,0 +1,204 @@
+# Copyright 2002-2025, OpenNebula Project, OpenNebula Systems
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Conversion of OpenNebula XML documents to compact JSON and CSV.
+
+JSON follows the layout of the OpenNebula ``--json`` output: every element
+becomes a key, leaves are strings and repeated elements become lists. The
+resources of a pool are always a list (``{"VM_POOL": {"VM": [...]}}``) so
+clients do not have to special-case pools with a single element. Attributes
+are prefixed with ``@`` (e.g. ``"@NEXT_CURSOR"``).
+
+CSV has one row per resource of a pool (or a single row for one resource)
+and one column per leaf path, e.g. ``TEMPLATE/NIC/IP``. Repeated leaves are
+joined with ``;`` in the same cell. It is best combined with ``fields``.
+
+Error documents (``<error>``) are returned unchanged in every format.
+"""
+
+import csv
+import io
+import json
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, List, Mapping, Optional
+
+from src.tools.utils.metrics import timed_stage
+
+OUTPUT_FORMATS = ("xml", "json", "csv")
+
+# Separator of repeated leaf values in a CSV cell
+CSV_MULTI_VALUE_SEPARATOR = ";"
+
+_MISSING = object()
+
+
+def check_output_format(output_format: str) -> Optional[str]:
+    """Return an XML error if *output_format* is not supported, None otherwise."""
+    if output_format not in OUTPUT_FORMATS:
+        return (
+            f"<error><message>Invalid output_format '{output_format}'. "
+            f"Valid formats: {', '.join(OUTPUT_FORMATS)}</message></error>"
+        )
+    return None
+
+
+def pool_item_tag(root_tag: str) -> Optional[str]:
+    """Return the tag of the resources of a pool root (VM for VM_POOL or VMS)."""
+    if root_tag.endswith("_POOL"):
+        return root_tag[: -len("_POOL")]
+    if root_tag == "VMS":
+        return "VM"
+    return None
+
+
+def element_to_json(element: ET.Element, list_tag: Optional[str] = None) -> Any:
+    """Convert *element* to JSON-compatible data (leaves are strings).
+
+    Args:
+        element: Element to convert
+        list_tag: Child tag always rendered as a list, even if empty or single
+    """
+    if not len(element) and not element.attrib and list_tag is None:
+        return element.text or ""
+
+    obj: Dict[str, Any] = (
+        {f"@{k}": v for k, v in element.attrib.items()} if element.attrib else {}
+    )
+    if list_tag is not None:
+        obj[list_tag] = []
+    if not len(element):
+        if element.text and element.text.strip():
+            obj["#text"] = element.text
+        return obj
+
+    for child in element:
+        # Leaves are by far the most common case, convert them inline
+        if len(child) or child.attrib:
+            value = element_to_json(child)
+        else:
+            value = child.text or ""
+        tag = child.tag
+        existing = obj.get(tag, _MISSING)
+        if existing is _MISSING:
+            obj[tag] = value
+        elif type(existing) is list:
+            # Converted values are never lists, so a list means repetition
+            existing.append(value)
+        else:
+            obj[tag] = [existing, value]
+    return obj
+
+
+def element_to_row(element: ET.Element) -> Dict[str, str]:
+    """Flatten *element* into ``{leaf path: value}`` for a CSV row."""
+    row: Dict[str, str] = {}
+    _flatten(element, "", row)
+    return row
+
+
+def _flatten(element: ET.Element, prefix: str, row: Dict[str, str]) -> None:
+    for child in element:
+        path = prefix + child.tag
+        if len(child):
+            _flatten(child, path + "/", row)
+        elif path in row:
+            row[path] += CSV_MULTI_VALUE_SEPARATOR + (child.text or "")
+        else:
+            row[path] = child.text or ""
+
+
+def rows_to_csv(rows: List[Dict[str, str]], attrib: Optional[Mapping[str, str]] = None) -> str:
+    """Render *rows* as CSV with a header of every column seen, in order.
+
+    Root attributes such as NEXT_CURSOR are written first as ``# NAME: value``
+    comment lines.
+    """
+    columns: Dict[str, None] = {}
+    for row in rows:
+        columns.update(dict.fromkeys(row))
+
+    out = io.StringIO()
+    for name, value in (attrib or {}).items():
+        out.write(f"# {name}: {value}\n")
+    if columns:
+        writer = csv.DictWriter(out, fieldnames=list(columns), lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+    return out.getvalue()
+
+
+def convert_xml(xml_str: str, output_format: str) -> str:
+    """Convert an OpenNebula XML document to *output_format*.
+
+    Args:
+        xml_str: Pool or resource XML, as returned by the CLI
+        output_format: One of OUTPUT_FORMATS
+
+    Returns:
+        str: The converted document. XML, errors and unparsable documents are
+        returned unchanged.
+    """
+    if output_format == "xml":
+        return xml_str
+    try:
+        with timed_stage("parse"):
+            root = ET.fromstring(xml_str)
+    except ET.ParseError:
+        return xml_str
+    if root.tag == "error":
+        return xml_str
+
+    with timed_stage("serialise"):
+        item_tag = pool_item_tag(root.tag)
+        if output_format == "json":
+            data = {root.tag: element_to_json(root, list_tag=item_tag)}
+            return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+        items = root.findall(item_tag) if item_tag else [root]
+        return rows_to_csv([element_to_row(item) for item in items], root.attrib)
+
+
+class PoolRenderer:
+    """Accumulate the resources of a pool page and render it in a format."""
+
+    def __init__(self, root_tag: str, output_format: str = "xml") -> None:
+        self.root_tag = root_tag
+        self.item_tag = pool_item_tag(root_tag)
+        self.output_format = output_format
+        self._items: List[Any] = []
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def add(self, element: ET.Element) -> None:
+        """Convert and keep *element*; it may be discarded afterwards."""
+        if self.output_format == "json":
+            self._items.append(element_to_json(element))
+        elif self.output_format == "csv":
+            self._items.append(element_to_row(element))
+        else:
+            self._items.append(ET.tostring(element, encoding="unicode"))
+
+    def render(self, attrib: Optional[Mapping[str, str]] = None) -> str:
+        """Return the pool document with the root attributes *attrib*."""
+        attrib = attrib or {}
+        if self.output_format == "json":
+            body: Dict[str, Any] = {f"@{k}": v for k, v in attrib.items()}
+            body[self.item_tag or self.root_tag] = self._items
+            return json.dumps({self.root_tag: body}, separators=(",", ":"), ensure_ascii=False)
+        if self.output_format == "csv":
+            return rows_to_csv(self._items, attrib)
+        attrs = "".join(f' {k}="{v}"' for k, v in attrib.items())
+        return f"<{self.root_tag}{attrs}>{''.join(self._items)}</{self.root_tag}>"
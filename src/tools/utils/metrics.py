@@ -0,0 +1,461 @@
+# Copyright 2002-2025, OpenNebula Project, OpenNebula Systems
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""In-process latency and size histograms of tool calls and commands.
+
+Every tool call records its wall time, the time it spent waiting for
+commands (``subprocess``) and parsing their XML (``parse``), the size of its
+response and whether it returned an error. Every command run through
+``execute_one_command`` or ``stream_one_command`` records the same per CLI
+binary (``onevm``, ``onehost``...), except that its subprocess time is the
+time the backend actually ran it: calls sharing a coalesced run or waiting
+for an execution slot add none. Pool cache hits are not recorded.
+
+Commands of one call may run in parallel, so its subprocess time can exceed
+its wall time. Histograms use fixed buckets; quantiles derived from them are
+estimates, interpolated within a bucket.
+
+Metrics are read with the ``server_metrics`` tool and can be dumped
+periodically to a file in the OpenMetrics text format, e.g. for the node
+exporter's textfile collector.
+"""
+
+import atexit
+import functools
+import inspect
+import logging
+import math
+import os
+import threading
+import time
+import xml.etree.ElementTree as ET
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging import getLogger
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from src.logging_config import end_call, log_slow_call, slow_calls_enabled, start_call
+from src.tools.utils.tracing import record_stage, trace_tool
+
+logger = getLogger("opennebula_mcp.utils.metrics")
+
+# Seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+# Bytes
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+DEFAULT_DUMP_INTERVAL = 60
+
+# Stage durations of the current tool call, shared with the tasks it spawns
+_call_stages: ContextVar[Optional[Dict[str, float]]] = ContextVar("call_stages", default=None)
+
+
+class Histogram:
+    """Cumulative-bucket histogram, as in the OpenMetrics data model."""
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = tuple(buckets)
+        # One count per bucket plus +Inf
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Estimate the *q* quantile (0-1), interpolating within its bucket."""
+        if not self.count:
+            return math.nan
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for bound, count in zip(self.buckets, self.counts):
+            if count and seen + count >= rank:
+                return lower + (bound - lower) * (rank - seen) / count
+            seen += count
+            lower = bound
+        # In the +Inf bucket: the largest finite bound is the best estimate
+        return self.buckets[-1]
+
+
+class _Family:
+    """A metric and its series, one per value of its single label."""
+
+    def __init__(
+        self, name: str, kind: str, help_text: str, label: str, buckets: Sequence[float] = ()
+    ) -> None:
+        self.name = name
+        self.kind = kind
+        self.help = help_text
+        self.label = label
+        self.buckets = buckets
+        self.series: Dict[str, Any] = {}
+
+
+class Metrics:
+    """Registry of the server's tool and command metrics.
+
+    Args:
+        enabled: If False, nothing is recorded.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        # Commands also run on the VM event thread
+        self._lock = threading.Lock()
+        self._families: Dict[str, _Family] = {}
+        self.started = time.time()
+        for scope, label in (("tool", "tool"), ("command", "binary")):
+            self._add(f"one_mcp_{scope}_duration_seconds", "histogram", f"Wall time per {label}", label, LATENCY_BUCKETS)
+            self._add(
+                f"one_mcp_{scope}_subprocess_seconds",
+                "histogram",
+                f"Time waiting for OpenNebula commands per {label}",
+                label,
+                LATENCY_BUCKETS,
+            )
+            self._add(f"one_mcp_{scope}_output_bytes", "histogram", f"Output size per {label}", label, SIZE_BUCKETS)
+            self._add(f"one_mcp_{scope}_errors", "counter", f"Errors per {label}", label)
+        self._add("one_mcp_tool_parse_seconds", "histogram", "Time parsing XML per tool", "tool", LATENCY_BUCKETS)
+
+    def _add(self, name: str, kind: str, help_text: str, label: str, buckets: Sequence[float] = ()) -> None:
+        self._families[name] = _Family(name, kind, help_text, label, buckets)
+
+    def observe(self, name: str, label_value: str, value: float) -> None:
+        """Add *value* to histogram *name* for *label_value*."""
+        family = self._families[name]
+        with self._lock:
+            histogram = family.series.get(label_value)
+            if histogram is None:
+                histogram = family.series[label_value] = Histogram(family.buckets)
+            histogram.observe(value)
+
+    def inc(self, name: str, label_value: str, amount: float = 1) -> None:
+        """Increment counter *name* for *label_value*."""
+        family = self._families[name]
+        with self._lock:
+            family.series[label_value] = family.series.get(label_value, 0) + amount
+
+    def record_tool(
+        self, tool: str, duration: float, stages: Dict[str, float], output_bytes: int, error: bool
+    ) -> None:
+        if not self.enabled:
+            return
+        self.observe("one_mcp_tool_duration_seconds", tool, duration)
+        self.observe("one_mcp_tool_subprocess_seconds", tool, stages.get("subprocess", 0.0))
+        self.observe("one_mcp_tool_parse_seconds", tool, stages.get("parse", 0.0))
+        self.observe("one_mcp_tool_output_bytes", tool, output_bytes)
+        if error:
+            self.inc("one_mcp_tool_errors", tool)
+
+    def record_command(self, binary: str, duration: float, output_bytes: int, error: bool) -> None:
+        """Record a command call, including time waiting for a slot or a shared run."""
+        if not self.enabled:
+            return
+        self.observe("one_mcp_command_duration_seconds", binary, duration)
+        self.observe("one_mcp_command_output_bytes", binary, output_bytes)
+        if error:
+            self.inc("one_mcp_command_errors", binary)
+
+    def record_subprocess(self, binary: str, seconds: float) -> None:
+        """Record the time a backend actually ran a command."""
+        if self.enabled:
+            self.observe("one_mcp_command_subprocess_seconds", binary, seconds)
+
+    def clear(self) -> None:
+        with self._lock:
+            for family in self._families.values():
+                family.series.clear()
+        self.started = time.time()
+
+    def _summaries(self, scope: str) -> Dict[str, Dict[str, float]]:
+        """Return per label value the headline figures of *scope* (tool or command)."""
+        with self._lock:
+            durations = self._families[f"one_mcp_{scope}_duration_seconds"].series
+            summaries = {}
+            for key, duration in durations.items():
+                summary = {
+                    "CALLS": duration.count,
+                    "ERRORS": self._families[f"one_mcp_{scope}_errors"].series.get(key, 0),
+                    "DURATION_SUM": duration.sum,
+                    "DURATION_P50": duration.quantile(0.5),
+                    "DURATION_P95": duration.quantile(0.95),
+                    "DURATION_P99": duration.quantile(0.99),
+                }
+                stages = ["subprocess", "parse"] if scope == "tool" else ["subprocess"]
+                for stage in stages:
+                    series = self._families[f"one_mcp_{scope}_{stage}_seconds"].series.get(key)
+                    summary[f"{stage.upper()}_SUM"] = series.sum if series else 0.0
+                output = self._families[f"one_mcp_{scope}_output_bytes"].series.get(key)
+                summary["OUTPUT_BYTES_SUM"] = output.sum if output else 0
+                summaries[key] = summary
+        return summaries
+
+    def to_xml(self) -> str:
+        """Return per tool and per binary summaries as ``<METRICS>`` XML."""
+        root = ET.Element("METRICS")
+        ET.SubElement(root, "UPTIME").text = f"{time.time() - self.started:.0f}"
+        for scope, group_tag, label_tag in (("tool", "TOOLS", "NAME"), ("command", "COMMANDS", "BINARY")):
+            group = ET.SubElement(root, group_tag)
+            summaries = self._summaries(scope)
+            # Slowest in total first: what dominates latency
+            for key in sorted(summaries, key=lambda k: -summaries[k]["DURATION_SUM"]):
+                entry = ET.SubElement(group, scope.upper())
+                ET.SubElement(entry, label_tag).text = key
+                for field, value in summaries[key].items():
+                    ET.SubElement(entry, field).text = _format_value(value)
+        return ET.tostring(root, encoding="unicode")
+
+    def to_openmetrics(self) -> str:
+        """Return every metric in the OpenMetrics text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            for family in self._families.values():
+                lines.append(f"# TYPE {family.name} {family.kind}")
+                lines.append(f"# HELP {family.name} {family.help}")
+                for key in sorted(family.series):
+                    label = f'{family.label}="{_escape_label(key)}"'
+                    series = family.series[key]
+                    if family.kind == "counter":
+                        lines.append(f"{family.name}_total{{{label}}} {_format_value(series)}")
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(family.buckets + (math.inf,), series.counts):
+                        cumulative += count
+                        le = "+Inf" if bound == math.inf else _format_value(bound)
+                        lines.append(f'{family.name}_bucket{{{label},le="{le}"}} {cumulative}')
+                    lines.append(f"{family.name}_count{{{label}}} {series.count}")
+                    lines.append(f"{family.name}_sum{{{label}}} {_format_value(series.sum)}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str) -> None:
+        """Write the OpenMetrics text to *path*, atomically replacing it."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_openmetrics())
+        os.replace(tmp_path, path)
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float):
+        if math.isnan(value):
+            return "NaN"
+        return f"{value:.6g}"
+    return str(value)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = Metrics()
+
+
+def add_stage_time(stage: str, seconds: float) -> None:
+    """Add *seconds* to *stage* of the current tool call, if any."""
+    stages = _call_stages.get()
+    if stages is not None:
+        stages[stage] = stages.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def timed_stage(stage: str) -> Iterator[None]:
+    """Count the time spent in the block towards *stage* of the current tool call.
+
+    The time is also added to the current trace span, if tracing is enabled.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        add_stage_time(stage, elapsed)
+        record_stage(stage, elapsed)
+
+
+def instrument_tool(name: str, fn: Callable) -> Callable:
+    """Wrap the async tool *fn* so each of its calls is recorded as *name*.
+
+    A call is an error if it raises or returns an ``<error>`` document. Calls
+    over the slow-call threshold are also written to the slow-call log. Each
+    call gets a correlation ID carried by the records logged on its behalf,
+    together with the tool name and the VM ID(s) it was called with, if any.
+    """
+    signature = inspect.signature(fn)
+    vm_param = next((p for p in ("vm_id", "vm_ids") if p in signature.parameters), None)
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        vm_id = kwargs.get(vm_param) if vm_param is not None else None
+        if vm_id is None and vm_param is not None and args:
+            vm_id = _bound_args(signature, args, kwargs).get(vm_param)
+        call_token = start_call(name, vm_id)
+        try:
+            if not metrics.enabled and not slow_calls_enabled() and not logger.isEnabledFor(logging.DEBUG):
+                return await fn(*args, **kwargs)
+            return await _instrumented_call(name, fn, signature, args, kwargs)
+        finally:
+            end_call(call_token)
+
+    return wrapper
+
+
+async def _instrumented_call(
+    name: str, fn: Callable, signature: inspect.Signature, args: tuple, kwargs: dict
+) -> Any:
+    stages: Dict[str, float] = {}
+    token = _call_stages.set(stages)
+    start = time.perf_counter()
+    result = None
+    try:
+        result = await fn(*args, **kwargs)
+        return result
+    finally:
+        duration = time.perf_counter() - start
+        _call_stages.reset(token)
+        text = result if isinstance(result, str) else ""
+        output_bytes = len(text.encode("utf-8"))
+        error = result is None or text.lstrip().startswith("<error>")
+        metrics.record_tool(name, duration, stages, output_bytes, error)
+        logger.debug(
+            "Tool %s %s in %.3fs",
+            name,
+            "failed" if error else "completed",
+            duration,
+            extra={"duration_ms": round(duration * 1000, 3), "output_bytes": output_bytes},
+        )
+        if slow_calls_enabled():
+            log_slow_call(
+                "tool",
+                name,
+                duration,
+                args=_bound_args(signature, args, kwargs),
+                breakdown=stages,
+                output_bytes=output_bytes,
+                error=error,
+            )
+
+
+def _bound_args(signature: inspect.Signature, args: tuple, kwargs: dict) -> Dict[str, Any]:
+    try:
+        return dict(signature.bind_partial(*args, **kwargs).arguments)
+    except TypeError:
+        return {**{f"arg{i}": value for i, value in enumerate(args)}, **kwargs}
+
+
+class InstrumentedMCP:
+    """Proxy of an MCP server whose ``tool`` decorator records and traces every call.
+
+    Tool modules register on it exactly as on the server itself.
+    """
+
+    def __init__(self, mcp) -> None:
+        self._mcp = mcp
+
+    def tool(self, *, name: str, **kwargs):
+        register = self._mcp.tool(name=name, **kwargs)
+
+        def decorator(fn):
+            register(instrument_tool(name, trace_tool(name, fn)))
+            return fn
+
+        return decorator
+
+    def __getattr__(self, attr: str):
+        return getattr(self._mcp, attr)
+
+
+class MetricsDumper:
+    """Background thread writing the metrics to a file every *interval* seconds."""
+
+    def __init__(self, path: str, interval: float = DEFAULT_DUMP_INTERVAL) -> None:
+        self.path = path
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="one-mcp-metrics", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        stopped = False
+        while True:
+            try:
+                metrics.dump(self.path)
+            except OSError as e:
+                logger.warning("Cannot write metrics to '%s': %s", self.path, e)
+            # One last dump after stop(), so the file holds the final figures
+            if stopped:
+                return
+            stopped = self._stopped.wait(self.interval)
+
+
+_dumper: Optional[MetricsDumper] = None
+
+
+def configure_metrics(
+    enabled: bool = True, dump_path: Optional[str] = None, dump_interval: Optional[float] = None
+) -> Optional[MetricsDumper]:
+    """Enable metrics and optionally their periodic dump to an OpenMetrics file.
+
+    Args:
+        enabled: If False, nothing is recorded.
+        dump_path: File to write the metrics to. If None, uses the
+            ONE_MCP_METRICS_FILE environment variable; if that is unset too,
+            metrics are only available through the server_metrics tool.
+        dump_interval: Seconds between two dumps. If None, uses
+            ONE_MCP_METRICS_INTERVAL or defaults to 60.
+
+    Returns:
+        Optional[MetricsDumper]: The running dumper, if enabled.
+
+    Raises:
+        ValueError: If the dump interval is not positive.
+    """
+    global _dumper
+
+    dump_path = dump_path or os.getenv("ONE_MCP_METRICS_FILE")
+    if dump_interval is None:
+        env_value = os.getenv("ONE_MCP_METRICS_INTERVAL")
+        dump_interval = float(env_value) if env_value else DEFAULT_DUMP_INTERVAL
+    if not dump_interval > 0:  # also rejects nan
+        raise ValueError(f"Invalid metrics dump interval {dump_interval}: must be positive")
+
+    if _dumper is not None:
+        _dumper.stop()
+        _dumper = None
+    metrics.enabled = enabled
+    metrics.clear()
+
+    if enabled and dump_path:
+        _dumper = MetricsDumper(dump_path, dump_interval)
+        _dumper.start()
+        atexit.register(_dumper.stop)
+    logger.debug("Metrics enabled=%s, dump_path=%s, dump_interval=%ss", enabled, dump_path, dump_interval)
+    return _dumper
@@ -0,0 +1,168 @@
+# Copyright 2002-2025, OpenNebula Project, OpenNebula Systems
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Cursor based pagination of OpenNebula pool listings."""
+
+import xml.etree.ElementTree as ET
+from contextlib import AsyncExitStack, aclosing
+from logging import getLogger
+from typing import AsyncIterator, Callable, Iterable, List, Optional
+
+from src.tools.utils.backends import get_backend
+from src.tools.utils.base import command_error_xml, stream_one_command
+from src.tools.utils.formats import PoolRenderer, check_output_format
+from src.tools.utils.projection import parse_fields, project
+from src.tools.utils.metrics import timed_stage
+from src.tools.utils.xml_stream import iter_pool_elements
+
+logger = getLogger("opennebula_mcp.utils.pagination")
+
+DEFAULT_PAGE_SIZE = 100
+
+# `<binary> list --xml` -> (pool root tag, element tag)
+POOL_TAGS = {
+    "onevm": ("VM_POOL", "VM"),
+    "onehost": ("HOST_POOL", "HOST"),
+    "onecluster": ("CLUSTER_POOL", "CLUSTER"),
+    "onedatastore": ("DATASTORE_POOL", "DATASTORE"),
+    "onevnet": ("VNET_POOL", "VNET"),
+    "oneimage": ("IMAGE_POOL", "IMAGE"),
+    "onetemplate": ("VMTEMPLATE_POOL", "VMTEMPLATE"),
+    "onemarketapp": ("MARKETPLACEAPP_POOL", "MARKETPLACEAPP"),
+}
+
+
+async def _iterate(elements: Iterable[ET.Element]) -> AsyncIterator[ET.Element]:
+    for element in elements:
+        yield element
+
+
+def parse_page_args(limit: Optional[str], cursor: Optional[str]) -> Optional[str]:
+    """Validate the ``limit``/``cursor`` tool arguments.
+
+    Returns:
+        Optional[str]: An XML error if the arguments are invalid, None otherwise.
+    """
+    if limit is not None and (not limit.isdigit() or int(limit) == 0):
+        return "<error><message>limit must be a positive integer</message></error>"
+    if cursor is not None and not cursor.isdigit():
+        return "<error><message>Invalid cursor. Pass the NEXT_CURSOR value of the previous page.</message></error>"
+    return None
+
+
+async def list_pool_page(
+    command_parts: List[str],
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    state: Optional[int] = None,
+    match: Optional[Callable[[ET.Element], bool]] = None,
+    fields: Optional[str] = None,
+    output_format: str = "xml",
+    elements: Optional[Iterable[ET.Element]] = None,
+) -> str:
+    """Return one page of a pool listing, filtered while it is streamed.
+
+    The cursor is an opaque token (the offset of the first element of the
+    page). When more elements are left, the returned pool root carries a
+    ``NEXT_CURSOR`` attribute to pass back for the next page.
+
+    When nothing has to be filtered client side and the backend can query
+    the pool by range (XML-RPC backend, filterable pools), only the page is
+    requested from oned. Otherwise the pool is streamed, skipping up to the
+    cursor, and the command is stopped as soon as the page is full.
+
+    Args:
+        command_parts: Pool listing command (e.g. ['onevm', 'list', '--xml'])
+        limit: Page size. If None, every element is returned, or
+            DEFAULT_PAGE_SIZE of them when a cursor is given.
+        cursor: NEXT_CURSOR of the previous page, None for the first page.
+        state: VM state filter, pushed down to oned when possible.
+        match: Client-side filter applied to every element.
+        fields: Comma-separated paths to keep in every element (see
+            ``parse_fields``); the whole element is returned if None.
+        output_format: "xml", "json" or "csv" (see ``formats``).
+        elements: Pool elements already at hand (e.g. the VM state table) to
+            page through instead of running the command.
+
+    Returns:
+        str: The page in *output_format*, or XML error format.
+    """
+    format_error = check_output_format(output_format)
+    if format_error:
+        return format_error
+    paths = parse_fields(fields) if fields is not None else None
+    if isinstance(paths, str):
+        return paths
+
+    root_tag, tag = POOL_TAGS[command_parts[0]]
+    offset = int(cursor) if cursor else 0
+    if cursor is not None and limit is None:
+        limit = DEFAULT_PAGE_SIZE
+    pool_range = None
+    if (
+        elements is None
+        and limit is not None
+        and match is None
+        and get_backend().supports_pool_range(command_parts)
+    ):
+        # One extra element tells whether there is a next page
+        pool_range = (offset, limit + 1)
+
+    skip = 0 if pool_range else offset
+    page = PoolRenderer(root_tag, output_format)
+    has_more = False
+    seen = 0
+
+    try:
+        async with AsyncExitStack() as stack:
+            if elements is not None:
+                pool = _iterate(elements)
+            else:
+                # Both generators are closed explicitly, so a command cut short when
+                # the page is full is killed right away, not when garbage collected
+                chunks = await stack.enter_async_context(
+                    aclosing(stream_one_command(command_parts, state=state, pool_range=pool_range))
+                )
+                pool = await stack.enter_async_context(aclosing(iter_pool_elements(chunks, tag)))
+            async for element in pool:
+                seen += 1
+                # The state is checked even if pushed down, the CLI cannot
+                if state is not None and element.findtext("STATE") != str(state):
+                    continue
+                if match is not None and not match(element):
+                    continue
+                if skip:
+                    skip -= 1
+                    continue
+                if limit is not None and len(page) == limit:
+                    has_more = True
+                    break
+                if paths:
+                    element = project(element, paths)
+                # The element is discarded once the iteration resumes
+                with timed_stage("serialise"):
+                    page.add(element)
+    except ET.ParseError as e:
+        logger.error("Failed to parse %s XML: %s", root_tag, e)
+        raise
+    except Exception as e:
+        return command_error_xml(command_parts, e)
+
+    logger.debug(
+        "%s: returning %s of %s elements read (offset %s, limit %s)", root_tag, len(page), seen, offset, limit
+    )
+
+    with timed_stage("serialise"):
+        return page.render({"NEXT_CURSOR": str(offset + limit)} if has_more else None)
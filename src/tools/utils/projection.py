@@ -0,0 +1,94 @@
+# Copyright 2002-2025, OpenNebula Project, OpenNebula Systems
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Field projection of OpenNebula XML resources."""
+
+import copy
+import re
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape
+from typing import Dict, List, Set, Union
+
+# One path step: a tag, optionally with a positional predicate ([1], [last()])
+_STEP = r"[A-Za-z_][A-Za-z0-9_.-]*(\[(\d+|last\(\)(-\d+)?)\])?"
+_PATH_RE = re.compile(rf"{_STEP}(/{_STEP})*")
+
+
+def parse_fields(fields: str) -> Union[List[str], str]:
+    """Parse a ``fields`` tool argument into a list of element paths.
+
+    Args:
+        fields: Comma-separated paths relative to the resource element, e.g.
+            ``"ID,NAME,STATE,TEMPLATE/NIC/IP,HISTORY_RECORDS/HISTORY[last()]/HID"``
+
+    Returns:
+        List[str] of paths, or an XML error string if any path is invalid.
+    """
+    paths = [path.strip() for path in fields.split(",") if path.strip()]
+    invalid = [path for path in paths if not _PATH_RE.fullmatch(path)]
+    if not paths or invalid:
+        return (
+            "<error><message>Invalid fields. Use comma-separated element paths such as "
+            f"ID,NAME,TEMPLATE/NIC/IP (got: {escape(fields)})</message></error>"
+        )
+    return paths
+
+
+def project(element: ET.Element, paths: List[str]) -> ET.Element:
+    """Return a copy of *element* keeping only the sub-elements at *paths*.
+
+    Intermediate elements are kept (without their other children) so the
+    result has the same structure as the original, e.g. ``TEMPLATE/NIC/IP``
+    yields ``<TEMPLATE><NIC><IP>..</IP></NIC>...</TEMPLATE>`` with one NIC per
+    original NIC. The last step of a path is copied with all its content.
+    """
+    projected = ET.Element(element.tag, element.attrib)
+    # Copies made so far, keyed by the id() of their source element. Full
+    # copies are never descended into again.
+    copies: Dict[int, ET.Element] = {}
+    complete: Set[int] = set()
+    for path in paths:
+        _project_path(element, projected, path.split("/"), copies, complete)
+    return projected
+
+
+def _project_path(
+    source: ET.Element,
+    target: ET.Element,
+    steps: List[str],
+    copies: Dict[int, ET.Element],
+    complete: Set[int],
+) -> None:
+    head, rest = steps[0], steps[1:]
+    for child in source.findall(head):
+        key = id(child)
+        if key in complete:
+            continue
+
+        if rest:
+            if key not in copies:
+                copies[key] = ET.SubElement(target, child.tag, child.attrib)
+            _project_path(child, copies[key], rest, copies, complete)
+            continue
+
+        full = copy.deepcopy(child)
+        full.tail = None
+        if key in copies:
+            # Replace the partial copy made for a previous, deeper path
+            target[list(target).index(copies[key])] = full
+        else:
+            target.append(full)
+        copies[key] = full
+        complete.add(key)
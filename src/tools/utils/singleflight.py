@@ -0,0 +1,158 @@
+# Copyright 2002-2025, OpenNebula Project, OpenNebula Systems
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Coalescing of identical read-only commands running at the same time.
+
+When several tool calls issue the same ``<binary> list|show|top`` command
+while one is already running, they wait for that command instead of starting
+their own, and all receive its output (or its error). Unlike the pool cache,
+nothing is kept once the command has finished, so a later call always runs it
+again.
+
+A write to a resource type makes in-flight reads of that type (and of the
+types it affects) ineligible: calls issued after the write start a fresh
+command rather than joining one that may return pre-write data.
+"""
+
+import asyncio
+import weakref
+from logging import getLogger
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from src.tools.utils.cache import READ_ONLY_SUBCOMMANDS, RESOURCE_TYPES, pool_cache
+
+logger = getLogger("opennebula_mcp.utils.singleflight")
+
+_Key = Tuple[Tuple[str, ...], int]
+
+
+class _Flight:
+    """A running command and the number of calls waiting for it."""
+
+    def __init__(self, task: "asyncio.Task[str]") -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Share one execution between identical concurrent read-only commands.
+
+    Args:
+        enabled: If False, every call runs its own command.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        # Tasks are bound to their event loop, so flights are kept per loop
+        self._flights: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[_Key, _Flight]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self.executed: Dict[str, int] = {}
+        self.coalesced: Dict[str, int] = {}
+
+    @staticmethod
+    def is_coalescable(command_parts: List[str]) -> bool:
+        """Return True for read-only commands of a known binary."""
+        return (
+            len(command_parts) >= 2
+            and command_parts[0] in RESOURCE_TYPES
+            and command_parts[1] in READ_ONLY_SUBCOMMANDS
+        )
+
+    async def run(self, command_parts: List[str], execute: Callable[[], Awaitable[str]]) -> str:
+        """Return the output of ``execute()``, shared with identical calls in flight.
+
+        Args:
+            command_parts: The command ``execute`` runs, used as the key.
+            execute: Runs the command; only called if no identical command is
+                in flight.
+
+        Returns:
+            str: The command output. Errors raised by ``execute`` are raised
+            to every caller sharing it.
+
+        Note:
+            A caller being cancelled (e.g. on timeout) does not affect the
+            others; the command itself is cancelled once no caller waits for it.
+        """
+        if not self.enabled or not self.is_coalescable(command_parts):
+            return await execute()
+
+        resource = RESOURCE_TYPES[command_parts[0]]
+        flights = self._flights.setdefault(asyncio.get_running_loop(), {})
+        # The generation changes on every write, so reads issued after a write
+        # never join a flight that started before it
+        key = (tuple(command_parts), pool_cache.generation(resource))
+
+        flight = flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(execute()))
+            flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._land(flights, key, flight))
+            self.executed[resource] = self.executed.get(resource, 0) + 1
+        else:
+            self.coalesced[resource] = self.coalesced.get(resource, 0) + 1
+            logger.debug("Joining in-flight command: %s", " ".join(command_parts))
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Every caller gave up: stop the command, and remove it now so
+                # that a new identical call does not join the cancelled task
+                self._land(flights, key, flight)
+                flight.task.cancel()
+
+    @staticmethod
+    def _land(flights: Dict[Any, "_Flight"], key: Any, flight: "_Flight") -> None:
+        """Remove *flight* from *flights*, unless another flight replaced it."""
+        if flights.get(key) is flight:
+            del flights[key]
+
+    def in_flight(self) -> int:
+        """Return the number of commands currently shared on this loop."""
+        return len(self._flights.get(asyncio.get_running_loop(), {}))
+
+    def clear(self) -> None:
+        """Reset the counters."""
+        self.executed.clear()
+        self.coalesced.clear()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Return executed/coalesced call counters per resource type."""
+        resources = sorted(set(self.executed) | set(self.coalesced))
+        return {
+            resource: {
+                "executed": self.executed.get(resource, 0),
+                "coalesced": self.coalesced.get(resource, 0),
+            }
+            for resource in resources
+        }
+
+
+single_flight = SingleFlight()
+
+
+def configure_single_flight(enabled: bool = True) -> None:
+    """Enable or disable coalescing of identical concurrent read-only commands.
+
+    Args:
+        enabled: If False, every call runs its own command.
+    """
+    single_flight.enabled = enabled
+    single_flight.clear()
+    logger.debug("Read coalescing enabled=%s", enabled)
@@ -0,0 +1,189 @@
+# Copyright 2002-2025, OpenNebula Project, OpenNebula Systems
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Persistent SSH sessions for commands run inside VMs.
+
+Every ``ssh`` invocation is routed through an OpenSSH ControlMaster: the first
+command to a target pays for the TCP connection, key exchange and
+authentication, later ones reuse the master's connection. Masters exit on
+their own after ``idle_timeout`` seconds without commands (ControlPersist),
+and at most ``max_sessions`` of them are kept; opening one more stops the
+least recently used master.
+"""
+
+import asyncio
+import atexit
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from collections import OrderedDict
+from logging import getLogger
+from typing import List, Optional
+
+logger = getLogger("opennebula_mcp.utils.ssh")
+
+DEFAULT_MAX_SESSIONS = 32
+DEFAULT_IDLE_TIMEOUT = 300
+
+
+class SshSessionPool:
+    """Bookkeeping of the ControlMaster sessions opened by this server.
+
+    Args:
+        max_sessions: Maximum number of master connections kept open.
+        idle_timeout: Seconds an unused master is kept open.
+        enabled: If False, commands are run without multiplexing.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        idle_timeout: int = DEFAULT_IDLE_TIMEOUT,
+        enabled: bool = True,
+    ) -> None:
+        self.enabled = enabled
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._control_dir: Optional[str] = None
+        # target -> time of last use, least recently used first
+        self._sessions: "OrderedDict[str, float]" = OrderedDict()
+        self.opened = 0
+        self.evicted = 0
+
+    @property
+    def control_dir(self) -> str:
+        """Private directory holding the master sockets, created on first use."""
+        if self._control_dir is None:
+            self._control_dir = tempfile.mkdtemp(prefix="one-mcp-ssh-")
+        return self._control_dir
+
+    def _options(self, persist: bool = True) -> List[str]:
+        # %C is a short hash of the connection, keeping socket paths well
+        # below the unix socket path length limit
+        options = ["-o", f"ControlPath={os.path.join(self.control_dir, '%C')}"]
+        if persist:
+            options += ["-o", "ControlMaster=auto", "-o", f"ControlPersist={self.idle_timeout}"]
+        return options
+
+    async def multiplex(self, command_parts: List[str], open_session: bool = True) -> List[str]:
+        """Return an ``ssh <target> ...`` command rewritten to use a shared session.
+
+        Args:
+            command_parts: ``["ssh", target, *remote_command]``
+            open_session: If False, an open session to the target is reused but
+                none is opened, e.g. for one-off commands on more hosts than
+                the pool holds.
+
+        Returns:
+            List[str]: The command with ControlMaster options; unchanged if
+            multiplexing is disabled.
+        """
+        if not self.enabled:
+            return command_parts
+
+        target = command_parts[1]
+        now = time.monotonic()
+        # Masters unused for longer than idle_timeout have exited on their own
+        while self._sessions and now - next(iter(self._sessions.values())) >= self.idle_timeout:
+            expired, _ = self._sessions.popitem(last=False)
+            logger.debug("SSH session to %s expired", expired)
+
+        if target in self._sessions:
+            self._sessions.move_to_end(target)
+        elif not open_session:
+            # ssh connects directly when no master listens on the ControlPath
+            return [command_parts[0], *self._options(persist=False), *command_parts[1:]]
+        else:
+            self.opened += 1
+            if len(self._sessions) >= self.max_sessions:
+                evicted, _ = self._sessions.popitem(last=False)
+                self.evicted += 1
+                await self._stop(evicted)
+        self._sessions[target] = now
+
+        return [command_parts[0], *self._options(), *command_parts[1:]]
+
+    async def _stop(self, target: str) -> None:
+        """Stop the master of *target*; commands still running on it complete."""
+        logger.debug("Stopping least recently used SSH session to %s", target)
+        try:
+            process = await asyncio.create_subprocess_exec(
+                "ssh", *self._options(persist=False), "-O", "stop", target,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            await process.wait()
+        except OSError as e:
+            logger.warning("Failed to stop SSH session to %s: %s", target, e)
+
+    def close(self) -> None:
+        """Close every master connection and remove the socket directory."""
+        if self._control_dir is None:
+            return
+        for target in self._sessions:
+            try:
+                subprocess.run(
+                    ["ssh", *self._options(persist=False), "-O", "exit", target],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    timeout=5,
+                )
+            except (OSError, subprocess.TimeoutExpired) as e:
+                logger.warning("Failed to close SSH session to %s: %s", target, e)
+        self._sessions.clear()
+        shutil.rmtree(self._control_dir, ignore_errors=True)
+        self._control_dir = None
+
+
+ssh_sessions = SshSessionPool()
+atexit.register(ssh_sessions.close)
+
+
+def configure_ssh(
+    enabled: bool = True,
+    max_sessions: Optional[int] = None,
+    idle_timeout: Optional[int] = None,
+) -> None:
+    """Configure the persistent SSH sessions used by execute_command.
+
+    Args:
+        enabled: If False, every command opens its own SSH connection.
+        max_sessions: Maximum number of open sessions. If None, uses the
+            ONE_MCP_SSH_MAX_SESSIONS environment variable or defaults to 32.
+        idle_timeout: Seconds an unused session is kept open. If None, uses the
+            ONE_MCP_SSH_IDLE_TIMEOUT environment variable or defaults to 300.
+
+    Raises:
+        ValueError: If a resolved limit is not a positive integer.
+    """
+    if max_sessions is None:
+        env_value = os.getenv("ONE_MCP_SSH_MAX_SESSIONS")
+        max_sessions = int(env_value) if env_value else DEFAULT_MAX_SESSIONS
+    if idle_timeout is None:
+        env_value = os.getenv("ONE_MCP_SSH_IDLE_TIMEOUT")
+        idle_timeout = int(env_value) if env_value else DEFAULT_IDLE_TIMEOUT
+
+    for name, value in (("max sessions", max_sessions), ("idle timeout", idle_timeout)):
+        if value < 1:
+            raise ValueError(f"Invalid SSH {name} {value}: must be a positive integer")
+
+    ssh_sessions.close()
+    ssh_sessions.enabled = enabled
+    ssh_sessions.max_sessions = max_sessions
+    ssh_sessions.idle_timeout = idle_timeout
+    logger.debug(
+        "SSH sessions enabled=%s, max_sessions=%s, idle_timeout=%ss", enabled, max_sessions, idle_timeout
+    )
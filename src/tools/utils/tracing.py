@@ -0,0 +1,283 @@
+# Copyright 2002-2025, OpenNebula Project, OpenNebula Systems
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Lightweight tracing of tool calls to a local JSONL file.
+
+Every tool call is a trace: a root ``tool`` span whose trace ID is the
+correlation ID of the call's log records, and nested spans for the work done
+on its behalf:
+
+- ``command``: an ``execute_one_command`` or ``stream_one_command`` call,
+  including time waiting for an execution slot; cache hits are marked
+  ``cached``.
+- ``subprocess``: the backend actually running a command (absent when the
+  call shared a coalesced run).
+- ``parse`` and ``serialise``: XML parsing and output rendering. Streaming
+  interleaves them with the command and with each other, so each is reported
+  as one aggregated span per parent: it starts at the first occurrence, lasts
+  the total time spent in the stage and has a ``count`` attribute.
+
+Spans are written, one JSON object per line, by a background thread so the
+request path never does file I/O; if the writer falls behind, spans are
+dropped and counted. Each record has ``trace_id``, ``span_id``,
+``parent_id``, ``name``, ``start`` (Unix time), ``duration_ms``, ``status``
+(ok, error or cancelled) and ``attributes``.
+
+Tracing is disabled unless a trace file is configured, and then costs a
+ContextVar lookup per span.
+"""
+
+import asyncio
+import atexit
+import functools
+import json
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging import getLogger
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from src.logging_config import current_call
+
+logger = getLogger("opennebula_mcp.utils.tracing")
+
+DEFAULT_QUEUE_SIZE = 10000
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """A timed operation of a trace."""
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: Dict[str, Any]) -> None:
+        self.name = name
+        if parent is not None:
+            self.trace_id = parent.trace_id
+        else:
+            # A tool call's trace ID is its correlation ID, to find its log records
+            call = current_call()
+            self.trace_id = call.correlation_id if call is not None else os.urandom(16).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.span_id = os.urandom(8).hex()
+        self.attributes = attributes
+        self.status = "ok"
+        self.start = time.time()
+        self._started = time.perf_counter()
+        # Aggregated stages: name -> [first start, total seconds, count]
+        self._stages: Dict[str, List[float]] = {}
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def add_stage(self, stage: str, seconds: float) -> None:
+        entry = self._stages.get(stage)
+        if entry is None:
+            self._stages[stage] = [time.time() - seconds, seconds, 1]
+        else:
+            entry[1] += seconds
+            entry[2] += 1
+
+    def records(self) -> List[Dict[str, Any]]:
+        """Return the span and its aggregated stages as export records."""
+        records = [
+            {
+                "trace_id": self.trace_id,
+                "span_id": self.span_id,
+                "parent_id": self.parent_id,
+                "name": self.name,
+                "start": round(self.start, 6),
+                "duration_ms": round((time.perf_counter() - self._started) * 1000, 3),
+                "status": self.status,
+                "attributes": self.attributes,
+            }
+        ]
+        for stage, (start, seconds, count) in self._stages.items():
+            records.append(
+                {
+                    "trace_id": self.trace_id,
+                    "span_id": os.urandom(8).hex(),
+                    "parent_id": self.span_id,
+                    "name": stage,
+                    "start": round(start, 6),
+                    "duration_ms": round(seconds * 1000, 3),
+                    "status": "ok",
+                    "attributes": {"aggregated": True, "count": int(count)},
+                }
+            )
+        return records
+
+
+class JsonlExporter:
+    """Append span records to *path* from a background thread.
+
+    Args:
+        path: JSONL file, created if missing.
+        max_queue: Records waiting to be written before new ones are dropped.
+    """
+
+    _STOP = object()
+
+    def __init__(self, path: str, max_queue: int = DEFAULT_QUEUE_SIZE) -> None:
+        self.path = path
+        self.dropped = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue(max_queue)
+        self._file = open(path, "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._run, name="one-mcp-tracing", daemon=True)
+        self._thread.start()
+
+    def export(self, records: List[Dict[str, Any]]) -> None:
+        for record in records:
+            try:
+                self._queue.put_nowait(record)
+            except queue.Full:
+                self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            record = self._queue.get()
+            # Write whatever else is waiting before flushing once
+            batch = [record]
+            while record is not self._STOP:
+                try:
+                    record = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(record)
+            try:
+                for item in batch:
+                    if item is not self._STOP:
+                        self._file.write(json.dumps(item, default=str) + "\n")
+                self._file.flush()
+            except (OSError, ValueError) as e:
+                logger.warning("Cannot write spans to '%s': %s", self.path, e)
+            if batch[-1] is self._STOP:
+                return
+
+    def close(self) -> None:
+        """Write the queued records and close the file."""
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join(timeout=5)
+        self._file.close()
+        if self.dropped:
+            logger.warning("%s spans were dropped, the trace file could not keep up", self.dropped)
+
+
+class Tracer:
+    """Create spans and hand finished ones to the exporter, if any."""
+
+    def __init__(self) -> None:
+        self.exporter: Optional[JsonlExporter] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+        """Run the block in a span, child of the current one; yields None if disabled."""
+        if self.exporter is None:
+            yield None
+            return
+        span = Span(name, _current_span.get(), attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except asyncio.CancelledError:
+            span.status = "cancelled"
+            raise
+        except Exception as e:
+            span.status = "error"
+            span.set(error=str(e)[:200])
+            raise
+        finally:
+            _current_span.reset(token)
+            self.finish(span)
+
+    def start_span(self, name: str, **attributes: Any) -> Optional[Span]:
+        """Start a child of the current span without making it current.
+
+        For work spread over an async generator's iterations, where the
+        current span cannot be switched; end it with ``finish``.
+        """
+        if self.exporter is None:
+            return None
+        return Span(name, _current_span.get(), attributes)
+
+    def finish(self, span: Optional[Span]) -> None:
+        if span is not None and self.exporter is not None:
+            self.exporter.export(span.records())
+
+    @staticmethod
+    def current() -> Optional[Span]:
+        return _current_span.get()
+
+
+tracer = Tracer()
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    """Add *seconds* of *stage* to the current span, if any."""
+    span = _current_span.get()
+    if span is not None:
+        span.add_stage(stage, seconds)
+
+
+def trace_tool(name: str, fn: Callable) -> Callable:
+    """Wrap the async tool *fn* so each call is the root span of a new trace."""
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        if not tracer.enabled:
+            return await fn(*args, **kwargs)
+        # A tool call always starts its own trace
+        token = _current_span.set(None)
+        try:
+            with tracer.span("tool", tool=name) as span:
+                result = await fn(*args, **kwargs)
+                if isinstance(result, str):
+                    span.set(output_bytes=len(result))
+                    if result.lstrip().startswith("<error>"):
+                        span.status = "error"
+                return result
+        finally:
+            _current_span.reset(token)
+
+    return wrapper
+
+
+def configure_tracing(path: Optional[str] = None) -> Optional[JsonlExporter]:
+    """Enable (or disable) writing spans to a JSONL file.
+
+    Args:
+        path: Trace file. If None, uses the ONE_MCP_TRACE_FILE environment
+            variable; if that is unset too, tracing is disabled.
+
+    Returns:
+        Optional[JsonlExporter]: The exporter, if tracing is enabled.
+    """
+    if tracer.exporter is not None:
+        tracer.exporter.close()
+        tracer.exporter = None
+
+    path = path or os.getenv("ONE_MCP_TRACE_FILE")
+    if path:
+        tracer.exporter = JsonlExporter(path)
+        atexit.register(tracer.exporter.close)
+        logger.info("Tracing tool calls to %s", path)
+    return tracer.exporter
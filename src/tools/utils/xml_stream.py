@@ -0,0 +1,68 @@
+# Copyright 2002-2025, OpenNebula Project, OpenNebula Systems
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Incremental parsing of large OpenNebula pool listings."""
+
+import xml.etree.ElementTree as ET
+from typing import AsyncIterator
+
+from src.tools.utils.metrics import timed_stage
+
+
+async def iter_pool_elements(
+    chunks: AsyncIterator[bytes], tag: str
+) -> AsyncIterator[ET.Element]:
+    """Yield the ``tag`` children of a pool document as they are parsed.
+
+    The document is fed to an ``XMLPullParser`` chunk by chunk, and each pool
+    element (e.g. ``<VM>`` under ``<VM_POOL>``) is detached from the tree once
+    the consumer moves on, so memory stays bounded by the chunk size plus a
+    single element instead of the whole pool.
+
+    Args:
+        chunks: Async iterator over the raw XML bytes
+        tag: Tag of the direct children of the root to yield (e.g. 'VM')
+
+    Yields:
+        ET.Element: Each complete pool element. It is only valid until the next
+        iteration; serialise or copy it before resuming.
+
+    Raises:
+        ET.ParseError: If the document is not well-formed XML.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    root = None
+    depth = 0
+
+    async for chunk in chunks:
+        with timed_stage("parse"):
+            parser.feed(chunk)
+            events = list(parser.read_events())
+        for event, element in events:
+            if event == "start":
+                if root is None:
+                    root = element
+                depth += 1
+                continue
+
+            depth -= 1
+            if depth == 1:
+                if element.tag == tag:
+                    yield element
+                root.remove(element)
+
+    # Raises ParseError on truncated documents
+    with timed_stage("parse"):
+        parser.close()
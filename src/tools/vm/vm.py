@@ -14,17 +14,36 @@
 
 """VM management tools for OpenNebula MCP Server."""
 
+import asyncio
+from contextlib import aclosing
 from logging import getLogger
 import re
 import xml.etree.ElementTree as ET
-from typing import Optional, List
+from typing import Dict, List, Optional, Set, Tuple, Union
 
 from src.static import (
     VM_STATES_DESCRIPTION,
     VM_TEMPLATE_DESCRIPTION,
     HOST_STATES_DESCRIPTION,
+    PAGINATION_DESCRIPTION,
+    FIELDS_DESCRIPTION,
+    OUTPUT_FORMAT_DESCRIPTION,
 )
-from src.tools.utils.base import execute_one_command, is_valid_ip_address
+from src.tools.utils.base import (
+    TIMEOUT_EXIT_CODE,
+    command_deadline,
+    command_error_xml,
+    execute_one_command,
+    is_valid_ip_address,
+    stream_one_command,
+)
+from src.tools.utils.coalescing import write_window
+from src.tools.utils.events import vm_states
+from src.tools.utils.formats import check_output_format, convert_xml
+from src.tools.utils.pagination import list_pool_page, parse_page_args
+from src.tools.utils.projection import parse_fields, project
+from src.tools.utils.ssh import ssh_sessions
+from src.tools.utils.xml_stream import iter_pool_elements
 
 # Module logger
 logger = getLogger("opennebula_mcp.vm")
@@ -64,6 +83,300 @@ STATE_VALIDATIONS = {
 }
 
 
+# Maximum number of `onevm show` calls issued in parallel by a single tool call
+MAX_PARALLEL_VM_FETCH = 10
+
+
+async def _fetch_vms_xml(vm_ids: List[str]) -> List[Union[str, BaseException]]:
+    """Run `onevm show <id> --xml` for every ID with bounded parallelism.
+
+    Returns:
+        One entry per ID, in the same order: the command output, or the exception
+        raised while fetching it.
+    """
+    semaphore = asyncio.Semaphore(MAX_PARALLEL_VM_FETCH)
+
+    async def fetch(vmid: str) -> str:
+        async with semaphore:
+            return await execute_one_command(["onevm", "show", vmid, "--xml"])
+
+    return await asyncio.gather(*(fetch(vmid) for vmid in vm_ids), return_exceptions=True)
+
+
+# Polling of wait_for_vm_state: seconds between two pool queries start at the
+# minimum, grow by the backoff factor while no VM changes state and drop back
+# to the minimum as soon as one does. The event-fed state table is cheap to
+# read, so it is checked at a fixed short interval instead.
+DEFAULT_WAIT_TIMEOUT = 300
+WAIT_MIN_INTERVAL = 1.0
+WAIT_MAX_INTERVAL = 15.0
+WAIT_BACKOFF = 1.5
+WAIT_TABLE_INTERVAL = 0.5
+
+# STATE values from which a VM does not move on by itself
+FAILED_STATES = {"7", "11"}
+# LCM_STATE values of an ACTIVE VM that failed an operation
+FAILED_LCM_STATES = {
+    "36", "37", "38", "39", "40", "41", "42", "44", "46", "47", "48", "49", "50", "61"
+}
+DONE_STATE = "6"
+
+
+def _is_failed(state: Optional[str], lcm_state: Optional[str]) -> bool:
+    return state in FAILED_STATES or (state == "3" and lcm_state in FAILED_LCM_STATES)
+
+
+async def _poll_vm_pool(vm_ids: Set[str], use_state_table: bool = True) -> Dict[str, ET.Element]:
+    """Return the current <VM> element of each of *vm_ids* found in the pool.
+
+    One query answers for every VM: the event-fed state table if it is in
+    sync (state fields only), otherwise a fresh `onevm list --xml` streamed
+    past the pool cache, restricted to the span of *vm_ids* where the backend
+    supports it and stopped once every VM has been seen. The table may lag
+    behind events, so VMs it does not know are looked up in the pool.
+    """
+    if use_state_table and vm_states.synced:
+        known = {vm_id: vm_states.get(vm_id) for vm_id in vm_ids}
+        found = {vm_id: vm for vm_id, vm in known.items() if vm is not None}
+        unknown = vm_ids - set(found)
+        if unknown:
+            found.update(await _poll_vm_pool(unknown, use_state_table=False))
+        return found
+
+    numeric_ids = [int(vm_id) for vm_id in vm_ids]
+    found: Dict[str, ET.Element] = {}
+    async with aclosing(
+        stream_one_command(
+            ["onevm", "list", "--xml"],
+            id_range=(min(numeric_ids), max(numeric_ids)),
+            cache=False,
+        )
+    ) as chunks, aclosing(iter_pool_elements(chunks, "VM")) as pool:
+        async for vm in pool:
+            vm_id = vm.findtext("ID")
+            if vm_id in vm_ids:
+                found[vm_id] = vm
+                if len(found) == len(vm_ids):
+                    break
+    return found
+
+
+async def _wait_for_vms(
+    vm_ids: List[str],
+    state: str,
+    lcm_state: Optional[str],
+    timeout: float,
+    use_state_table: bool = True,
+) -> Dict[str, Tuple[str, Optional[ET.Element], float]]:
+    """Wait until every VM reaches STATE *state* (and LCM_STATE *lcm_state*).
+
+    A VM stops being waited for once it reaches the target, fails (see
+    ``_is_failed``) or is missing from the pool; a VM missing while waiting
+    for DONE has reached it.
+
+    Returns:
+        Per VM ID: (status, last <VM> element seen, seconds until the status
+        was known). Status is "reached", "failed", "not_found" or "timeout".
+
+    Raises:
+        Exception: If the first pool query fails; later failures are retried.
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    deadline = start + timeout
+    pending = set(vm_ids)
+    results: Dict[str, Tuple[str, Optional[ET.Element], float]] = {}
+    last_seen: Dict[str, ET.Element] = {}
+    interval = WAIT_MIN_INTERVAL
+    first = True
+
+    while True:
+        from_table = use_state_table and vm_states.synced
+        try:
+            # A query never outlives the wait
+            with command_deadline(max(deadline - loop.time(), WAIT_MIN_INTERVAL)):
+                found: Optional[Dict[str, ET.Element]] = await _poll_vm_pool(
+                    pending, use_state_table
+                )
+        except Exception as e:
+            if first:
+                raise
+            logger.warning("VM pool query failed while waiting, retrying: %s", e)
+            found = None
+        first = False
+        now = loop.time()
+
+        progressed = False
+        for vm_id in sorted(pending) if found is not None else []:
+            vm = found.get(vm_id)
+            if vm is None:
+                status = "reached" if state == DONE_STATE else "not_found"
+            else:
+                previous = last_seen.get(vm_id)
+                current = (vm.findtext("STATE"), vm.findtext("LCM_STATE"))
+                if previous is not None and current != (
+                    previous.findtext("STATE"), previous.findtext("LCM_STATE")
+                ):
+                    progressed = True
+                last_seen[vm_id] = vm
+                if current[0] == state and lcm_state in (None, current[1]):
+                    status = "reached"
+                elif _is_failed(*current):
+                    status = "failed"
+                else:
+                    continue
+            results[vm_id] = (status, vm if vm is not None else last_seen.get(vm_id), now - start)
+            pending.discard(vm_id)
+            progressed = True
+
+        if not pending:
+            break
+        if now >= deadline:
+            for vm_id in pending:
+                results[vm_id] = ("timeout", last_seen.get(vm_id), now - start)
+            break
+
+        if from_table:
+            interval = WAIT_TABLE_INTERVAL
+        elif progressed:
+            interval = WAIT_MIN_INTERVAL
+        else:
+            interval = min(interval * WAIT_BACKOFF, WAIT_MAX_INTERVAL)
+        await asyncio.sleep(min(interval, deadline - now))
+
+    logger.debug("Waited %.1fs for VMs %s", loop.time() - start, ",".join(vm_ids))
+    return results
+
+
+def _wait_result_xml(
+    vm_ids: List[str],
+    results: Dict[str, Tuple[str, Optional[ET.Element], float]],
+    elapsed: float,
+) -> str:
+    """Build the wait_for_vm_state XML, one <vm> per ID in request order."""
+    root = ET.Element("wait_result")
+    ET.SubElement(root, "elapsed").text = f"{elapsed:.1f}"
+    for vm_id in vm_ids:
+        status, vm, vm_elapsed = results[vm_id]
+        entry = ET.SubElement(root, "vm", id=vm_id, status=status, elapsed=f"{vm_elapsed:.1f}")
+        if vm is not None:
+            for field in ("STATE", "LCM_STATE"):
+                ET.SubElement(entry, field).text = vm.findtext(field)
+    return ET.tostring(root, encoding="unicode")
+
+
+async def _wait_until_running(vm_ids: List[str], timeout: float) -> str:
+    """Wait for new VMs to be RUNNING and return their ID, NAME, state and IP."""
+    logger.debug("Waiting up to %gs for VMs %s to be RUNNING", timeout, ",".join(vm_ids))
+    start = asyncio.get_running_loop().time()
+    try:
+        # VMs whose creation events the state table has not received yet are
+        # looked up in the pool by _poll_vm_pool, not reported as not_found
+        results = await _wait_for_vms(vm_ids, "3", "3", timeout)
+        if any(vm is not None and vm.find("TEMPLATE") is None for _, vm, _ in results.values()):
+            # Waited on the state table, which has no IP: one pool query for them
+            found = await _poll_vm_pool(set(vm_ids), use_state_table=False)
+            results = {
+                vm_id: (status, found.get(vm_id, vm), elapsed)
+                for vm_id, (status, vm, elapsed) in results.items()
+            }
+    except Exception as e:
+        logger.error("Failed to query the VM pool: %s", e)
+        return command_error_xml(["onevm", "list", "--xml"], e)
+
+    root = ET.Element("VMS", elapsed=f"{asyncio.get_running_loop().time() - start:.1f}")
+    for vm_id in vm_ids:
+        status, vm, _ = results[vm_id]
+        entry = ET.SubElement(root, "VM", status=status)
+        ET.SubElement(entry, "ID").text = vm_id
+        if vm is not None:
+            for field in ("NAME", "STATE", "LCM_STATE"):
+                ET.SubElement(entry, field).text = vm.findtext(field)
+            ET.SubElement(entry, "IP").text = _vm_ip_address(vm)
+    return ET.tostring(root, encoding="unicode")
+
+
+# Seconds a command run by execute_command may take unless the caller says otherwise
+DEFAULT_EXECUTE_TIMEOUT = 300
+
+# Defaults of execute_command_fleet: hosts reached in parallel and seconds per host
+DEFAULT_FLEET_PARALLEL = 20
+DEFAULT_FLEET_TIMEOUT = 60
+
+
+async def _new_vms_xml(vm_ids: List[str]) -> str:
+    """Return the <VM> elements of freshly instantiated VMs under <VMS>.
+
+    The VMs come from one pool query over their ID span rather than one
+    `onevm show` each; any VM the query misses (or all of them, if it fails)
+    is fetched with bounded parallel `onevm show` calls. VMs are listed in
+    the order of *vm_ids*.
+    """
+    try:
+        found = await _poll_vm_pool(set(vm_ids), use_state_table=False)
+    except Exception as e:
+        logger.warning("Pool query for new VMs failed, fetching them one by one: %s", e)
+        found = {}
+
+    missing = [vm_id for vm_id in vm_ids if vm_id not in found]
+    if missing:
+        logger.debug("VMs %s not in the pool listing, fetching them one by one", missing)
+        for vm_id, vm_xml in zip(missing, await _fetch_vms_xml(missing)):
+            try:
+                if isinstance(vm_xml, BaseException):
+                    raise vm_xml
+                found[vm_id] = ET.fromstring(vm_xml)
+            except Exception as e:
+                logger.error("Failed to get details of VM %s: %s", vm_id, e)
+
+    root = ET.Element("VMS")
+    root.extend(found[vm_id] for vm_id in vm_ids if vm_id in found)
+    return ET.tostring(root, encoding="unicode")
+
+
+def _vm_ip_address(vm: ET.Element) -> Optional[str]:
+    """Return the first IP address of a VM element (NIC lease or context)."""
+    for path in ("TEMPLATE/NIC/IP", "TEMPLATE/CONTEXT/ETH0_IP"):
+        ip = vm.findtext(path)
+        if ip and is_valid_ip_address(ip):
+            return ip
+    return None
+
+
+async def _run_on_host(ip: str, command: str, timeout: float, open_session: bool) -> Tuple[str, str]:
+    """Run *command* on *ip* over SSH and return a (status, output) pair."""
+    command_parts = ["ssh", f"root@{ip}", command]
+    with command_deadline(timeout):
+        output = await execute_one_command(await ssh_sessions.multiplex(command_parts, open_session))
+
+    if not output.startswith("<error>"):
+        return "ok", output
+    try:
+        error = ET.fromstring(output)
+    except ET.ParseError:
+        return "error", output
+    if error.findtext("exit_code") == str(TIMEOUT_EXIT_CODE):
+        return "timeout", f"No result within {timeout:g} seconds"
+    # The stderr of the failed command, without the per-host command line
+    return f"exit {error.findtext('exit_code')}", error.findtext("stderr") or ""
+
+
+def _group_fleet_results(command: str, results: List[Tuple[str, str, str]]) -> str:
+    """Build the execute_command_fleet XML, one <group> per identical result."""
+    groups: Dict[Tuple[str, str], List[str]] = {}
+    for target, status, output in results:
+        groups.setdefault((status, output), []).append(target)
+
+    root = ET.Element("fleet_result")
+    ET.SubElement(root, "command").text = command
+    ET.SubElement(root, "hosts").text = str(len(results))
+    for (status, output), targets in sorted(groups.items(), key=lambda g: -len(g[1])):
+        group = ET.SubElement(root, "group", status=status, count=str(len(targets)))
+        ET.SubElement(group, "targets").text = ",".join(targets)
+        ET.SubElement(group, "output").text = output
+    return ET.tostring(root, encoding="unicode")
+
+
 def _is_multi_vm(vm_id: str) -> bool:
     """Return True if vm_id string denotes a comma-separated list or numeric range."""
     return "," in vm_id or ".." in vm_id
@@ -98,6 +411,202 @@ def _wrap_success_xml(vm_id: str, operation: str, hard: bool, result: str, multi
     return ET.tostring(success_root, encoding="unicode")
 
 
+# Largest number of VMs a single manage_vm call may target
+MAX_BATCH_VMS = 10000
+
+# The VM an error line of a multi-VM onevm command is about, e.g.
+# "[one.vm.action] User [0] : Not authorized to perform MANAGE VM [5]."
+_VM_ERROR_ID = re.compile(r"(?:\bVM|virtual machine)\s*\[?(\d+)\]?", re.IGNORECASE)
+
+
+def _parse_vm_id_list(vm_id: str) -> Optional[List[str]]:
+    """Expand a comma-separated list or an ``a..b`` range into distinct VM IDs.
+
+    Returns:
+        The IDs in request order, or None if *vm_id* is neither form or
+        targets more than MAX_BATCH_VMS VMs.
+    """
+    vm_id = vm_id.strip()
+    if ".." in vm_id:
+        first, _, last = vm_id.partition("..")
+        if not (first.isdigit() and last.isdigit()) or int(first) > int(last):
+            return None
+        if int(last) - int(first) >= MAX_BATCH_VMS:
+            return None
+        return [str(i) for i in range(int(first), int(last) + 1)]
+
+    parts = [part.strip() for part in vm_id.split(",")]
+    if not all(part.isdigit() for part in parts) or len(parts) > MAX_BATCH_VMS:
+        return None
+    return list(dict.fromkeys(str(int(part)) for part in parts))
+
+
+def _state_error(operation: str, state: int, lcm_state: Optional[int]) -> Optional[str]:
+    """Return why *operation* is not allowed in STATE/LCM_STATE, None if it is."""
+    validation = STATE_VALIDATIONS[operation]
+    if state not in validation["valid_states"]:
+        return f"{validation['error_msg']} (current state: {state})"
+    # LCM states are only validated when the VM is ACTIVE
+    if "valid_lcm_states" in validation and state == 3:
+        if lcm_state not in validation["valid_lcm_states"]:
+            return f"{validation['error_msg']} (current LCM state: {lcm_state})"
+    return None
+
+
+def _failed_vms(error_xml: str, vm_ids: List[str]) -> Dict[str, str]:
+    """Attribute the error of a multi-VM onevm command to the VMs it names.
+
+    The CLI reports one stderr line per VM it could not act on. Lines naming
+    none of *vm_ids* cannot be attributed; if no line can, every VM is
+    reported failed with the whole error.
+
+    Returns:
+        Per failed VM ID, the error lines about it.
+    """
+    try:
+        root = ET.fromstring(error_xml)
+        stderr = root.findtext("stderr") or root.findtext("message") or error_xml
+    except ET.ParseError:
+        stderr = error_xml
+
+    failed: Dict[str, List[str]] = {}
+    for line in stderr.splitlines():
+        for vm_id in set(_VM_ERROR_ID.findall(line)) & set(vm_ids):
+            failed.setdefault(vm_id, []).append(line.strip())
+    if not failed:
+        return {vm_id: stderr.strip() for vm_id in vm_ids}
+    return {vm_id: "\n".join(lines) for vm_id, lines in failed.items()}
+
+
+def _batch_result_xml(
+    vm_id: str, operation: str, hard: bool, output: str, outcomes: Dict[str, Tuple[str, Optional[str]]]
+) -> str:
+    """Return the <result> of a multi-VM operation with one <vm> per target."""
+    counts = {status: 0 for status in ("eligible", "skipped", "failed")}
+    for status, _ in outcomes.values():
+        counts[status] += 1
+
+    root = ET.Element("result")
+    ET.SubElement(root, "vm_id").text = vm_id
+    ET.SubElement(root, "operation").text = operation
+    ET.SubElement(root, "hard").text = str(hard)
+    ET.SubElement(root, "message").text = (
+        f"VMs {vm_id} {operation}: {counts['eligible']} executed, "
+        f"{counts['skipped']} skipped, {counts['failed']} failed"
+    )
+    ET.SubElement(root, "command_output").text = output.strip()
+    vms = ET.SubElement(root, "vms", {status: str(count) for status, count in counts.items()})
+    for target, (status, reason) in outcomes.items():
+        entry = ET.SubElement(vms, "vm", id=target, status=status)
+        if reason:
+            ET.SubElement(entry, "reason").text = reason
+    return ET.tostring(root, encoding="unicode")
+
+
+_Outcomes = Dict[str, Tuple[str, Optional[str]]]
+
+
+async def _act_on_vms(vm_ids: List[str], operation: str, hard: bool) -> Tuple[str, _Outcomes]:
+    """Validate *vm_ids* against one pool snapshot and act on the eligible ones.
+
+    The snapshot is always one fresh `onevm list` over the span of the IDs,
+    never the event-fed state table: a write must not be allowed or refused
+    on a state the table may not have caught up with. VMs missing from the
+    snapshot or in a state STATE_VALIDATIONS rejects are skipped; the others
+    are acted on with a single `onevm <action> id1,id2,...`.
+
+    Returns:
+        The command output ("" if no VM was eligible) and, per VM ID, its
+        status ("eligible", "skipped" or "failed") and the reason if not eligible.
+
+    Raises:
+        RuntimeError: If the snapshot cannot be taken or the command not run.
+    """
+    try:
+        found = await _poll_vm_pool(set(vm_ids), use_state_table=False)
+    except Exception as e:
+        raise RuntimeError(f"Failed to get VM status: {e}") from e
+
+    outcomes: _Outcomes = {}
+    eligible = []
+    for target in vm_ids:
+        vm = found.get(target)
+        if vm is None:
+            outcomes[target] = ("skipped", f"Error: VM {target} does not exist")
+            continue
+        try:
+            state = int(vm.findtext("STATE"))
+            lcm_text = vm.findtext("LCM_STATE")
+            reason = _state_error(operation, state, int(lcm_text) if lcm_text else None)
+        except (TypeError, ValueError):
+            reason = "Could not determine VM state"
+        if reason:
+            outcomes[target] = ("skipped", reason)
+        else:
+            outcomes[target] = ("eligible", None)
+            eligible.append(target)
+
+    output = ""
+    if eligible:
+        cmd_parts = _build_cmd_parts(operation, ",".join(eligible), hard)
+        logger.debug("Executing multi-VM %s command: %s", operation, " ".join(cmd_parts))
+        try:
+            output = await execute_one_command(cmd_parts)
+        except Exception as e:
+            raise RuntimeError(f"Failed to execute multi-VM {operation}: {e}") from e
+        if output.lstrip().startswith("<error>"):
+            for target, reason in _failed_vms(output, eligible).items():
+                outcomes[target] = ("failed", reason)
+
+    logger.info(
+        "VMs %s %s: %s eligible, %s skipped",
+        ",".join(vm_ids),
+        operation,
+        len(eligible),
+        len(vm_ids) - len(eligible),
+    )
+    return output, outcomes
+
+
+async def _manage_vms(vm_id: str, vm_ids: List[str], operation: str, hard: bool) -> str:
+    """Run a multi-VM operation and return its per-VM <result>."""
+    try:
+        output, outcomes = await _act_on_vms(vm_ids, operation, hard)
+    except RuntimeError as e:
+        logger.error("Failed to %s VMs %s: %s", operation, vm_id, e)
+        return f"<error><message>{e}</message></error>"
+    return _batch_result_xml(vm_id, operation, hard, output, outcomes)
+
+
+async def _manage_vms_coalesced(
+    vm_id: str, vm_ids: List[str], operation: str, hard: bool, multi: bool
+) -> str:
+    """Run an operation as part of the current coalescing window's batch.
+
+    The batch acts on the VMs of every same-operation call of the window at
+    once; this call's result only covers its own VMs, in the format it would
+    have without coalescing.
+    """
+    try:
+        output, outcomes = await write_window.run(
+            (operation, hard), vm_ids, lambda targets: _act_on_vms(targets, operation, hard)
+        )
+    except RuntimeError as e:
+        logger.error("Failed to %s VMs %s: %s", operation, vm_id, e)
+        return f"<error><message>{e}</message></error>"
+
+    if multi:
+        return _batch_result_xml(
+            vm_id, operation, hard, output, {target: outcomes[target] for target in vm_ids}
+        )
+    status, reason = outcomes[vm_ids[0]]
+    if status == "skipped":
+        return f"<error><message>{reason}</message></error>"
+    if status == "failed":
+        return f"<error><message>Failed to execute {operation}: {reason}</message></error>"
+    return _wrap_success_xml(vm_id, operation, hard, output, False)
+
+
 def register_tools(mcp, allow_write):
     """Register VM-related tools.
     Args:
@@ -133,6 +642,8 @@ def register_tools(mcp, allow_write):
 
         For multiple IDs the tool will return an <VMS> root element containing the XML description of each VM exactly as
         returned by `onevm show <id> --xml`.
+        {FIELDS_DESCRIPTION}
+        {OUTPUT_FORMAT_DESCRIPTION}
         {VM_STATES_DESCRIPTION}
         {VM_TEMPLATE_DESCRIPTION}
         
@@ -143,18 +654,26 @@ def register_tools(mcp, allow_write):
               wastes resources. Always batch the IDs into a single call.
         """,
     )
-    def get_vm_status(vm_id: str) -> str:
+    async def get_vm_status(
+        vm_id: str, fields: Optional[str] = None, output_format: str = "xml"
+    ) -> str:
         """Retrieve full details for one or more VMs.
 
         Args:
             vm_id: A **comma-separated** string of VM IDs (e.g. "1" or "1,2,3").
+            fields: Optional comma-separated paths to keep in every VM
+                (e.g. "ID,NAME,STATE,TEMPLATE/NIC/IP").
+            output_format: "xml" (default), "json" or "csv".
+
+        Requests for state fields only (see ``events.STATE_FIELDS``) are
+        served from the event-fed VM state table, if enabled.
 
         Returns:
             str: XML string. For a single VM, the raw `<VM>` element returned by OpenNebula. For multiple VMs, a root
                  `<VMS>` element containing each individual `<VM>` child.
         """
 
-        logger.debug(f"Getting VM status for VM ID(s): {vm_id}")
+        logger.debug("Getting VM status for VM ID(s): %s", vm_id)
 
         # Split by comma and validate each part
         id_parts = [part.strip() for part in vm_id.split(',') if part.strip()]
@@ -165,43 +684,73 @@ def register_tools(mcp, allow_write):
 
         for part in id_parts:
             if not part.isdigit():
-                logger.error(f"Invalid VM ID provided: {part} (must be non-negative integer)")
+                logger.error("Invalid VM ID provided: %s (must be non-negative integer)", part)
                 return (
                     "<error><message>All vm_id values must be non-negative integers separated by commas</message></error>"
                 )
 
+        paths = parse_fields(fields) if fields is not None else None
+        if isinstance(paths, str):
+            return paths
+        format_error = check_output_format(output_format)
+        if format_error:
+            return format_error
+
+        if vm_states.covers(paths):
+            # Only state fields requested: answer from the event-fed table
+            # if it knows every VM, without running any command
+            known = [vm_states.get(vmid) for vmid in id_parts]
+            if all(vm is not None for vm in known):
+                logger.debug("Serving VM status for %s from the state table", vm_id)
+                if len(known) == 1:
+                    result = ET.tostring(project(known[0], paths), encoding="unicode")
+                else:
+                    root = ET.Element("VMS")
+                    root.extend(project(vm, paths) for vm in known)
+                    result = ET.tostring(root, encoding="unicode")
+                return convert_xml(result, output_format)
+
         try:
             if len(id_parts) == 1:
                 # Single VM – return raw XML as-is
                 single_id = id_parts[0]
-                result = execute_one_command(["onevm", "show", single_id, "--xml"])
-                logger.debug(f"Successfully retrieved VM status for VM {single_id}")
-                return result
-
-            # Multiple VMs – aggregate under <VMS>
+                result = await execute_one_command(["onevm", "show", single_id, "--xml"])
+                logger.debug("Successfully retrieved VM status for VM %s", single_id)
+                if paths:
+                    vm_element = ET.fromstring(result)
+                    # Errors are returned unchanged
+                    if vm_element.tag == "VM":
+                        result = ET.tostring(project(vm_element, paths), encoding="unicode")
+                return convert_xml(result, output_format)
+
+            # Multiple VMs – fetch in parallel and aggregate under <VMS> in request order
             root = ET.Element("VMS")
-            for vmid in id_parts:
+            vm_outputs = await _fetch_vms_xml(id_parts)
+            for vmid, vm_xml in zip(id_parts, vm_outputs):
                 try:
-                    vm_xml = execute_one_command(["onevm", "show", vmid, "--xml"])
+                    if isinstance(vm_xml, BaseException):
+                        raise vm_xml
                     vm_element = ET.fromstring(vm_xml)
+                    if paths and vm_element.tag == "VM":
+                        vm_element = project(vm_element, paths)
                     root.append(vm_element)
-                    logger.debug(f"Added VM {vmid} status to aggregate output")
+                    logger.debug("Added VM %s status to aggregate output", vmid)
                 except Exception as e:
-                    logger.error(f"Failed to get VM status for VM {vmid}: {e}")
+                    logger.error("Failed to get VM status for VM %s: %s", vmid, e)
                     # Include an <error> element for this VM instead of failing entire request
                     err_el = ET.SubElement(root, "error")
                     ET.SubElement(err_el, "vm_id").text = vmid
                     ET.SubElement(err_el, "message").text = str(e)
 
-            return ET.tostring(root, encoding="unicode")
+            return convert_xml(ET.tostring(root, encoding="unicode"), output_format)
 
         except Exception as e:
-            logger.error(f"Unexpected error while retrieving VM status: {e}")
+            logger.error("Unexpected error while retrieving VM status: %s", e)
             return f"<error><message>{e}</message></error>"
 
     @mcp.tool(
         name="execute_command",
-        description="""Execute a shell command inside an OpenNebula virtual machine.
+        description=f"""Execute a shell command inside an OpenNebula virtual machine.
 
         ⚠️  CRITICAL SECURITY CHECK - READ FIRST ⚠️
         
@@ -236,8 +785,8 @@ def register_tools(mcp, allow_write):
         2. Make the command non-interactive using flags like `-y`, `--yes`, etc.
 
         === STRICT NON-INTERACTIVE POLICY ===
-        The command MUST **never** wait for keyboard input. A blocking prompt
-        will freeze the underlying `subprocess.run` and break the workflow.
+        The command MUST **never** wait for keyboard input. stdin is closed, so a
+        prompt fails or hangs until the command is killed at its timeout.
 
         1. Make the command non-interactive.
            - Use native flags: `-y`, `--yes`, `--assume-yes`, `--noconfirm`,
@@ -355,14 +904,19 @@ def register_tools(mcp, allow_write):
         Parameters:
         - vm_ip_address: target VM address.
         - command      : shell command to execute.
+        - timeout      : seconds after which the command is killed (default {DEFAULT_EXECUTE_TIMEOUT}).
+                         Raise it for long-running jobs such as package upgrades or large copies.
         """,
     )
-    def execute_command(vm_ip_address: str, command: str) -> str:
+    async def execute_command(
+        vm_ip_address: str, command: str, timeout: Optional[str] = None
+    ) -> str:
         """Execute a shell command inside an OpenNebula virtual machine.
 
         Args:
             vm_ip_address: target VM address.
             command: shell command to execute.
+            timeout: seconds after which the command is killed.
 
         Returns:
             str: XML string with command execution result or error message.
@@ -379,22 +933,31 @@ def register_tools(mcp, allow_write):
 
         # Sanitize command for logging (truncate if very long, avoid logging sensitive commands)
         cmd_preview = command[:100] + "..." if len(command) > 100 else command
-        logger.debug(f"Executing command on VM {vm_ip_address}: '{cmd_preview}'")
+        logger.debug("Executing command on VM %s: '%s'", vm_ip_address, cmd_preview)
 
         # Check if the IP address is valid
         if not is_valid_ip_address(vm_ip_address):
-            logger.error(f"Invalid IP address provided: {vm_ip_address}")
+            logger.error("Invalid IP address provided: %s", vm_ip_address)
             return "<error><message>Invalid IP address</message></error>"
 
+        try:
+            seconds = float(timeout) if timeout is not None else DEFAULT_EXECUTE_TIMEOUT
+        except ValueError:
+            seconds = 0
+        if not seconds > 0:  # also rejects nan
+            return "<error><message>timeout must be a positive number of seconds</message></error>"
+
         # Construct a direct SSH command, bypassing the 'onevm ssh' wrapper to avoid authentication issues
         ssh_command_parts = ["ssh", f"root@{vm_ip_address}", command]
-        logger.debug(f"SSH command constructed for VM {vm_ip_address}")
+        logger.debug("SSH command constructed for VM %s", vm_ip_address)
 
         try:
-            output = execute_one_command(ssh_command_parts)
-            logger.debug(f"Command execution completed on VM {vm_ip_address}")
+            # Reuse the persistent session to this VM, if any, to skip the handshake
+            with command_deadline(seconds):
+                output = await execute_one_command(await ssh_sessions.multiplex(ssh_command_parts))
+            logger.debug("Command execution completed on VM %s", vm_ip_address)
         except Exception as e:
-            logger.error(f"SSH command execution failed on VM {vm_ip_address}: {e}")
+            logger.error("SSH command execution failed on VM %s: %s", vm_ip_address, e)
             output = f"<error><message>Command execution failed via direct SSH: {e}</message></error>"
 
         result_root = ET.Element("result")
@@ -403,29 +966,161 @@ def register_tools(mcp, allow_write):
         ET.SubElement(result_root, "output").text = output
         return ET.tostring(result_root, encoding="unicode")
 
+    @mcp.tool(
+        name="execute_command_fleet",
+        description=f"""Execute the same shell command inside many OpenNebula virtual machines at once.
+
+        Use this tool instead of calling `execute_command` repeatedly when a command must run on several VMs
+        (e.g. "check disk usage on all web VMs"). The command runs on up to `max_parallel` VMs at a time, each
+        with its own timeout, and VMs that return the same output are grouped so the response stays small.
+
+        The same rules as `execute_command` apply: reject dangerous commands without calling any tool, and make
+        the command strictly non-interactive.
+
+        Parameters:
+        - targets     : comma-separated VM IP addresses and/or VM IDs (e.g. "10.0.0.5,10.0.0.6" or "12,13,14").
+                        VM IDs are resolved to their first IP address through the VM pool.
+        - command     : shell command to execute.
+        - max_parallel: maximum number of VMs contacted at the same time (default {DEFAULT_FLEET_PARALLEL}).
+        - timeout     : seconds allowed per VM before it is reported as timed out (default {DEFAULT_FLEET_TIMEOUT}).
+
+        === RETURN FORMAT ===
+        <fleet_result>
+          <command>...</command>
+          <hosts>number of targets</hosts>
+          <group status="ok | exit N | timeout | unresolved" count="...">
+            <targets>comma-separated targets as given</targets>
+            <output>output shared by these targets (stderr for failures)</output>
+          </group>
+          ...
+        </fleet_result>
+        Groups are ordered from the largest to the smallest.
+        """,
+    )
+    async def execute_command_fleet(
+        targets: str,
+        command: str,
+        max_parallel: Optional[str] = None,
+        timeout: Optional[str] = None,
+    ) -> str:
+        """Execute a shell command inside several OpenNebula virtual machines.
+
+        Args:
+            targets: Comma-separated VM IP addresses and/or VM IDs.
+            command: shell command to execute.
+            max_parallel: Maximum number of VMs contacted concurrently.
+            timeout: Seconds allowed per VM.
+
+        Returns:
+            str: XML string with the results grouped by identical output, or error message.
+        """
+        if not allow_write:
+            logger.warning(
+                "execute_command_fleet called while allow_write=False – refusing to execute command"
+            )
+            return (
+                "<error><message>Write operations are disabled on this MCP instance."
+                "</message></error>"
+            )
+
+        if max_parallel is not None and not (max_parallel.isdigit() and int(max_parallel) > 0):
+            return "<error><message>max_parallel must be a positive integer</message></error>"
+        try:
+            per_host_timeout = float(timeout) if timeout is not None else DEFAULT_FLEET_TIMEOUT
+        except ValueError:
+            per_host_timeout = 0
+        if per_host_timeout <= 0:
+            return "<error><message>timeout must be a positive number of seconds</message></error>"
+
+        target_list = [t.strip() for t in targets.split(",") if t.strip()]
+        if not target_list:
+            return "<error><message>targets must list at least one VM IP address or ID</message></error>"
+        invalid = [t for t in target_list if not (t.isdigit() or is_valid_ip_address(t))]
+        if invalid:
+            logger.error("Invalid fleet targets: %s", invalid)
+            return (
+                f"<error><message>Invalid targets {','.join(invalid)}: "
+                "each target must be a VM IP address or a non-negative integer VM ID</message></error>"
+            )
+
+        # Resolve VM IDs to current addresses with a single pool query over
+        # their ID span, past the pool cache
+        addresses: Dict[str, Optional[str]] = {t: t for t in target_list if not t.isdigit()}
+        vm_ids = [t for t in target_list if t.isdigit()]
+        if vm_ids:
+            try:
+                found = await _poll_vm_pool(set(vm_ids), use_state_table=False)
+            except Exception as e:
+                logger.error("Failed to query the VM pool: %s", e)
+                return command_error_xml(["onevm", "list", "--xml"], e)
+            for vm_id in vm_ids:
+                addresses[vm_id] = _vm_ip_address(found[vm_id]) if vm_id in found else None
+
+        cmd_preview = command[:100] + "..." if len(command) > 100 else command
+        logger.debug("Executing command on %s VMs: '%s'", len(target_list), cmd_preview)
+
+        # Only open persistent sessions if the whole fleet fits in the pool
+        hosts = {ip for ip in addresses.values() if ip}
+        open_sessions = len(hosts) <= ssh_sessions.max_sessions
+        semaphore = asyncio.Semaphore(int(max_parallel) if max_parallel else DEFAULT_FLEET_PARALLEL)
+
+        async def run(target: str) -> Tuple[str, str, str]:
+            ip = addresses[target]
+            if ip is None:
+                return target, "unresolved", "VM not found or without an IP address"
+            async with semaphore:
+                status, output = await _run_on_host(ip, command, per_host_timeout, open_sessions)
+            return target, status, output
+
+        results = await asyncio.gather(*(run(t) for t in target_list))
+        return _group_fleet_results(command, results)
+
     @mcp.tool(
         name="list_vms",
         description=f"""Retrieve a list of all virtual machines, with optional filters. 
-        It is possible to pass the state, host_id, and cluster_id as a string, but they must represent non-negative integers otherwise you cannot use the tool.
+        It is possible to pass the state, host_id, cluster_id, owner_id and group_id as a string, but they must represent non-negative integers otherwise you cannot use the tool.
         The host_id is used to filter on the HID field of the HISTORY_RECORDS element.
         The cluster_id is used to filter on the CID field of the HISTORY_RECORDS element.
-        The state is used to filter on the STATE field of the VM element.
+        The state is used to filter on the STATE field of the VM element. Terminated VMs are not listed, so state 6 (DONE) is rejected.
+        The owner_id is used to filter on the UID field of the VM element (the owner user).
+        The group_id is used to filter on the GID field of the VM element (the owner group).
+        {PAGINATION_DESCRIPTION}
+        {FIELDS_DESCRIPTION}
+        {OUTPUT_FORMAT_DESCRIPTION}
         {VM_STATES_DESCRIPTION}
         {VM_TEMPLATE_DESCRIPTION}
         {HOST_STATES_DESCRIPTION}
         """,
     )
-    def list_vms(
+    async def list_vms(
         state: Optional[str] = None,
         host_id: Optional[str] = None,
         cluster_id: Optional[str] = None,
+        owner_id: Optional[str] = None,
+        group_id: Optional[str] = None,
+        limit: Optional[str] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None,
+        output_format: str = "xml",
     ) -> str:
-        """List VMs with optional filters for state, host, and cluster.
+        """List VMs with optional filters for state, host, cluster, owner and group.
+
+        The owner filter is always applied by oned (pool filter flag), and so is
+        the state filter when the XML-RPC backend is in use. The remaining
+        filters are applied while the pool is being parsed. Requests for
+        state fields only are served from the event-fed VM state table, if
+        enabled.
 
         Args:
-            state (Optional[str]): Filter by VM state ID.
+            state (Optional[str]): Filter by VM state ID, any but DONE.
             host_id (Optional[str]): Filter by host ID where the VM is running.
             cluster_id (Optional[str]): Filter by cluster ID where the VM is running.
+            owner_id (Optional[str]): Filter by the ID of the owner user.
+            group_id (Optional[str]): Filter by the ID of the owner group.
+            limit (Optional[str]): Maximum number of VMs to return (page size).
+            cursor (Optional[str]): NEXT_CURSOR of the previous page.
+            fields (Optional[str]): Comma-separated paths to keep in every VM.
+            output_format (str): "xml" (default), "json" or "csv".
 
         Returns:
             str: XML string conforming to VM Pool XSD Schema.
@@ -438,44 +1133,44 @@ def register_tools(mcp, allow_write):
             filters_desc.append(f"host_id={host_id}")
         if cluster_id:
             filters_desc.append(f"cluster_id={cluster_id}")
+        if owner_id:
+            filters_desc.append(f"owner_id={owner_id}")
+        if group_id:
+            filters_desc.append(f"group_id={group_id}")
         filters_str = ", ".join(filters_desc) if filters_desc else "no filters"
-        logger.debug(f"Listing VMs with filters: {filters_str}")
+        logger.debug("Listing VMs with filters: %s", filters_str)
 
-        try:
-            result = execute_one_command(["onevm", "list", "--xml"])
-            logger.debug(f"Retrieved VM list from OpenNebula")
-        except Exception as e:
-            logger.error(f"Failed to retrieve VM list: {e}")
-            raise
+        page_error = parse_page_args(limit, cursor) or check_output_format(output_format)
+        if page_error:
+            return page_error
 
-        if all(f is None for f in [state, host_id, cluster_id]):
+        filters = [state, host_id, cluster_id, owner_id, group_id]
+        paging = [limit, cursor, fields]
+        if all(f is None for f in filters + paging):
             logger.debug("No filters applied, returning all VMs")
-            return result
-        else:
-            # Validate that non-None filter values are integers
-            filter_values = [f for f in [state, host_id, cluster_id] if f is not None]
-            if any(not f.isdigit() for f in filter_values):
-                logger.error(
-                    f"Invalid filter values provided: {filter_values} (must be integers)"
-                )
-                return "<error><message>Invalid filter values. All filter values must represent integers.</message></error>"
+            return convert_xml(
+                await execute_one_command(["onevm", "list", "--xml"]), output_format
+            )
 
-        try:
-            root = ET.fromstring(result)
-            total_vms = len(root.findall("VM"))
-            logger.debug(f"Parsing XML and applying filters to {total_vms} VMs")
-        except ET.ParseError as e:
-            logger.error(f"Failed to parse VM list XML: {e}")
-            raise
-
-        filtered_vms = []
-
-        for vm in root.findall("VM"):
-            # State filter
-            if state is not None:
-                vm_state = vm.find("STATE")
-                if vm_state is None or vm_state.text != state:
-                    continue
+        # Validate that non-None filter values are integers
+        filter_values = [f for f in filters if f is not None]
+        if any(not f.isdigit() for f in filter_values):
+            logger.error(
+                "Invalid filter values provided: %s (must be integers)", filter_values
+            )
+            return "<error><message>Invalid filter values. All filter values must represent integers.</message></error>"
+
+        # `onevm list` never shows DONE VMs while oned's pool call can, so the
+        # answer would depend on the backend
+        if state == DONE_STATE:
+            return "<error><message>Terminated VMs are not listed, state 6 (DONE) cannot be used as a filter.</message></error>"
+
+        def matches(vm: ET.Element) -> bool:
+            # Group filter, oned can only filter on the caller's own groups
+            if group_id is not None:
+                vm_group_id = vm.find("GID")
+                if vm_group_id is None or vm_group_id.text != group_id:
+                    return False
 
             # History-based filters (host and cluster)
             history = vm.find("HISTORY_RECORDS/HISTORY[last()]")
@@ -484,32 +1179,133 @@ def register_tools(mcp, allow_write):
                 if host_id is not None:
                     vm_host_id = history.find("HID")
                     if vm_host_id is None or vm_host_id.text != host_id:
-                        continue
+                        return False
                 # Cluster filter
                 if cluster_id is not None:
                     vm_cluster_id = history.find("CID")
                     if vm_cluster_id is None or vm_cluster_id.text != cluster_id:
-                        continue
+                        return False
             elif host_id is not None or cluster_id is not None:
                 # If history is required for filtering but not present, skip VM
-                continue
-
-            filtered_vms.append(vm)
+                return False
+
+            return True
+
+        paths = parse_fields(fields) if fields is not None else None
+        if (
+            not isinstance(paths, str)
+            and host_id is None
+            and cluster_id is None
+            and vm_states.covers(paths)
+        ):
+            # Only state fields requested: page through the event-fed table
+            logger.debug("Serving VM list from the state table")
+
+            def owned(vm: ET.Element) -> bool:
+                return (owner_id is None or vm.findtext("UID") == owner_id) and matches(vm)
+
+            return await list_pool_page(
+                ["onevm", "list", "--xml"],
+                limit=int(limit) if limit is not None else None,
+                cursor=cursor,
+                state=int(state) if state is not None else None,
+                match=owned,
+                fields=fields,
+                output_format=output_format,
+                elements=vm_states.elements(),
+            )
 
-        logger.debug(
-            f"Filtering completed: {len(filtered_vms)}/{total_vms} VMs match criteria"
+        # Push the owner (CLI filterflag / oned filter flag) and the state down
+        # to oned, then filter the rest while the pool is being read so only
+        # matching VMs are kept in memory.
+        command_parts = ["onevm", "list", "--xml"]
+        if owner_id is not None:
+            command_parts.insert(2, owner_id)
+        client_side = any(f is not None for f in [host_id, cluster_id, group_id])
+
+        return await list_pool_page(
+            command_parts,
+            limit=int(limit) if limit is not None else None,
+            cursor=cursor,
+            state=int(state) if state is not None else None,
+            match=matches if client_side else None,
+            fields=fields,
+            output_format=output_format,
         )
 
-        # Create new XML with filtered VMs
-        new_root = ET.Element("VM_POOL")
-        for vm in filtered_vms:
-            new_root.append(vm)
+    @mcp.tool(
+        name="wait_for_vm_state",
+        description=f"""Wait until one or more VMs reach a given state, then return their final states.
 
-        return ET.tostring(new_root, encoding="unicode")
+        Use this tool instead of calling `get_vm_status` repeatedly after `manage_vm` or `instantiate_vm`:
+        the server polls the VM pool once per tick for all the VMs, backing off while nothing changes, and
+        answers once every VM has reached the state, failed, disappeared or the timeout expired.
+
+        Parameters:
+        - vm_ids   : comma-separated non-negative VM IDs (e.g. "42" or "1,2,3"). Expand ranges yourself.
+        - state    : target STATE (e.g. "3" for ACTIVE, "8" for POWEROFF, "6" for DONE, i.e. terminated).
+        - lcm_state: optional target LCM_STATE, only meaningful with state "3" (e.g. "3" for RUNNING).
+        - timeout  : seconds to wait at most (default {DEFAULT_WAIT_TIMEOUT}).
+
+        Returns a <wait_result> element with the total <elapsed> seconds and one <vm> per ID, in request
+        order, with a status attribute and the last STATE and LCM_STATE seen:
+            • reached  : the VM is in the requested state (elapsed = seconds it took)
+            • failed   : the VM went into a failure state (e.g. BOOT_FAILURE) and will not get there by itself
+            • not_found: the VM is not in the pool (wrong ID or already terminated)
+            • timeout  : the state was not reached in time
+
+        {VM_STATES_DESCRIPTION}
+        """,
+    )
+    async def wait_for_vm_state(
+        vm_ids: str,
+        state: str,
+        lcm_state: Optional[str] = None,
+        timeout: Optional[str] = None,
+    ) -> str:
+        """Wait for one or more VMs to reach a state.
+
+        Args:
+            vm_ids: Comma-separated VM IDs.
+            state: Target STATE.
+            lcm_state: Optional target LCM_STATE.
+            timeout: Seconds to wait at most.
+
+        Returns:
+            str: <wait_result> XML, or XML error format.
+        """
+        id_parts = [part.strip() for part in vm_ids.split(",") if part.strip()]
+        if not id_parts or not all(part.isdigit() for part in id_parts):
+            return "<error><message>vm_ids must be non-negative integers separated by commas</message></error>"
+        # Duplicates are waited for once
+        id_parts = list(dict.fromkeys(id_parts))
+        if not state.isdigit() or (lcm_state is not None and not lcm_state.isdigit()):
+            return "<error><message>state and lcm_state must be non-negative integers</message></error>"
+        try:
+            seconds = float(timeout) if timeout is not None else DEFAULT_WAIT_TIMEOUT
+        except ValueError:
+            seconds = 0
+        if not seconds > 0:  # also rejects nan
+            return "<error><message>timeout must be a positive number of seconds</message></error>"
+
+        logger.debug(
+            "Waiting up to %gs for VMs %s to reach STATE=%s, LCM_STATE=%s",
+            seconds,
+            ",".join(id_parts),
+            state,
+            lcm_state,
+        )
+        start = asyncio.get_running_loop().time()
+        try:
+            results = await _wait_for_vms(id_parts, state, lcm_state, seconds)
+        except Exception as e:
+            logger.error("Failed to query the VM pool: %s", e)
+            return command_error_xml(["onevm", "list", "--xml"], e)
+        return _wait_result_xml(id_parts, results, asyncio.get_running_loop().time() - start)
 
     @mcp.tool(
         name="instantiate_vm",
-        description="""Create a new OpenNebula virtual machine from an existing template with specified resources.
+        description=f"""Create a new OpenNebula virtual machine from an existing template with specified resources.
             The function performs minimal validation of the provided parameters, constructs the
             appropriate *onetemplate instantiate* CLI call and, upon success, retrieves the full
             VM details in XML format so that callers always receive a valid VM XSD document.
@@ -517,6 +1313,10 @@ def register_tools(mcp, allow_write):
             **IMPORTANT**: After successfully instantiating a VM, DO NOT call `list_vms` to verify the creation. 
             The tool already returns the VM details in XML format. Only call this tool once per instantiation request.
 
+            **WAIT MODE**: If the next step needs the VM running (e.g. `execute_command` on it), pass
+            `wait=True`: the tool then waits until every new VM is RUNNING and returns their IP addresses,
+            so DO NOT poll `get_vm_status` or call `wait_for_vm_state` afterwards.
+
             Args:
                 template_id: String ID of the template to instantiate but it must be a non-negative integer otherwise you cannot use the tool
                 vm_name: Optional - name for the new VM
@@ -524,19 +1324,26 @@ def register_tools(mcp, allow_write):
                 memory: Optional - Memory amount given to the VM. By default the unit is megabytes.
                 network_name: Optional - network name to attach
                 num_instances: Optional - number of VMs to instantiate
+                wait: Optional - wait until the new VMs are RUNNING (default False)
+                wait_timeout: Optional - seconds to wait at most in wait mode (default {DEFAULT_WAIT_TIMEOUT})
 
             Returns:
                 str: XML string with VM details or error message. If multiple VMs are created,
                      the XML will contain a <VMS> root element with a <VM> for each.
+                     In wait mode, a <VMS> root with one <VM status="..."> per new VM holding only
+                     ID, NAME, STATE, LCM_STATE and IP; status is reached (RUNNING), failed,
+                     not_found or timeout as in `wait_for_vm_state`.
         """,
     )
-    def instantiate_vm(
+    async def instantiate_vm(
         template_id: str,
         vm_name: Optional[str] = None,
         cpu: Optional[str] = None,
         memory: Optional[str] = None,
         network_name: Optional[str] = None,
         num_instances: Optional[str] = None,
+        wait: bool = False,
+        wait_timeout: Optional[str] = None,
     ) -> str:
         """Instantiate a new VM from an existing template.
 
@@ -551,10 +1358,13 @@ def register_tools(mcp, allow_write):
             memory: Optional - Memory amount given to the VM. By default the unit is megabytes.
             network_name: Optional - network name to attach
             num_instances: Optional - number of VMs to instantiate
+            wait: Optional - wait until the new VMs are RUNNING
+            wait_timeout: Optional - seconds to wait at most in wait mode
 
         Returns:
             str: XML string with VM details or error message. If multiple VMs are created,
-                 the XML will contain a <VMS> root element with a <VM> for each.
+                 the XML will contain a <VMS> root element with a <VM> for each. In wait
+                 mode, a <VMS> root with the ID, NAME, state and IP of each new VM.
         """
         # --- Permission guard -------------------------------------------------------------
         if not allow_write:
@@ -582,9 +1392,16 @@ def register_tools(mcp, allow_write):
                     or (int(value) < 0 and param_name == "template_id")
                     or (int(value) <= 0 and param_name != "template_id")
                 ):
-                    logger.error(f"Invalid {param_name} provided: {value}")
+                    logger.error("Invalid %s provided: %s", param_name, value)
                     return f"<error><message>{param_name} must be a a non-negative integer for the template_id, and a positive integer for the other parameters</message></error>"
 
+        try:
+            wait_seconds = float(wait_timeout) if wait_timeout is not None else DEFAULT_WAIT_TIMEOUT
+        except ValueError:
+            wait_seconds = 0
+        if not wait_seconds > 0:  # also rejects nan
+            return "<error><message>wait_timeout must be a positive number of seconds</message></error>"
+
         cmd_parts = ["onetemplate", "instantiate", template_id]
 
         # Optional flags
@@ -608,7 +1425,7 @@ def register_tools(mcp, allow_write):
             " ".join(cmd_parts),
         )
 
-        instantiate_output = execute_one_command(cmd_parts)
+        instantiate_output = await execute_one_command(cmd_parts)
 
         # Parse the textual output to extract the new VM IDs
         vm_ids: list[str] = []
@@ -628,20 +1445,14 @@ def register_tools(mcp, allow_write):
                 f"{instantiate_output}</message></error>"
             )
 
-        logger.debug(f"Fetching XML details for newly created VMs {vm_ids}")
+        if wait:
+            return await _wait_until_running(vm_ids, wait_seconds)
+
+        logger.debug("Fetching XML details for newly created VMs %s", vm_ids)
         if len(vm_ids) == 1:
-            return execute_one_command(["onevm", "show", vm_ids[0], "--xml"])
+            return await execute_one_command(["onevm", "show", vm_ids[0], "--xml"])
         else:
-            root = ET.Element("VMS")
-            for vm_id in vm_ids:
-                vm_xml_str = execute_one_command(["onevm", "show", vm_id, "--xml"])
-                try:
-                    vm_element = ET.fromstring(vm_xml_str)
-                    root.append(vm_element)
-                except ET.ParseError as e:
-                    logger.error(f"Failed to parse XML for VM {vm_id}: {e}")
-                    logger.error(f"XML content: {vm_xml_str}")
-            return ET.tostring(root, encoding="unicode")
+            return await _new_vms_xml(vm_ids)
 
     @mcp.tool(
         name="manage_vm",
@@ -672,7 +1483,7 @@ def register_tools(mcp, allow_write):
                 - "VMs 1 through 5" becomes a range: "1..5".
                 Mixed formats like "1..2,3" or space-separated lists like "1 2 3" are INVALID and MUST be normalized or rejected.
 
-                When multiple IDs are provided, you MUST invoke this tool **once** with the normalized list/range. Per-VM state validation is skipped client-side; the OpenNebula backend enforces it and will reject only the non-eligible VMs while processing the rest.
+                When multiple IDs are provided, you MUST invoke this tool **once** with the normalized list/range (at most {MAX_BATCH_VMS} VMs). Every VM is validated against one snapshot of the VM pool: VMs that do not exist or are not in a valid state for the operation are skipped, and the others are acted on with a single CLI call.
 
             operation: Lifecycle action to perform. Supported values are:
                 - "start"  → maps to `onevm resume`
@@ -693,9 +1504,15 @@ def register_tools(mcp, allow_write):
         - terminate: if True, forces deletion even if VM is in problematic state
 
         The tool validates current VM state and only allows valid state transitions according to OpenNebulas VM lifecycle.
+
+        Returns:
+            For a single VM, a <result> with the command output, or an <error> if the VM state does not allow the operation.
+            For a list/range, a <result> whose <vms eligible="N" skipped="N" failed="N"> child holds one
+            <vm id="..." status="eligible|skipped|failed"> per target; skipped and failed VMs have a <reason>.
+            "eligible" VMs were acted on; "failed" ones were rejected by OpenNebula.
         """,
     )
-    def manage_vm(vm_id: str, operation: str, hard: Optional[bool] = False) -> str:
+    async def manage_vm(vm_id: str, operation: str, hard: Optional[bool] = False) -> str:
         """Manage VM lifecycle operations with state validation.
 
         Args:
@@ -717,44 +1534,49 @@ def register_tools(mcp, allow_write):
 
         if not allow_write:
             logger.warning(
-                f"manage_vm called while allow_write=False - refusing operation {operation} on VM {vm_id}"
+                "manage_vm called while allow_write=False - refusing operation %s on VM %s", operation, vm_id
             )
             return "<error><message>Write operations are disabled on this MCP instance.</message></error>"
 
         valid_operations = ["start", "stop", "reboot", "terminate"]
         operation = operation.strip().lower()
         if operation not in valid_operations:
-            logger.error(f"Invalid operation: {operation}")
+            logger.error("Invalid operation: %s", operation)
             return f"<error><message>Invalid operation '{operation}'. Valid operations: {', '.join(valid_operations)}</message></error>"
 
         # Multi-VM handling (comma list or range)
         is_multi_vm = _is_multi_vm(vm_id)
         if is_multi_vm:
-            cmd_parts = _build_cmd_parts(operation, vm_id, hard)
-
-            logger.debug(f"Executing multi-VM {operation} command: {' '.join(cmd_parts)}")
-            try:
-                result = execute_one_command(cmd_parts)
-
-                return _wrap_success_xml(vm_id, operation, hard, result, True)
-
-            except Exception as e:
-                logger.error(f"Failed to execute multi-VM {operation} for {vm_id}: {e}")
-                return f"<error><message>Failed to execute multi-VM {operation}: {e}</message></error>"
+            vm_ids = _parse_vm_id_list(vm_id)
+            if vm_ids is None:
+                logger.error("Invalid VM ID list provided: %s", vm_id)
+                return (
+                    "<error><message>vm_id must be a comma-separated list or a range of "
+                    f"non-negative integers, targeting at most {MAX_BATCH_VMS} VMs</message></error>"
+                )
+            if write_window.enabled:
+                return await _manage_vms_coalesced(vm_id, vm_ids, operation, bool(hard), True)
+            return await _manage_vms(vm_id, vm_ids, operation, hard)
 
         # Single VM operation logic
         if not vm_id.isdigit() or int(vm_id) < 0:
-            logger.error(f"Invalid VM ID provided: {vm_id}")
+            logger.error("Invalid VM ID provided: %s", vm_id)
             return (
                 "<error><message>vm_id must be a non-negative integer</message></error>"
             )
 
-        # Get current VM status
-        logger.debug(f"Getting current status for VM {vm_id} before {operation}")
+        if write_window.enabled:
+            return await _manage_vms_coalesced(
+                vm_id, [str(int(vm_id))], operation, bool(hard), False
+            )
+
+        # Get current VM status from oned: writes are never validated against
+        # the event-fed state table, which may lag behind
+        logger.debug("Getting current status for VM %s before %s", vm_id, operation)
         try:
-            vm_status_xml = execute_one_command(["onevm", "show", vm_id, "--xml"])
+            vm_status_xml = await execute_one_command(["onevm", "show", vm_id, "--xml"])
         except Exception as e:
-            logger.error(f"Failed to get VM status for {vm_id}: {e}")
+            logger.error("Failed to get VM status for %s: %s", vm_id, e)
             return f"<error><message>Failed to get VM status: {e}</message></error>"
 
         # Parse VM state
@@ -770,48 +1592,36 @@ def register_tools(mcp, allow_write):
             current_lcm = int(lcm_state.text) if lcm_state is not None else None
 
             logger.debug(
-                f"VM {vm_id} current state: STATE={current_state}, LCM_STATE={current_lcm}"
+                "VM %s current state: STATE=%s, LCM_STATE=%s", vm_id, current_state, current_lcm
             )
 
         except (ET.ParseError, ValueError) as e:
-            logger.error(f"Failed to parse VM status XML: {e}")
+            logger.error("Failed to parse VM status XML: %s", e)
             return f"<error><message>Failed to parse VM status: {e}</message></error>"
 
-        # State validation and operation mapping
-        validation = STATE_VALIDATIONS.get(operation)
-        if not validation:
-            return f"<error><message>Unknown operation: {operation}</message></error>"
-
         # Check if current state allows the operation
-        if current_state not in validation["valid_states"]:
+        reason = _state_error(operation, current_state, current_lcm)
+        if reason:
             logger.warning(
-                f"VM {vm_id} operation {operation} not allowed in state {current_state}"
+                "VM %s operation %s not allowed in state %s/%s", vm_id, operation, current_state, current_lcm
             )
-            return f"<error><message>{validation['error_msg']} (current state: {current_state})</message></error>"
-
-        # Additional LCM state validation is only applied when the VM is in an ACTIVE state
-        if "valid_lcm_states" in validation and current_state == 3:
-            if current_lcm not in validation["valid_lcm_states"]:
-                logger.warning(
-                    f"VM {vm_id} operation {operation} not allowed in LCM state {current_lcm}"
-                )
-                return f"<error><message>{validation['error_msg']} (current LCM state: {current_lcm})</message></error>"
+            return f"<error><message>{reason}</message></error>"
 
         # Build CLI command for single-VM actions
         cmd_parts = _build_cmd_parts(operation, vm_id, hard)
 
-        logger.debug(f"Executing VM {operation} command: {' '.join(cmd_parts)}")
+        logger.debug("Executing VM %s command: %s", operation, " ".join(cmd_parts))
 
         # Execute operation
         try:
-            result = execute_one_command(cmd_parts)
-            logger.info(f"VM {vm_id} {operation} operation completed")
+            result = await execute_one_command(cmd_parts)
+            logger.info("VM %s %s operation completed", vm_id, operation)
 
             # Return success message in XML format
             return _wrap_success_xml(vm_id, operation, hard, result, False)
 
         except Exception as e:
-            logger.error(f"Failed to execute {operation} on VM {vm_id}: {e}")
+            logger.error("Failed to execute %s on VM %s: %s", operation, vm_id, e)
             return (
                 f"<error><message>Failed to execute {operation}: {e}</message></error>"
             )
@@ -829,7 +1639,7 @@ def register_tools(mcp, allow_write):
             str: XML string with operation result or error message.
         """,
     )
-    def vm_disk_attach(
+    async def vm_disk_attach(
         vm_id: str, image_id: Optional[str] = None, size: Optional[str] = None
     ) -> str:
         """Attach a new disk to a VM."""
@@ -857,12 +1667,12 @@ def register_tools(mcp, allow_write):
         else:
             return "<error><message>Either image_id or size must be provided</message></error>"
 
-        logger.debug(f"Attaching disk to VM {vm_id}")
+        logger.debug("Attaching disk to VM %s", vm_id)
         try:
-            result = execute_one_command(cmd_parts)
+            result = await execute_one_command(cmd_parts)
             return _wrap_success_xml(vm_id, "disk-attach", False, result, False)
         except Exception as e:
-            logger.error(f"Failed to attach disk to VM {vm_id}: {e}")
+            logger.error("Failed to attach disk to VM %s: %s", vm_id, e)
             return f"<error><message>Failed to attach disk: {e}</message></error>"
 
     @mcp.tool(
@@ -877,7 +1687,7 @@ def register_tools(mcp, allow_write):
             str: XML string with operation result or error message.
         """,
     )
-    def vm_disk_detach(vm_id: str, disk_id: str) -> str:
+    async def vm_disk_detach(vm_id: str, disk_id: str) -> str:
         """Detach a disk from a VM."""
         if not allow_write:
             logger.warning("vm_disk_detach called while allow_write=False")
@@ -888,12 +1698,12 @@ def register_tools(mcp, allow_write):
 
         cmd_parts = ["onevm", "disk-detach", vm_id, disk_id]
 
-        logger.debug(f"Detaching disk {disk_id} from VM {vm_id}")
+        logger.debug("Detaching disk %s from VM %s", disk_id, vm_id)
         try:
-            result = execute_one_command(cmd_parts)
+            result = await execute_one_command(cmd_parts)
             return _wrap_success_xml(vm_id, "disk-detach", False, result, False)
         except Exception as e:
-            logger.error(f"Failed to detach disk {disk_id} from VM {vm_id}: {e}")
+            logger.error("Failed to detach disk %s from VM %s: %s", disk_id, vm_id, e)
             return f"<error><message>Failed to detach disk: {e}</message></error>"
 
     @mcp.tool(
@@ -913,7 +1723,7 @@ def register_tools(mcp, allow_write):
             str: XML string with operation result or error message.
         """,
     )
-    def vm_disk_resize(vm_id: str, disk_id: str, size: str) -> str:
+    async def vm_disk_resize(vm_id: str, disk_id: str, size: str) -> str:
         """Resize a VM disk."""
         if not allow_write:
             logger.warning("vm_disk_resize called while allow_write=False")
@@ -924,12 +1734,12 @@ def register_tools(mcp, allow_write):
 
         cmd_parts = ["onevm", "disk-resize", vm_id, disk_id, size]
 
-        logger.debug(f"Resizing disk {disk_id} of VM {vm_id} to {size}")
+        logger.debug("Resizing disk %s of VM %s to %s", disk_id, vm_id, size)
         try:
-            result = execute_one_command(cmd_parts)
+            result = await execute_one_command(cmd_parts)
             return _wrap_success_xml(vm_id, "disk-resize", False, result, False)
         except Exception as e:
-            logger.error(f"Failed to resize disk {disk_id} of VM {vm_id}: {e}")
+            logger.error("Failed to resize disk %s of VM %s: %s", disk_id, vm_id, e)
             return f"<error><message>Failed to resize disk: {e}</message></error>"
 
     @mcp.tool(
@@ -944,7 +1754,7 @@ def register_tools(mcp, allow_write):
             str: XML string with operation result or error message.
         """,
     )
-    def vm_snapshot_create(vm_id: str, name: str) -> str:
+    async def vm_snapshot_create(vm_id: str, name: str) -> str:
         """Create a snapshot of a VM."""
         if not allow_write:
             logger.warning("vm_snapshot_create called while allow_write=False")
@@ -957,12 +1767,12 @@ def register_tools(mcp, allow_write):
 
         cmd_parts = ["onevm", "snapshot-create", vm_id, name]
 
-        logger.debug(f"Creating snapshot '{name}' for VM {vm_id}")
+        logger.debug("Creating snapshot '%s' for VM %s", name, vm_id)
         try:
-            result = execute_one_command(cmd_parts)
+            result = await execute_one_command(cmd_parts)
             return _wrap_success_xml(vm_id, "snapshot-create", False, result, False)
         except Exception as e:
-            logger.error(f"Failed to create snapshot for VM {vm_id}: {e}")
+            logger.error("Failed to create snapshot for VM %s: %s", vm_id, e)
             return f"<error><message>Failed to create snapshot: {e}</message></error>"
 
     @mcp.tool(
@@ -977,7 +1787,7 @@ def register_tools(mcp, allow_write):
             str: XML string with operation result or error message.
         """,
     )
-    def vm_snapshot_revert(vm_id: str, snapshot_id: str) -> str:
+    async def vm_snapshot_revert(vm_id: str, snapshot_id: str) -> str:
         """Revert a VM to a snapshot."""
         if not allow_write:
             logger.warning("vm_snapshot_revert called while allow_write=False")
@@ -988,12 +1798,12 @@ def register_tools(mcp, allow_write):
 
         cmd_parts = ["onevm", "snapshot-revert", vm_id, snapshot_id]
 
-        logger.debug(f"Reverting VM {vm_id} to snapshot {snapshot_id}")
+        logger.debug("Reverting VM %s to snapshot %s", vm_id, snapshot_id)
         try:
-            result = execute_one_command(cmd_parts)
+            result = await execute_one_command(cmd_parts)
             return _wrap_success_xml(vm_id, "snapshot-revert", False, result, False)
         except Exception as e:
-            logger.error(f"Failed to revert VM {vm_id} to snapshot {snapshot_id}: {e}")
+            logger.error("Failed to revert VM %s to snapshot %s: %s", vm_id, snapshot_id, e)
             return f"<error><message>Failed to revert snapshot: {e}</message></error>"
 
     @mcp.tool(
@@ -1009,7 +1819,7 @@ def register_tools(mcp, allow_write):
             str: XML string with operation result or error message.
         """,
     )
-    def vm_nic_attach(vm_id: str, network_id: str, ip: Optional[str] = None) -> str:
+    async def vm_nic_attach(vm_id: str, network_id: str, ip: Optional[str] = None) -> str:
         """Attach a network interface to a VM."""
         if not allow_write:
             logger.warning("vm_nic_attach called while allow_write=False")
@@ -1027,12 +1837,12 @@ def register_tools(mcp, allow_write):
                 return "<error><message>Invalid IP address</message></error>"
             cmd_parts.extend(["--ip", ip])
 
-        logger.debug(f"Attaching NIC to VM {vm_id} (network: {network_id})")
+        logger.debug("Attaching NIC to VM %s (network: %s)", vm_id, network_id)
         try:
-            result = execute_one_command(cmd_parts)
+            result = await execute_one_command(cmd_parts)
             return _wrap_success_xml(vm_id, "nic-attach", False, result, False)
         except Exception as e:
-            logger.error(f"Failed to attach NIC to VM {vm_id}: {e}")
+            logger.error("Failed to attach NIC to VM %s: %s", vm_id, e)
             return f"<error><message>Failed to attach NIC: {e}</message></error>"
 
     @mcp.tool(
@@ -1047,7 +1857,7 @@ def register_tools(mcp, allow_write):
             str: XML string with operation result or error message.
         """,
     )
-    def vm_nic_detach(vm_id: str, nic_id: str) -> str:
+    async def vm_nic_detach(vm_id: str, nic_id: str) -> str:
         """Detach a network interface from a VM."""
         if not allow_write:
             logger.warning("vm_nic_detach called while allow_write=False")
@@ -1058,19 +1868,19 @@ def register_tools(mcp, allow_write):
 
         cmd_parts = ["onevm", "nic-detach", vm_id, nic_id]
 
-        logger.debug(f"Detaching NIC {nic_id} from VM {vm_id}")
+        logger.debug("Detaching NIC %s from VM %s", nic_id, vm_id)
         try:
-            result = execute_one_command(cmd_parts)
+            result = await execute_one_command(cmd_parts)
             return _wrap_success_xml(vm_id, "nic-detach", False, result, False)
         except Exception as e:
-            logger.error(f"Failed to detach NIC {nic_id} from VM {vm_id}: {e}")
+            logger.error("Failed to detach NIC %s from VM %s: %s", nic_id, vm_id, e)
             return f"<error><message>Failed to detach NIC: {e}</message></error>"
 
     @mcp.tool(
         name="get_vm_log",
         description="Get the log of a virtual machine.",
     )
-    def get_vm_log(vm_id: str) -> str:
+    async def get_vm_log(vm_id: str) -> str:
         """Get the log of a virtual machine.
         Args:
             vm_id: ID of the VM
@@ -1080,7 +1890,7 @@ def register_tools(mcp, allow_write):
         if not vm_id.isdigit():
             return "<error><message>vm_id must be a non-negative integer</message></error>"
 
-        logger.debug(f"Getting log for VM {vm_id}")
+        logger.debug("Getting log for VM %s", vm_id)
         # onelog get-vm <id> returns raw text log
-        return execute_one_command(["onelog", "get-vm", vm_id])
+        return await execute_one_command(["onelog", "get-vm", vm_id])
 